@@ -0,0 +1,48 @@
+"""add player rolling features
+
+Revision ID: 3d9b6f1c8a47
+Revises: e4a7c2d91b35
+Create Date: 2026-10-18 13:02:17.334920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b6f1c8a47'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c2d91b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('player_rolling_features',
+    sa.Column('player_id', sa.String(), nullable=False),
+    sa.Column('matches_played', sa.Integer(), nullable=False),
+    sa.Column('total_goals', sa.Integer(), nullable=False),
+    sa.Column('total_assists', sa.Integer(), nullable=False),
+    sa.Column('total_minutes', sa.Integer(), nullable=False),
+    sa.Column('recent_match_ids', sa.JSON(), nullable=False),
+    sa.Column('recent_points', sa.JSON(), nullable=False),
+    sa.Column('recent_minutes', sa.JSON(), nullable=False),
+    sa.Column('last_kickoff_utc', sa.DateTime(), nullable=True),
+    sa.Column('last3_points', sa.Float(), nullable=False),
+    sa.Column('last5_points', sa.Float(), nullable=False),
+    sa.Column('goals_per90', sa.Float(), nullable=False),
+    sa.Column('assists_per90', sa.Float(), nullable=False),
+    sa.Column('minutes_trend', sa.Float(), nullable=False),
+    sa.Column('start_probability', sa.Float(), nullable=False),
+    sa.Column('stats_version', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('player_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('player_rolling_features')
@@ -0,0 +1,51 @@
+"""add player ownership counters
+
+Revision ID: 7c3e91a0b5d2
+Revises: 4fa28a6e0d12
+Create Date: 2026-10-18 09:12:41.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e91a0b5d2'
+down_revision: Union[str, Sequence[str], None] = '4fa28a6e0d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ownership_scopes',
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('squads', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    op.create_table('player_ownership',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('player_id', sa.String(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('owners', sa.Integer(), nullable=False),
+    sa.Column('captains', sa.Integer(), nullable=False),
+    sa.Column('vice_captains', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('player_id', 'scope', name='uq_player_ownership_scope')
+    )
+    op.create_index(op.f('ix_player_ownership_player_id'), 'player_ownership', ['player_id'], unique=False)
+    op.create_index(op.f('ix_player_ownership_scope'), 'player_ownership', ['scope'], unique=False)
+    # Counters start empty; the first reconciliation run backfills them.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_player_ownership_scope'), table_name='player_ownership')
+    op.drop_index(op.f('ix_player_ownership_player_id'), table_name='player_ownership')
+    op.drop_table('player_ownership')
+    op.drop_table('ownership_scopes')
@@ -0,0 +1,51 @@
+"""add data versions and team strengths
+
+Revision ID: b81f4d2e6a90
+Revises: 7c3e91a0b5d2
+Create Date: 2026-10-18 11:40:02.774105
+
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4d2e6a90'
+down_revision: Union[str, Sequence[str], None] = '7c3e91a0b5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    data_versions = op.create_table('data_versions',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('token', sa.String(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_table('team_strengths',
+    sa.Column('team_id', sa.String(), nullable=False),
+    sa.Column('matches_played', sa.Integer(), nullable=False),
+    sa.Column('goals_for', sa.Integer(), nullable=False),
+    sa.Column('goals_against', sa.Integer(), nullable=False),
+    sa.Column('attack', sa.Float(), nullable=False),
+    sa.Column('defence', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('team_id')
+    )
+    # Seed the version rows so read-only requests never have to create them
+    op.bulk_insert(data_versions, [
+        {'key': 'stats', 'token': uuid.uuid4().hex},
+        {'key': 'catalog', 'token': uuid.uuid4().hex},
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('team_strengths')
+    op.drop_table('data_versions')
@@ -0,0 +1,46 @@
+"""add team model ratings and fixture projections
+
+Revision ID: e4a7c2d91b35
+Revises: b81f4d2e6a90
+Create Date: 2026-10-18 12:25:41.508312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d91b35'
+down_revision: Union[str, Sequence[str], None] = 'b81f4d2e6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('team_strengths', sa.Column('attack_rating', sa.Float(), nullable=True))
+    op.add_column('team_strengths', sa.Column('defence_rating', sa.Float(), nullable=True))
+    op.add_column('team_strengths', sa.Column('home_advantage', sa.Float(), nullable=True))
+    op.create_table('fixture_projections',
+    sa.Column('match_id', sa.String(), nullable=False),
+    sa.Column('home_xg', sa.Float(), nullable=False),
+    sa.Column('away_xg', sa.Float(), nullable=False),
+    sa.Column('home_clean_sheet', sa.Float(), nullable=False),
+    sa.Column('away_clean_sheet', sa.Float(), nullable=False),
+    sa.Column('home_win', sa.Float(), nullable=False),
+    sa.Column('draw', sa.Float(), nullable=False),
+    sa.Column('away_win', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ),
+    sa.PrimaryKeyConstraint('match_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('fixture_projections')
+    op.drop_column('team_strengths', 'home_advantage')
+    op.drop_column('team_strengths', 'defence_rating')
+    op.drop_column('team_strengths', 'attack_rating')
@@ -32,6 +32,14 @@ class Settings(BaseSettings):
         default="http://localhost:11434/v1", alias="OLLAMA_BASE_URL"
     )
     ollama_model: str = Field(default="qwen3:4b", alias="OLLAMA_MODEL")
+    # Shared Ollama client (app/integrations/ollama_client.py); match OLLAMA_NUM_PARALLEL on the server
+    ollama_max_concurrency: int = Field(default=2, alias="OLLAMA_MAX_CONCURRENCY")
+    ollama_max_queue: int = Field(default=16, alias="OLLAMA_MAX_QUEUE")
+    ollama_queue_timeout_s: float = Field(default=5.0, alias="OLLAMA_QUEUE_TIMEOUT_S")
+    ollama_timeout_s: float = Field(default=30.0, alias="OLLAMA_TIMEOUT_S")
+    # ToT planner response cache (app/integrations/planner.py)
+    tot_cache_size: int = Field(default=256, alias="TOT_CACHE_SIZE")
+    tot_cache_ttl_s: float = Field(default=900.0, alias="TOT_CACHE_TTL_S")
 
     # OpenAI-compatible key (set to "ollama" when using Ollama, unused otherwise)
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
@@ -40,6 +48,25 @@ class Settings(BaseSettings):
     rl_model_path: str = Field(
         default="./models/rl_executor.pth", alias="RL_MODEL_PATH"
     )
+    # Versioned policy registry (app/rl/model_registry.py); RL_MODEL_PATH is the fallback
+    rl_model_registry: str = Field(default="./models/registry", alias="RL_MODEL_REGISTRY")
+    # Micro-batching of policy steps across concurrent requests (0 disables the window)
+    rl_batch_window_ms: float = Field(default=3.0, alias="RL_BATCH_WINDOW_MS")
+    rl_max_batch: int = Field(default=64, alias="RL_MAX_BATCH")
+    # Policy beam search for alternative squads (app/rl/squad_beam.py)
+    rl_beam_width: int = Field(default=16, alias="RL_BEAM_WIDTH")
+    rl_squad_alternatives: int = Field(default=3, alias="RL_SQUAD_ALTERNATIVES")
+    # CPU-heavy AI calls run on this many worker processes (0 = in-process threads)
+    ai_workers: int = Field(default=0, alias="AI_WORKERS")
+    ai_max_queue: int = Field(default=32, alias="AI_MAX_QUEUE")
+    ai_task_timeout_s: float = Field(default=10.0, alias="AI_TASK_TIMEOUT_S")
+    # Monte Carlo scenarios per round-points simulation (app/rl/round_simulator.py)
+    rl_round_scenarios: int = Field(default=50_000, alias="RL_ROUND_SCENARIOS")
+
+    # Historical WC results (scripts/collect_training_data.py) — team-model priors
+    historical_results_path: str = Field(
+        default="../../data/historical_match_results.csv", alias="HISTORICAL_RESULTS_PATH"
+    )
 
     # ChromaDB episodic memory
     chromadb_path: str = Field(default="./data/chromadb", alias="CHROMADB_PATH")
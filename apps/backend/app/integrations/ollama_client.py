@@ -0,0 +1,205 @@
+"""
+Shared async client for Ollama's OpenAI-compatible chat endpoint.
+
+A local Ollama serves only OLLAMA_NUM_PARALLEL generations at once and
+queues the rest internally, where they sit until the HTTP timeout. This
+client keeps one keep-alive connection pool for the whole process and
+admits at most max_concurrency requests at a time. Up to max_queue more
+may wait for a slot, for at most queue_timeout_s. Beyond that, chat()
+raises OllamaBusy at once, and the planner answers with its fallback.
+
+    client = get_ollama_client()
+    text = await client.chat(system=..., user=...)
+    async for piece in client.chat_stream(system=..., user=...):
+        ...
+
+stats() reports queue wait and generation latencies for /ai/agent-status.
+The app lifespan closes the client on shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+
+LATENCY_WINDOW = 500    # recent requests kept for the latency percentiles
+
+
+class OllamaBusy(RuntimeError):
+    """No generation slot became free: the wait queue is full or the wait timed out."""
+
+
+class OllamaClient:
+    """Pooled httpx client with a concurrency limit matched to Ollama's parallelism."""
+
+    def __init__(self, base_url: str, model: str, max_concurrency: int = 2, max_queue: int = 16,
+                 queue_timeout_s: float = 5.0, timeout_s: float = 30.0,
+                 transport: httpx.AsyncBaseTransport | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.timeout_s = timeout_s
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        self._waits: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._generations: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Counters for /ai/agent-status
+        self.requests = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_timeouts = 0
+
+    async def chat(self, system: str, user: str, temperature: float = 0.7, max_tokens: int = 2048) -> str:
+        """Return the completion text for one system + user message pair."""
+        payload = self._payload(system, user, temperature, max_tokens)
+        await self._acquire()
+        started_at = time.perf_counter()
+        try:
+            resp = await self._get_client().post("/chat/completions", json=payload)
+            resp.raise_for_status()
+            content = resp.json()["choices"][0]["message"]["content"]
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self._release(started_at)
+        self.completed += 1
+        return content
+
+    async def chat_stream(self, system: str, user: str, temperature: float = 0.7,
+                          max_tokens: int = 2048) -> AsyncIterator[str]:
+        """Yield the completion text in pieces as Ollama generates it (stream: true).
+
+        The slot is held until the stream is exhausted or closed.
+        """
+        payload = self._payload(system, user, temperature, max_tokens) | {"stream": True}
+        await self._acquire()
+        started_at = time.perf_counter()
+        try:
+            async with self._get_client().stream("POST", "/chat/completions", json=payload) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    # OpenAI-style server-sent events: "data: {chunk}" lines, then "data: [DONE]"
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except GeneratorExit:       # the consumer has what it needs, or its client disconnected
+            self.completed += 1
+            raise
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self._release(started_at)
+        self.completed += 1
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "waiting": self._waiting,
+            "requests": self.requests,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_timeouts": self.queue_timeouts,
+            "wait_ms_p50": _percentile_ms(self._waits, 50),
+            "wait_ms_p95": _percentile_ms(self._waits, 95),
+            "generation_ms_p50": _percentile_ms(self._generations, 50),
+            "generation_ms_p95": _percentile_ms(self._generations, 95),
+        }
+
+    def _payload(self, system: str, user: str, temperature: float, max_tokens: int) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency,
+                                  max_keepalive_connections=self.max_concurrency)
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout_s,
+                                             limits=limits, transport=self._transport)
+        return self._client
+
+    async def _acquire(self) -> None:
+        self.requests += 1
+        # Counted before the first await, so concurrent callers cannot all slip past the check
+        if self._active + self._waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise OllamaBusy(f"Ollama is busy ({self._active} generating, {self._waiting} waiting)")
+        self._waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self.queue_timeouts += 1
+            raise OllamaBusy(f"no Ollama slot became free within {self.queue_timeout_s:g}s")
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        self._waits.append(time.perf_counter() - queued_at)
+
+    def _release(self, started_at: float) -> None:
+        self._generations.append(time.perf_counter() - started_at)
+        self._active -= 1
+        self._slots.release()
+
+
+def _percentile_ms(samples: deque[float], q: float) -> float:
+    return round(1000 * float(np.percentile(list(samples), q)), 1) if samples else 0.0
+
+
+_client: OllamaClient | None = None
+
+
+def get_ollama_client() -> OllamaClient:
+    global _client
+    if _client is None:
+        _client = OllamaClient(
+            settings.ollama_base_url,
+            settings.ollama_model,
+            max_concurrency=settings.ollama_max_concurrency,
+            max_queue=settings.ollama_max_queue,
+            queue_timeout_s=settings.ollama_queue_timeout_s,
+            timeout_s=settings.ollama_timeout_s,
+        )
+    return _client
+
+
+async def close_ollama_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
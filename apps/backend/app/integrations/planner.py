@@ -11,12 +11,15 @@ Each branch includes reasoning, recommended players, and confidence %.
 """
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
-from typing import Any
-
-import httpx
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 
 from app.core.config import settings
+from app.integrations.ollama_client import get_ollama_client
+from app.integrations.response_cache import ResponseCache
 
 TOT_SYSTEM_PROMPT = """You are an expert FIFA World Cup 2026 fantasy football strategist.
 Analyze the given player data and generate exactly 3 strategy branches:
@@ -35,6 +38,9 @@ For each branch, provide:
 
 Respond ONLY with a JSON array of 3 branch objects. No extra text."""
 
+# ToT responses, keyed by prompt inputs and scoped to the stats/catalog version
+_tot_cache = ResponseCache(max_entries=settings.tot_cache_size, ttl_s=settings.tot_cache_ttl_s)
+
 QA_SYSTEM_PROMPT = """You are a helpful FIFA World Cup 2026 fantasy football assistant.
 Answer questions about squad rules, scoring, strategy, and player comparisons.
 Keep answers concise (2-4 sentences). Reference specific rules when relevant.
@@ -50,18 +56,137 @@ Key rules:
 async def generate_tot_branches(
     player_context: str,
     squad_context: str | None = None,
+    data_version: str | None = None,
 ) -> list[dict[str, Any]]:
     """Call Ollama to generate 3 ToT branches.
 
-    Falls back to mock branches if Ollama is unreachable.
+    Responses are cached per (system prompt, player context, squad context,
+    model) within the current data_version (the player pool's stats/catalog
+    token), and identical concurrent calls share one completion. Falls back
+    to mock branches if Ollama is unreachable; fallbacks are not cached.
+    """
+    prompt = _tot_prompt(player_context, squad_context)
+    key = _tot_key(player_context, squad_context)
+    branches = await _tot_cache.get_or_compute(key, lambda: _llm_branches(prompt), scope=data_version)
+    # Copies: callers may annotate branches, and the cached ones are shared
+    return copy.deepcopy(branches) if branches is not None else _mock_branches()
+
+
+async def stream_tot_branches(
+    player_context: str,
+    squad_context: str | None = None,
+    data_version: str | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield the 3 ToT branches one by one, each as soon as its JSON object is complete.
+
+    Uses the same cache as generate_tot_branches: a hit yields at once, and a
+    full streamed answer is stored for later calls. If Ollama fails part way,
+    the branches still missing are filled from the mock fallbacks.
+    """
+    key = _tot_key(player_context, squad_context)
+    cached = _tot_cache.get(key, scope=data_version)
+    if cached is not None:
+        for branch in copy.deepcopy(cached):
+            yield branch
+        return
+
+    parser = BranchStreamParser()
+    branches: list[dict[str, Any]] = []
+    stream = get_ollama_client().chat_stream(system=TOT_SYSTEM_PROMPT, user=_tot_prompt(player_context, squad_context))
+    try:
+        # aclosing: stopping early must end the HTTP stream and free the Ollama slot now
+        async with aclosing(stream) as pieces:
+            async for piece in pieces:
+                for branch in parser.feed(piece)[:3 - len(branches)]:
+                    branches.append(branch)
+                    yield copy.deepcopy(branch)
+                if len(branches) == 3:
+                    break
+    except Exception:
+        pass
+
+    if len(branches) == 3:
+        _tot_cache.put(key, branches, scope=data_version)
+        return
+    seen = {b.get("branch") for b in branches}
+    for branch in _mock_branches():
+        if len(branches) == 3:
+            break
+        if branch["branch"] not in seen:
+            branches.append(branch)
+            yield branch
+
+
+class BranchStreamParser:
+    """Incremental parser for the planner's JSON array of branch objects.
+
+    feed() takes the next piece of completion text and returns the branch
+    objects completed by it. Text outside the objects (the array brackets,
+    commas, markdown fences) is skipped, as are objects without a "branch".
     """
-    prompt = f"""Current player data:
+
+    def __init__(self):
+        self._buf: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        done = []
+        for ch in text:
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                continue
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    branch = _loads_object("".join(self._buf))
+                    if branch is not None and "branch" in branch:
+                        done.append(branch)
+        return done
+
+
+def _loads_object(text: str) -> dict | None:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _tot_prompt(player_context: str, squad_context: str | None) -> str:
+    return f"""Current player data:
 {player_context}
 
 {f'Current squad: {squad_context}' if squad_context else 'No current squad — building from scratch.'}
 
 Generate your 3 strategy branches as a JSON array."""
 
+
+def _tot_key(player_context: str, squad_context: str | None) -> str:
+    return _cache_key(TOT_SYSTEM_PROMPT, player_context, squad_context or "", settings.ollama_model)
+
+
+def tot_cache_stats() -> dict:
+    return _tot_cache.stats()
+
+
+async def _llm_branches(prompt: str) -> list[dict[str, Any]] | None:
+    """Three branches parsed from one completion, or None when Ollama fails."""
     try:
         response = await _chat_completion(
             system=TOT_SYSTEM_PROMPT,
@@ -73,9 +198,11 @@ Generate your 3 strategy branches as a JSON array."""
             return branches[:3]
     except Exception:
         pass
+    return None
+
 
-    # Fallback mock branches
-    return _mock_branches()
+def _cache_key(*parts: str) -> str:
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
 
 
 async def answer_question(question: str) -> str:
@@ -93,23 +220,8 @@ async def answer_question(question: str) -> str:
 
 
 async def _chat_completion(system: str, user: str) -> str:
-    """Call Ollama's OpenAI-compatible chat endpoint."""
-    url = f"{settings.ollama_base_url}/chat/completions"
-    payload = {
-        "model": settings.ollama_model,
-        "messages": [
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        "temperature": 0.7,
-        "max_tokens": 2048,
-    }
-
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        return data["choices"][0]["message"]["content"]
+    """Call Ollama's OpenAI-compatible chat endpoint through the shared, rate-limited client."""
+    return await get_ollama_client().chat(system=system, user=user)
 
 
 def _parse_json_array(text: str) -> list[dict] | None:
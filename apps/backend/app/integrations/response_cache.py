@@ -0,0 +1,121 @@
+"""
+In-process response cache for slow async calls (LLM completions).
+
+    cache = ResponseCache(max_entries=256, ttl_s=900)
+    value = await cache.get_or_compute(key, lambda: call_llm(prompt), scope=data_version)
+
+Entries are evicted least-recently-used beyond max_entries and expire
+ttl_s after they were stored. Calls are single-flight: while a key is
+being computed, identical requests await the same in-flight call instead
+of starting their own. A failed call is not cached, and neither is a
+result rejected by `cacheable` (e.g. a fallback answer).
+
+`scope` ties entries to a data version: when a lookup arrives with a new
+scope, every entry from the old one is dropped, since answers computed
+from stale stats or prices should not be served again.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class ResponseCache:
+    """Async LRU + TTL cache with single-flight coalescing, scoped to a data version."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 900.0,
+                 cacheable: Callable[[Any], bool] = lambda value: value is not None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.cacheable = cacheable
+        self.scope: Hashable = None
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        # Counters for /ai/agent-status
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             scope: Hashable = None) -> Any:
+        key = self._scoped(key, scope)
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The call runs as its own task, so a cancelled first caller does not cancel it for the others
+            task = asyncio.get_running_loop().create_task(self._fill(key, compute))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())   # never "unretrieved"
+            self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    def get(self, key: Hashable, scope: Hashable = None) -> Any:
+        """Cached value or None, for callers that produce values themselves (e.g. streams)."""
+        entry = self._lookup(self._scoped(key, scope))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any, scope: Hashable = None) -> None:
+        key = self._scoped(key, scope)
+        if self.cacheable(value):
+            self._store(key, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _scoped(self, key: Hashable, scope: Hashable) -> tuple:
+        if scope != self.scope:
+            self._entries.clear()
+            self.scope = scope
+        return scope, key
+
+    def _lookup(self, key: tuple) -> tuple[float, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _fill(self, key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+        finally:
+            self._in_flight.pop(key, None)
+        if self.cacheable(value) and key[0] == self.scope:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
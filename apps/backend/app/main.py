@@ -3,6 +3,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.integrations.ollama_client import close_ollama_client
 from app.routers import (
     ai_router,
     auth_router,
@@ -14,13 +15,17 @@ from app.routers import (
     transfers_router,
     users_router,
 )
+from app.rl import inference
 from app.tasks.scheduler import start_scheduler, stop_scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     start_scheduler()
+    inference.get_compute_pool().start()
     yield
+    inference.get_compute_pool().shutdown()
+    await close_ollama_client()
     stop_scheduler()
 
 
@@ -1,29 +1,40 @@
 from app.models.ai_decision import AIDecision
+from app.models.data_version import DataVersion
+from app.models.fixture_projection import FixtureProjection
 from app.models.league import League, league_memberships
 from app.models.match import Match, MatchStatus
 from app.models.player import Player
 from app.models.player_match_stats import PlayerMatchStats
+from app.models.player_ownership import OwnershipScope, PlayerOwnership
+from app.models.player_rolling_features import PlayerRollingFeatures
 from app.models.round import Round, round_matches
 from app.models.squad import Squad
 from app.models.squad_player import SquadPlayer
 from app.models.squad_round_points import SquadRoundPoints
 from app.models.team import Team
+from app.models.team_strength import TeamStrength
 from app.models.user import User
 
 __all__ = [
     "AIDecision",
+    "DataVersion",
+    "FixtureProjection",
     "League",
     "league_memberships",
     "Match",
     "MatchStatus",
     "Player",
     "PlayerMatchStats",
+    "OwnershipScope",
+    "PlayerOwnership",
+    "PlayerRollingFeatures",
     "Round",
     "round_matches",
     "Squad",
     "SquadPlayer",
     "SquadRoundPoints",
     "Team",
+    "TeamStrength",
     "User",
 ]
 
@@ -0,0 +1,20 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from app.core.db import Base
+
+
+class DataVersion(Base):
+    """Opaque version token per data domain ("stats", "catalog").
+
+    Writers bump the token whenever the underlying data changes; in-process
+    caches key on the token so they rebuild lazily, once per change.
+    """
+
+    __tablename__ = "data_versions"
+
+    key = Column(String, primary_key=True)
+    token = Column(String, nullable=False, default=lambda: uuid.uuid4().hex)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
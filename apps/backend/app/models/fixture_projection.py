@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, String
+from sqlalchemy.orm import relationship
+
+from app.core.db import Base
+
+
+class FixtureProjection(Base):
+    """Poisson team-model projection for one upcoming match."""
+
+    __tablename__ = "fixture_projections"
+
+    match_id = Column(String, ForeignKey("matches.id"), primary_key=True)
+    home_xg = Column(Float, nullable=False)
+    away_xg = Column(Float, nullable=False)
+    # P(team keeps a clean sheet)
+    home_clean_sheet = Column(Float, nullable=False)
+    away_clean_sheet = Column(Float, nullable=False)
+    home_win = Column(Float, nullable=False)
+    draw = Column(Float, nullable=False)
+    away_win = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    match = relationship("Match")
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from app.core.db import Base
+
+# Scope value for tournament-wide counters (other scopes are league IDs)
+GLOBAL_SCOPE = "global"
+
+
+class PlayerOwnership(Base):
+    """Denormalised ownership/captaincy counters for one player in one scope."""
+
+    __tablename__ = "player_ownership"
+    __table_args__ = (UniqueConstraint("player_id", "scope", name="uq_player_ownership_scope"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    player_id = Column(String, ForeignKey("players.id"), nullable=False, index=True)
+    # "global" or a league ID
+    scope = Column(String, nullable=False, index=True)
+    owners = Column(Integer, default=0, nullable=False)
+    captains = Column(Integer, default=0, nullable=False)
+    vice_captains = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    player = relationship("Player")
+
+
+class OwnershipScope(Base):
+    """Number of squads in a scope — the denominator for "selected by %"."""
+
+    __tablename__ = "ownership_scopes"
+
+    scope = Column(String, primary_key=True)
+    squads = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.db import Base
+
+
+class PlayerRollingFeatures(Base):
+    """Rolling-window form features for one player, maintained per finished match."""
+
+    __tablename__ = "player_rolling_features"
+
+    player_id = Column(String, ForeignKey("players.id"), primary_key=True)
+    matches_played = Column(Integer, default=0, nullable=False)
+    total_goals = Column(Integer, default=0, nullable=False)
+    total_assists = Column(Integer, default=0, nullable=False)
+    total_minutes = Column(Integer, default=0, nullable=False)
+    # Last 5 appearances, oldest first: match IDs, fantasy points, minutes
+    recent_match_ids = Column(JSON, nullable=False, default=list)
+    recent_points = Column(JSON, nullable=False, default=list)
+    recent_minutes = Column(JSON, nullable=False, default=list)
+    last_kickoff_utc = Column(DateTime, nullable=True)
+    # Derived features (mean points per appearance over the window)
+    last3_points = Column(Float, default=0.0, nullable=False)
+    last5_points = Column(Float, default=0.0, nullable=False)
+    goals_per90 = Column(Float, default=0.0, nullable=False)
+    assists_per90 = Column(Float, default=0.0, nullable=False)
+    # Least-squares slope of minutes over the window (minutes per match)
+    minutes_trend = Column(Float, default=0.0, nullable=False)
+    start_probability = Column(Float, default=0.0, nullable=False)
+    # Stats data-version token of the transaction that last wrote this row
+    stats_version = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    player = relationship("Player")
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.db import Base
+
+
+class TeamStrength(Base):
+    """Per-team attack/defence record, recomputed after each finished match."""
+
+    __tablename__ = "team_strengths"
+
+    team_id = Column(String, ForeignKey("teams.id"), primary_key=True)
+    matches_played = Column(Integer, default=0, nullable=False)
+    goals_for = Column(Integer, default=0, nullable=False)
+    goals_against = Column(Integer, default=0, nullable=False)
+    # Goals scored / conceded per finished match
+    attack = Column(Float, default=0.0, nullable=False)
+    defence = Column(Float, default=0.0, nullable=False)
+    # Poisson team-model log ratings (team_model_service), NULL until fitted.
+    # attack_rating includes the baseline scoring rate; higher defence = fewer conceded.
+    attack_rating = Column(Float, nullable=True)
+    defence_rating = Column(Float, nullable=True)
+    # Global home-advantage term of the same fit, repeated on every row
+    home_advantage = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    team = relationship("Team")
@@ -0,0 +1,120 @@
+"""
+Micro-batched policy inference across concurrent requests.
+
+Every squad-builder request walks FantasyEnv pick by pick, one policy
+forward pass per pick. Under a burst, those passes are hundreds of small
+matmuls interleaved on the event loop. PolicyBatchScheduler collects the
+pending steps of all in-flight requests over a short window (a few ms) and
+runs them as one batched forward pass via FantasyPolicy.select_actions.
+
+    scheduler = PolicyBatchScheduler(get_policy, window_ms=3.0)
+    action = await scheduler.select_action(obs, mask)
+
+A batch is flushed when its window expires or when it reaches max_batch,
+whichever is first. Steps whose observations have different sizes (the
+player pool changed mid-burst) are evaluated as separate batches. When
+every row of a batch shares the same player block — the usual case, as
+all requests score the cached catalog — the player embeddings are
+computed once per batch (FantasyPolicy.forward_shared_pool), so a batch
+costs far less than its rows evaluated one by one. The forward pass runs
+in the default executor, so the loop keeps collecting the next batch
+while one is being evaluated.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+from app.rl.executor_policy import STATE_DIM, FantasyPolicy
+
+
+class PolicyBatchScheduler:
+    """Coalesces single-step select_action calls into batched forward passes."""
+
+    def __init__(
+        self,
+        policy_getter: Callable[[], FantasyPolicy],
+        window_ms: float = 3.0,
+        max_batch: int = 64,
+        seed: int | None = None,
+    ):
+        self.policy_getter = policy_getter
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._rng = np.random.default_rng(seed)
+        self._pending: list[tuple[np.ndarray, np.ndarray, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()   # batches may overlap in the executor; the rng is not thread-safe
+        # Counters for /ai/agent-status and the window benchmark
+        self.steps = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.forward_seconds = 0.0
+
+    async def select_action(self, obs: np.ndarray, mask: np.ndarray) -> int:
+        """Queue one policy step and wait for its batch to be evaluated."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((obs, mask, future))
+        if len(self._pending) >= self.max_batch or self.window_ms <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "steps": self.steps,
+            "batches": self.batches,
+            "mean_batch_size": round(self.steps / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "forward_ms_per_step": round(1000 * self.forward_seconds / self.steps, 3) if self.steps else 0.0,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        groups: dict[int, list] = {}
+        for item in batch:
+            groups.setdefault(item[0].shape[-1], []).append(item)
+        for items in groups.values():
+            task = asyncio.get_running_loop().create_task(self._run(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: list[tuple[np.ndarray, np.ndarray, asyncio.Future]]) -> None:
+        obs = np.stack([item[0] for item in items])
+        masks = np.stack([item[1] for item in items])
+        loop = asyncio.get_running_loop()
+        try:
+            actions = await loop.run_in_executor(None, self._evaluate, obs, masks)
+        except Exception as exc:  # surface model errors to every waiting request
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), action in zip(items, actions):
+            if not future.done():
+                future.set_result(int(action))
+
+    def _evaluate(self, obs: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        # Requests scoring the same catalog share the player block of the observation
+        n_features = obs.shape[1] - STATE_DIM
+        shared = bool((obs[1:, :n_features] == obs[0, :n_features]).all())
+        with self._lock:
+            start = time.perf_counter()
+            actions = self.policy_getter().select_actions(obs, masks, self._rng, shared_pool=shared)
+            self.forward_seconds += time.perf_counter() - start
+            self.steps += len(obs)
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(obs))
+        return actions
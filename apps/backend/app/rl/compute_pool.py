@@ -0,0 +1,235 @@
+"""
+Bounded offload of CPU-heavy AI work — policy decoding, optimizers, simulations.
+
+The AI endpoints are async, so a NumPy-heavy call made directly in a
+handler holds the event loop and every other request waits behind it.
+ComputePool runs such calls on a pool of worker processes instead:
+
+    pool = ComputePool(workers=2, max_queue=32, timeout_s=10.0)
+    pool.start()                                   # spawn and warm the workers
+    result = await pool.run(inference.suggest_lineup_rl, player_ids)
+
+Tasks are module-level functions taking a DB session first. The pool opens
+a fresh session for every task and closes it when the task ends, so only
+the other arguments cross the process boundary. The request's session is
+never shared: a task that outlives its timeout, or its cancelled caller,
+must not use a session the request is already closing.
+
+Workers are warm: each one loads the live policy and builds the cached
+player pool when it starts, and keeps both across tasks (the registry and
+the pool cache still pick up new versions).
+
+workers=0 runs tasks on a small in-process thread pool instead, with
+sessions from session_factory (SessionLocal by default; tests pass one
+bound to their in-memory SQLite, which other processes cannot see). That
+suits development and still keeps the event loop free.
+
+The pool is bounded: at most workers + max_queue tasks are in flight, and
+run() raises ComputePoolFull beyond that instead of queueing without
+limit. A task that exceeds its timeout raises ComputeTimeout. A queued
+task is dropped on timeout. A running one cannot be interrupted, so it
+keeps its slot until it finishes. stats() reports queue depth, counters
+and wait/run latencies for /ai/agent-status.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+INLINE_THREADS = 2
+LATENCY_WINDOW = 500    # recent tasks kept for the latency percentiles
+
+
+class ComputePoolFull(RuntimeError):
+    """More than workers + max_queue tasks would be in flight."""
+
+
+class ComputeTimeout(TimeoutError):
+    """A task did not finish within its timeout."""
+
+
+class ComputePool:
+    """Process pool with warm workers, a bounded queue and per-task timeouts."""
+
+    def __init__(self, workers: int = 0, max_queue: int = 32, timeout_s: float = 10.0,
+                 warmup: Callable[[], None] | None = None,
+                 session_factory: Callable[[], Any] | None = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_s = timeout_s
+        self.warmup = warmup
+        self.session_factory = session_factory      # thread mode only; workers use SessionLocal
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waits: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._runs: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Counters for /ai/agent-status
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.max_in_flight_seen = 0
+
+    @property
+    def slots(self) -> int:
+        """Tasks that can run at once."""
+        return self.workers if self.workers > 0 else INLINE_THREADS
+
+    @property
+    def capacity(self) -> int:
+        return self.slots + self.max_queue
+
+    def start(self) -> None:
+        """Create the executor and spawn every worker now, rather than on the first requests."""
+        executor = self._get_executor()
+        if self.workers > 0:
+            for _ in range(self.workers):
+                executor.submit(_ping)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: float | None = None, **kwargs) -> Any:
+        """Run fn(db, *args, **kwargs) off the event loop, with a session of its own, and return its result.
+
+        Exceptions raised by fn propagate unchanged.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise ComputePoolFull(f"AI compute pool is busy ({self._in_flight} tasks in flight)")
+            self._in_flight += 1
+            self.submitted += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self._in_flight)
+
+        submitted_at = time.time()
+        try:
+            if self.workers > 0:
+                future = self._get_executor().submit(_run_in_worker, fn, args, kwargs)
+            else:
+                future = self._get_executor().submit(_run_inline, fn, self.session_factory, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(lambda f: self._finished(f, submitted_at))
+
+        try:
+            return (await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout_s))[1]
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise ComputeTimeout(f"{fn.__name__} did not finish within {timeout or self.timeout_s:g}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): start a fresh pool for the next tasks
+            log.error("AI compute worker died; restarting the pool")
+            self.shutdown()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            waits, runs = list(self._waits), list(self._runs)
+        slots = self.slots
+        return {
+            "mode": "processes" if self.workers > 0 else "threads",
+            "workers": slots,
+            "max_queue": self.max_queue,
+            "timeout_s": self.timeout_s,
+            "in_flight": in_flight,
+            "queue_depth": max(in_flight - slots, 0),
+            "max_in_flight": self.max_in_flight_seen,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "wait_ms_p50": _percentile_ms(waits, 50),
+            "wait_ms_p95": _percentile_ms(waits, 95),
+            "run_ms_p50": _percentile_ms(runs, 50),
+            "run_ms_p95": _percentile_ms(runs, 95),
+        }
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # spawn: forking a process that holds DB connections and an event loop is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker, initargs=(self.warmup,),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(INLINE_THREADS, thread_name_prefix="ai-compute")
+            return self._executor
+
+    def _finished(self, future, submitted_at: float) -> None:
+        if future.cancelled():              # dropped from the queue after a timeout
+            self._release(None)
+        elif future.exception() is not None:
+            self._release(None, failed=True)
+        else:
+            self._release((submitted_at, future.result()[0], time.time()))
+
+    def _release(self, timing: tuple[float, float, float] | None, failed: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if timing is not None:
+                submitted_at, started_at, finished_at = timing
+                self.completed += 1
+                self._waits.append(max(started_at - submitted_at, 0.0))
+                self._runs.append(finished_at - started_at)
+            elif failed:
+                self.failed += 1
+
+
+def _percentile_ms(samples: list[float], q: float) -> float:
+    return round(1000 * float(np.percentile(samples, q)), 1) if samples else 0.0
+
+
+# ── Worker side ───────────────────────────────────────────────────
+
+
+def _init_worker(warmup: Callable[[], None] | None) -> None:
+    if warmup is None:
+        return
+    try:
+        warmup()
+    except Exception:  # a cold worker still serves; the first task pays the load
+        log.exception("AI compute worker warm-up failed")
+
+
+def _ping() -> None:
+    return None
+
+
+def _run_in_worker(fn: Callable[..., Any], args: tuple, kwargs: dict) -> tuple[float, Any]:
+    return _run_inline(fn, None, args, kwargs)
+
+
+def _run_inline(fn: Callable[..., Any], session_factory: Callable[[], Any] | None,
+                args: tuple, kwargs: dict) -> tuple[float, Any]:
+    if session_factory is None:
+        from app.core.db import SessionLocal as session_factory
+
+    started_at = time.time()
+    db = session_factory()
+    try:
+        return started_at, fn(db, *args, **kwargs)
+    finally:
+        db.close()
@@ -2,18 +2,28 @@
 Fantasy WC26 RL Environment — Gymnasium-compatible.
 
 State:  player feature matrix (flattened) + budget + position slot counts + squad size
-Action: pick one player (discrete 0..MAX_PLAYERS-1)
+Action: pick one player (discrete 0..pool_size-1)
 Reward: fantasy points of the selected squad after a simulated round
 
+Replay mode (episodes=EpisodeStore) plays historical rounds instead: each
+reset() samples a round, the pool is that round's players with their
+pre-round features, and the squad is rewarded with the points its players
+actually scored.
+
 Constraint masking: invalid actions (over budget, wrong position, too many
 from same team) are masked via the `action_masks()` method, compatible with
 Stable-Baselines3 MaskablePPO.
 """
+from typing import TYPE_CHECKING
+
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
 
-MAX_PLAYERS = 200  # padded pool size (actual count may be less)
+if TYPE_CHECKING:
+    from app.rl.episode_store import EpisodeStore
+
+MAX_PLAYERS = 200  # minimum padded pool size (smaller pools are zero-padded)
 FEATURE_DIM = 8    # features per player
 
 # Position limits for a 15-player squad
@@ -60,54 +70,126 @@ def _generate_team_ids(n: int = MAX_PLAYERS, n_teams: int = 48) -> np.ndarray:
 
 
 class FantasyEnv(gym.Env):
-    """Fantasy football squad selection environment."""
+    """Fantasy football squad selection environment.
+
+    Constraint state lives in NumPy arrays (picked flags, per-position and
+    per-team counts) and an `_available` mask that is narrowed incrementally
+    as positions and teams fill up, so masking is one vectorised budget
+    comparison per step. Observations are written into a preallocated
+    buffer: the array returned by reset()/step() is reused, so copy it if
+    you need to keep it past the next step.
+    """
 
     metadata = {"render_modes": []}
 
     def __init__(self, player_pool: np.ndarray | None = None,
-                 team_ids: np.ndarray | None = None):
+                 team_ids: np.ndarray | None = None,
+                 episodes: "EpisodeStore | None" = None):
         super().__init__()
 
-        self.player_pool = player_pool if player_pool is not None else _generate_random_pool()
-        self.team_ids = team_ids if team_ids is not None else _generate_team_ids(len(self.player_pool))
-        self.n_players = len(self.player_pool)
-
-        # Pad to MAX_PLAYERS if needed
-        if self.n_players < MAX_PLAYERS:
-            pad = np.zeros((MAX_PLAYERS - self.n_players, FEATURE_DIM), dtype=np.float32)
-            self.player_pool = np.vstack([self.player_pool, pad])
-            self.team_ids = np.concatenate([
-                self.team_ids,
-                np.full(MAX_PLAYERS - self.n_players, -1, dtype=np.int64),
-            ])
+        self.episodes = episodes
+        self.round_index: int | None = None
+        realised = None
+        if episodes is not None:
+            # Replay: reset() loads a sampled historical round; pad every round to the largest
+            player_pool, team_ids, realised = episodes.round(0)
+            self.pool_size = max(episodes.max_round_size, MAX_PLAYERS)
+        else:
+            player_pool = player_pool if player_pool is not None else _generate_random_pool()
+            team_ids = team_ids if team_ids is not None else _generate_team_ids(len(player_pool))
+            # Pad to MAX_PLAYERS if needed; larger pools (full catalog) are used as-is
+            self.pool_size = max(len(player_pool), MAX_PLAYERS)
 
         # Spaces
-        obs_dim = MAX_PLAYERS * FEATURE_DIM + 6  # + budget + 4 pos slots + squad_size
+        obs_dim = self.pool_size * FEATURE_DIM + 6  # + budget + 4 pos slots + squad_size
         self.observation_space = spaces.Box(
             low=-np.inf, high=np.inf, shape=(obs_dim,), dtype=np.float32
         )
-        self.action_space = spaces.Discrete(MAX_PLAYERS)
+        self.action_space = spaces.Discrete(self.pool_size)
 
         # Constraints
         self.position_limits = dict(POSITION_LIMITS)
         self.max_per_team = MAX_PER_TEAM
 
+        # Observation buffer: the pool part only changes when a replay round is loaded
+        self._obs = np.empty(obs_dim, dtype=np.float32)
+        self._load_pool(player_pool, team_ids, realised)
+
         # State (set in reset)
         self.budget_remaining = INITIAL_BUDGET
         self.squad: list[int] = []
-        self.position_counts = {"GK": 0, "DEF": 0, "MID": 0, "FWD": 0}
-        self.team_counts: dict[int, int] = {}
+        self._reset_state()
+
+    def _load_pool(self, player_pool: np.ndarray, team_ids: np.ndarray,
+                   realised_points: np.ndarray | None = None) -> None:
+        """Set up the static per-player arrays for a pool of up to pool_size players.
+
+        realised_points (replay) replaces avg_points as the end-of-episode reward.
+        """
+        self.n_players = len(player_pool)
+        pad = self.pool_size - self.n_players
+        self.player_pool = np.asarray(player_pool, dtype=np.float32)
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)
+        if pad:
+            self.player_pool = np.vstack([self.player_pool, np.zeros((pad, FEATURE_DIM), dtype=np.float32)])
+            self.team_ids = np.concatenate([self.team_ids, np.full(pad, -1, dtype=np.int64)])
+
+        # Static per-player arrays (unknown position codes count as MID, like IDX_TO_POS.get)
+        pos = self.player_pool[:, 0].astype(np.int64)
+        self._positions = np.where((pos >= 0) & (pos < len(POS_TO_IDX)), pos, POS_TO_IDX["MID"])
+        self._prices = self.player_pool[:, 1].astype(np.float64)
+        self._points = self.player_pool[:, 2].astype(np.float64)
+        self._in_pool = np.arange(len(self.player_pool)) < self.n_players
+        self._reward_points = self._points
+        if realised_points is not None:
+            self._reward_points = np.zeros(self.pool_size)
+            self._reward_points[:self.n_players] = realised_points
+
+        # Compact team codes; players without a team share a slot that never fills
+        self._team_values, codes = np.unique(self.team_ids, return_inverse=True)
+        self._team_limited = self._team_values >= 0
+        self._team_codes = codes.reshape(-1)
+        self._pos_members = [np.flatnonzero(self._positions == p) for p in range(len(POS_TO_IDX))]
+        order = np.argsort(self._team_codes, kind="stable")
+        bounds = np.searchsorted(self._team_codes[order], np.arange(len(self._team_values) + 1))
+        self._team_members = [order[bounds[t]:bounds[t + 1]] for t in range(len(self._team_values))]
+
+        self._obs[:self.pool_size * FEATURE_DIM] = self.player_pool.ravel()
+
+    @property
+    def position_counts(self) -> dict[str, int]:
+        return {pos: int(self._pos_counts[i]) for pos, i in POS_TO_IDX.items()}
+
+    @property
+    def team_counts(self) -> dict[int, int]:
+        picked = np.flatnonzero(self._team_counts)
+        return {int(self._team_values[t]): int(self._team_counts[t]) for t in picked}
+
+    def _reset_state(self) -> None:
+        self._picked = np.zeros(len(self.player_pool), dtype=bool)
+        self._available = self._in_pool.copy()
+        self._pos_counts = np.zeros(len(POS_TO_IDX), dtype=np.int64)
+        self._team_counts = np.zeros(len(self._team_values), dtype=np.int64)
+        self._pos_limits = np.array([self.position_limits.get(IDX_TO_POS[i], 0) for i in range(len(POS_TO_IDX))])
+        for p in np.flatnonzero(self._pos_limits <= 0):
+            self._available[self._pos_members[p]] = False
 
     def reset(self, seed=None, options=None):
+        """Start a new episode; in replay mode on options["round"] or a sampled round."""
         super().reset(seed=seed)
+        info = {}
+        if self.episodes is not None:
+            r = (options or {}).get("round")
+            self.round_index = self.episodes.sample(self.np_random) if r is None else int(r)
+            self._load_pool(*self.episodes.round(self.round_index))
+            info["round"] = self.episodes.labels[self.round_index]
         self.budget_remaining = INITIAL_BUDGET
         self.squad = []
-        self.position_counts = {"GK": 0, "DEF": 0, "MID": 0, "FWD": 0}
-        self.team_counts = {}
-        return self._get_obs(), {}
+        self._reset_state()
+        return self._get_obs(), info
 
     def step(self, action: int):
-        assert self.action_space.contains(action), f"Invalid action {action}"
+        assert 0 <= action < self.pool_size, f"Invalid action {action}"
 
         reward = 0.0
         terminated = False
@@ -122,31 +204,34 @@ class FantasyEnv(gym.Env):
         else:
             # Add player to squad
             self.squad.append(action)
-            player = self.player_pool[action]
-            pos_idx = int(player[0])
-            pos = IDX_TO_POS.get(pos_idx, "MID")
-            price = float(player[1])
+            self._picked[action] = True
+            self._available[action] = False
+            self.budget_remaining -= float(self.player_pool[action, 1])
 
-            self.budget_remaining -= price
-            self.position_counts[pos] = self.position_counts.get(pos, 0) + 1
+            pos = self._positions[action]
+            self._pos_counts[pos] += 1
+            if self._pos_counts[pos] >= self._pos_limits[pos]:
+                self._available[self._pos_members[pos]] = False
 
-            team_id = int(self.team_ids[action])
-            self.team_counts[team_id] = self.team_counts.get(team_id, 0) + 1
+            team = self._team_codes[action]
+            self._team_counts[team] += 1
+            if self._team_limited[team] and self._team_counts[team] >= self.max_per_team:
+                self._available[self._team_members[team]] = False
 
             # Small reward for picking — proportional to player quality
-            reward = float(player[2]) * 0.1  # avg_points * 0.1
+            reward = float(self.player_pool[action, 2]) * 0.1  # avg_points * 0.1
 
         # Check if squad is complete
         if len(self.squad) >= SQUAD_SIZE:
             terminated = True
-            # Final reward: sum of avg_points for entire squad
-            total_points = sum(float(self.player_pool[pid][2]) for pid in self.squad)
+            # Final reward: the squad's avg_points (replay: points actually scored in the round)
+            total_points = float(self._reward_points[self.squad].sum())
             reward += total_points
             info["squad_points"] = total_points
             info["budget_remaining"] = self.budget_remaining
 
         # Check if no valid picks remain (budget too low, all positions filled)
-        elif not any(self._is_valid_pick(i) for i in range(self.n_players)):
+        elif not self.action_masks().any():
             terminated = True
             # Incomplete squad penalty
             reward -= 10.0 * (SQUAD_SIZE - len(self.squad))
@@ -156,49 +241,16 @@ class FantasyEnv(gym.Env):
 
     def action_masks(self) -> np.ndarray:
         """Return boolean mask of valid actions (for MaskablePPO)."""
-        mask = np.zeros(MAX_PLAYERS, dtype=bool)
-        for i in range(self.n_players):
-            mask[i] = self._is_valid_pick(i)
-        return mask
+        return self._available & (self._prices <= self.budget_remaining)
 
     def _is_valid_pick(self, action: int) -> bool:
         """Check if picking player `action` is valid."""
-        if action >= self.n_players:
-            return False
-        if action in self.squad:
-            return False  # already picked
-
-        player = self.player_pool[action]
-        pos_idx = int(player[0])
-        pos = IDX_TO_POS.get(pos_idx, "MID")
-        price = float(player[1])
-
-        # Budget check
-        if price > self.budget_remaining:
-            return False
-
-        # Position limit check
-        if self.position_counts.get(pos, 0) >= self.position_limits.get(pos, 0):
-            return False
-
-        # Team limit check
-        team_id = int(self.team_ids[action])
-        if team_id >= 0 and self.team_counts.get(team_id, 0) >= self.max_per_team:
-            return False
-
-        return True
+        return bool(self._available[action]) and self._prices[action] <= self.budget_remaining
 
     def _get_obs(self) -> np.ndarray:
-        """Build flat observation vector."""
-        flat_pool = self.player_pool.flatten()  # MAX_PLAYERS * FEATURE_DIM
-
-        extras = np.array([
-            self.budget_remaining,
-            self.position_counts.get("GK", 0),
-            self.position_counts.get("DEF", 0),
-            self.position_counts.get("MID", 0),
-            self.position_counts.get("FWD", 0),
-            len(self.squad),
-        ], dtype=np.float32)
-
-        return np.concatenate([flat_pool, extras])
+        """Refresh the state slots of the observation buffer and return it."""
+        tail = self._obs[self.pool_size * FEATURE_DIM:]
+        tail[0] = self.budget_remaining
+        tail[1:5] = self._pos_counts
+        tail[5] = len(self.squad)
+        return self._obs
@@ -0,0 +1,188 @@
+"""
+Historical episode store — columnar, memory-mapped rounds for replay training.
+
+One episode is one historical round: the pool of players who appeared in it,
+with features as a manager would have seen them before the round, and the
+points each player actually scored in it. Layout of a store directory:
+
+    features.npy   (rows, FEATURE_DIM) float32  pre-round features in the env pool layout
+    team.npy       (rows,) int32                team code
+    player.npy     (rows,) int32                player code, stable across rounds
+    points.npy     (rows,) float32              fantasy points scored in the round
+    offsets.npy    (rounds + 1,) int64          round r is rows offsets[r]:offsets[r + 1]
+    index.json     round labels, row counts, created_at
+
+Rows are grouped by round, so a round's pool is a contiguous slice of the
+memory-mapped arrays: EpisodeStore.round() copies nothing, and worker
+processes opening the same store share its pages in the OS page cache.
+A store is written under a temporary name and renamed into place.
+
+Feature columns match player_pool.build_player_pool, computed from each
+player's earlier rounds only: position, price, avg points per appearance,
+total goals, total assists, avg minutes, total saves, and form (mean points
+over the last FORM_WINDOW appearances). Historical data has no prices, so
+price is position base + PRICE_PER_POINT per prior average point, clipped
+to the catalog's price range.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.rl.environment import FEATURE_DIM
+
+INDEX_FILE = "index.json"
+COLUMNS = ("features", "team", "player", "points")
+FORM_WINDOW = 5                                 # as rolling_feature_service.WINDOW
+PRICE_BASE = np.array([4.5, 5.0, 5.5, 6.5])     # GK, DEF, MID, FWD; as _generate_random_pool
+PRICE_PER_POINT = 0.5
+PRICE_RANGE = (4.0, 12.5)
+
+
+class EpisodeStore:
+    """Read-only view of a store directory; arrays are memory-mapped."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        index = json.loads((self.root / INDEX_FILE).read_text())
+        self.labels: list[str] = index["rounds"]
+        self.offsets = np.load(self.root / "offsets.npy")
+        self.features = np.load(self.root / "features.npy", mmap_mode="r")
+        self.team = np.load(self.root / "team.npy", mmap_mode="r")
+        self.player = np.load(self.root / "player.npy", mmap_mode="r")
+        self.points = np.load(self.root / "points.npy", mmap_mode="r")
+        sizes = np.diff(self.offsets)
+        self.max_round_size = int(sizes.max()) if len(sizes) else 0
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __reduce__(self):
+        # Pickle by path: a worker process re-opens (and shares) the mapping
+        return (EpisodeStore, (str(self.root),))
+
+    def round(self, r: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(features, team codes, realised points) of round r, as views into the store."""
+        lo, hi = self.offsets[r], self.offsets[r + 1]
+        return self.features[lo:hi], self.team[lo:hi], self.points[lo:hi]
+
+    def sample(self, rng: np.random.Generator) -> int:
+        return int(rng.integers(len(self)))
+
+
+def write_episode_store(
+    root: str | Path,
+    round_keys: np.ndarray,
+    player_keys: np.ndarray,
+    team_keys: np.ndarray,
+    positions: np.ndarray,
+    goals: np.ndarray,
+    assists: np.ndarray,
+    minutes: np.ndarray,
+    saves: np.ndarray,
+    points: np.ndarray,
+    round_labels: Optional[Sequence[str]] = None,
+    min_round_size: int = 0,
+) -> Path:
+    """Build a store from per-appearance rows and write it to root (replacing any old store).
+
+    round_keys sort chronologically; rows with the same (round, player) are
+    summed (e.g. several matches in one stage). positions are POS_TO_IDX
+    codes. round_labels, if given, name the sorted unique round keys.
+    Rounds with fewer than min_round_size players are dropped.
+    """
+    round_codes, round_values = _codes(round_keys)
+    player_codes, _ = _codes(player_keys)
+    team_codes, _ = _codes(team_keys)
+    stats = np.stack([goals, assists, minutes, saves, points], axis=1).astype(np.float64)
+
+    # One row per (player, round), in player-then-round order
+    order = np.lexsort((round_codes, player_codes))
+    key = player_codes[order] * (len(round_values) + 1) + round_codes[order]
+    first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    rows = order[first]
+    stats = np.add.reduceat(stats[order], first, axis=0)
+    player, rnd = player_codes[rows], round_codes[rows]
+    goals, assists, minutes, saves, points = stats.T
+
+    # Totals over each player's earlier rounds: cumulative sums minus the current row
+    start = np.flatnonzero(np.r_[True, player[1:] != player[:-1]])
+    group_start = np.repeat(start, np.diff(np.r_[start, len(player)]))
+    prior = np.arange(len(player)) - group_start                     # earlier appearances
+
+    def before(values: np.ndarray) -> np.ndarray:
+        cum = np.cumsum(values)
+        return cum - values - np.where(group_start > 0, cum[group_start - 1], 0.0)
+
+    avg_points = before(points) / np.maximum(prior, 1)
+    cum_points = np.r_[0.0, np.cumsum(points)]
+    window_start = np.maximum(group_start, np.arange(len(player)) - FORM_WINDOW)
+    recent = np.arange(len(player)) - window_start
+    recent_points = cum_points[np.arange(len(player))] - cum_points[window_start]
+    form = np.where(recent > 0, recent_points / np.maximum(recent, 1), avg_points)
+
+    pos = np.clip(np.asarray(positions)[rows].astype(np.int64), 0, len(PRICE_BASE) - 1)
+    features = np.empty((len(rows), FEATURE_DIM), dtype=np.float32)
+    features[:, 0] = pos
+    features[:, 1] = np.clip(PRICE_BASE[pos] + PRICE_PER_POINT * avg_points, *PRICE_RANGE)
+    features[:, 2] = avg_points
+    features[:, 3] = before(goals)
+    features[:, 4] = before(assists)
+    features[:, 5] = before(minutes) / np.maximum(prior, 1)
+    features[:, 6] = before(saves)
+    features[:, 7] = form
+
+    # Group rows by round and drop thin rounds
+    by_round = np.argsort(rnd, kind="stable")
+    sizes = np.bincount(rnd, minlength=len(round_values))
+    keep = sizes >= max(min_round_size, 1)
+    by_round = by_round[keep[rnd[by_round]]]
+    offsets = np.r_[0, np.cumsum(sizes[keep])].astype(np.int64)
+    labels = [str(v) for v in round_values] if round_labels is None else [str(v) for v in round_labels]
+    columns = {
+        "features": features[by_round],
+        "team": team_codes[rows][by_round].astype(np.int32),
+        "player": player[by_round].astype(np.int32),
+        "points": points[by_round].astype(np.float32),
+    }
+    return _write(Path(root), columns, offsets, [labels[i] for i in np.flatnonzero(keep)])
+
+
+def _codes(keys) -> tuple[np.ndarray, np.ndarray]:
+    """(dense codes, sorted unique values) for an array of keys."""
+    values, inverse = np.unique(np.asarray(keys), return_inverse=True)
+    return inverse.reshape(-1).astype(np.int64), values
+
+
+def _write(root: Path, columns: dict[str, np.ndarray], offsets: np.ndarray, labels: list[str]) -> Path:
+    root.parent.mkdir(parents=True, exist_ok=True)
+    staging = root.parent / f".{root.name}.{uuid.uuid4().hex[:8]}.tmp"
+    staging.mkdir()
+    try:
+        for name, values in columns.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(values))
+        np.save(staging / "offsets.npy", offsets)
+        (staging / INDEX_FILE).write_text(json.dumps({
+            "rounds": labels,
+            "rows": int(offsets[-1]),
+            "columns": list(COLUMNS),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }, indent=2))
+        old = None
+        if root.exists():
+            old = root.parent / f".{root.name}.{uuid.uuid4().hex[:8]}.old"
+            os.rename(root, old)
+        os.rename(staging, root)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return root
@@ -1,8 +1,18 @@
 """
-PPO executor policy — lightweight NumPy MLP for squad selection.
+PPO executor policy — pool-size-independent NumPy network for squad selection.
 
-Architecture: obs → FC(hidden) → ReLU → FC(MAX_PLAYERS) → logits
-Action selection uses masked softmax for constraint enforcement.
+Architecture (DeepSets style, shared weights for every player):
+    e_i    = ReLU(x_i · W_e + b_e)                      per-player embedding
+    pooled = mean_i e_i                                 over real (non-padding) players
+    c      = ReLU([state, pooled] · W_c + b_c)          squad-state context
+    h_i    = ReLU(e_i · W_p + c · W_q + b_p)            player scored in context
+    logit_i = h_i · w_o + b_o
+    value   = c · w_v + b_v                             state-value head (PPO critic)
+
+No parameter depends on the number of players, so one checkpoint scores a
+200-player training pool or the full 1,500+ player catalog, and a batch of
+observations is a handful of matmuls. Action selection uses masked softmax
+for constraint enforcement.
 
 For production training on Colab A100, this can be replaced with a
 PyTorch/SB3 policy. This NumPy version is used for local inference
@@ -12,10 +22,20 @@ from __future__ import annotations
 
 import numpy as np
 
-from app.rl.environment import MAX_PLAYERS, FEATURE_DIM
+from app.rl.environment import FEATURE_DIM, INITIAL_BUDGET, POSITION_LIMITS, SQUAD_SIZE
+
+STATE_DIM = 6  # budget + 4 position slots + squad size (tail of the observation)
+HIDDEN_DIM = 64
+
+# Rough per-feature scales: [position_idx, price, avg_points, goals, assists, minutes, saves, form]
+FEATURE_SCALE = np.array([1 / 3, 1 / 10, 1 / 10, 1 / 5, 1 / 5, 1 / 90, 1 / 5, 1 / 10], dtype=np.float32)
+STATE_SCALE = np.array(
+    [1 / INITIAL_BUDGET, *(1 / v for v in POSITION_LIMITS.values()), 1 / SQUAD_SIZE], dtype=np.float32
+)
 
-OBS_DIM = MAX_PLAYERS * FEATURE_DIM + 6  # pool features + budget/pos/squad
-HIDDEN_DIM = 128
+POLICY_PARAM_NAMES = ("w_e", "b_e", "w_c", "b_c", "w_p", "w_q", "b_p", "w_o", "b_o")
+VALUE_PARAM_NAMES = ("w_v", "b_v")
+PARAM_NAMES = POLICY_PARAM_NAMES + VALUE_PARAM_NAMES
 
 
 def _xavier_init(fan_in: int, fan_out: int, rng: np.random.Generator) -> np.ndarray:
@@ -23,22 +43,131 @@ def _xavier_init(fan_in: int, fan_out: int, rng: np.random.Generator) -> np.ndar
     return rng.uniform(-limit, limit, size=(fan_in, fan_out)).astype(np.float32)
 
 
+def split_obs(obs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Flat observation(s) → (players (B, P, FEATURE_DIM), state (B, STATE_DIM))."""
+    obs = np.atleast_2d(obs)
+    n_players = (obs.shape[1] - STATE_DIM) // FEATURE_DIM
+    players = obs[:, : n_players * FEATURE_DIM].reshape(len(obs), n_players, FEATURE_DIM)
+    return players, obs[:, n_players * FEATURE_DIM:]
+
+
+def masked_log_softmax(logits: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Row-wise log-softmax over valid actions; masked entries are -inf."""
+    masked = np.where(masks, logits, -np.inf)
+    top = masked.max(axis=1, keepdims=True)
+    top = np.where(np.isfinite(top), top, 0.0)
+    shifted = masked - top
+    return shifted - np.log(np.maximum(np.exp(shifted).sum(axis=1, keepdims=True), 1e-30))
+
+
 class FantasyPolicy:
-    """Two-layer MLP policy with masked action selection."""
+    """Shared per-player scoring network with masked action selection."""
 
     def __init__(self, hidden_dim: int = HIDDEN_DIM, seed: int | None = None):
         rng = np.random.default_rng(seed)
-        self.w1 = _xavier_init(OBS_DIM, hidden_dim, rng)
-        self.b1 = np.zeros(hidden_dim, dtype=np.float32)
-        self.w2 = _xavier_init(hidden_dim, MAX_PLAYERS, rng)
-        self.b2 = np.zeros(MAX_PLAYERS, dtype=np.float32)
+        self.w_e = _xavier_init(FEATURE_DIM, hidden_dim, rng)
+        self.b_e = np.zeros(hidden_dim, dtype=np.float32)
+        self.w_c = _xavier_init(STATE_DIM + hidden_dim, hidden_dim, rng)
+        self.b_c = np.zeros(hidden_dim, dtype=np.float32)
+        self.w_p = _xavier_init(hidden_dim, hidden_dim, rng)
+        self.w_q = _xavier_init(hidden_dim, hidden_dim, rng)
+        self.b_p = np.zeros(hidden_dim, dtype=np.float32)
+        self.w_o = _xavier_init(hidden_dim, 1, rng)[:, 0]
+        self.b_o = np.zeros(1, dtype=np.float32)
+        self._init_value_head(hidden_dim)
+
+    def _init_value_head(self, hidden_dim: int) -> None:
+        self.w_v = np.zeros(hidden_dim, dtype=np.float32)
+        self.b_v = np.zeros(1, dtype=np.float32)
+
+    @classmethod
+    def from_params(cls, params: dict[str, np.ndarray]) -> FantasyPolicy:
+        """Rebuild a policy from params() output (e.g. in a rollout worker)."""
+        policy = cls.__new__(cls)
+        for name in PARAM_NAMES:
+            setattr(policy, name, np.array(params[name]))
+        return policy
+
+    def params(self) -> dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in PARAM_NAMES}
+
+    def forward_cached(self, obs: np.ndarray) -> tuple[np.ndarray, dict]:
+        """Batched forward pass returning (logits (B, P), cache for backward).
+
+        The state values (B,) are computed alongside and stored as cache["values"].
+        """
+        raw, state = split_obs(obs)
+        x = raw * FEATURE_SCALE
+        valid = raw.any(axis=2).astype(np.float32)                     # (B, P) padding rows are all-zero
+        count = np.maximum(valid.sum(axis=1, keepdims=True), 1.0)      # (B, 1)
+
+        a_e = x @ self.w_e + self.b_e                                  # (B, P, H)
+        e = np.maximum(a_e, 0)
+        pooled = np.einsum("bph,bp->bh", e, valid) / count             # (B, H)
+        z = np.concatenate([state * STATE_SCALE, pooled], axis=1)      # (B, S + H)
+        a_c = z @ self.w_c + self.b_c
+        c = np.maximum(a_c, 0)                                         # (B, H)
+        a_p = e @ self.w_p + (c @ self.w_q)[:, None, :] + self.b_p     # (B, P, H)
+        h = np.maximum(a_p, 0)
+        logits = h @ self.w_o + self.b_o                               # (B, P)
+        values = c @ self.w_v + self.b_v                               # (B,)
+
+        cache = {"x": x, "valid": valid, "count": count, "a_e": a_e, "e": e,
+                 "z": z, "a_c": a_c, "c": c, "a_p": a_p, "h": h, "values": values}
+        return logits, cache
+
+    def backward(
+        self, cache: dict, grad_logits: np.ndarray, grad_values: np.ndarray | None = None
+    ) -> dict[str, np.ndarray]:
+        """Parameter gradients of sum(grad_logits * logits) + sum(grad_values * values)."""
+        g = grad_logits
+        gv = grad_values if grad_values is not None else np.zeros(len(g), dtype=g.dtype)
+        h, e, c, z = cache["h"], cache["e"], cache["c"], cache["z"]
+        hidden = h.shape[2]
+
+        d_a_p = (g[..., None] * self.w_o) * (cache["a_p"] > 0)         # (B, P, H)
+        d_c = d_a_p.sum(axis=1) @ self.w_q.T + gv[:, None] * self.w_v
+        d_a_c = d_c * (cache["a_c"] > 0)                               # (B, H)
+        d_pooled = (d_a_c @ self.w_c.T)[:, STATE_DIM:]                 # (B, H)
+        d_e = d_a_p @ self.w_p.T + (d_pooled / cache["count"])[:, None, :] * cache["valid"][..., None]
+        d_a_e = d_e * (cache["a_e"] > 0)
+
+        return {
+            "w_e": cache["x"].reshape(-1, cache["x"].shape[2]).T @ d_a_e.reshape(-1, hidden),
+            "b_e": d_a_e.sum(axis=(0, 1)),
+            "w_c": z.T @ d_a_c,
+            "b_c": d_a_c.sum(axis=0),
+            "w_p": e.reshape(-1, hidden).T @ d_a_p.reshape(-1, hidden),
+            "w_q": c.T @ d_a_p.sum(axis=1),
+            "b_p": d_a_p.sum(axis=(0, 1)),
+            "w_o": np.einsum("bp,bph->h", g, h),
+            "b_o": np.array([g.sum()], dtype=np.float32),
+            "w_v": c.T @ gv,
+            "b_v": np.array([gv.sum()], dtype=np.float32),
+        }
 
     def forward(self, obs: np.ndarray) -> np.ndarray:
-        """Forward pass: obs → logits (MAX_PLAYERS,)."""
-        h = obs @ self.w1 + self.b1
-        h = np.maximum(h, 0)  # ReLU
-        logits = h @ self.w2 + self.b2
-        return logits
+        """Forward pass: obs → logits, (n_players,) for one obs or (B, n_players) for a batch."""
+        logits, _ = self.forward_cached(obs)
+        return logits[0] if obs.ndim == 1 else logits
+
+    def forward_shared_pool(self, obs: np.ndarray) -> np.ndarray:
+        """Batched logits (B, P) for observations that share one player pool.
+
+        Concurrent inference requests all score the same catalog, so the
+        per-player embedding e and e · W_p are computed once from the first
+        row; only the squad-state context differs between rows.
+        """
+        raw, state = split_obs(obs)
+        x = raw[0] * FEATURE_SCALE
+        valid = raw[0].any(axis=1).astype(np.float32)                  # (P,)
+        e = np.maximum(x @ self.w_e + self.b_e, 0)                     # (P, H)
+        pooled = (valid @ e) / max(valid.sum(), 1.0)                   # (H,)
+        z = np.concatenate([state * STATE_SCALE, np.broadcast_to(pooled, (len(state), len(pooled)))], axis=1)
+        c = np.maximum(z @ self.w_c + self.b_c, 0)                     # (B, H)
+        base = e @ self.w_p + self.b_p                                 # (P, H)
+        h = np.maximum(base[None, :, :] + (c @ self.w_q)[:, None, :], 0)
+        return h @ self.w_o + self.b_o                                 # (B, P)
 
     def select_action(self, obs: np.ndarray, mask: np.ndarray) -> int:
         """Select an action using masked softmax sampling."""
@@ -60,24 +189,56 @@ class FantasyPolicy:
 
         return int(np.random.choice(len(probs), p=probs))
 
-    def action_probs(self, obs: np.ndarray, mask: np.ndarray) -> np.ndarray:
-        """Return action probabilities (for training)."""
-        logits = self.forward(obs)
+    def action_probs(self, obs: np.ndarray, mask: np.ndarray, shared_pool: bool = False) -> np.ndarray:
+        """Return action probabilities (for training).
+
+        Accepts a single observation or a (batch, obs_dim) stack with a
+        matching (batch, n_players) mask. shared_pool=True asserts every row
+        has the same player block and takes the forward_shared_pool path.
+        """
+        logits = self.forward_shared_pool(obs) if shared_pool else self.forward(obs)
         masked_logits = np.where(mask, logits, -1e9)
-        shifted = masked_logits - masked_logits.max()
+        shifted = masked_logits - masked_logits.max(axis=-1, keepdims=True)
         exp = np.exp(shifted)
-        probs = exp / (exp.sum() + 1e-10)
+        probs = exp / (exp.sum(axis=-1, keepdims=True) + 1e-10)
         return probs
 
+    def select_actions(
+        self,
+        obs: np.ndarray,
+        masks: np.ndarray,
+        rng: np.random.Generator | None = None,
+        shared_pool: bool = False,
+    ) -> np.ndarray:
+        """Sample one action per row of a (batch, obs_dim) stack — one forward pass.
+
+        Rows with no valid action get action 0 (the env treats it as invalid).
+        """
+        rng = rng or np.random.default_rng()
+        probs = self.action_probs(obs, masks, shared_pool)
+        cdf = np.cumsum(probs, axis=1)
+        u = rng.random((len(probs), 1)) * cdf[:, -1:]
+        actions = (cdf <= u).sum(axis=1)
+        # Guard against float round-off landing on a masked column
+        fallback = np.where(masks.any(axis=1), masks.argmax(axis=1), 0)
+        ok = masks[np.arange(len(actions)), np.minimum(actions, masks.shape[1] - 1)]
+        return np.where(ok, np.minimum(actions, masks.shape[1] - 1), fallback)
+
     def save(self, path: str) -> None:
-        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+        np.savez(path, **self.params())
 
     @classmethod
     def load(cls, path: str) -> FantasyPolicy:
         policy = cls.__new__(cls)
         data = np.load(path)
-        policy.w1 = data["w1"]
-        policy.b1 = data["b1"]
-        policy.w2 = data["w2"]
-        policy.b2 = data["b2"]
+        missing = [name for name in POLICY_PARAM_NAMES if name not in data.files]
+        if missing:
+            raise ValueError(f"{path} is not a FantasyPolicy checkpoint (missing {', '.join(missing)})")
+        for name in POLICY_PARAM_NAMES:
+            setattr(policy, name, data[name])
+        # Checkpoints from the REINFORCE trainer have no value head; inference doesn't need one
+        policy._init_value_head(policy.w_e.shape[1])
+        for name in VALUE_PARAM_NAMES:
+            if name in data.files:
+                setattr(policy, name, data[name])
         return policy
@@ -6,15 +6,18 @@ based on the RL policy's learned evaluation of player combinations.
 """
 from __future__ import annotations
 
+import logging
 import os
-from pathlib import Path
+from datetime import datetime
 from typing import Optional
 
 import numpy as np
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.player import Player
-from app.models.team import Team
+from app.models.round import Round
+from app.models.squad import Squad
 from app.rl.environment import (
     FEATURE_DIM,
     INITIAL_BUDGET,
@@ -25,60 +28,42 @@ from app.rl.environment import (
     IDX_TO_POS,
     FantasyEnv,
 )
+from app.rl.batch_scheduler import PolicyBatchScheduler
+from app.rl.compute_pool import ComputePool
 from app.rl.executor_policy import FantasyPolicy
-from app.services.feature_service import build_player_features
+from app.rl.model_registry import ModelRegistry
+# Module imports: lineup_optimizer pulls in app.services, which imports this module
+from app.rl import lineup_optimizer, player_pool as pool_cache, round_simulator, squad_beam, transfer_planner
+from app.rl.squad_optimizer import optimize_squad
+from app.services.feature_service import BATCH_FEATURE_INDEX as F, build_features_batch
+from app.services.team_model_service import get_fixture_projections
 
-_policy: Optional[FantasyPolicy] = None
+log = logging.getLogger(__name__)
 
+# Fixture scaling for per-round expected points: a typical team xG and
+# clean-sheet probability map to a factor of 1.0
+BASE_XG = 1.35
+BASE_CLEAN_SHEET = 0.3
 
-def _get_policy() -> FantasyPolicy:
-    """Load the trained policy (lazy singleton)."""
-    global _policy
-    if _policy is not None:
-        return _policy
-
-    model_path = os.environ.get("RL_MODEL_PATH", "models/rl_executor.npz")
-    if Path(model_path).exists():
-        _policy = FantasyPolicy.load(model_path)
-    else:
-        # No trained model yet — use random initialization
-        _policy = FantasyPolicy(seed=42)
-    return _policy
+_registry: Optional[ModelRegistry] = None
+_scheduler: Optional[PolicyBatchScheduler] = None
+_compute_pool: Optional[ComputePool] = None
 
 
-def _build_pool_from_db(db: Session) -> tuple[np.ndarray, list[Player], np.ndarray]:
-    """Build a player feature pool from the database.
-
-    Returns (pool_array, player_list, team_id_array).
-    """
-    players = db.query(Player).filter(Player.is_active == True).all()  # noqa: E712
+def get_model_registry() -> ModelRegistry:
+    """Registry serving the live policy version (lazy singleton)."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(
+            settings.rl_model_registry,
+            fallback_path=os.environ.get("RL_MODEL_PATH", "models/rl_executor.npz"),
+        )
+    return _registry
 
-    # Map team IDs to integers
-    teams = db.query(Team).all()
-    team_idx_map = {t.id: i for i, t in enumerate(teams)}
-
-    pool = np.zeros((MAX_PLAYERS, FEATURE_DIM), dtype=np.float32)
-    team_ids = np.full(MAX_PLAYERS, -1, dtype=np.int64)
-    player_list: list[Player] = []
-
-    for i, p in enumerate(players[:MAX_PLAYERS]):
-        features = build_player_features(p.id, db)
-        if features is None:
-            continue
 
-        pool[i, 0] = POS_TO_IDX.get(p.position, 2)  # position
-        pool[i, 1] = float(p.price)                   # price
-        pool[i, 2] = features.get("avg_points", 0)    # avg points
-        pool[i, 3] = features.get("total_goals", 0)   # goals
-        pool[i, 4] = features.get("total_assists", 0) # assists
-        pool[i, 5] = features.get("total_minutes", 0) / max(features.get("matches_played", 1), 1)  # avg minutes
-        pool[i, 6] = features.get("total_saves", 0)   # saves
-        pool[i, 7] = features.get("avg_points", 0)    # form (= avg_points for now)
-
-        team_ids[i] = team_idx_map.get(p.team_id, -1)
-        player_list.append(p)
-
-    return pool, player_list, team_ids
+def _get_policy() -> FantasyPolicy:
+    """The live policy; picks up a newly promoted registry version without a restart."""
+    return get_model_registry().policy()
 
 
 def suggest_squad_rl(db: Session, budget: float = 100.0) -> dict:
@@ -86,10 +71,13 @@ def suggest_squad_rl(db: Session, budget: float = 100.0) -> dict:
 
     Returns dict with player_ids, captain_id, explanation.
     """
-    pool, player_list, team_ids = _build_pool_from_db(db)
+    player_pool = pool_cache.get_player_pool(db)
+    pool = player_pool.features
+    n_players = player_pool.n_players
     policy = _get_policy()
 
-    env = FantasyEnv(player_pool=pool, team_ids=team_ids)
+    # Slice off the cache's zero padding: FantasyEnv pads (and masks) by itself
+    env = FantasyEnv(player_pool=pool[:n_players], team_ids=player_pool.team_index[:n_players])
     obs, _ = env.reset()
     env.budget_remaining = budget
 
@@ -102,87 +90,441 @@ def suggest_squad_rl(db: Session, budget: float = 100.0) -> dict:
             break
         action = policy.select_action(obs, mask)
         obs, reward, terminated, truncated, info = env.step(action)
-        if action not in selected_indices and action < len(player_list):
+        if action not in selected_indices and action < n_players:
             selected_indices.append(action)
 
-    # Map indices back to player IDs
-    selected_players = [player_list[i] for i in selected_indices if i < len(player_list)]
-    player_ids = [p.id for p in selected_players]
+    return _squad_result(player_pool, selected_indices, env.budget_remaining, budget)
 
-    # Pick captain (highest avg_points among FWD/MID)
-    captain_id = None
-    best_score = -1
-    for i in selected_indices:
-        if i < len(player_list):
-            p = player_list[i]
-            score = float(pool[i, 2])  # avg_points
-            if score > best_score and p.position in ("FWD", "MID"):
-                best_score = score
-                captain_id = p.id
-
-    if captain_id is None and player_ids:
-        captain_id = player_ids[0]
 
+async def suggest_squad_rl_batched(db: Session, budget: float = 100.0) -> dict:
+    """suggest_squad_rl with each pick evaluated by the shared batch scheduler.
+
+    Concurrent requests' picks are coalesced into batched forward passes,
+    so a burst of squad-builder calls costs a few large matmuls per pick
+    rather than one small one per request.
+    """
+    player_pool = pool_cache.get_player_pool(db)
+    scheduler = get_batch_scheduler()
+
+    n_players = player_pool.n_players
+    env = FantasyEnv(player_pool=player_pool.features[:n_players], team_ids=player_pool.team_index[:n_players])
+    obs, _ = env.reset()
+    env.budget_remaining = budget
+
+    selected_indices: list[int] = []
+    terminated = False
+
+    while not terminated:
+        mask = env.action_masks()
+        if not mask.any():
+            break
+        action = await scheduler.select_action(obs, mask)
+        obs, reward, terminated, truncated, info = env.step(action)
+        if action not in selected_indices and action < n_players:
+            selected_indices.append(action)
+
+    return _squad_result(player_pool, selected_indices, env.budget_remaining, budget)
+
+
+def suggest_squads_beam(db: Session, budget: float = 100.0, k: Optional[int] = None) -> list[dict]:
+    """Up to k alternative squads from policy beam search, most likely first.
+
+    Each has the suggest_squad_rl shape plus rank, log_prob (the policy's
+    score) and expected_points (sum of avg_points).
+    """
+    player_pool = pool_cache.get_player_pool(db)
+    n_players = player_pool.n_players
+    beams = squad_beam.beam_search_squads(
+        _get_policy(),
+        player_pool.features[:n_players],
+        player_pool.team_index[:n_players],
+        budget=budget,
+        k=k or settings.rl_squad_alternatives,
+        beam_width=settings.rl_beam_width,
+    )
+    results = []
+    for rank, beam in enumerate(beams, start=1):
+        indices = beam["indices"]
+        result = _squad_result(player_pool, indices, beam["budget_remaining"], budget)
+        expected = round(float(player_pool.features[indices, 2].sum()), 1)
+        result.update({
+            "rank": rank,
+            "log_prob": round(beam["log_prob"], 3),
+            "expected_points": expected,
+            "explanation": f"Beam search alternative {rank}: {expected} expected pts within £{budget}m, "
+                           f"£{round(beam['budget_remaining'], 1)}m remaining.",
+        })
+        results.append(result)
+    return results
+
+
+def get_batch_scheduler() -> PolicyBatchScheduler:
+    """Process-wide scheduler shared by all squad-builder requests (lazy singleton)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PolicyBatchScheduler(
+            _get_policy, window_ms=settings.rl_batch_window_ms, max_batch=settings.rl_max_batch
+        )
+    return _scheduler
+
+
+def get_compute_pool() -> ComputePool:
+    """Process-wide pool for CPU-heavy AI calls (lazy singleton; started in the app lifespan)."""
+    global _compute_pool
+    if _compute_pool is None:
+        _compute_pool = ComputePool(
+            workers=settings.ai_workers,
+            max_queue=settings.ai_max_queue,
+            timeout_s=settings.ai_task_timeout_s,
+            warmup=warm_worker,
+        )
+    return _compute_pool
+
+
+def warm_worker() -> None:
+    """Load the live policy and build the player pool in a new compute worker."""
+    from app.core.db import SessionLocal
+
+    _get_policy()
+    db = SessionLocal()
+    try:
+        pool_cache.get_player_pool(db)
+    finally:
+        db.close()
+
+
+def _squad_result(
+    player_pool: pool_cache.PlayerPool, selected_indices: list[int], budget_remaining: float, budget: float
+) -> dict:
+    player_ids = [player_pool.player_ids[i] for i in selected_indices]
     return {
         "player_ids": player_ids,
-        "captain_id": captain_id,
-        "budget_remaining": round(env.budget_remaining, 1),
-        "positions": {pos: sum(1 for i in selected_indices if i < len(player_list) and player_list[i].position == pos) for pos in ("GK", "DEF", "MID", "FWD")},
+        "captain_id": _pick_captain(player_pool, selected_indices),
+        "budget_remaining": round(budget_remaining, 1),
+        "positions": {pos: sum(1 for i in selected_indices if player_pool.positions[i] == pos) for pos in ("GK", "DEF", "MID", "FWD")},
         "explanation": f"RL policy selected {len(player_ids)} players within £{budget}m budget. "
-                       f"£{round(env.budget_remaining, 1)}m remaining.",
+                       f"£{round(budget_remaining, 1)}m remaining.",
     }
 
 
-def suggest_lineup_rl(db: Session, squad_player_ids: list[str]) -> dict:
-    """Given a 15-player squad, pick the best starting XI + captain.
-
-    Uses player features to rank — highest avg_points start.
+def _pick_captain(player_pool: pool_cache.PlayerPool, indices: list[int]) -> Optional[str]:
+    """Highest avg_points among FWD/MID, else the first pick."""
+    captain_id = None
+    best_score = -1.0
+    for i in indices:
+        score = float(player_pool.features[i, 2])  # avg_points
+        if score > best_score and player_pool.positions[i] in ("FWD", "MID"):
+            best_score = score
+            captain_id = player_pool.player_ids[i]
+    if captain_id is None and indices:
+        captain_id = player_pool.player_ids[indices[0]]
+    return captain_id
+
+
+def suggest_squad_optimal(
+    db: Session,
+    budget: float = 100.0,
+    locked_player_ids: Optional[list[str]] = None,
+    excluded_player_ids: Optional[list[str]] = None,
+) -> dict:
+    """Deterministic points-maximising squad from the exact optimizer.
+
+    Same shape as suggest_squad_rl. Raises ValueError when the locked
+    players are unknown or illegal, or no squad fits the budget.
     """
-    players = db.query(Player).filter(Player.id.in_(squad_player_ids)).all()
-    player_map = {p.id: p for p in players}
-
-    # Build features for ranking
-    scored = []
-    for pid in squad_player_ids:
-        features = build_player_features(pid, db)
-        p = player_map.get(pid)
-        if features and p:
-            scored.append((pid, p.position, features.get("avg_points", 0)))
-
-    # Sort by avg_points descending
-    scored.sort(key=lambda x: x[2], reverse=True)
-
-    # Pick starting XI respecting min formation: 1 GK, 3 DEF, 2 MID, 1 FWD
-    starting = []
-    bench = []
-    pos_counts = {"GK": 0, "DEF": 0, "MID": 0, "FWD": 0}
-    min_required = {"GK": 1, "DEF": 3, "MID": 2, "FWD": 1}
-
-    # First pass: fill minimums
-    remaining = list(scored)
-    for pos in ("GK", "DEF", "MID", "FWD"):
-        for item in remaining[:]:
-            if item[1] == pos and pos_counts[pos] < min_required[pos]:
-                starting.append(item[0])
-                pos_counts[pos] += 1
-                remaining.remove(item)
-
-    # Fill remaining slots (11 - len(starting)) with best available
-    for item in remaining:
-        if len(starting) >= 11:
-            bench.append(item[0])
-        else:
-            starting.append(item[0])
-            pos_counts[item[1]] += 1
-
-    # Captain = highest avg_points in starting
-    captain_id = starting[0] if starting else None
-    vice_captain_id = starting[1] if len(starting) > 1 else None
+    player_pool = pool_cache.get_player_pool(db)
+    n = player_pool.n_players
+    locked = player_pool.indices(locked_player_ids or [])
+    if (locked < 0).any():
+        unknown = [pid for pid, i in zip(locked_player_ids, locked) if i < 0]
+        raise ValueError(f"Locked players not in the active catalog: {', '.join(unknown)}")
+    excluded = player_pool.indices(excluded_player_ids or [])
+
+    pool = player_pool.features[:n]
+    solution = optimize_squad(
+        points=pool[:, 2],
+        prices=pool[:, 1],
+        positions=pool[:, 0].astype(np.int64),
+        team_index=player_pool.team_index[:n],
+        budget=budget,
+        locked=locked.tolist(),
+        excluded=excluded[excluded >= 0].tolist(),
+    )
+    indices = solution.indices
+    remaining = round(budget - solution.total_cost, 1)
+    return {
+        "player_ids": [player_pool.player_ids[i] for i in indices],
+        "captain_id": _pick_captain(player_pool, indices),
+        "budget_remaining": remaining,
+        "expected_points": round(solution.total_points, 1),
+        "positions": {pos: sum(1 for i in indices if player_pool.positions[i] == pos) for pos in ("GK", "DEF", "MID", "FWD")},
+        "explanation": f"Optimizer selected the highest expected-points squad within £{budget}m "
+                       f"({round(solution.total_points, 1)} pts, £{remaining}m remaining).",
+    }
+
 
+def suggest_lineup_rl(db: Session, squad_player_ids: list[str], risk_profile: str = "balanced") -> dict:
+    """Given a 15-player squad, pick the best formation, starting XI, bench order and armbands.
+
+    Every formation in squad_service.FORMATIONS is scored at once by the
+    lineup optimizer on expected (average) points. A conservative or
+    aggressive risk_profile re-picks the armbands on a quantile of the
+    simulated round; "round_outlook" describes the result.
+    """
+    players = db.query(Player.id, Player.position).filter(Player.id.in_(squad_player_ids)).all()
+    position_map = dict(players)
+    squad = [pid for pid in squad_player_ids if pid in position_map]
+
+    # Score from the shared pool; players outside it (e.g. inactive) are looked up in one batch
+    player_pool = pool_cache.get_player_pool(db)
+    idx = player_pool.indices(squad)
+    avg_points = np.where(idx >= 0, player_pool.features[idx, 2], 0.0)
+    missing = [pid for pid, i in zip(squad, idx) if i < 0]
+    if missing:
+        features = build_features_batch(db, missing)
+        avg_points[idx < 0] = features[:, F["avg_points"]]
+
+    lineup = lineup_optimizer.best_lineup(squad, [position_map[pid] for pid in squad], avg_points)
+    if lineup["formation"] is None:
+        lineup["explanation"] = "Squad cannot field a valid formation."
+        return lineup
+
+    round_name, points = simulate_next_round(db, squad)
+    armbands = None
+    if round_simulator.RISK_QUANTILES.get(risk_profile) is None:
+        armbands = (lineup["captain_id"], lineup["vice_captain_id"])
+    outlook = _outlook(round_name, points, squad, lineup["starting"], risk_profile, armbands)
+    lineup["captain_id"], lineup["vice_captain_id"] = outlook["captain_id"], outlook["vice_captain_id"]
+    lineup["round_outlook"] = outlook
+    if armbands is None:
+        lineup["explanation"] = (
+            f"Best formation {lineup['formation']} by expected points; armbands for a {risk_profile} "
+            f"round ({outlook['mean']} mean, {outlook['p25']}–{outlook['p75']} pts middle half). "
+            f"Captain: {lineup['captain_id']}."
+        )
+    else:
+        lineup["explanation"] = (
+            f"Best formation {lineup['formation']} by expected points "
+            f"({lineup['expected_points']} incl. armbands). Captain: {lineup['captain_id']}."
+        )
+    return lineup
+
+
+def simulate_next_round(
+    db: Session, player_ids: list[str], n_scenarios: Optional[int] = None, seed: Optional[int] = None
+) -> tuple[Optional[str], np.ndarray]:
+    """(next round name, (len(player_ids), n_scenarios) int16 simulated points).
+
+    Rates are fitted from each player's history (round_simulator.fit_player_rates)
+    and sides are set by the next round's fixtures and team-model xG. Players
+    whose team has no match in the round score 0; without a linked schedule
+    everyone gets an average fixture.
+    """
+    rows = dict(
+        (r.id, r) for r in db.query(Player.id, Player.team_id, Player.position).filter(Player.id.in_(player_ids))
+    )
+    positions = np.array([POS_TO_IDX.get(rows[pid].position, 2) if pid in rows else 2 for pid in player_ids])
+    rates = round_simulator.fit_player_rates(build_features_batch(db, player_ids), positions)
+
+    round_ = (
+        db.query(Round)
+        .filter(Round.end_utc >= datetime.utcnow())
+        .order_by(Round.start_utc)
+        .first()
+    )
+    if round_ is None or not round_.matches:
+        fixtures = round_simulator.Fixtures.neutral(len(player_ids))
+    else:
+        projections = get_fixture_projections(db, [m.id for m in round_.matches])
+        side_of: dict[str, int] = {}
+        side_xg: list[float] = []
+        for match in round_.matches:
+            proj = projections.get(match.id) or {}
+            for team_id, side in ((match.home_team_id, "home"), (match.away_team_id, "away")):
+                side_of[team_id] = len(side_xg)
+                side_xg.append(float(proj.get(f"{side}_xg", BASE_XG)))
+        player_side = [side_of.get(rows[pid].team_id, -1) if pid in rows else -1 for pid in player_ids]
+        fixtures = round_simulator.Fixtures(player_side, side_xg, np.arange(len(side_xg)) ^ 1)
+
+    points = round_simulator.simulate_points(
+        rates, fixtures, n_scenarios or settings.rl_round_scenarios, seed=seed
+    )
+    return (round_.name if round_ else None), points
+
+
+def round_outlooks(
+    db: Session, squads: list[list[str]], risk_profile: str = "balanced", seed: Optional[int] = None
+) -> list[dict]:
+    """Simulated next-round points of each squad's best XI, with armbands for risk_profile.
+
+    All squads share one simulation, so comparing them (e.g. transfer plans)
+    is not blurred by sampling noise. The XI maximises simulated mean points.
+    """
+    union = list(dict.fromkeys(pid for squad in squads for pid in squad))
+    round_name, points = simulate_next_round(db, union, seed=seed)
+    position_map = dict(db.query(Player.id, Player.position).filter(Player.id.in_(union)).all())
+    row = {pid: i for i, pid in enumerate(union)}
+
+    outlooks = []
+    for squad in squads:
+        squad_points = points[[row[pid] for pid in squad]]
+        lineup = lineup_optimizer.best_lineup(
+            squad, [position_map.get(pid, "MID") for pid in squad], squad_points.mean(axis=1)
+        )
+        if lineup["formation"] is None:
+            outlooks.append(None)
+            continue
+        outlooks.append(_outlook(round_name, squad_points, squad, lineup["starting"], risk_profile))
+    return outlooks
+
+
+def _outlook(
+    round_name: Optional[str],
+    points: np.ndarray,
+    player_ids: list[str],
+    starting: list[str],
+    risk_profile: str,
+    armbands: Optional[tuple[str, str]] = None,
+) -> dict:
+    """Round distribution of one XI; armbands are chosen for risk_profile unless given."""
+    rows = np.array([player_ids.index(pid) for pid in starting])
+    if armbands is None:
+        captain, vice, dist = round_simulator.choose_captains(points, rows, risk_profile)
+    else:
+        captain, vice = (player_ids.index(pid) for pid in armbands)
+        multipliers = np.where(rows == captain, 2.0, np.where(rows == vice, 1.5, 1.0))
+        dist = round_simulator.squad_distribution(points, rows[None, :], multipliers[None, :])
     return {
-        "starting": starting,
-        "bench": bench,
-        "captain_id": captain_id,
-        "vice_captain_id": vice_captain_id,
-        "explanation": f"Lineup optimized by player form. Captain: {captain_id}.",
+        "round_name": round_name,
+        "risk_profile": risk_profile,
+        "scenarios": points.shape[1],
+        "starting": list(starting),
+        "captain_id": player_ids[captain],
+        "vice_captain_id": player_ids[vice],
+        **dist.summary(),
     }
+
+
+def expected_points_by_round(
+    db: Session, player_pool: pool_cache.PlayerPool, horizon: int
+) -> tuple[list[Optional[str]], np.ndarray]:
+    """(round names, (n_players, horizon) expected points) for the next rounds.
+
+    Average points are scaled per fixture by the team model projection:
+    xG for MID/FWD and clean-sheet probability for GK/DEF. Players whose team
+    has no match in a round score 0 for it. Rounds without linked matches
+    (or past the schedule) fall back to plain average points.
+    """
+    n = player_pool.n_players
+    base = player_pool.features[:n, 2].astype(np.float64)
+    attacking = np.isin(player_pool.features[:n, 0], [POS_TO_IDX["MID"], POS_TO_IDX["FWD"]])
+    team_ids = np.array(player_pool.team_ids, dtype=object)
+
+    rounds = (
+        db.query(Round)
+        .filter(Round.end_utc >= datetime.utcnow())
+        .order_by(Round.start_utc)
+        .limit(horizon)
+        .all()
+    )
+    matches = [m for r in rounds for m in r.matches]
+    projections = get_fixture_projections(db, [m.id for m in matches])
+
+    factors = np.ones((n, horizon))
+    for t, round_ in enumerate(rounds):
+        if not round_.matches:
+            continue
+        factors[:, t] = 0.0
+        for match in round_.matches:
+            proj = projections.get(match.id)
+            for team_id, side, opp in ((match.home_team_id, "home", "away"), (match.away_team_id, "away", "home")):
+                if proj is None:
+                    factor = np.ones(n)
+                else:
+                    attack = proj[f"{side}_xg"] / BASE_XG
+                    defence = proj[f"{side}_clean_sheet"] / BASE_CLEAN_SHEET
+                    factor = np.clip(np.where(attacking, attack, defence), 0.5, 1.5)
+                factors[:, t] += np.where(team_ids == team_id, factor, 0.0)
+    names = [r.name for r in rounds] + [None] * (horizon - len(rounds))
+    return names, base[:, None] * factors
+
+
+def suggest_transfer_plans(
+    db: Session,
+    squad_id: str,
+    horizon: int = 3,
+    max_transfers: int = 2,
+    bank: Optional[float] = None,
+    time_budget_ms: float = 250.0,
+    risk_profile: str = "balanced",
+) -> dict:
+    """Best 0/1/2-transfer (and wildcard) plans for a squad over the next rounds.
+
+    Each plan's "round_outlook" is the simulated next-round distribution of
+    the squad it fields this round, with armbands for risk_profile.
+
+    Raises ValueError if the squad does not exist or is not a full 15.
+    """
+    squad = db.get(Squad, squad_id)
+    if squad is None:
+        raise ValueError("Squad not found")
+    squad_ids = [sp.player_id for sp in squad.players]
+    if len(squad_ids) != sum(POSITION_LIMITS.values()):
+        raise ValueError("Transfer planning needs a full 15-player squad")
+
+    player_pool = pool_cache.get_player_pool(db)
+    n = player_pool.n_players
+    names, points = expected_points_by_round(db, player_pool, horizon)
+    prices = player_pool.features[:n, 1].astype(np.float64)
+    positions = player_pool.features[:n, 0].astype(np.int64)
+    teams = player_pool.team_index[:n]
+    ids = list(player_pool.player_ids)
+
+    # Squad players outside the pool (e.g. inactive) can only be sold
+    idx = player_pool.indices(squad_ids)
+    missing = [pid for pid, i in zip(squad_ids, idx) if i < 0]
+    if missing:
+        rows = db.query(Player.id, Player.position, Player.price).filter(Player.id.in_(missing)).all()
+        points = np.vstack([points, np.zeros((len(rows), horizon))])
+        prices = np.concatenate([prices, [float(r.price or 0) for r in rows]])
+        positions = np.concatenate([positions, [POS_TO_IDX.get(r.position, 2) for r in rows]])
+        teams = np.concatenate([teams, np.full(len(rows), -1)])
+        ids += [r.id for r in rows]
+        extra = {r.id: n + j for j, r in enumerate(rows)}
+        idx = np.array([i if i >= 0 else extra[pid] for pid, i in zip(squad_ids, idx)])
+
+    plans = transfer_planner.plan_transfers(
+        points, prices, positions, teams, idx.tolist(),
+        bank=float(squad.budget_remaining) if bank is None else bank,
+        free_transfers=squad.free_transfers_remaining,
+        wildcard_available=not squad.wildcard_used,
+        max_transfers=max_transfers,
+        time_budget_ms=time_budget_ms,
+    )
+    for plan in plans:
+        plan["final_squad"] = [ids[i] for i in plan["final_squad"]]
+        for step in plan["steps"]:
+            step["round_name"] = names[step["round"]]
+            step["transfers"] = [{"out": ids[o], "in": ids[i]} for o, i in step["transfers"]]
+
+    # Distribution of the squad fielded in the first round of each plan
+    first_squads = []
+    for plan in plans:
+        first = list(squad_ids)
+        for move in plan["steps"][0]["transfers"]:
+            first[first.index(move["out"])] = move["in"]
+        first_squads.append(first)
+    for plan, outlook in zip(plans, round_outlooks(db, first_squads, risk_profile) if plans else []):
+        plan["round_outlook"] = outlook
+
+    best = plans[0] if plans else None
+    if best is None:
+        explanation = "No transfer plan found."
+    elif best["first_round"] == transfer_planner.WILDCARD:
+        explanation = f"Play the wildcard now: {best['expected_points']} expected pts over {horizon} rounds."
+    else:
+        explanation = (
+            f"Best plan makes {best['first_round']} transfer(s) this round: "
+            f"{best['expected_points']} expected pts over {horizon} rounds after hits."
+        )
+    return {"rounds": names, "plans": plans, "explanation": explanation}
@@ -0,0 +1,251 @@
+"""
+Policy model registry — versioned checkpoints, mmap loading, hot swap.
+
+Layout of a registry directory (RL_MODEL_REGISTRY):
+
+    versions/<version>/<param>.npy   one array per FantasyPolicy parameter
+    versions/<version>/metadata.json created_at, param shapes, trainer info
+    LIVE                             name of the version being served
+
+Weights are plain .npy files opened with mmap_mode="r", so every worker
+process serving the same version shares one copy of the pages in the OS
+page cache instead of holding its own. A version directory is written
+under a temporary name and renamed into place, and LIVE is replaced with
+os.replace, so readers only ever see complete versions and a whole
+pointer.
+
+ModelRegistry.policy() re-reads LIVE at most once per check_interval and
+swaps in the new version without a restart. Callers that already hold the
+old policy (e.g. a batch in flight) finish with it.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.rl.executor_policy import POLICY_PARAM_NAMES, VALUE_PARAM_NAMES, FantasyPolicy
+
+log = logging.getLogger(__name__)
+
+LIVE_FILE = "LIVE"
+VERSIONS_DIR = "versions"
+METADATA_FILE = "metadata.json"
+UNTRAINED = "untrained"     # reported version when serving a random-init policy
+
+
+def new_version_name() -> str:
+    """Sortable, collision-free version name, e.g. 20260614-093000-1a2b3c."""
+    return f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def publish(
+    policy: FantasyPolicy,
+    root: str | Path,
+    metadata: Optional[dict] = None,
+    version: Optional[str] = None,
+    make_live: bool = True,
+) -> str:
+    """Write policy as a new registry version (and make it live). Returns the version name."""
+    root = Path(root)
+    version = version or new_version_name()
+    versions = root / VERSIONS_DIR
+    target = versions / version
+    if target.exists():
+        raise ValueError(f"Model version {version} already exists in {root}")
+    versions.mkdir(parents=True, exist_ok=True)
+
+    staging = versions / f".{version}.{uuid.uuid4().hex[:8]}.tmp"
+    staging.mkdir()
+    try:
+        params = policy.params()
+        for name, value in params.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(value))
+        info = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "params": {name: list(value.shape) for name, value in params.items()},
+            **(metadata or {}),
+        }
+        (staging / METADATA_FILE).write_text(json.dumps(info, indent=2, default=str))
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if make_live:
+        set_live(root, version)
+    return version
+
+
+def set_live(root: str | Path, version: str) -> None:
+    """Atomically point LIVE at an existing version (promote or roll back)."""
+    root = Path(root)
+    if not (root / VERSIONS_DIR / version / METADATA_FILE).exists():
+        raise ValueError(f"Unknown model version {version} in {root}")
+    tmp = root / f".{LIVE_FILE}.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+    with open(tmp, "w") as fh:
+        fh.write(version + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, root / LIVE_FILE)
+
+
+def live_version(root: str | Path) -> Optional[str]:
+    try:
+        return (Path(root) / LIVE_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(root: str | Path) -> list[dict]:
+    """Metadata of every complete version, oldest first."""
+    versions = Path(root) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    out = []
+    for path in sorted(versions.iterdir()):
+        meta = path / METADATA_FILE
+        if path.name.startswith(".") or not meta.exists():
+            continue
+        out.append(json.loads(meta.read_text()))
+    return out
+
+
+def load_version(root: str | Path, version: str) -> FantasyPolicy:
+    """Memory-mapped, read-only FantasyPolicy for one registry version."""
+    path = Path(root) / VERSIONS_DIR / version
+    missing = [name for name in POLICY_PARAM_NAMES if not (path / f"{name}.npy").exists()]
+    if missing:
+        raise ValueError(f"Model version {version} is incomplete (missing {', '.join(missing)})")
+    policy = FantasyPolicy.__new__(FantasyPolicy)
+    for name in POLICY_PARAM_NAMES:
+        setattr(policy, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+    policy._init_value_head(policy.w_e.shape[1])
+    for name in VALUE_PARAM_NAMES:
+        if (path / f"{name}.npy").exists():
+            setattr(policy, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+    return policy
+
+
+class ModelRegistry:
+    """Serves the LIVE policy of a registry directory, hot-swapping on change.
+
+    When the registry has no live version, falls back to the legacy single
+    checkpoint at fallback_path, then to a random-init policy. Both are
+    logged once and reported through .version so /ai/agent-status shows
+    what is actually being served.
+    """
+
+    def __init__(self, root: str | Path, fallback_path: Optional[str] = None, check_interval: float = 1.0):
+        self.root = Path(root)
+        self.fallback_path = fallback_path
+        self.check_interval = check_interval
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[str] = None
+        self._policy: Optional[FantasyPolicy] = None
+        self._live_stamp: Optional[tuple[int, int]] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def policy(self) -> FantasyPolicy:
+        """Current live policy; re-checks LIVE at most every check_interval seconds."""
+        policy = self._policy
+        if policy is not None and time.monotonic() < self._next_check:
+            return policy
+        with self._lock:
+            if self._policy is None or time.monotonic() >= self._next_check:
+                self._refresh()
+                self._next_check = time.monotonic() + self.check_interval
+            return self._policy
+
+    def status(self) -> dict:
+        self.policy()
+        return {"version": self.version, "loaded_at": self.loaded_at, "registry": str(self.root)}
+
+    def _refresh(self) -> None:
+        try:
+            stat = (self.root / LIVE_FILE).stat()
+            stamp = (stat.st_mtime_ns, stat.st_ino)
+        except FileNotFoundError:
+            stamp = None
+        if self._policy is not None and stamp == self._live_stamp:
+            return
+
+        version = live_version(self.root) if stamp is not None else None
+        if version is not None and version == self.version:
+            self._live_stamp = stamp
+            return
+        if version is not None:
+            try:
+                self._swap(load_version(self.root, version), version)
+                self._live_stamp = stamp
+                log.info("Serving RL policy version %s", version)
+                return
+            except (OSError, ValueError) as exc:
+                if self._policy is not None:
+                    # Keep serving the previous version rather than dropping to a fallback
+                    log.error("Could not load RL policy version %s, keeping %s: %s", version, self.version, exc)
+                    self._live_stamp = stamp
+                    return
+                log.error("Could not load RL policy version %s: %s", version, exc)
+        if self._policy is None:
+            self._load_fallback()
+        self._live_stamp = stamp
+
+    def _load_fallback(self) -> None:
+        if self.fallback_path and Path(self.fallback_path).exists():
+            try:
+                self._swap(FantasyPolicy.load(self.fallback_path), f"file:{Path(self.fallback_path).name}")
+                log.warning("No live version in %s; serving RL checkpoint %s", self.root, self.fallback_path)
+                return
+            except ValueError as exc:
+                # e.g. a checkpoint from the old fixed-size MLP — retrain to replace it
+                log.warning("Ignoring RL checkpoint: %s", exc)
+        log.warning("No trained RL policy available; serving a random-init policy")
+        self._swap(FantasyPolicy(seed=42), UNTRAINED)
+
+    def _swap(self, policy: FantasyPolicy, version: str) -> None:
+        self._policy = policy
+        self.version = version
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+
+
+def _import_checkpoint(root: str, path: str, make_live: bool) -> str:
+    return publish(FantasyPolicy.load(path), root, metadata={"source": str(path)}, make_live=make_live)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the RL policy model registry")
+    parser.add_argument("--registry", default=os.environ.get("RL_MODEL_REGISTRY", "./models/registry"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list versions; * marks the live one")
+    promote = sub.add_parser("promote", help="make a version live (also used to roll back)")
+    promote.add_argument("version")
+    imp = sub.add_parser("import", help="publish a .npz checkpoint as a new version")
+    imp.add_argument("path")
+    imp.add_argument("--no-live", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        live = live_version(args.registry)
+        for meta in list_versions(args.registry):
+            mark = "*" if meta["version"] == live else " "
+            extras = {k: v for k, v in meta.items() if k not in ("version", "created_at", "params")}
+            print(f"{mark} {meta['version']}  {meta['created_at']}  {extras}")
+    elif args.command == "promote":
+        set_live(args.registry, args.version)
+        print(f"LIVE -> {args.version}")
+    else:
+        print(_import_checkpoint(args.registry, args.path, make_live=not args.no_live))
@@ -0,0 +1,125 @@
+"""
+Player pool cache — the RL executor's view of the player catalog.
+
+Building the pool (feature matrix, team index array, id ↔ index maps) costs
+several queries, but its inputs only change when a match is settled or the
+catalog is edited. get_player_pool() therefore keeps one PlayerPool per
+process, keyed by the stats + catalog data versions, and rebuilds it lazily
+once per change. The arrays are marked read-only so the squad, lineup and
+transfer endpoints can share a single instance safely across threads.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.player import Player
+from app.models.team import Team
+from app.rl.environment import FEATURE_DIM, MAX_PLAYERS, POS_TO_IDX
+from app.services.data_version_service import CATALOG, STATS, current_versions
+from app.services.feature_service import BATCH_FEATURE_INDEX as F, build_features_batch
+from app.services.rolling_feature_service import ROLLING_FEATURE_INDEX as R, get_rolling_snapshot
+
+
+class PlayerPool:
+    """Immutable pool snapshot for one data version.
+
+    features:   (pool_size, FEATURE_DIM) float32, zero-padded past n_players
+    team_index: (pool_size,) int64 team indices, -1 for padding
+    pool_size is max(n_players, MAX_PLAYERS): the whole active catalog.
+    player_ids / names / positions / team_ids / prices: per-index metadata
+    """
+
+    def __init__(
+        self,
+        version: str,
+        features: np.ndarray,
+        team_index: np.ndarray,
+        player_ids: list[str],
+        names: list[str],
+        positions: list[str],
+        team_ids: list[str],
+    ):
+        features.setflags(write=False)
+        team_index.setflags(write=False)
+        self.version = version
+        self.features = features
+        self.team_index = team_index
+        self.player_ids = tuple(player_ids)
+        self.names = tuple(names)
+        self.positions = tuple(positions)
+        self.team_ids = tuple(team_ids)
+        self.index = {pid: i for i, pid in enumerate(player_ids)}
+
+    @property
+    def n_players(self) -> int:
+        return len(self.player_ids)
+
+    def indices(self, player_ids: list[str]) -> np.ndarray:
+        """Pool indices for `player_ids` (-1 for players not in the pool)."""
+        return np.array([self.index.get(pid, -1) for pid in player_ids], dtype=np.int64)
+
+
+def build_player_pool(db: Session, version: str = "") -> PlayerPool:
+    """Build a PlayerPool from the database (uncached)."""
+    players = (
+        db.query(Player.id, Player.name, Player.position, Player.team_id)
+        .filter(Player.is_active == True)  # noqa: E712
+        .all()
+    )
+    team_idx_map = {team_id: i for i, (team_id,) in enumerate(db.query(Team.id).all())}
+
+    n = len(players)
+    ids = [p.id for p in players]
+    features = build_features_batch(db, ids)
+    rolling, has_rolling = get_rolling_snapshot(db).rows(ids)
+
+    size = max(n, MAX_PLAYERS)
+    pool = np.zeros((size, FEATURE_DIM), dtype=np.float32)
+    pool[:n, 0] = [POS_TO_IDX.get(p.position, 2) for p in players]          # position
+    pool[:n, 1] = features[:, F["price"]]                                    # price
+    pool[:n, 2] = features[:, F["avg_points"]]                               # avg points
+    pool[:n, 3] = features[:, F["total_goals"]]                              # goals
+    pool[:n, 4] = features[:, F["total_assists"]]                            # assists
+    pool[:n, 5] = features[:, F["total_minutes"]] / np.maximum(features[:, F["matches_played"]], 1)  # avg minutes
+    pool[:n, 6] = features[:, F["total_saves"]]                              # saves
+    pool[:n, 7] = np.where(has_rolling, rolling[:, R["last5_points"]], features[:, F["avg_points"]])  # form
+
+    team_index = np.full(size, -1, dtype=np.int64)
+    team_index[:n] = [team_idx_map.get(p.team_id, -1) for p in players]
+
+    return PlayerPool(
+        version,
+        pool,
+        team_index,
+        ids,
+        [p.name for p in players],
+        [p.position for p in players],
+        [p.team_id for p in players],
+    )
+
+
+_pool_lock = threading.Lock()
+_pool_cache: Optional[PlayerPool] = None
+
+
+def get_player_pool(db: Session) -> PlayerPool:
+    """Shared PlayerPool for the current data version.
+
+    One primary-key lookup per data domain when warm.
+    """
+    global _pool_cache
+    version = current_versions(db, STATS, CATALOG)
+    cached = _pool_cache
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _pool_lock:
+        cached = _pool_cache
+        if cached is not None and cached.version == version:
+            return cached
+        _pool_cache = build_player_pool(db, version)
+        return _pool_cache
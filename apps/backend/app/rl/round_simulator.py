@@ -0,0 +1,384 @@
+"""
+Monte Carlo round simulator — distributions of squad points for one round.
+
+Expected points hide risk: a premium forward and two steady defenders can
+have the same mean but very different spreads. This module samples whole
+rounds, scores them with the scoring_service tables, and lets captaincy and
+squad choices target a quantile instead of the mean.
+
+Per player and scenario:
+
+- Minutes are full (≥60), a cameo, or none.
+- Goals and assists are Poisson thinnings of the side's xG from the team
+  model. A player's share of the side's xG is his per-90 rate / BASE_XG.
+  A cameo gets CAMEO_SHARE of it.
+- The side's total goals add the squad players' goals and assists to an
+  unattributed remainder. Those totals drive clean sheets and goals
+  conceded on the other side, so a forward's haul and the opposing
+  keeper's clean sheet are correlated the way real results are.
+- GK saves are Poisson. Cards are one draw per appearance.
+- sync_stats_task awards a rating bonus, which is approximated from
+  returns: +3 for two or more goals/assists/clean sheets, +2 for one,
+  +1 for a full match without. Penalties and own goals are not simulated.
+
+Every random outcome is an inverse-CDF lookup of a 16-bit uniform into a
+65536-entry table built once per player. Uniforms come four to a 64-bit
+word of an SFC64 generator. Points are int16 and totals are integers, so
+quantiles come from a histogram rather than a sort. 100k scenarios of a
+15-man squad take a few tens of milliseconds.
+
+    rates = fit_player_rates(features, positions)           # history -> per-90 rates
+    points = simulate_points(rates, fixtures, 100_000)      # (P, N) player points
+    dist = squad_distribution(points, squads, multipliers)  # mean/std/quantiles per squad
+
+Squads are row indices into the simulated players with a multiplier per
+slot: 1 starter, 0 bench, 2 captain, 1.5 vice-captain. Like
+sync_stats_task, the 1.5× is truncated per player.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from app.rl.environment import IDX_TO_POS
+from app.services.feature_service import BATCH_FEATURE_INDEX as F
+from app.services.scoring_service import (
+    ASSIST_POINTS,
+    CLEAN_SHEET_POINTS,
+    CONCEDED_POSITIONS,
+    GOAL_POINTS,
+    RED_CARD_POINTS,
+    SAVES_PER_POINT,
+    YELLOW_CARD_POINTS,
+)
+
+BASE_XG = 1.35                  # typical side xG; a player's share of it is per-90 rate / BASE_XG
+CAMEO_SHARE = 1 / 3             # a substitute's share of his full-match involvement
+MAX_INVOLVEMENT = 5             # goals / assists per player are capped here
+MAX_COUNT = 12                  # and side goals / GK saves here
+PRIOR_MATCHES = 3.0             # shrinkage weight of the position priors, in matches
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+RANKING_SCENARIOS = 20_000        # scenarios used to rank captain candidates
+RISK_QUANTILES = {"conservative": 0.25, "balanced": None, "aggressive": 0.75}   # None = mean
+
+# Position priors (GK, DEF, MID, FWD) for players with little or no history
+PRIOR_GOALS_90 = np.array([0.0, 0.06, 0.18, 0.40])
+PRIOR_ASSISTS_90 = np.array([0.02, 0.07, 0.15, 0.15])
+PRIOR_SAVES = 3.0               # GK saves per match
+PRIOR_YELLOW = 0.12
+PRIOR_RED = 0.005
+PRIOR_FULL = 0.6                # P(plays ≥60 min)
+PRIOR_CAMEO = 0.2               # P(plays 1–59 min)
+
+_SCALE = 1 << 16
+_STATE_SHARE = np.array([0.0, CAMEO_SHARE, 1.0])   # minutes state 0 none, 1 cameo, 2 full
+_POSITIONS = [IDX_TO_POS[i] for i in range(len(IDX_TO_POS))]
+_GOAL_PTS = np.array([GOAL_POINTS[p] for p in _POSITIONS])
+_CS_PTS = np.array([CLEAN_SHEET_POINTS[p] for p in _POSITIONS])
+_CONCEDES = np.array([p in CONCEDED_POSITIONS for p in _POSITIONS])
+_GK = _POSITIONS.index("GK")
+
+
+class PlayerRates:
+    """Per-player event rates; all arrays are (P,).
+
+    positions: POS_TO_IDX codes
+    p_full / p_cameo: P(≥60 min) / P(1–59 min)
+    goals_90 / assists_90: involvement per 90 minutes at a BASE_XG side
+    saves: expected GK saves per match
+    p_yellow / p_red: card probabilities per appearance
+    """
+
+    def __init__(self, positions, p_full, p_cameo, goals_90, assists_90, saves, p_yellow, p_red):
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.p_full = np.asarray(p_full, dtype=np.float64)
+        self.p_cameo = np.asarray(p_cameo, dtype=np.float64)
+        self.goals_90 = np.asarray(goals_90, dtype=np.float64)
+        self.assists_90 = np.asarray(assists_90, dtype=np.float64)
+        self.saves = np.asarray(saves, dtype=np.float64)
+        self.p_yellow = np.asarray(p_yellow, dtype=np.float64)
+        self.p_red = np.asarray(p_red, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class Fixtures:
+    """Which side of which match each simulated player plays for.
+
+    player_side: (P,) index into the sides, -1 if the player has no match
+    side_xg:     (S,) expected goals of each side
+    opponent:    (S,) index of the opposing side
+    """
+
+    def __init__(self, player_side, side_xg, opponent):
+        self.player_side = np.asarray(player_side, dtype=np.int64)
+        self.side_xg = np.asarray(side_xg, dtype=np.float64)
+        self.opponent = np.asarray(opponent, dtype=np.int64)
+
+    @classmethod
+    def neutral(cls, n_players: int) -> Fixtures:
+        """Every player on his own side of an average fixture (BASE_XG each way)."""
+        sides = np.arange(2 * n_players)
+        return cls(sides[::2], np.full(2 * n_players, BASE_XG), sides ^ 1)
+
+
+class RoundDistribution:
+    """Distribution of round totals for B squads over N scenarios.
+
+    mean / std / var: (B,)
+    quantiles:        (B, Q) at .levels, as the smallest total whose CDF reaches the level
+    totals:           (B, N) int32 scenario totals
+    """
+
+    def __init__(self, totals: np.ndarray, levels: tuple[float, ...] = DEFAULT_QUANTILES):
+        self.totals = totals
+        self.levels = tuple(levels)
+        self.mean = totals.mean(axis=1, dtype=np.float64)
+        self.var = totals.var(axis=1, dtype=np.float64)
+        self.std = np.sqrt(self.var)
+        self.quantiles = _quantiles(totals, self.levels)
+
+    def summary(self, i: int = 0) -> dict:
+        out = {"mean": round(float(self.mean[i]), 2), "std": round(float(self.std[i]), 2)}
+        for level, value in zip(self.levels, self.quantiles[i]):
+            out[f"p{round(level * 100):02d}"] = int(value)
+        return out
+
+
+def fit_player_rates(features: np.ndarray, positions: np.ndarray) -> PlayerRates:
+    """Shrunk per-player rates from build_features_batch() rows.
+
+    Totals are turned into per-90 rates (goals, assists) or per-appearance
+    rates (saves, cards, minutes) and pulled toward the position priors with
+    a weight of PRIOR_MATCHES matches, so a debutant gets roughly the
+    positional average.
+    """
+    features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+    positions = np.clip(np.asarray(positions, dtype=np.int64), 0, len(_POSITIONS) - 1)
+    matches = features[:, F["matches_played"]]
+    nineties = features[:, F["total_minutes"]] / 90.0
+    k = PRIOR_MATCHES
+
+    goals_90 = (features[:, F["total_goals"]] + k * PRIOR_GOALS_90[positions]) / (nineties + k)
+    assists_90 = (features[:, F["total_assists"]] + k * PRIOR_ASSISTS_90[positions]) / (nineties + k)
+    saves = np.where(positions == _GK, (features[:, F["total_saves"]] + k * PRIOR_SAVES) / (matches + k), 0.0)
+    p_yellow = (features[:, F["total_yellows"]] + k * PRIOR_YELLOW) / (matches + k)
+    p_red = (features[:, F["total_reds"]] + k * PRIOR_RED) / (matches + k)
+
+    # Average minutes per appearance → share of full matches; half the rest are cameos
+    avg_minutes = features[:, F["total_minutes"]] / np.maximum(matches, 1)
+    weight = matches / (matches + k)
+    p_full = weight * np.clip(avg_minutes / 90.0, 0.05, 0.95) + (1 - weight) * PRIOR_FULL
+    p_cameo = np.minimum(weight * 0.5 * (1 - p_full) + (1 - weight) * PRIOR_CAMEO, 1 - p_full)
+
+    return PlayerRates(positions, p_full, p_cameo, goals_90, assists_90, saves,
+                       np.clip(p_yellow, 0, 0.9), np.clip(p_red, 0, 0.1))
+
+
+def simulate_points(
+    rates: PlayerRates,
+    fixtures: Fixtures,
+    n_scenarios: int = 10_000,
+    seed: int | None = None,
+) -> np.ndarray:
+    """(P, N) int16 fantasy points for every player in every scenario."""
+    rng = np.random.Generator(np.random.SFC64(seed))
+    n_players, n = len(rates), n_scenarios
+    pos = rates.positions
+    plays = fixtures.player_side >= 0
+    side = np.maximum(fixtures.player_side, 0)
+    xg = np.where(plays, fixtures.side_xg[side], 0.0)
+    p_full = np.where(plays, rates.p_full, 0.0)
+    p_cameo = np.where(plays, rates.p_cameo, 0.0)
+    goal_share = rates.goals_90 / BASE_XG
+    assist_share = rates.assists_90 / BASE_XG
+
+    # A player's own events are one joint outcome (minutes, goals, assists, cards)
+    # drawn with a single uniform; the points of every outcome are precomputed.
+    p_minutes = np.stack([1 - p_full - p_cameo, p_cameo, p_full], axis=1)                 # (P, 3)
+    p_goals = _poisson_pmf(np.outer(goal_share * xg, _STATE_SHARE), MAX_INVOLVEMENT)       # (P, 3, G)
+    p_assists = _poisson_pmf(np.outer(assist_share * xg, _STATE_SHARE), MAX_INVOLVEMENT)   # (P, 3, A)
+    p_cards = np.stack([1 - rates.p_yellow - rates.p_red, rates.p_yellow, rates.p_red], axis=1)
+    p_cards = np.stack([np.broadcast_to(np.eye(1, 3)[0], p_cards.shape), p_cards, p_cards], axis=1)  # (P, 3, C)
+    joint = (p_minutes[:, :, None, None, None] * p_goals[:, :, :, None, None]
+             * p_assists[:, :, None, :, None] * p_cards[:, :, None, None, :])
+    outcome_tab = _tables(joint.reshape(n_players, -1))
+    base, clean_sheet, concede, involvement, full = _outcome_points(pos)
+
+    # Side goals: an unattributed remainder plus the simulated players' involvement
+    expected_share = (goal_share + assist_share) * (p_full + CAMEO_SHARE * p_cameo)
+    claimed = np.bincount(side[plays], weights=expected_share[plays], minlength=len(fixtures.side_xg))
+    remainder = _tables(_poisson_pmf(fixtures.side_xg * np.maximum(1.0 - claimed, 0.0), MAX_COUNT))
+    u = _uniform16(rng, (len(remainder), n))
+    side_goals = np.empty((len(remainder), n), dtype=np.int16)
+    for s in range(len(remainder)):
+        side_goals[s] = remainder[s].take(u[s])
+
+    u = _uniform16(rng, (n_players, n))
+    outcome = np.empty((n_players, n), dtype=outcome_tab.dtype)
+    for p in range(n_players):
+        outcome[p] = outcome_tab[p].take(u[p])
+        if plays[p]:
+            side_goals[side[p]] += involvement.take(outcome[p])
+
+    points = np.empty((n_players, n), dtype=np.int16)
+    for p in range(n_players):
+        o = outcome[p]
+        pts = base[p].take(o)
+        if plays[p]:
+            conceded = side_goals[fixtures.opponent[side[p]]]
+            pts += (conceded == 0) * clean_sheet[p].take(o)
+            if _CONCEDES[pos[p]]:
+                pts -= concede.take(o) * (conceded >> 1)
+        points[p] = pts
+
+    # GK saves, for keepers who play ≥60 min
+    keepers = np.flatnonzero((pos == _GK) & plays)
+    save_tab = _tables(_poisson_pmf(rates.saves[keepers], MAX_COUNT))
+    save_pts = (np.arange(MAX_COUNT + 1) // SAVES_PER_POINT).astype(np.int16)
+    u = _uniform16(rng, (len(keepers), n))
+    for i, p in enumerate(keepers):
+        points[p] += full.take(outcome[p]) * save_pts.take(save_tab[i].take(u[i]))
+    return points
+
+
+def squad_distribution(
+    points: np.ndarray,
+    squads: np.ndarray,
+    multipliers: np.ndarray,
+    levels: tuple[float, ...] = DEFAULT_QUANTILES,
+) -> RoundDistribution:
+    """Round totals for B squads from simulated player points.
+
+    squads:      (B, S) row indices into points, -1 for an empty slot
+    multipliers: (B, S) per-slot multiplier (0 bench, 1, 1.5 vice, 2 captain);
+                 fractional products are truncated like sync_stats_task
+    """
+    squads = np.atleast_2d(np.asarray(squads, dtype=np.int64))
+    multipliers = np.atleast_2d(np.asarray(multipliers, dtype=np.float64))
+    multipliers = np.where(squads >= 0, multipliers, 0.0)
+    whole = np.floor(multipliers)
+
+    # Whole multipliers as one (B, P) @ (P, N) product; fractional ones slot by slot
+    weights = np.zeros((len(squads), len(points)), dtype=np.float32)
+    rows = np.repeat(np.arange(len(squads)), squads.shape[1])
+    np.add.at(weights, (rows, np.maximum(squads, 0).ravel()), whole.ravel())
+    totals = np.rint(weights @ points.astype(np.float32)).astype(np.int32)
+    for b, s in zip(*np.nonzero(multipliers != whole)):
+        p = points[squads[b, s]].astype(np.float64)
+        totals[b] += (np.trunc(p * multipliers[b, s]) - p * whole[b, s]).astype(np.int32)
+    return RoundDistribution(totals, levels)
+
+
+def choose_captains(
+    points: np.ndarray,
+    starters: np.ndarray,
+    risk_profile: str = "balanced",
+) -> tuple[int, int, RoundDistribution]:
+    """Captain and vice-captain among starters (row indices) for a risk profile.
+
+    "balanced" maximises the mean round total, "conservative" / "aggressive"
+    its 25th / 75th percentile; unknown profiles count as balanced. The
+    captain is picked first, then the vice given the captain, each ranked on
+    the first RANKING_SCENARIOS scenarios. Returns (captain row, vice row,
+    distribution of the chosen XI over all scenarios).
+    """
+    starters = np.asarray(starters, dtype=np.int64)
+    level = RISK_QUANTILES.get(risk_profile)
+    lineup = points[starters, :RANKING_SCENARIOS].astype(np.int32)
+    base = lineup.sum(axis=0)
+
+    def best(extra: np.ndarray, exclude: int = -1) -> int:
+        candidates = base + extra
+        score = candidates.mean(axis=1)
+        if level is not None:
+            score = _quantiles(candidates, (level,))[:, 0] + 1e-6 * score   # mean breaks ties
+        if exclude >= 0:
+            score[exclude] = -np.inf
+        return int(np.argmax(score))
+
+    cap = best(lineup)                                                  # ×2: one more copy
+    vice = best(lineup[cap] + ((lineup + (lineup < 0)) >> 1), exclude=cap)  # ×1.5, truncated
+
+    multipliers = np.ones(len(starters))
+    multipliers[cap], multipliers[vice] = 2.0, 1.5
+    dist = squad_distribution(points, starters[None, :], multipliers[None, :])
+    return int(starters[cap]), int(starters[vice]), dist
+
+
+def _uniform16(rng: np.random.Generator, shape: tuple[int, ...]) -> np.ndarray:
+    """Uniform uint16 draws: four per 64-bit word of the bit generator."""
+    size = int(np.prod(shape))
+    raw = rng.bit_generator.random_raw((size + 3) // 4)
+    return raw.view(np.uint16)[:size].reshape(shape)
+
+
+def _tables(pmf: np.ndarray) -> np.ndarray:
+    """(R, K) outcome probabilities → (R, 65536) inverse-CDF tables.
+
+    table[r, u] is the outcome for a 16-bit uniform u. Outcome k covers the
+    entries between the rounded cumulative probabilities before and after
+    it, so rounding never accumulates across outcomes.
+    """
+    pmf = np.clip(np.atleast_2d(pmf), 0.0, None)
+    bounds = np.rint(np.cumsum(pmf, axis=1) * _SCALE).clip(0, _SCALE).astype(np.int64)
+    bounds[:, -1] = _SCALE
+    widths = np.diff(np.maximum.accumulate(bounds, axis=1), axis=1, prepend=0)
+    outcomes = np.arange(pmf.shape[1], dtype=np.uint8 if pmf.shape[1] <= 256 else np.uint16)
+    tables = np.empty((len(pmf), _SCALE), dtype=outcomes.dtype)
+    for r, w in enumerate(widths):
+        tables[r] = np.repeat(outcomes, w)
+    return tables
+
+
+def _poisson_pmf(rate, cap: int) -> np.ndarray:
+    """Poisson(rate) probabilities of 0..cap with the tail folded into cap; shape rate.shape + (cap + 1,)."""
+    rate = np.maximum(np.asarray(rate, dtype=np.float64), 0.0)[..., None]
+    k = np.arange(cap + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmf = np.exp(k * np.log(rate) - rate - log_fact)
+    pmf[..., 0] = np.exp(-rate[..., 0])                  # 0 * log(0) for rate 0
+    pmf[..., cap] = np.maximum(1.0 - pmf[..., :cap].sum(axis=-1), 0.0)
+    return pmf
+
+
+def _outcome_points(positions: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Per-player value tables over the joint outcomes (minutes, goals, assists, cards).
+
+    base:        (P, O) points that don't depend on the opponent, including the bonus estimate
+    clean_sheet: (P, O) points added when the opponent doesn't score (≥60 min only)
+    concede:     (O,) 1 if the player appeared (GK/DEF lose a point per 2 conceded)
+    involvement: (O,) goals + assists, added to the side's goals
+    full:        (O,) 1 for ≥60 minutes
+    """
+    grid = np.meshgrid(np.arange(3), np.arange(MAX_INVOLVEMENT + 1), np.arange(MAX_INVOLVEMENT + 1),
+                       np.arange(3), indexing="ij")
+    state, goals, assists, cards = (g.ravel() for g in grid)
+    full = (state == 2).astype(np.int16)
+    played = (state > 0).astype(np.int16)
+    returns = goals + assists
+
+    def bonus(r):
+        return np.where(r > 0, np.minimum(r, 2) + 1, full)
+
+    card_pts = np.array([0, YELLOW_CARD_POINTS, RED_CARD_POINTS])
+    base = (state + bonus(returns) + assists * ASSIST_POINTS + card_pts[cards]
+            + goals * _GOAL_PTS[positions][:, None])
+    cs = _CS_PTS[positions][:, None]
+    clean_sheet = full * (cs + (cs >= 4) * (bonus(returns + 1) - bonus(returns)))
+    return (base.astype(np.int16), clean_sheet.astype(np.int16), played,
+            returns.astype(np.int16), full)
+
+
+def _quantiles(totals: np.ndarray, levels: tuple[float, ...]) -> np.ndarray:
+    """(B, Q) inverted-CDF quantiles of integer totals, from one histogram per row."""
+    if not levels or not totals.size:
+        return np.empty((len(totals), len(levels)))
+    low = int(totals.min())
+    width = int(totals.max()) - low + 1
+    offsets = (np.arange(len(totals)) * width)[:, None]
+    cdf = np.cumsum(np.bincount((totals - low + offsets).ravel(), minlength=len(totals) * width)
+                    .reshape(len(totals), width), axis=1)
+    targets = np.maximum(np.ceil(np.asarray(levels) * totals.shape[1]), 1)
+    return np.stack([low + np.searchsorted(row, targets) for row in cdf]).astype(np.float64)
@@ -0,0 +1,160 @@
+"""
+Policy-guided beam search — several alternative squads from one request.
+
+suggest_squad_rl samples a single squad. Beam search instead decodes
+beam_width partial squads in parallel on a VecFantasyEnv (auto_reset off).
+Each step scores every beam with one batched forward pass; the beams share
+the catalog, so forward_shared_pool embeds the players once. It then
+expands each beam's top picks and keeps the best children by cumulative
+log-probability under the policy. Picks that would leave less than the
+cheapest way to fill the open slots are masked first, so beams cannot
+overspend early and strand themselves short of a full squad.
+
+Children are kept greedily, and a candidate ranks by its log-probability
+minus diversity × its largest overlap (the fraction of shared picks) with
+a child already kept. That spreads the beam over different squads instead
+of near-copies of one. Pick order does not change a squad, so a child
+whose player set equals a kept one is a duplicate and is dropped. The
+final k squads are chosen from the complete beams the same way.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from app.rl.environment import INITIAL_BUDGET, SQUAD_SIZE
+from app.rl.executor_policy import FantasyPolicy, masked_log_softmax
+from app.rl.squad_optimizer import NEEDS
+from app.rl.vec_env import VecFantasyEnv
+
+BEAM_WIDTH = 16
+DIVERSITY = 1.0               # log-prob given up per fully shared squad
+RETRIES = 2                   # searches repeated when fewer than k distinct squads survive
+RETRY_DIVERSITY_FACTOR = 4.0  # diversity multiplier for each retry
+
+
+def beam_search_squads(
+    policy: FantasyPolicy,
+    player_pool: np.ndarray,
+    team_ids: np.ndarray,
+    budget: float = INITIAL_BUDGET,
+    k: int = 3,
+    beam_width: int = BEAM_WIDTH,
+    diversity: float = DIVERSITY,
+) -> list[dict]:
+    """Up to k complete, valid squads, best first.
+
+    player_pool: (n, FEATURE_DIM) features; team_ids: (n,) team codes.
+    Each result holds indices (pool rows in pick order), log_prob (the
+    policy's log-probability of that pick sequence) and budget_remaining.
+    Fewer than k come back when fewer distinct squads fit the budget, or
+    when the beams still merge after RETRIES searches with more diversity.
+    """
+    beam_width = max(beam_width, k)
+    best: list[dict] = []
+    for _ in range(RETRIES + 1):
+        squads = _search(policy, player_pool, team_ids, budget, k, beam_width, diversity)
+        if len(squads) > len(best):
+            best = squads
+        if len(best) >= k:
+            break
+        # The beams shared their early picks and the budget forced the same cheap tail on
+        # all of them, so they merged: search again with the beams pushed further apart
+        diversity = max(diversity, 1.0) * RETRY_DIVERSITY_FACTOR
+    return best
+
+
+def _search(policy: FantasyPolicy, player_pool: np.ndarray, team_ids: np.ndarray, budget: float,
+            k: int, beam_width: int, diversity: float) -> list[dict]:
+    env = VecFantasyEnv(1, player_pool, team_ids, budget=budget, auto_reset=False)
+    obs, _ = env.reset()
+    scores = np.zeros(1)
+
+    for _ in range(SQUAD_SIZE):
+        masks = env.action_masks() & _leaves_fill_budget(env)
+        log_p = masked_log_softmax(policy.forward_shared_pool(obs), masks)
+        width = min(beam_width, masks.shape[1])
+        top = np.argpartition(-log_p, width - 1, axis=1)[:, :width]
+        child_scores = (scores[:, None] + np.take_along_axis(log_p, top, axis=1)).ravel()
+        parents = np.repeat(np.arange(env.num_envs), width)
+        actions = top.ravel()
+
+        # Beams with no valid pick left (only possible through nation limits) die
+        ok = np.isfinite(child_scores)
+        if not ok.any():
+            break
+        parents, actions, child_scores = parents[ok], actions[ok], child_scores[ok]
+        sets = env._picked[parents]
+        sets[np.arange(len(parents)), actions] = True
+
+        keep = _diverse_top(child_scores, sets, beam_width, diversity)
+        env.select(parents[keep])
+        obs, _, _, _, _ = env.step(actions[keep])
+        scores = child_scores[keep]
+
+    complete = np.flatnonzero(env.squad_size == SQUAD_SIZE)
+    if not len(complete):
+        return []
+    final = complete[_diverse_top(scores[complete], env._picked[complete], k, diversity)]
+    return [
+        {
+            "indices": env.squads[i].tolist(),
+            "log_prob": float(scores[i]),
+            "budget_remaining": float(env.budget_remaining[i]),
+        }
+        for i in final
+    ]
+
+
+def _leaves_fill_budget(env: VecFantasyEnv) -> np.ndarray:
+    """(num_envs, pool_size) mask of picks that still leave enough to fill the squad.
+
+    A pick must leave budget_remaining at least the cheapest cost of filling
+    every other open position slot with available players. Without this
+    reserve, the most likely picks spend the budget early and every beam
+    dies short of 15. Nation limits are ignored, so the reserve is a lower
+    bound and a beam can still (rarely) get stuck.
+    """
+    prices = env._prices
+    need = NEEDS[None, :] - env._pos_counts                                 # (B, P) open slots
+    # fill[b, p, k]: the k cheapest available players at p; inf when fewer are left
+    fill = np.full((env.num_envs, len(NEEDS), NEEDS.max() + 2), np.inf)
+    fill[:, :, 0] = 0.0
+    for p in range(len(NEEDS)):
+        cheapest = np.sort(np.where(env._available & (env._positions == p), prices, np.inf), axis=1)
+        fill[:, p, 1:] = np.cumsum(cheapest[:, : NEEDS.max() + 1], axis=1)
+    rows = np.arange(env.num_envs)
+    open_cost = fill[rows[:, None], np.arange(len(NEEDS))[None, :], need]   # (B, P)
+
+    reserve = np.full((env.num_envs, env.pool_size), np.inf)
+    with np.errstate(invalid="ignore"):
+        for p in range(len(NEEDS)):
+            others = open_cost.sum(axis=1) - open_cost[:, p]
+            k = np.maximum(need[:, p], 1)
+            # Picking j at p leaves need−1 slots there, filled by the cheapest need−1 others:
+            # (cheapest need) − j if j is among them, else (cheapest need−1), i.e. the larger
+            fill_k = fill[rows, p, k][:, None]
+            own = np.maximum(fill_k - prices[None, :], fill[rows, p, k - 1][:, None])
+            own = np.where(np.isfinite(fill_k), own, np.inf)          # fewer than need left at p
+            at_p = env._positions == p
+            reserve[:, at_p] = (others[:, None] + own)[:, at_p]
+    after = env.budget_remaining[:, None] - prices[None, :]
+    return np.nan_to_num(after - reserve, nan=-np.inf) >= -1e-6
+
+
+def _diverse_top(scores: np.ndarray, sets: np.ndarray, n: int, diversity: float) -> np.ndarray:
+    """Indices of up to n distinct sets, picked greedily by score − diversity × max overlap.
+
+    All sets have the same size; a set equal to a picked one is never picked.
+    """
+    size = max(int(sets[0].sum()), 1)
+    members = sets.astype(np.float32)
+    overlap = np.zeros(len(scores))
+    open_ = np.ones(len(scores), dtype=bool)
+    chosen: list[int] = []
+    while len(chosen) < n and open_.any():
+        i = int(np.argmax(np.where(open_, scores - diversity * overlap / size, -np.inf)))
+        chosen.append(i)
+        shared = members @ members[i]
+        open_ &= shared < size
+        overlap = np.maximum(overlap, shared)
+    return np.array(chosen, dtype=np.int64)
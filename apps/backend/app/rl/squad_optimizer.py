@@ -0,0 +1,239 @@
+"""
+Exact squad optimizer — deterministic alternative to sampling the policy.
+
+Picking the points-maximising 15-man squad (2 GK / 5 DEF / 5 MID / 3 FWD,
+£100m, at most MAX_PER_TEAM per nation) is a small integer program. It is
+solved exactly in three steps:
+
+1. Dominance pruning. Player j is dominated by i (same position) when i is
+   no dearer and scores at least as much. Any squad holding j can swap it
+   for a dominator that is neither already picked nor from a full nation.
+   Other than j, the squad holds at most need−1 same-position players and
+   at most 7 full nations. So j is dropped once its dominators from its own
+   nation (or nationless ones), plus the distinct other nations among its
+   dominators, reach 7 + need.
+2. Knapsack bounds. Prices become integers (tenths of £m divided by their
+   gcd). A DP per position gives the best k players from any suffix of the
+   points-sorted candidates at every cost. A max-plus convolution over the
+   remaining positions gives a tight upper bound that ignores nations.
+3. Branch and bound. A depth-first search picks players position by
+   position, best first. It enforces the per-nation limit and cuts any
+   branch whose bound cannot beat the incumbent.
+
+Locked players are placed first. Excluded players never enter the search.
+No LP solver is needed, and the full catalog solves in milliseconds.
+"""
+from __future__ import annotations
+
+import time
+from functools import reduce
+from math import gcd
+
+import numpy as np
+
+from app.rl.environment import INITIAL_BUDGET, IDX_TO_POS, MAX_PER_TEAM, POSITION_LIMITS, POS_TO_IDX
+
+PRICE_UNIT = 0.1          # prices are quoted in £0.1m steps
+MAX_FULL_TEAMS = (sum(POSITION_LIMITS.values()) - 1) // MAX_PER_TEAM
+NEEDS = np.array([POSITION_LIMITS[IDX_TO_POS[p]] for p in range(len(POS_TO_IDX))])
+
+
+class SquadSolution:
+    """Result of optimize_squad: chosen pool indices and their totals.
+
+    optimal is False only when the node limit or the deadline stopped the
+    search early, in which case `indices` is the best squad found.
+    """
+
+    def __init__(self, indices: list[int], total_points: float, total_cost: float,
+                 optimal: bool, nodes: int, candidates: int):
+        self.indices = indices
+        self.total_points = total_points
+        self.total_cost = total_cost
+        self.optimal = optimal
+        self.nodes = nodes
+        self.candidates = candidates
+
+
+def _to_units(prices: np.ndarray) -> np.ndarray:
+    return np.rint(np.asarray(prices, dtype=np.float64) / PRICE_UNIT).astype(np.int64)
+
+
+def prune_dominated(points: np.ndarray, costs: np.ndarray, teams: np.ndarray, need: int) -> np.ndarray:
+    """Boolean keep-mask over one position's candidates (see module docstring)."""
+    n = len(points)
+    if need <= 0:
+        return np.zeros(n, dtype=bool)
+    if n <= need:
+        return np.ones(n, dtype=bool)
+    idx = np.arange(n)
+    # dom[i, j]: i dominates j; ties broken by index so the relation is a strict order
+    dom = (costs[:, None] <= costs[None, :]) & (points[:, None] >= points[None, :])
+    strict = (costs[:, None] < costs[None, :]) | (points[:, None] > points[None, :]) | (idx[:, None] < idx[None, :])
+    dom &= strict
+
+    same = (teams[:, None] == teams[None, :]) | (teams[:, None] < 0)      # always swappable
+    own = (dom & same).sum(axis=0)
+    _, codes = np.unique(teams, return_inverse=True)
+    onehot = np.zeros((n, codes.max() + 1), dtype=np.float32)
+    onehot[idx, codes] = 1.0
+    onehot[teams < 0] = 0.0
+    per_team = (dom & ~same).T.astype(np.float32) @ onehot                # (j, team) dominator counts
+    other_teams = (per_team > 0).sum(axis=1)
+    return own + other_teams < MAX_FULL_TEAMS + need
+
+
+def _suffix_tables(points: np.ndarray, costs: np.ndarray, need: int, cap: int) -> np.ndarray:
+    """g[i, k, c]: best points from candidates i.. choosing exactly k at total cost ≤ c."""
+    n = len(points)
+    g = np.full((n + 1, need + 1, cap + 1), -np.inf)
+    g[n, 0] = 0.0
+    for i in range(n - 1, -1, -1):
+        g[i] = g[i + 1]
+        cost = costs[i]
+        if need and cost <= cap:
+            take = g[i + 1, :-1, : cap + 1 - cost] + points[i]
+            np.maximum(g[i, 1:, cost:], take, out=g[i, 1:, cost:])
+    return g
+
+
+def _max_plus(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """out[c] = max_{c' ≤ c} a[c'] + b[c − c']."""
+    cap = len(a) - 1
+    padded = np.concatenate([np.full(cap, -np.inf), b])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, cap + 1)  # windows[c, m] = b[c + m − cap]
+    return (windows + a[::-1]).max(axis=1)
+
+
+def optimize_squad(
+    points: np.ndarray,
+    prices: np.ndarray,
+    positions: np.ndarray,
+    team_index: np.ndarray,
+    budget: float = INITIAL_BUDGET,
+    locked: list[int] | tuple[int, ...] = (),
+    excluded: list[int] | tuple[int, ...] = (),
+    max_nodes: int = 200_000,
+    deadline: float | None = None,
+) -> SquadSolution:
+    """Points-maximising legal squad over a pool.
+
+    points, prices: per-player expected points and price (£m)
+    positions:      position indices (POS_TO_IDX)
+    team_index:     nation indices, -1 for players without a nation (unlimited)
+    locked/excluded: pool indices forced in / kept out
+    deadline:       time.perf_counter() value at which the search stops, like max_nodes
+
+    Raises ValueError if the locked players are illegal or no legal squad
+    fits the budget, or if the search stops before it finds any squad.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.int64)
+    teams = np.asarray(team_index, dtype=np.int64)
+    costs = _to_units(prices)
+    n = len(points)
+
+    locked = sorted(set(int(i) for i in locked))
+    banned = np.zeros(n, dtype=bool)
+    banned[list(excluded)] = True
+    if banned[locked].any():
+        raise ValueError("A player cannot be both locked and excluded")
+
+    need = NEEDS.copy()
+    team_counts: dict[int, int] = {}
+    for i in locked:
+        need[positions[i]] -= 1
+        if teams[i] >= 0:
+            team_counts[int(teams[i])] = team_counts.get(int(teams[i]), 0) + 1
+    if (need < 0).any():
+        raise ValueError("Locked players exceed a position limit")
+    if any(v > MAX_PER_TEAM for v in team_counts.values()):
+        raise ValueError(f"Locked players exceed {MAX_PER_TEAM} per nation")
+    budget_units = int(np.floor(budget / PRICE_UNIT + 1e-6)) - int(costs[locked].sum())
+    if budget_units < 0:
+        raise ValueError("Locked players exceed the budget")
+
+    free = ~banned
+    free[locked] = False
+    for t, count in team_counts.items():
+        if count >= MAX_PER_TEAM:
+            free &= teams != t
+
+    # Per-position candidates: dominance-pruned, best first
+    cands: list[np.ndarray] = []
+    for p in range(len(NEEDS)):
+        members = np.flatnonzero(free & (positions == p) & (costs <= budget_units))
+        keep = prune_dominated(points[members], costs[members], teams[members], int(need[p]))
+        members = members[keep]
+        cands.append(members[np.lexsort((costs[members], -points[members]))])
+    n_candidates = sum(len(c) for c in cands)
+
+    # Integer cost scale
+    scale = reduce(gcd, [int(c) for m in cands for c in costs[m]], 0) or 1
+    cap = budget_units // scale
+    unit_costs = [costs[m] // scale for m in cands]
+
+    g = [_suffix_tables(points[m], uc, int(need[p]), cap) for p, (m, uc) in enumerate(zip(cands, unit_costs))]
+    rest = [None] * (len(NEEDS) + 1)
+    rest[len(NEEDS)] = np.zeros(cap + 1)
+    rest[len(NEEDS) - 1] = g[-1][0, need[-1]]
+    for p in range(len(NEEDS) - 2, -1, -1):
+        rest[p] = _max_plus(g[p][0, need[p]], rest[p + 1])
+    if not np.isfinite(rest[0][cap]):
+        raise ValueError("No legal squad fits the budget")
+
+    counts = np.zeros(max(int(teams.max(initial=-1)) + 1, 1), dtype=np.int64)
+    for t, count in team_counts.items():
+        counts[t] = count
+    best = {"points": -np.inf, "picks": None}
+    chosen: list[int] = []
+    nodes = 0
+
+    def bound(p: int, i: int, k: int, c: int) -> float:
+        return float(np.max(g[p][i, k, : c + 1] + rest[p + 1][c::-1]))
+
+    def search(p: int, i: int, k: int, c: int, total: float) -> bool:
+        """Returns False once the node limit or the deadline is hit."""
+        nonlocal nodes
+        while k == 0:
+            p += 1
+            if p == len(NEEDS):
+                if total > best["points"]:
+                    best["points"], best["picks"] = total, list(chosen)
+                return True
+            i, k = 0, int(need[p])
+        members, uc = cands[p], unit_costs[p]
+        for j in range(i, len(members) - k + 1):
+            nodes += 1
+            if nodes > max_nodes or (deadline is not None and time.perf_counter() > deadline):
+                return False
+            if total + bound(p, j, k, c) <= best["points"] + 1e-9:
+                break  # bounds only shrink further down the best-first list
+            player, cost = members[j], int(uc[j])
+            team = teams[player]
+            if cost > c or (team >= 0 and counts[team] >= MAX_PER_TEAM):
+                continue
+            chosen.append(int(player))
+            if team >= 0:
+                counts[team] += 1
+            ok = search(p, j + 1, k - 1, c - cost, total + points[player])
+            if team >= 0:
+                counts[team] -= 1
+            chosen.pop()
+            if not ok:
+                return False
+        return True
+
+    optimal = search(0, 0, int(need[0]), cap, float(points[locked].sum()))
+    if best["picks"] is None:
+        raise ValueError("No legal squad fits the budget" if optimal else "Search stopped before finding a squad")
+
+    indices = locked + best["picks"]
+    return SquadSolution(
+        indices=indices,
+        total_points=float(points[indices].sum()),
+        total_cost=round(float(costs[indices].sum()) * PRICE_UNIT, 1),
+        optimal=optimal,
+        nodes=nodes,
+        candidates=n_candidates,
+    )
@@ -1,21 +1,50 @@
 """
-Lightweight PPO training loop using pure NumPy.
+PPO trainer for the squad-building policy, in pure NumPy.
 
-For production training on Colab A100, use Stable-Baselines3 MaskablePPO
-with the FantasyEnv directly. This module provides a minimal REINFORCE
-(policy gradient) trainer for local development and quick iteration.
+Rollouts are collected from VecFantasyEnv by a pool of worker processes,
+each holding its own vectorised env across iterations. A worker returns a
+RolloutBuffer (observations, masks, actions, log-probs, values, rewards,
+dones) for `n_steps` lock-step moves of its `num_envs` episodes. The
+learner computes GAE advantages, then runs several epochs of minibatch
+updates on the clipped PPO objective with a value loss and an entropy
+bonus, using the policy's batched forward_cached/backward and Adam.
+
+Each iteration logs env steps/sec; the run logs the wall-clock time and
+env steps at which the rolling mean episode return first reaches
+--target-reward.
+
+train_one_episode() keeps the single-episode REINFORCE update for quick
+smoke tests.
 
 Usage:
     cd apps/backend
     source .venv/bin/activate
-    PYTHONPATH=$(pwd) python -m app.rl.train_ppo --episodes 500 --output ../../models/rl_executor.npz
+    PYTHONPATH=$(pwd) python -m app.rl.train_ppo --steps 500000 --workers 4 \\
+        --target-reward 100 --output ../../models/rl_executor.npz \\
+        --registry models/registry
+
+--registry publishes the trained weights as a new model registry version
+and makes it live; running servers pick it up without a restart.
+--episodes ../../data/episodes trains on historical rounds (replay mode) instead
+of random pools.
 """
 from __future__ import annotations
 
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
-from app.rl.environment import FantasyEnv
-from app.rl.executor_policy import FantasyPolicy
+from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+from app.rl import model_registry
+from app.rl.episode_store import EpisodeStore
+from app.rl.executor_policy import FantasyPolicy, masked_log_softmax
+from app.rl.vec_env import VecFantasyEnv
+
+logger = logging.getLogger(__name__)
 
 
 def train_one_episode(
@@ -29,9 +58,9 @@ def train_one_episode(
     Returns total episode reward.
     """
     obs, _ = env.reset()
-    log_probs: list[float] = []
     rewards: list[float] = []
     obs_list: list[np.ndarray] = []
+    masks: list[np.ndarray] = []
     actions: list[int] = []
 
     terminated = False
@@ -41,8 +70,8 @@ def train_one_episode(
         action = int(np.random.choice(len(probs), p=probs))
 
         obs_list.append(obs.copy())
+        masks.append(mask)
         actions.append(action)
-        log_probs.append(np.log(probs[action] + 1e-10))
 
         obs, reward, terminated, truncated, info = env.step(action)
         rewards.append(reward)
@@ -64,86 +93,392 @@ def train_one_episode(
     if len(returns_arr) > 1:
         returns_arr = (returns_arr - returns_arr.mean()) / (returns_arr.std() + 1e-8)
 
-    # Policy gradient update (REINFORCE)
-    for t in range(len(obs_list)):
-        obs_t = obs_list[t]
-        action_t = actions[t]
-
-        # Forward pass
-        h = obs_t @ policy.w1 + policy.b1
-        h_relu = np.maximum(h, 0)
-        logits = h_relu @ policy.w2 + policy.b2
-
-        # Masked softmax
-        mask = env.action_masks() if t == 0 else np.ones(len(logits), dtype=bool)
-        masked_logits = np.where(mask, logits, -1e9)
-        shifted = masked_logits - masked_logits.max()
-        exp = np.exp(shifted)
-        probs = exp / (exp.sum() + 1e-10)
-
-        # Gradient of log pi(a|s) w.r.t. logits (softmax cross-entropy gradient)
-        grad_logits = -probs.copy()
-        grad_logits[action_t] += 1.0
-        grad_logits *= returns_arr[t]  # scale by advantage
-
-        # Backprop through layer 2
-        grad_w2 = np.outer(h_relu, grad_logits)
-        grad_b2 = grad_logits
-
-        # Backprop through ReLU + layer 1
-        grad_h = (grad_logits @ policy.w2.T) * (h > 0).astype(np.float32)
-        grad_w1 = np.outer(obs_t, grad_h)
-        grad_b1 = grad_h
-
-        # SGD update
-        policy.w1 += lr * grad_w1
-        policy.b1 += lr * grad_b1
-        policy.w2 += lr * grad_w2
-        policy.b2 += lr * grad_b2
+    # Policy gradient update (REINFORCE), one batched pass over the episode
+    logits, cache = policy.forward_cached(np.stack(obs_list))
+    mask_arr = np.stack(masks)
+    masked_logits = np.where(mask_arr, logits, -1e9)
+    exp = np.exp(masked_logits - masked_logits.max(axis=1, keepdims=True))
+    probs = exp / (exp.sum(axis=1, keepdims=True) + 1e-10)
+
+    # Gradient of log pi(a|s) w.r.t. logits (softmax cross-entropy gradient)
+    grad_logits = -probs
+    grad_logits[np.arange(len(actions)), actions] += 1.0
+    grad_logits *= returns_arr[:, None]  # scale by advantage
+
+    # SGD (ascent) update
+    for name, grad in policy.backward(cache, grad_logits.astype(np.float32)).items():
+        getattr(policy, name)[...] += lr * grad
 
     return float(total_reward)
 
 
+class RolloutBuffer:
+    """Fixed-size (n_steps, num_envs) rollout storage from one VecFantasyEnv.
+
+    dones[t] marks that the episode ended with step t (the env auto-reset),
+    so bootstrapping stops there. last_values are V(s) for the observations
+    after the final step.
+    """
+
+    def __init__(self, n_steps: int, num_envs: int, obs_dim: int, pool_size: int):
+        self.obs = np.zeros((n_steps, num_envs, obs_dim), dtype=np.float32)
+        self.masks = np.zeros((n_steps, num_envs, pool_size), dtype=bool)
+        self.actions = np.zeros((n_steps, num_envs), dtype=np.int64)
+        self.log_probs = np.zeros((n_steps, num_envs), dtype=np.float32)
+        self.values = np.zeros((n_steps, num_envs), dtype=np.float32)
+        self.rewards = np.zeros((n_steps, num_envs), dtype=np.float32)
+        self.dones = np.zeros((n_steps, num_envs), dtype=bool)
+        self.last_values = np.zeros(num_envs, dtype=np.float32)
+        self.episode_returns: list[float] = []
+
+    @property
+    def n_transitions(self) -> int:
+        return self.actions.size
+
+    def compute_gae(self, gamma: float, lam: float) -> tuple[np.ndarray, np.ndarray]:
+        """Generalised advantage estimates and value targets, both (n_steps, num_envs)."""
+        advantages = np.zeros_like(self.rewards)
+        next_value = self.last_values
+        next_adv = np.zeros_like(self.last_values)
+        for t in reversed(range(len(self.rewards))):
+            live = ~self.dones[t]
+            delta = self.rewards[t] + gamma * next_value * live - self.values[t]
+            next_adv = delta + gamma * lam * live * next_adv
+            advantages[t] = next_adv
+            next_value = self.values[t]
+        return advantages, advantages + self.values
+
+
+class Adam:
+    """Adam over a policy's named parameter arrays (updated in place)."""
+
+    def __init__(self, params: dict[str, np.ndarray], lr: float = 3e-4,
+                 betas: tuple[float, float] = (0.9, 0.999), eps: float = 1e-8):
+        self.lr = lr
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+        self.t = 0
+        self.m = {name: np.zeros_like(p) for name, p in params.items()}
+        self.v = {name: np.zeros_like(p) for name, p in params.items()}
+
+    def step(self, params: dict[str, np.ndarray], grads: dict[str, np.ndarray]) -> None:
+        """Descend along `grads` (gradients of a loss to minimise)."""
+        self.t += 1
+        lr = self.lr * np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for name, grad in grads.items():
+            self.m[name] = self.beta1 * self.m[name] + (1 - self.beta1) * grad
+            self.v[name] = self.beta2 * self.v[name] + (1 - self.beta2) * grad * grad
+            params[name][...] -= (lr * self.m[name] / (np.sqrt(self.v[name]) + self.eps)).astype(params[name].dtype)
+
+
+def ppo_loss_grads(
+    policy: FantasyPolicy,
+    obs: np.ndarray,
+    masks: np.ndarray,
+    actions: np.ndarray,
+    old_log_probs: np.ndarray,
+    advantages: np.ndarray,
+    returns: np.ndarray,
+    clip: float = 0.2,
+    vf_coef: float = 0.5,
+    ent_coef: float = 0.01,
+) -> tuple[dict[str, np.ndarray], dict[str, float]]:
+    """Gradients of the clipped PPO loss on one minibatch, plus diagnostics.
+
+    loss = -mean(min(r·A, clip(r, 1±ε)·A)) + vf_coef · ½·mean((V − R)²) − ent_coef · mean(H)
+    """
+    n = len(actions)
+    rows = np.arange(n)
+    logits, cache = policy.forward_cached(obs)
+    values = cache["values"]
+    log_p = masked_log_softmax(logits, masks)
+    probs = np.exp(log_p)
+    safe_log_p = np.where(masks, log_p, 0.0)
+
+    new_log_probs = log_p[rows, actions]
+    ratio = np.exp(new_log_probs - old_log_probs)
+    surr1 = ratio * advantages
+    surr2 = np.clip(ratio, 1 - clip, 1 + clip) * advantages
+    # min() takes the unclipped branch → gradient flows; otherwise it's a constant
+    active = surr1 <= surr2
+    entropy = -(probs * safe_log_p).sum(axis=1)
+
+    d_log_prob = -(active * ratio * advantages) / n                    # d loss / d log π(a|s)
+    one_hot = np.zeros_like(probs)
+    one_hot[rows, actions] = 1.0
+    grad_logits = d_log_prob[:, None] * (one_hot - probs)
+    grad_logits += (ent_coef / n) * probs * (safe_log_p + entropy[:, None])
+    grad_values = vf_coef * (values - returns) / n
+
+    grads = policy.backward(cache, grad_logits.astype(np.float32), grad_values.astype(np.float32))
+    stats = {
+        "policy_loss": float(-np.minimum(surr1, surr2).mean()),
+        "value_loss": float(0.5 * ((values - returns) ** 2).mean()),
+        "entropy": float(entropy.mean()),
+        "approx_kl": float((old_log_probs - new_log_probs).mean()),
+        "clip_frac": float((np.abs(ratio - 1) > clip).mean()),
+    }
+    return grads, stats
+
+
+def _clip_grad_norm(grads: dict[str, np.ndarray], max_norm: float) -> None:
+    norm = np.sqrt(sum(float((g * g).sum()) for g in grads.values()))
+    if norm > max_norm:
+        for g in grads.values():
+            g *= max_norm / (norm + 1e-6)
+
+
+def ppo_update(
+    policy: FantasyPolicy,
+    optimizer: Adam,
+    buffers: list[RolloutBuffer],
+    gamma: float = 0.99,
+    gae_lambda: float = 0.95,
+    epochs: int = 4,
+    minibatch_size: int = 256,
+    clip: float = 0.2,
+    vf_coef: float = 0.5,
+    ent_coef: float = 0.01,
+    max_grad_norm: float = 0.5,
+    rng: np.random.Generator | None = None,
+) -> dict[str, float]:
+    """Run `epochs` passes of shuffled minibatch PPO updates over the buffers."""
+    rng = rng or np.random.default_rng()
+    adv_ret = [b.compute_gae(gamma, gae_lambda) for b in buffers]
+    obs = np.concatenate([b.obs.reshape(-1, b.obs.shape[2]) for b in buffers])
+    masks = np.concatenate([b.masks.reshape(-1, b.masks.shape[2]) for b in buffers])
+    actions = np.concatenate([b.actions.ravel() for b in buffers])
+    old_log_probs = np.concatenate([b.log_probs.ravel() for b in buffers])
+    advantages = np.concatenate([a.ravel() for a, _ in adv_ret])
+    returns = np.concatenate([r.ravel() for _, r in adv_ret])
+
+    params = policy.params()
+    totals: dict[str, float] = {}
+    n_batches = 0
+    for _ in range(epochs):
+        order = rng.permutation(len(actions))
+        for start in range(0, len(order), minibatch_size):
+            idx = order[start:start + minibatch_size]
+            adv = advantages[idx]
+            adv = (adv - adv.mean()) / (adv.std() + 1e-8)
+            grads, stats = ppo_loss_grads(
+                policy, obs[idx], masks[idx], actions[idx], old_log_probs[idx], adv, returns[idx],
+                clip=clip, vf_coef=vf_coef, ent_coef=ent_coef,
+            )
+            _clip_grad_norm(grads, max_grad_norm)
+            optimizer.step(params, grads)
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0.0) + value
+            n_batches += 1
+    return {key: value / max(n_batches, 1) for key, value in totals.items()}
+
+
+class RolloutWorker:
+    """One VecFantasyEnv whose episodes carry over between collect() calls.
+
+    With an episode store, each collect() instead starts every episode on a
+    newly sampled historical round; unfinished episodes are cut off and
+    bootstrapped from the value head like any rollout boundary.
+    """
+
+    def __init__(self, player_pool: np.ndarray | None, team_ids: np.ndarray | None, num_envs: int,
+                 seed: int | None = None, episodes: EpisodeStore | None = None):
+        self.env = VecFantasyEnv(num_envs, player_pool, team_ids, episodes=episodes, seed=seed)
+        self.obs, _ = self.env.reset()
+        self.running_returns = np.zeros(num_envs, dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+    def collect(self, policy: FantasyPolicy, n_steps: int) -> RolloutBuffer:
+        env = self.env
+        if env.episodes is not None:
+            self.obs, _ = env.reset()
+            self.running_returns[:] = 0.0
+        buf = RolloutBuffer(n_steps, env.num_envs, env.obs_dim, env.pool_size)
+        rows = np.arange(env.num_envs)
+        for t in range(n_steps):
+            masks = env.action_masks()
+            logits, cache = policy.forward_cached(self.obs)
+            log_p = masked_log_softmax(logits, masks)
+            # Gumbel-max sampling from the masked softmax
+            gumbel = -np.log(-np.log(self.rng.random(log_p.shape) + 1e-12) + 1e-12)
+            actions = np.argmax(np.where(masks, log_p + gumbel, -np.inf), axis=1)
+
+            buf.obs[t] = self.obs
+            buf.masks[t] = masks
+            buf.actions[t] = actions
+            buf.log_probs[t] = np.where(masks.any(axis=1), log_p[rows, actions], 0.0)
+            buf.values[t] = cache["values"]
+
+            self.obs, rewards, terminated, truncated, _ = env.step(actions)
+            done = terminated | truncated
+            buf.rewards[t] = rewards
+            buf.dones[t] = done
+            self.running_returns += rewards
+            buf.episode_returns.extend(self.running_returns[done].tolist())
+            self.running_returns[done] = 0.0
+
+        _, cache = policy.forward_cached(self.obs)
+        buf.last_values[:] = cache["values"]
+        return buf
+
+
+_worker: RolloutWorker | None = None
+
+
+def _init_worker(player_pool: np.ndarray | None, team_ids: np.ndarray | None, num_envs: int, seed: int | None,
+                 episodes: EpisodeStore | None = None) -> None:
+    global _worker
+    _worker = RolloutWorker(player_pool, team_ids, num_envs, None if seed is None else seed + os.getpid(), episodes)
+
+
+def _collect_in_worker(params: dict[str, np.ndarray], n_steps: int) -> RolloutBuffer:
+    return _worker.collect(FantasyPolicy.from_params(params), n_steps)
+
+
 def train(
-    episodes: int = 500,
-    lr: float = 0.001,
+    total_steps: int = 200_000,
+    num_envs: int = 16,
+    n_steps: int = 32,
+    workers: int = 0,
+    lr: float = 3e-4,
     gamma: float = 0.99,
+    gae_lambda: float = 0.95,
+    clip: float = 0.2,
+    epochs: int = 4,
+    minibatch_size: int = 256,
+    vf_coef: float = 0.5,
+    ent_coef: float = 0.01,
+    target_reward: float | None = None,
+    player_pool: np.ndarray | None = None,
+    team_ids: np.ndarray | None = None,
+    episodes: EpisodeStore | None = None,
+    policy: FantasyPolicy | None = None,
     output_path: str | None = None,
+    registry_path: str | None = None,
+    seed: int | None = None,
     verbose: bool = True,
 ) -> FantasyPolicy:
-    """Train the policy for N episodes."""
-    env = FantasyEnv()
-    policy = FantasyPolicy()
-
-    best_reward = -float("inf")
-    reward_history = []
-
-    for ep in range(episodes):
-        total_reward = train_one_episode(env, policy, lr=lr, gamma=gamma)
-        reward_history.append(total_reward)
+    """Train the policy with PPO for `total_steps` env steps.
 
-        if total_reward > best_reward:
-            best_reward = total_reward
-
-        if verbose and (ep + 1) % 50 == 0:
-            avg = np.mean(reward_history[-50:])
-            print(f"Episode {ep+1:4d} | Avg reward (last 50): {avg:.1f} | Best: {best_reward:.1f}")
+    workers=0 collects in-process; workers=N spreads collection over N
+    processes, each stepping `num_envs` episodes per iteration. With an
+    episode store, training replays its historical rounds instead of the
+    fixed player_pool (workers open the store by path and share its pages).
+    """
+    rng = np.random.default_rng(seed)
+    pool = teams = None
+    if episodes is None:
+        pool = player_pool if player_pool is not None else _generate_random_pool()
+        teams = team_ids if team_ids is not None else _generate_team_ids(len(pool))
+    policy = policy or FantasyPolicy(seed=seed)
+    optimizer = Adam(policy.params(), lr=lr)
+
+    executor = None
+    local_worker = None
+    if workers > 0:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                       initargs=(pool, teams, num_envs, seed, episodes))
+    else:
+        local_worker = RolloutWorker(pool, teams, num_envs, seed, episodes)
+
+    recent_returns: deque[float] = deque(maxlen=100)
+    env_steps = 0
+    iteration = 0
+    reached_at: tuple[float, int] | None = None
+    mean_return = float("nan")
+    start = time.perf_counter()
+    try:
+        while env_steps < total_steps:
+            iter_start = time.perf_counter()
+            if executor is not None:
+                params = {name: np.asarray(p) for name, p in policy.params().items()}
+                buffers = list(executor.map(_collect_in_worker, [params] * workers, [n_steps] * workers))
+            else:
+                buffers = [local_worker.collect(policy, n_steps)]
+            collect_time = time.perf_counter() - iter_start
+
+            stats = ppo_update(
+                policy, optimizer, buffers, gamma=gamma, gae_lambda=gae_lambda, epochs=epochs,
+                minibatch_size=minibatch_size, clip=clip, vf_coef=vf_coef, ent_coef=ent_coef, rng=rng,
+            )
+            iteration += 1
+            steps = sum(b.n_transitions for b in buffers)
+            env_steps += steps
+            for b in buffers:
+                recent_returns.extend(b.episode_returns)
+            elapsed = time.perf_counter() - start
+            mean_return = float(np.mean(recent_returns)) if recent_returns else float("nan")
+
+            if target_reward is not None and reached_at is None and mean_return >= target_reward:
+                reached_at = (elapsed, env_steps)
+                _log(verbose, f"Reached target reward {target_reward:.1f} after {elapsed:.1f}s ({env_steps} env steps)")
+
+            if iteration % 10 == 0 or env_steps >= total_steps:
+                _log(verbose,
+                     f"Iter {iteration:4d} | steps {env_steps:8d} | "
+                     f"{steps / (time.perf_counter() - iter_start):7.0f} steps/s "
+                     f"(collect {steps / collect_time:7.0f}) | return {mean_return:6.1f} | "
+                     f"pi {stats['policy_loss']:+.3f} v {stats['value_loss']:.2f} "
+                     f"H {stats['entropy']:.2f} kl {stats['approx_kl']:.4f}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    _log(verbose, f"Trained {env_steps} env steps in {elapsed:.1f}s ({env_steps / elapsed:.0f} steps/s)")
+    if target_reward is not None:
+        if reached_at is None:
+            _log(verbose, f"Target reward {target_reward:.1f} not reached (final mean return {mean_return:.1f})")
+        else:
+            _log(verbose, f"Time to target reward {target_reward:.1f}: {reached_at[0]:.1f}s, {reached_at[1]} env steps")
 
     if output_path:
         policy.save(output_path)
-        if verbose:
-            print(f"Saved policy to {output_path}")
+        _log(verbose, f"Saved policy to {output_path}")
+    if registry_path:
+        version = model_registry.publish(policy, registry_path, metadata={
+            "trainer": "ppo",
+            "env_steps": env_steps,
+            "train_seconds": round(elapsed, 1),
+            "mean_return": round(mean_return, 2),
+            "seed": seed,
+            "episodes": str(episodes.root) if episodes is not None else None,
+        })
+        _log(verbose, f"Published policy version {version} to {registry_path} (live)")
 
     return policy
 
 
+def _log(verbose: bool, message: str) -> None:
+    logger.info(message)
+    if verbose:
+        print(message)
+
+
 if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Train Fantasy PPO policy")
-    parser.add_argument("--episodes", type=int, default=500)
-    parser.add_argument("--lr", type=float, default=0.001)
+    parser.add_argument("--steps", type=int, default=200_000, help="total env steps")
+    parser.add_argument("--num-envs", type=int, default=16, help="episodes per worker")
+    parser.add_argument("--n-steps", type=int, default=32, help="rollout length per iteration")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="rollout processes (0 = collect in-process)")
+    parser.add_argument("--lr", type=float, default=3e-4)
+    parser.add_argument("--epochs", type=int, default=4)
+    parser.add_argument("--minibatch-size", type=int, default=256)
+    parser.add_argument("--target-reward", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--output", type=str, default="../../models/rl_executor.npz")
+    parser.add_argument("--registry", type=str, default=None,
+                        help="also publish to this model registry as the new live version")
+    parser.add_argument("--episodes", type=str, default=None,
+                        help="replay historical rounds from this episode store (scripts/collect_training_data.py)")
     args = parser.parse_args()
 
-    train(episodes=args.episodes, lr=args.lr, output_path=args.output)
+    train(
+        total_steps=args.steps, num_envs=args.num_envs, n_steps=args.n_steps, workers=args.workers,
+        lr=args.lr, epochs=args.epochs, minibatch_size=args.minibatch_size,
+        target_reward=args.target_reward, seed=args.seed, output_path=args.output,
+        registry_path=args.registry, episodes=EpisodeStore(args.episodes) if args.episodes else None,
+    )
@@ -0,0 +1,345 @@
+"""
+Multi-round transfer planner — beam search over rounds.
+
+Given expected points per player for each of the next K rounds, the
+planner searches transfer sequences under the transfers_service rules:
+
+- one free transfer per round (max_free_transfers is how many can be
+  banked; the game's default is 1, i.e. no banking)
+- −4 points for every transfer beyond the free ones
+- a one-off wildcard round with unlimited free transfers
+
+Each round, every beam state expands into a hold move, the best single
+swaps and the best pairs of swaps. Candidates are pruned per position to
+the top players by remaining-horizon points that fit the bank and the
+per-nation limit. A wildcard is one exact squad_optimizer call. All
+children of a round are scored together with one batched lineup solve
+(best formation plus armbands). The beam keeps the best states for each
+first-round choice: hold, one transfer, two transfers, or wildcard. That
+way one search returns the best 0-, 1- and 2-transfer plans side by side.
+
+The time budget is checked before every expensive step, not only before
+each state expands. Wildcard solves and the holding-value ranking start
+only if their expected cost still fits: costs start from priors and are
+replaced by measured times as the search runs. A wildcard solve stops at
+the deadline with the best squad it has found. Expansion stops early
+enough to leave time to score the round. Once the budget is spent, states
+are ranked by their squads' summed remaining points and completed with
+hold moves, every remaining round scored in one batched lineup solve. The
+plans are then flagged as not exhaustive.
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from app.rl.environment import MAX_PER_TEAM, SQUAD_SIZE
+from app.rl import lineup_optimizer  # module import: see app.rl.inference
+from app.rl.squad_optimizer import PRICE_UNIT, optimize_squad
+
+HIT_COST = 4.0
+CANDIDATE_POOL = 64       # incoming candidates considered per position
+WILDCARD_COST_S = 0.04    # prior for one wildcard solve on a full catalog, until one is timed
+SCORE_COST_S = 5e-6       # prior for scoring one child state in one round, until a round is timed
+WILDCARD = "wildcard"
+_WILDCARD_BUCKET = 3      # buckets 0/1/2 are first-round transfer counts
+
+
+class _Node:
+    __slots__ = ("squad", "bank", "free", "wildcard", "value", "steps", "bucket", "priority")
+
+    def __init__(self, squad, bank, free, wildcard, value, steps, bucket, priority=0.0):
+        self.squad = squad          # sorted (15,) pool indices
+        self.bank = bank            # integer £0.1m units
+        self.free = free            # free transfers available this round
+        self.wildcard = wildcard    # wildcard still available
+        self.value = value          # points so far, net of hits
+        self.steps = steps          # tuple of per-round step dicts
+        self.bucket = bucket        # first-round choice: 0, 1, 2 or _WILDCARD_BUCKET
+        self.priority = priority    # value + holding value to the end (beam ranking)
+
+
+def plan_transfers(
+    points: np.ndarray,
+    prices: np.ndarray,
+    positions: np.ndarray,
+    team_index: np.ndarray,
+    squad: list[int],
+    bank: float,
+    free_transfers: int = 1,
+    wildcard_available: bool = False,
+    max_transfers: int = 2,
+    max_free_transfers: int = 1,
+    beam_width: int = 8,
+    candidates_per_position: int = 10,
+    moves_per_state: int = 16,
+    time_budget_ms: float = 250.0,
+) -> list[dict]:
+    """Best transfer plans over the next K rounds.
+
+    points:  (n, K) expected points per player per round
+    squad:   the current 15 pool indices; bank in £m
+
+    Returns one plan per first-round choice (0, 1 or 2 transfers, or
+    "wildcard"), best first. Each plan holds expected_points (net of hits),
+    hits, exhaustive, final_squad, bank and per-round steps. Transfers in
+    the steps are (out, in) pool indices.
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    points = np.asarray(points, dtype=np.float64)
+    horizon = points.shape[1]
+    positions = np.asarray(positions, dtype=np.int64)
+    teams = np.asarray(team_index, dtype=np.int64)
+    costs = np.rint(np.asarray(prices, dtype=np.float64) / PRICE_UNIT).astype(np.int64)
+    max_transfers = max(0, min(max_transfers, 2))
+
+    # remaining[:, t] = points from round t to the end of the horizon
+    remaining = np.cumsum(points[:, ::-1], axis=1)[:, ::-1]
+    # Per round: (positions, CANDIDATE_POOL) best players of each position by
+    # remaining-horizon points (-1 padded); incoming transfers come from here
+    ranked = [_top_by_position(remaining[:, t], positions) for t in range(horizon)]
+    wildcard_cache: dict[tuple[int, int], np.ndarray | None] = {}
+    hold = np.full((1, 2), -1, dtype=np.int64)
+    wildcard_cost, score_cost = WILDCARD_COST_S, SCORE_COST_S
+
+    beam = [_Node(np.sort(np.asarray(squad, dtype=np.int64)), int(round(bank / PRICE_UNIT)),
+                  free_transfers, wildcard_available, 0.0, (), 0)]
+    exhaustive = True
+
+    for t in range(horizon):
+        if time.perf_counter() >= deadline:
+            exhaustive = False
+            beam = _hold_to_end(beam, t, points, positions)
+            break
+
+        # The wildcard is tried from the most promising holder in each bucket
+        wildcard_from: dict[int, int] = {}
+        for k, n in enumerate(beam):
+            if n.wildcard and (n.bucket not in wildcard_from or n.priority > beam[wildcard_from[n.bucket]].priority):
+                wildcard_from[n.bucket] = k
+
+        # Children of every state: (parent, squad, bank, outs, ins, wildcard) as stacked arrays
+        parents, squads, banks, outs, ins, wildcards = [], [], [], [], [], []
+        n_children = 0
+        for k, node in enumerate(beam):
+            # Leave time to score the children generated so far
+            expand = time.perf_counter() + score_cost * n_children < deadline
+            exhaustive &= expand
+            move_out, move_in = hold, hold
+            if expand:
+                o, i = _candidate_moves(node, t, remaining, ranked, positions, costs, teams,
+                                        max_transfers, candidates_per_position, moves_per_state)
+                move_out, move_in = np.vstack([hold, o]), np.vstack([hold, i])
+            child = np.repeat(node.squad[None, :], len(move_out), axis=0)
+            for col in range(2):
+                hit = child == move_out[:, col:col + 1]
+                child = np.where(hit, move_in[:, col:col + 1], child)
+            sold = np.where(move_out >= 0, costs[move_out], 0).sum(axis=1)
+            bought = np.where(move_in >= 0, costs[move_in], 0).sum(axis=1)
+            parents.append(np.full(len(child), k))
+            squads.append(np.sort(child, axis=1))
+            banks.append(node.bank + sold - bought)
+            outs.append(move_out)
+            ins.append(move_in)
+            wildcards.append(np.zeros(len(child), dtype=bool))
+            n_children += len(child)
+
+            if expand and wildcard_from.get(node.bucket) == k:
+                total = node.bank + int(costs[node.squad].sum())
+                if (t, total) not in wildcard_cache:
+                    started = time.perf_counter()
+                    if deadline - started < wildcard_cost:
+                        exhaustive = False      # no time left for the solve: skip the wildcard
+                        wildcard_cache[(t, total)] = None
+                    else:
+                        try:
+                            # Stopped by the deadline, the solve returns the best squad found so far
+                            solution = optimize_squad(remaining[:, t], costs * PRICE_UNIT, positions, teams,
+                                                      budget=total * PRICE_UNIT, deadline=deadline)
+                            exhaustive &= solution.optimal
+                            wildcard_cache[(t, total)] = np.sort(solution.indices)
+                        except ValueError:
+                            wildcard_cache[(t, total)] = None
+                        wildcard_cost = max(wildcard_cost, time.perf_counter() - started)
+                new_squad = wildcard_cache[(t, total)]
+                if new_squad is not None:
+                    parents.append(np.array([k]))
+                    squads.append(new_squad[None, :])
+                    banks.append(np.array([total - int(costs[new_squad].sum())]))
+                    outs.append(hold)
+                    ins.append(hold)
+                    wildcards.append(np.ones(1, dtype=bool))
+                    n_children += 1
+
+        parent = np.concatenate(parents)
+        squad_c = np.concatenate(squads)
+        bank_c = np.concatenate(banks)
+        out_c, in_c = np.concatenate(outs), np.concatenate(ins)
+        wildcard_c = np.concatenate(wildcards)
+
+        # Score the round for every child in one batched lineup solve
+        scoring = time.perf_counter()
+        scores = lineup_optimizer.solve_lineups(points[squad_c, t], positions[squad_c]).expected_points
+        free = np.array([n.free for n in beam])[parent]
+        n_moves = (out_c >= 0).sum(axis=1)
+        hits = np.where(wildcard_c, 0, np.maximum(0, n_moves - free))
+        free_next = np.minimum(max_free_transfers, np.where(wildcard_c, free, np.maximum(0, free - n_moves)) + 1)
+        wildcard_next = np.array([n.wildcard for n in beam])[parent] & ~wildcard_c
+        value = np.array([n.value for n in beam])[parent] + scores - HIT_COST * hits
+        if t == 0:
+            bucket = np.where(wildcard_c, _WILDCARD_BUCKET, n_moves)
+        else:
+            bucket = np.array([n.bucket for n in beam])[parent]
+
+        # Dedupe identical states (keep the best), then rank by value + holding to the end
+        order = np.argsort(-value, kind="stable")
+        keys = np.column_stack([bucket, free_next, wildcard_next, squad_c])[order]
+        _, first = np.unique(keys, axis=0, return_index=True)
+        kept = order[np.sort(first)]
+        started = time.perf_counter()
+        if t + 1 == horizon:
+            future = 0.0
+        elif started + score_cost * len(kept) * (horizon - t) < deadline:
+            future = _hold_scores(points[:, t + 1:], positions, squad_c[kept]).sum(axis=1)
+        else:
+            # No time for lineup solves: rank by the squads' summed remaining points
+            exhaustive = False
+            future = remaining[squad_c[kept], t + 1].sum(axis=1)
+        ranking = time.perf_counter() - started
+        priority = value[kept] + future
+        rank = np.argsort(-priority, kind="stable")
+        kept, priority = kept[rank], priority[rank]
+
+        new_beam = []
+        for b in np.unique(bucket[kept]):
+            in_bucket = bucket[kept] == b
+            for c, prio in zip(kept[in_bucket][:beam_width], priority[in_bucket][:beam_width]):
+                node = beam[parent[c]]
+                if wildcard_c[c]:
+                    transfers = _diff(node.squad, squad_c[c], positions)
+                else:
+                    transfers = [(int(o), int(i)) for o, i in zip(out_c[c], in_c[c]) if o >= 0]
+                step = {"round": t, "transfers": transfers, "wildcard": bool(wildcard_c[c]),
+                        "hits": int(hits[c]), "points": round(float(scores[c]), 2)}
+                new_beam.append(_Node(squad_c[c], int(bank_c[c]), int(free_next[c]), bool(wildcard_next[c]),
+                                      float(value[c]), node.steps + (step,), int(bucket[c]), float(prio)))
+        beam = new_beam
+        score_cost = (time.perf_counter() - scoring - ranking) / len(parent)
+
+    plans: dict[int, _Node] = {}
+    for node in beam:
+        if node.bucket not in plans or node.value > plans[node.bucket].value:
+            plans[node.bucket] = node
+    return [
+        {
+            "first_round": WILDCARD if node.bucket == _WILDCARD_BUCKET else node.bucket,
+            "expected_points": round(node.value, 2),
+            "hits": int(sum(s["hits"] for s in node.steps)),
+            "exhaustive": exhaustive,
+            "final_squad": node.squad.tolist(),
+            "bank": round(node.bank * PRICE_UNIT, 1),
+            "steps": list(node.steps),
+        }
+        for node in sorted(plans.values(), key=lambda n: -n.value)
+    ]
+
+
+def _top_by_position(value: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    table = np.full((positions.max() + 1, CANDIDATE_POOL), -1, dtype=np.int64)
+    for p in range(len(table)):
+        members = np.flatnonzero(positions == p)
+        best = members[np.argsort(-value[members], kind="stable")[:CANDIDATE_POOL]]
+        table[p, : len(best)] = best
+    return table
+
+
+def _diff(before: np.ndarray, after: np.ndarray, positions: np.ndarray) -> list[tuple[int, int]]:
+    """Squad change as (out, in) pairs, matched up by position."""
+    outs = np.setdiff1d(before, after)
+    ins = np.setdiff1d(after, before)
+    outs = outs[np.argsort(positions[outs], kind="stable")]
+    ins = ins[np.argsort(positions[ins], kind="stable")]
+    return [(int(o), int(i)) for o, i in zip(outs, ins)]
+
+
+def _hold_scores(points: np.ndarray, positions: np.ndarray, squads: np.ndarray) -> np.ndarray:
+    """(n_squads, rounds) best lineup score of each squad in each of the given rounds."""
+    n_squads, rounds = len(squads), points.shape[1]
+    flat = np.repeat(squads, rounds, axis=0)
+    round_idx = np.tile(np.arange(rounds), n_squads)
+    scores = lineup_optimizer.solve_lineups(points[flat, round_idx[:, None]], positions[flat]).expected_points
+    return np.nan_to_num(scores.reshape(n_squads, rounds), nan=0.0)
+
+
+def _hold_to_end(beam: list[_Node], t: int, points: np.ndarray, positions: np.ndarray) -> list[_Node]:
+    """Complete every state with hold moves from round t to the end of the horizon."""
+    scores = _hold_scores(points[:, t:], positions, np.stack([n.squad for n in beam]))
+    finished = []
+    for node, row in zip(beam, scores):
+        steps = tuple({"round": t + r, "transfers": [], "wildcard": False, "hits": 0,
+                       "points": round(float(p), 2)} for r, p in enumerate(row))
+        finished.append(_Node(node.squad, node.bank, node.free, node.wildcard, node.value + float(row.sum()),
+                              node.steps + steps, node.bucket, node.priority))
+    return finished
+
+
+def _candidate_moves(
+    node: _Node,
+    t: int,
+    remaining: np.ndarray,
+    ranked: list[np.ndarray],
+    positions: np.ndarray,
+    costs: np.ndarray,
+    teams: np.ndarray,
+    max_transfers: int,
+    per_position: int,
+    limit: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Best single and double swaps for a state, by remaining-horizon gain.
+
+    Returns (outs, ins), each (M, 2) pool indices with -1 for an unused slot.
+    """
+    none = np.empty((0, 2), dtype=np.int64)
+    if max_transfers == 0:
+        return none, none
+    squad = node.squad
+    value = remaining[:, t]
+    in_squad = np.zeros(len(value), dtype=bool)
+    in_squad[squad] = True
+    counts = np.bincount(teams[squad][teams[squad] >= 0], minlength=teams.max() + 1)
+
+    # (15, L) incoming candidates: the best L players of each outgoing player's position
+    cand = ranked[t][positions[squad]]
+    out_col = squad[:, None]
+    team_in, team_out = teams[cand], teams[out_col]
+    ok = (cand >= 0) & (value[cand] > value[out_col]) & ~in_squad[cand]
+    ok &= costs[cand] <= node.bank + costs[out_col]
+    ok &= (team_in < 0) | (team_in == team_out) | (counts[np.maximum(team_in, 0)] < MAX_PER_TEAM)
+    ok &= np.cumsum(ok, axis=1) <= per_position
+    rows, cols = np.nonzero(ok)
+    if not len(rows):
+        return none, none
+    gain = value[cand[rows, cols]] - value[squad[rows]]
+    out_, in_ = squad[rows], cand[rows, cols]
+    top = np.argsort(-gain, kind="stable")[:limit]
+    gain, out_, in_ = gain[top], out_[top], in_[top]
+    pad = np.full(len(top), -1)
+    single_out, single_in = np.column_stack([out_, pad]), np.column_stack([in_, pad])
+    if max_transfers < 2 or len(top) < 2:
+        return single_out, single_in
+
+    # All pairs of the top singles, checked together for budget and nations
+    a, b = np.triu_indices(len(top), k=1)
+    oa, ob, ia, ib = out_[a], out_[b], in_[a], in_[b]
+    ok = (oa != ob) & (ia != ib)
+    ok &= costs[ia] + costs[ib] <= node.bank + costs[oa] + costs[ob]
+    ta, tb, toa, tob = teams[ia], teams[ib], teams[oa], teams[ob]
+    for t_new, t_other in ((ta, tb), (tb, ta)):
+        after = counts[np.maximum(t_new, 0)] - (toa == t_new) - (tob == t_new) + 1 + (t_other == t_new)
+        ok &= (t_new < 0) | (after <= MAX_PER_TEAM)
+    pair_gain = np.where(ok, gain[a] + gain[b], -np.inf)
+    best = np.argsort(-pair_gain, kind="stable")[:limit]
+    best = best[np.isfinite(pair_gain[best])]
+    return (np.vstack([single_out, np.column_stack([oa[best], ob[best]])]),
+            np.vstack([single_in, np.column_stack([ia[best], ib[best]])]))
@@ -0,0 +1,199 @@
+"""
+Vectorised Fantasy environment — N squad-building episodes in lock-step.
+
+VecFantasyEnv holds N independent episodes over one shared player pool as
+stacked arrays (budgets, picked flags, per-position and per-team counts,
+availability masks). step() advances every episode with one vectorised
+call and auto-resets the ones that finished, following the Gymnasium
+vector-env convention: the returned observation for a finished episode is
+already the first observation of its next episode.
+
+Rewards and termination match FantasyEnv exactly, so a policy trained here
+runs unchanged on the single env used for inference.
+
+auto_reset=False leaves finished episodes as they are, for callers that
+read the final squads (beam search).
+
+In replay mode (episodes=EpisodeStore) the N episodes share one historical
+round, and auto-resets stay on it; reset() moves them all to a newly
+sampled round.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from app.rl.episode_store import EpisodeStore
+from app.rl.environment import (
+    FEATURE_DIM,
+    INITIAL_BUDGET,
+    IDX_TO_POS,
+    MAX_PER_TEAM,
+    MAX_PLAYERS,
+    POSITION_LIMITS,
+    POS_TO_IDX,
+    SQUAD_SIZE,
+    _generate_random_pool,
+    _generate_team_ids,
+)
+
+OBS_DIM = MAX_PLAYERS * FEATURE_DIM + 6  # for pools of up to MAX_PLAYERS; see .obs_dim
+
+
+class VecFantasyEnv:
+    """N FantasyEnv episodes sharing one player pool, stepped together."""
+
+    def __init__(
+        self,
+        num_envs: int,
+        player_pool: np.ndarray | None = None,
+        team_ids: np.ndarray | None = None,
+        budget: float = INITIAL_BUDGET,
+        episodes: EpisodeStore | None = None,
+        seed: int | None = None,
+        auto_reset: bool = True,
+    ):
+        self.num_envs = num_envs
+        self.initial_budget = budget
+        self.auto_reset = auto_reset
+        self.episodes = episodes
+        self.round_index: int | None = None
+        self.rng = np.random.default_rng(seed)
+        realised = None
+        if episodes is not None:
+            pool, teams, realised = episodes.round(0)
+            self.pool_size = max(episodes.max_round_size, MAX_PLAYERS)
+        else:
+            pool = player_pool if player_pool is not None else _generate_random_pool()
+            teams = team_ids if team_ids is not None else _generate_team_ids(len(pool))
+            self.pool_size = max(len(pool), MAX_PLAYERS)
+        self.obs_dim = self.pool_size * FEATURE_DIM + 6
+        self._pos_limits = np.array([POSITION_LIMITS[IDX_TO_POS[i]] for i in range(len(POS_TO_IDX))])
+
+        n = num_envs
+        self._obs = np.empty((n, self.obs_dim), dtype=np.float32)
+        self.budget_remaining = np.full(n, budget, dtype=np.float64)
+        self.squad_size = np.zeros(n, dtype=np.int64)
+        self.squads = np.full((n, SQUAD_SIZE), -1, dtype=np.int64)
+        self._picked = np.zeros((n, self.pool_size), dtype=bool)
+        self._available = np.zeros((n, self.pool_size), dtype=bool)
+        self._pos_counts = np.zeros((n, len(POS_TO_IDX)), dtype=np.int64)
+        self._load_pool(pool, teams, realised)
+
+    def _load_pool(self, pool: np.ndarray, teams: np.ndarray, realised_points: np.ndarray | None = None) -> None:
+        """Set up the shared static arrays; episodes must be reset afterwards."""
+        self.n_players = len(pool)
+        self.player_pool = np.zeros((self.pool_size, FEATURE_DIM), dtype=np.float32)
+        self.player_pool[: self.n_players] = pool
+        self.team_ids = np.full(self.pool_size, -1, dtype=np.int64)
+        self.team_ids[: self.n_players] = np.asarray(teams, dtype=np.int64)
+
+        pos = self.player_pool[:, 0].astype(np.int64)
+        self._positions = np.where((pos >= 0) & (pos < len(POS_TO_IDX)), pos, POS_TO_IDX["MID"])
+        self._prices = self.player_pool[:, 1].astype(np.float64)
+        self._points = self.player_pool[:, 2].astype(np.float64)
+        self._reward_points = self._points
+        if realised_points is not None:
+            self._reward_points = np.zeros(self.pool_size)
+            self._reward_points[: self.n_players] = realised_points
+        self._in_pool = np.arange(self.pool_size) < self.n_players
+        self._team_values, codes = np.unique(self.team_ids, return_inverse=True)
+        self._team_codes = codes.reshape(-1)
+        self._team_limited = self._team_values >= 0
+        self._team_counts = np.zeros((self.num_envs, len(self._team_values)), dtype=np.int64)
+        self._obs[:, : self.pool_size * FEATURE_DIM] = self.player_pool.ravel()
+
+    def _reset_envs(self, envs: np.ndarray) -> None:
+        self.budget_remaining[envs] = self.initial_budget
+        self.squad_size[envs] = 0
+        self.squads[envs] = -1
+        self._picked[envs] = False
+        self._available[envs] = self._in_pool
+        self._pos_counts[envs] = 0
+        self._team_counts[envs] = 0
+
+    def reset(self, seed: int | None = None, round_index: int | None = None) -> tuple[np.ndarray, dict]:
+        """Restart every episode; in replay mode on round_index or a newly sampled round."""
+        info = {}
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        if self.episodes is not None:
+            r = self.episodes.sample(self.rng) if round_index is None else round_index
+            self._load_pool(*self.episodes.round(r))
+            self.round_index = r
+            info["round"] = self.episodes.labels[r]
+        self._reset_envs(np.arange(self.num_envs))
+        return self._get_obs(), info
+
+    def select(self, rows: np.ndarray) -> None:
+        """Keep episodes `rows` (repeats allowed), in that order; num_envs becomes len(rows).
+
+        Used by beam search to branch partial squads: a row that appears
+        twice continues as two independent episodes.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self.num_envs = len(rows)
+        for name in ("budget_remaining", "squad_size", "squads", "_picked", "_available",
+                     "_pos_counts", "_team_counts", "_obs"):
+            setattr(self, name, getattr(self, name)[rows])
+
+    def action_masks(self) -> np.ndarray:
+        """(num_envs, pool_size) boolean mask of valid picks."""
+        return self._available & (self._prices[None, :] <= self.budget_remaining[:, None])
+
+    def step(self, actions: np.ndarray):
+        """Apply one pick per episode.
+
+        Returns (obs, rewards, terminated, truncated, infos) where infos holds
+        per-env arrays: invalid_pick, squad_points (NaN unless the squad
+        completed) and incomplete_squad.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        envs = np.arange(self.num_envs)
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+
+        valid = self._available[envs, actions] & (self._prices[actions] <= self.budget_remaining)
+        rewards[~valid] = -1.0
+
+        e, a = envs[valid], actions[valid]
+        if len(e):
+            self._picked[e, a] = True
+            self._available[e, a] = False
+            self.budget_remaining[e] -= self.player_pool[a, 1]
+            self.squads[e, self.squad_size[e]] = a
+            self.squad_size[e] += 1
+            rewards[e] = self._points[a] * 0.1
+
+            pos = self._positions[a]
+            self._pos_counts[e, pos] += 1
+            full = self._pos_counts[e, pos] >= self._pos_limits[pos]
+            if full.any():
+                self._available[e[full]] &= self._positions[None, :] != pos[full][:, None]
+
+            team = self._team_codes[a]
+            self._team_counts[e, team] += 1
+            full = self._team_limited[team] & (self._team_counts[e, team] >= MAX_PER_TEAM)
+            if full.any():
+                self._available[e[full]] &= self._team_codes[None, :] != team[full][:, None]
+
+        squad_points = np.full(self.num_envs, np.nan)
+        complete = self.squad_size >= SQUAD_SIZE
+        if complete.any():
+            squad_points[complete] = (self._picked[complete] * self._reward_points).sum(axis=1)
+            rewards[complete] += squad_points[complete]
+
+        stuck = ~complete & ~self.action_masks().any(axis=1)
+        rewards[stuck] -= 10.0 * (SQUAD_SIZE - self.squad_size[stuck])
+
+        terminated = complete | stuck
+        infos = {"invalid_pick": ~valid, "squad_points": squad_points, "incomplete_squad": stuck}
+        if self.auto_reset and terminated.any():
+            self._reset_envs(envs[terminated])
+        return self._get_obs(), rewards, terminated, np.zeros(self.num_envs, dtype=bool), infos
+
+    def _get_obs(self) -> np.ndarray:
+        """Refresh the state slots of the (reused) observation buffer."""
+        tail = self._obs[:, self.pool_size * FEATURE_DIM:]
+        tail[:, 0] = self.budget_remaining
+        tail[:, 1:5] = self._pos_counts
+        tail[:, 5] = self.squad_size
+        return self._obs
@@ -1,10 +1,17 @@
+import json
+
 from fastapi import APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import SessionLocal, get_db
 from app.deps.auth_deps import get_current_user
 from app.integrations.memory_client import get_episode_count
+from app.integrations.ollama_client import get_ollama_client
+from app.integrations.planner import tot_cache_stats
+from app.rl import inference
 from app.schemas.ai_schemas import (
     AIRecommendation,
     LineupRequest,
@@ -24,6 +31,26 @@ async def squad_builder(payload: SquadBuilderRequest, db: Session = Depends(get_
     return AIRecommendation(explanation=data.get("explanation", ""), data=data)
 
 
+@router.post("/squad-builder/stream")
+async def squad_builder_stream(payload: SquadBuilderRequest, user=Depends(get_current_user)):
+    """Server-sent events version of /squad-builder: each ToT branch is pushed as soon as it is generated."""
+
+    async def events():
+        # Request-scoped sessions are closed before a streamed body is sent, so the stream opens its own
+        db = SessionLocal()
+        try:
+            async for event, data in ai_coach_service.stream_squad(db, payload):
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/lineup", response_model=AIRecommendation)
 async def lineup(payload: LineupRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
     data = await ai_coach_service.suggest_lineup(db, payload)
@@ -47,8 +74,13 @@ async def agent_status(user=Depends(get_current_user)):
     """Return the current status of AI subsystems."""
     return {
         "rl_executor": "ready",
+        "rl_model": inference.get_model_registry().status(),
         "planner": "stub",  # becomes "ready" when Ollama is running
         "episodic_memory_count": get_episode_count(),
+        "rl_batching": inference.get_batch_scheduler().stats(),
+        "compute_pool": inference.get_compute_pool().stats(),
+        "tot_cache": tot_cache_stats(),
+        "ollama": get_ollama_client().stats(),
     }
 
 
@@ -1,15 +1,19 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.db import get_db
 from app.models.player import Player
-from app.schemas.player_schemas import PlayerResponse
-from app.services.feature_service import get_player_form
+from app.schemas.player_schemas import PlayerOwnershipResponse, PlayerResponse
+from app.services.feature_service import get_player_form, get_players_form_batch
+from app.services.ownership_service import get_ownership
 
 router = APIRouter()
 
+# Upper bound on ids per batched request (keeps the IN lists reasonable)
+MAX_BATCH_IDS = 500
+
 
 def _player_to_response(p: Player) -> dict:
     return {
@@ -45,6 +49,32 @@ def list_players(
     return [_player_to_response(p) for p in players]
 
 
+def _parse_ids(ids: str) -> List[str]:
+    player_ids = list(dict.fromkeys(pid for pid in ids.split(",") if pid))
+    if len(player_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return player_ids
+
+
+@router.get("/form")
+def players_form(
+    ids: str = Query(..., description="Comma-separated player IDs"),
+    db: Session = Depends(get_db),
+):
+    """Batched form snapshots keyed by player ID — same shape as /{player_id}/form."""
+    return get_players_form_batch(_parse_ids(ids), db)
+
+
+@router.get("/ownership", response_model=List[PlayerOwnershipResponse])
+def player_ownership(
+    ids: str = Query(..., description="Comma-separated player IDs"),
+    league_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Selected-by / captained-by percentages, globally or within one league."""
+    return get_ownership(db, _parse_ids(ids), league_id=league_id)
+
+
 @router.get("/{player_id}", response_model=PlayerResponse)
 def player_detail(player_id: str, db: Session = Depends(get_db)):
     return db.get(Player, player_id)
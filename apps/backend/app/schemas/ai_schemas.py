@@ -8,12 +8,15 @@ class SquadBuilderRequest(BaseModel):
     budget: float
     preferred_formation: str
     risk_profile: str
+    locked_player_ids: List[str] = []
+    excluded_player_ids: List[str] = []
 
 
 class LineupRequest(BaseModel):
     league_id: str
     squad_id: str
     round_id: str
+    risk_profile: str = "balanced"
 
 
 class TransferSuggestionRequest(BaseModel):
@@ -22,6 +25,7 @@ class TransferSuggestionRequest(BaseModel):
     round_id: str
     budget: Optional[float] = None
     max_transfers: int = 3
+    risk_profile: str = "balanced"
 
 
 class QARequest(BaseModel):
@@ -12,3 +12,11 @@ class PlayerResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class PlayerOwnershipResponse(BaseModel):
+    player_id: str
+    owners: int
+    captains: int
+    selected_by_pct: float
+    captained_by_pct: float
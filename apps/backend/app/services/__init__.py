@@ -2,6 +2,7 @@ from app.services import (
     ai_coach_service,
     auth_service,
     league_service,
+    ownership_service,
     scoring_service,
     squad_service,
     stats_service,
@@ -13,6 +14,7 @@ __all__ = [
     "ai_coach_service",
     "auth_service",
     "league_service",
+    "ownership_service",
     "scoring_service",
     "squad_service",
     "stats_service",
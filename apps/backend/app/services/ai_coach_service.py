@@ -2,12 +2,18 @@
 AI Coach service — orchestrates the RL executor, ToT planner, and
 episodic memory to provide squad, lineup, transfer, and Q&A recommendations.
 """
+import asyncio
+from typing import AsyncIterator
+
+import numpy as np
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.integrations.memory_client import query_lessons
-from app.integrations.planner import answer_question, generate_tot_branches
-from app.models.player import Player
-from app.rl.inference import suggest_lineup_rl, suggest_squad_rl
+from app.integrations.planner import answer_question, generate_tot_branches, stream_tot_branches
+# Module imports (not names): app.rl imports app.services, so either side may load first
+from app.rl import inference, player_pool
+from app.rl.compute_pool import ComputePoolFull, ComputeTimeout
 from app.schemas.ai_schemas import (
     LineupRequest,
     QARequest,
@@ -16,83 +22,238 @@ from app.schemas.ai_schemas import (
 )
 
 
-def _build_player_context(db: Session, limit: int = 50) -> str:
-    """Build a text summary of top players for the planner prompt."""
-    players = db.query(Player).filter(Player.is_active == True).limit(limit).all()  # noqa: E712
+async def _offload(fn, *args, **kwargs):
+    """Run a CPU-heavy inference call on the compute pool, off the event loop.
+
+    fn gets a session of its own from the pool, never the request's.
+    """
+    try:
+        return await inference.get_compute_pool().run(fn, *args, **kwargs)
+    except ComputePoolFull as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+    except ComputeTimeout as exc:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc))
+
+
+def _build_player_context(pool: player_pool.PlayerPool, limit: int = 50) -> str:
+    """Build a text summary of the in-form players for the planner prompt."""
+    n = pool.n_players
+    top = np.argsort(-pool.features[:n, 7], kind="stable")[:limit]  # by form
     lines = []
-    for p in players:
-        lines.append(f"{p.id[:8]} | {p.name:25s} | {p.position:3s} | £{float(p.price):.1f}m | {p.team_id[:8]}")
+    for i in top:
+        lines.append(
+            f"{pool.player_ids[i][:8]} | {pool.names[i]:25s} | {pool.positions[i]:3s} | "
+            f"£{float(pool.features[i, 1]):.1f}m | {pool.team_ids[i][:8]}"
+        )
     return "\n".join(lines)
 
 
-async def suggest_squad(db: Session, payload: SquadBuilderRequest):
-    """Suggest a full 15-player squad using RL + ToT planner."""
-    # 1. RL executor picks the squad
-    rl_result = suggest_squad_rl(db, budget=payload.budget)
+def _planner_context(db: Session) -> tuple[str, str]:
+    """Player-context prompt and data version for the ToT planner.
+
+    Runs on the compute pool: after a stats/catalog version bump the pool
+    lookup rebuilds the whole catalog pool.
+    """
+    pool = player_pool.get_player_pool(db)
+    return _build_player_context(pool), pool.version
 
-    # 2. ToT planner generates strategy branches
-    player_context = _build_player_context(db)
-    branches = await generate_tot_branches(
+
+async def _tot_branches(squad_context: str) -> list[dict]:
+    player_context, data_version = await _offload(_planner_context)
+    return await generate_tot_branches(
         player_context=player_context,
-        squad_context=f"Budget: £{payload.budget}m, Formation: {payload.preferred_formation}",
+        squad_context=squad_context,
+        data_version=data_version,
+    )
+
+
+async def _past_lessons(query: str, decision_type: str) -> list[str]:
+    """Episodic-memory lookup; ChromaDB is blocking, so it runs on a thread."""
+    lessons = await asyncio.to_thread(query_lessons, query, n_results=3, decision_type=decision_type)
+    return [l["lesson"] for l in lessons] if lessons else []
+
+
+async def _squad_candidates(db: Session, payload: SquadBuilderRequest) -> tuple[dict, dict, list[dict]]:
+    """RL squad, optimal squad and beam-search alternatives, each with a round outlook.
+
+    Only the RL executor uses the request's session. The optimizer and beam
+    search run together on the compute pool, with sessions of their own.
+    The round outlooks need every squad, so they run once both are done.
+    """
+    # Warm the player-pool cache on a thread, so the RL executor's lookup on the loop is a cache hit
+    await asyncio.to_thread(player_pool.get_player_pool, db)
+    # RL executor samples a squad; the exact optimizer gives the deterministic best
+    rl_result = await inference.suggest_squad_rl_batched(db, budget=payload.budget)
+
+    async def optimal_squad():
+        try:
+            return await _offload(
+                inference.suggest_squad_optimal,
+                budget=payload.budget,
+                locked_player_ids=payload.locked_player_ids,
+                excluded_player_ids=payload.excluded_player_ids,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    optimal, alternatives = await asyncio.gather(
+        optimal_squad(),
+        # Alternative squads for the ToT branches: policy beam search, diverse by construction
+        _offload(inference.suggest_squads_beam, budget=payload.budget),
     )
+    # Simulated next round of every squad, armbands set for the risk profile
+    squads = [rl_result, optimal, *alternatives]
+    outlooks = await _offload(inference.round_outlooks, [s["player_ids"] for s in squads], payload.risk_profile)
+    for squad, outlook in zip(squads, outlooks):
+        squad["round_outlook"] = outlook
+    return rl_result, optimal, alternatives
+
 
-    # 3. Query episodic memory for relevant lessons
-    lessons = query_lessons(
-        f"squad building {payload.preferred_formation} {payload.risk_profile}",
-        n_results=3,
-        decision_type="lineup",
+async def suggest_squad(db: Session, payload: SquadBuilderRequest):
+    """Suggest a full 15-player squad using RL + ToT planner.
+
+    The RL squads, the ToT planner and the episodic-memory lookup do not
+    depend on each other, so they run concurrently and the request takes
+    about as long as the slowest of them.
+    """
+    (rl_result, optimal, alternatives), branches, lessons = await asyncio.gather(
+        # 1. RL executor and optimizer squads
+        _squad_candidates(db, payload),
+        # 2. ToT planner generates strategy branches
+        _tot_branches(f"Budget: £{payload.budget}m, Formation: {payload.preferred_formation}"),
+        # 3. Query episodic memory for relevant lessons
+        _past_lessons(f"squad building {payload.preferred_formation} {payload.risk_profile}", "lineup"),
     )
 
     return {
         "explanation": rl_result.get("explanation", "Squad selected by AI."),
         "data": branches,
         "rl_squad": rl_result,
-        "past_lessons": [l["lesson"] for l in lessons] if lessons else [],
+        "optimal_squad": optimal,
+        "alternative_squads": alternatives,
+        "past_lessons": lessons,
     }
 
 
+async def stream_squad(db: Session, payload: SquadBuilderRequest) -> AsyncIterator[tuple[str, dict]]:
+    """Streaming variant of suggest_squad, yielding (event, data) pairs as results arrive.
+
+    Each ToT branch is sent as a "branch" event as soon as the planner has
+    parsed it from the token stream. The RL squads ("squads") and past
+    lessons ("lessons") follow whenever their stages finish. A stage that
+    fails with an HTTPException sends an "error" event, and "done" closes
+    the stream.
+    """
+    events: asyncio.Queue[tuple[str, dict] | None] = asyncio.Queue()
+
+    async def branches():
+        player_context, data_version = await _offload(_planner_context)
+        index = 0
+        async for branch in stream_tot_branches(
+            player_context=player_context,
+            squad_context=f"Budget: £{payload.budget}m, Formation: {payload.preferred_formation}",
+            data_version=data_version,
+        ):
+            await events.put(("branch", {"index": index, "branch": branch}))
+            index += 1
+
+    async def squads():
+        rl_result, optimal, alternatives = await _squad_candidates(db, payload)
+        await events.put(("squads", {
+            "explanation": rl_result.get("explanation", "Squad selected by AI."),
+            "rl_squad": rl_result,
+            "optimal_squad": optimal,
+            "alternative_squads": alternatives,
+        }))
+
+    async def lessons():
+        lessons = await _past_lessons(f"squad building {payload.preferred_formation} {payload.risk_profile}", "lineup")
+        await events.put(("lessons", {"past_lessons": lessons}))
+
+    async def run(stage):
+        try:
+            await stage()
+        except HTTPException as exc:
+            await events.put(("error", {"status_code": exc.status_code, "detail": exc.detail}))
+        finally:
+            await events.put(None)      # one end marker per stage
+
+    tasks = [asyncio.create_task(run(stage)) for stage in (branches, squads, lessons)]
+    try:
+        running = len(tasks)
+        while running:
+            event = await events.get()
+            if event is None:
+                running -= 1
+            else:
+                yield event
+        for task in tasks:
+            task.result()               # re-raise unexpected failures
+        yield "done", {}
+    finally:
+        # The client may disconnect mid-stream: stop whatever is still running
+        for task in tasks:
+            task.cancel()
+
+
 async def suggest_lineup(db: Session, payload: LineupRequest):
     """Suggest a starting XI from an existing squad."""
-    # Get squad player IDs
+    result = await _offload(_lineup_for_squad, payload.squad_id, payload.risk_profile)
+    if result is None:
+        return {"explanation": "Squad not found.", "data": None}
+
+    return {
+        "explanation": result.get("explanation", "Lineup optimized."),
+        "data": result,
+    }
+
+
+def _lineup_for_squad(db: Session, squad_id: str, risk_profile: str) -> dict | None:
+    """Squad lookup and lineup optimisation in one compute-pool task; None if the squad is missing."""
     from app.models.squad import Squad
     squad = db.query(Squad).filter(
-        Squad.id == payload.squad_id,
+        Squad.id == squad_id,
     ).first()
 
     if not squad:
-        return {"explanation": "Squad not found.", "data": None}
+        return None
 
     player_ids = [sp.player_id for sp in squad.players]
-    result = suggest_lineup_rl(db, player_ids)
-
-    return {
-        "explanation": result.get("explanation", "Lineup optimized."),
-        "data": result,
-    }
+    return inference.suggest_lineup_rl(db, player_ids, risk_profile=risk_profile)
 
 
 async def suggest_transfers(db: Session, payload: TransferSuggestionRequest):
-    """Suggest transfers based on current squad and available players."""
-    player_context = _build_player_context(db)
-    branches = await generate_tot_branches(
-        player_context=player_context,
-        squad_context=f"Squad: {payload.squad_id}, Max transfers: {payload.max_transfers}",
-    )
+    """Suggest transfers based on current squad and available players.
 
-    lessons = query_lessons(
-        "transfer strategy round",
-        n_results=3,
-        decision_type="transfer",
+    Planner, transfer search and memory lookup run concurrently, as in suggest_squad.
+    """
+    plans, branches, lessons = await asyncio.gather(
+        _transfer_plans(db, payload),
+        _tot_branches(f"Squad: {payload.squad_id}, Max transfers: {payload.max_transfers}"),
+        _past_lessons("transfer strategy round", "transfer"),
     )
 
     return {
-        "explanation": "Transfer suggestions generated.",
+        "explanation": plans["explanation"],
         "data": branches,
-        "past_lessons": [l["lesson"] for l in lessons] if lessons else [],
+        "transfer_plans": plans["plans"],
+        "past_lessons": lessons,
     }
 
 
+async def _transfer_plans(db: Session, payload: TransferSuggestionRequest) -> dict:
+    try:
+        return await _offload(
+            inference.suggest_transfer_plans,
+            payload.squad_id,
+            max_transfers=min(payload.max_transfers, 2),
+            bank=payload.budget,
+            risk_profile=payload.risk_profile,
+        )
+    except ValueError as exc:
+        return {"plans": [], "explanation": str(exc)}
+
+
 async def answer_rules(payload: QARequest):
     """Answer a rules or strategy question."""
     answer = await answer_question(payload.question)
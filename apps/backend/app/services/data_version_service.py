@@ -0,0 +1,48 @@
+"""
+Data version service — cheap watermarks for in-process caches.
+
+Each data domain has an opaque token in the data_versions table:
+  - "stats":   match results and player match stats
+  - "catalog": teams, players and prices
+
+Writers call bump_version() in the same transaction as their change.
+Readers fetch the token with a primary-key lookup and compare it with the
+token their cache was built from. Tokens are random rather than counters so
+caches can never confuse two databases that happen to share a number.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+
+STATS = "stats"
+CATALOG = "catalog"
+
+
+def current_version(db: Session, key: str = STATS) -> str:
+    """Return the current token for `key`, creating it if missing."""
+    row = db.get(DataVersion, key)
+    if row is None:
+        row = DataVersion(key=key, token=uuid.uuid4().hex)
+        db.add(row)
+        db.flush()
+    return row.token
+
+
+def current_versions(db: Session, *keys: str) -> str:
+    """Combined token for several domains, e.g. current_versions(db, STATS, CATALOG)."""
+    return ":".join(current_version(db, key) for key in keys)
+
+
+def bump_version(db: Session, key: str = STATS) -> str:
+    """Mark `key` as changed. Takes effect for readers once the caller commits."""
+    row = db.get(DataVersion, key)
+    if row is None:
+        row = DataVersion(key=key)
+        db.add(row)
+    row.token = uuid.uuid4().hex
+    row.updated_at = datetime.utcnow()
+    db.flush()
+    return row.token
@@ -5,16 +5,213 @@ Computes a 1–5 difficulty rating for an upcoming match based on the
 opponent's offensive/defensive record in the tournament so far.
 
 1 = very easy, 5 = very hard.
+
+Team strengths (goals for/against per finished match) are recomputed once
+per finished match by refresh_team_strengths() and persisted in
+team_strengths. From them a FixtureDifficultyMatrix — every team × its next
+FDR_HORIZON fixtures — is built once per data version and held in-process,
+so FDR lookups are array indexing rather than aggregate queries.
 """
+import threading
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import func, or_
+import numpy as np
+from sqlalchemy import func, union_all
 from sqlalchemy.orm import Session
 
 from app.models.match import Match, MatchStatus
 from app.models.player import Player
-from app.models.player_match_stats import PlayerMatchStats
+from app.models.team_strength import TeamStrength
+from app.services.data_version_service import CATALOG, STATS, current_versions
+
+# Upcoming fixtures held per team in the difficulty matrix
+FDR_HORIZON = 8
+
+# Opponent goals-per-match thresholds for FDR 2, 3, 4, 5
+_GPM_THRESHOLDS = np.array([0.5, 1.0, 1.8, 2.5])
+_UNKNOWN_FDR = 3  # Unknown opponent — medium difficulty
+
+
+def _fdr_from_goals_per_match(goals_per_match: float) -> int:
+    """Map an opponent's goals-per-match to FDR 1–5."""
+    return int(np.digitize(goals_per_match, _GPM_THRESHOLDS)) + 1
+
+
+def _aggregate_strengths(db: Session) -> list[tuple[str, int, int, int]]:
+    """(team_id, matches_played, goals_for, goals_against) for every team, in one query."""
+    finished = Match.status == MatchStatus.FINISHED
+    appearances = union_all(
+        db.query(
+            Match.home_team_id.label("team_id"),
+            Match.home_score.label("goals_for"),
+            Match.away_score.label("goals_against"),
+        ).filter(finished),
+        db.query(
+            Match.away_team_id.label("team_id"),
+            Match.away_score.label("goals_for"),
+            Match.home_score.label("goals_against"),
+        ).filter(finished),
+    ).subquery()
+    rows = (
+        db.query(
+            appearances.c.team_id,
+            func.count(appearances.c.team_id),
+            func.coalesce(func.sum(appearances.c.goals_for), 0),
+            func.coalesce(func.sum(appearances.c.goals_against), 0),
+        )
+        .group_by(appearances.c.team_id)
+        .all()
+    )
+    return [(team_id, int(mp), int(gf), int(ga)) for team_id, mp, gf, ga in rows]
+
+
+def refresh_team_strengths(db: Session) -> int:
+    """Recompute and persist every team's strength. Call once per finished match.
+
+    Does not commit or bump the data version — the caller does both as part
+    of the transaction that settled the match. Returns the number of teams.
+    """
+    existing = {row.team_id: row for row in db.query(TeamStrength).all()}
+    now = datetime.utcnow()
+    rows = _aggregate_strengths(db)
+    for team_id, mp, gf, ga in rows:
+        row = existing.get(team_id)
+        if row is None:
+            row = TeamStrength(team_id=team_id)
+            db.add(row)
+        row.matches_played = mp
+        row.goals_for = gf
+        row.goals_against = ga
+        row.attack = gf / mp if mp else 0.0
+        row.defence = ga / mp if mp else 0.0
+        row.updated_at = now
+    db.flush()
+    return len(rows)
+
+
+class FixtureDifficultyMatrix:
+    """Team strengths and team × next-N-fixtures FDR, as NumPy arrays.
+
+    Row t describes team_ids[t]: its attack/defence rates, the FDR other
+    teams face when playing it, and its next fixtures (opponent index,
+    kickoff, home flag, FDR), padded with -1 / NaT / 0.
+    """
+
+    def __init__(
+        self,
+        strengths: list[tuple[str, int, int, int]],
+        fixtures: list[tuple[str, str, datetime]],
+        horizon: int = FDR_HORIZON,
+    ):
+        team_ids = list(dict.fromkeys(
+            [s[0] for s in strengths] + [t for f in fixtures for t in f[:2]]
+        ))
+        self.team_ids = team_ids
+        self.team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+        n_teams = len(team_ids)
+
+        self.matches_played = np.zeros(n_teams, dtype=np.int32)
+        self.attack = np.full(n_teams, np.nan, dtype=np.float32)
+        self.defence = np.full(n_teams, np.nan, dtype=np.float32)
+        for team_id, mp, gf, ga in strengths:
+            i = self.team_index[team_id]
+            if mp:
+                self.matches_played[i] = mp
+                self.attack[i] = gf / mp
+                self.defence[i] = ga / mp
+
+        # FDR for facing each team — driven by that team's attack
+        self.opponent_fdr = np.full(n_teams, _UNKNOWN_FDR, dtype=np.int8)
+        known = self.matches_played > 0
+        self.opponent_fdr[known] = np.digitize(self.attack[known], _GPM_THRESHOLDS) + 1
+
+        self.opponents = np.full((n_teams, horizon), -1, dtype=np.int32)
+        self.kickoffs = np.full((n_teams, horizon), np.datetime64("NaT"), dtype="datetime64[s]")
+        self.is_home = np.zeros((n_teams, horizon), dtype=bool)
+        filled = np.zeros(n_teams, dtype=np.int32)
+        for home_id, away_id, kickoff in fixtures:  # ordered by kickoff
+            h, a = self.team_index[home_id], self.team_index[away_id]
+            for team, opp, home in ((h, a, True), (a, h, False)):
+                col = filled[team]
+                if col < horizon:
+                    self.opponents[team, col] = opp
+                    self.kickoffs[team, col] = np.datetime64(kickoff, "s")
+                    self.is_home[team, col] = home
+                    filled[team] = col + 1
+        self.fdr = np.where(self.opponents >= 0, self.opponent_fdr[self.opponents], 0).astype(np.int8)
+
+    def fdr_against(self, opponent_id: str) -> int:
+        """FDR for any team playing `opponent_id`."""
+        i = self.team_index.get(opponent_id)
+        return int(self.opponent_fdr[i]) if i is not None else _UNKNOWN_FDR
+
+    def _next_col(self, team_id: str, now: datetime) -> Optional[tuple[int, int]]:
+        t = self.team_index.get(team_id)
+        if t is None:
+            return None
+        upcoming = np.flatnonzero(self.kickoffs[t] > np.datetime64(now, "s"))
+        return (t, int(upcoming[0])) if len(upcoming) else None
+
+    def next_fdr(self, team_id: str, now: Optional[datetime] = None) -> Optional[int]:
+        """FDR of `team_id`'s next fixture after `now`, or None."""
+        pos = self._next_col(team_id, now or datetime.utcnow())
+        return int(self.fdr[pos]) if pos else None
+
+    def upcoming(self, team_id: str, now: Optional[datetime] = None) -> list[dict]:
+        """`team_id`'s remaining fixtures in the horizon with their FDR."""
+        pos = self._next_col(team_id, now or datetime.utcnow())
+        if pos is None:
+            return []
+        t, start = pos
+        return [
+            {
+                "opponent_id": self.team_ids[self.opponents[t, c]],
+                "is_home": bool(self.is_home[t, c]),
+                "fdr": int(self.fdr[t, c]),
+            }
+            for c in range(start, self.opponents.shape[1])
+            if self.opponents[t, c] >= 0
+        ]
+
+
+_matrix_lock = threading.Lock()
+_matrix_cache: Optional[tuple[str, FixtureDifficultyMatrix]] = None
+
+
+def get_fdr_matrix(db: Session) -> FixtureDifficultyMatrix:
+    """Return the difficulty matrix for the current data version.
+
+    One primary-key lookup when warm; rebuilt lazily (two queries) once per
+    version change.
+    """
+    global _matrix_cache
+    version = current_versions(db, STATS, CATALOG)
+    cached = _matrix_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _matrix_lock:
+        cached = _matrix_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        strengths = [
+            (row.team_id, row.matches_played, row.goals_for, row.goals_against)
+            for row in db.query(TeamStrength).all()
+        ]
+        if not strengths:
+            # Nothing persisted yet (fresh DB) — derive from matches directly
+            strengths = _aggregate_strengths(db)
+        fixtures = (
+            db.query(Match.home_team_id, Match.away_team_id, Match.kickoff_utc)
+            .filter(Match.status == MatchStatus.SCHEDULED, Match.kickoff_utc > datetime.utcnow())
+            .order_by(Match.kickoff_utc.asc())
+            .all()
+        )
+        matrix = FixtureDifficultyMatrix(strengths, fixtures)
+        _matrix_cache = (version, matrix)
+        return matrix
 
 
 def compute_fdr(team_id: str, opponent_id: str, db: Session) -> int:
@@ -25,45 +222,7 @@ def compute_fdr(team_id: str, opponent_id: str, db: Session) -> int:
 
     Returns int 1–5.
     """
-    # Count total goals scored by the opponent in all finished matches
-    opponent_home_goals = (
-        db.query(func.coalesce(func.sum(Match.home_score), 0))
-        .filter(Match.home_team_id == opponent_id, Match.status == MatchStatus.FINISHED)
-        .scalar()
-    )
-    opponent_away_goals = (
-        db.query(func.coalesce(func.sum(Match.away_score), 0))
-        .filter(Match.away_team_id == opponent_id, Match.status == MatchStatus.FINISHED)
-        .scalar()
-    )
-    total_goals = int(opponent_home_goals) + int(opponent_away_goals)
-
-    # Count finished matches involving the opponent
-    match_count = (
-        db.query(func.count(Match.id))
-        .filter(
-            Match.status == MatchStatus.FINISHED,
-            or_(Match.home_team_id == opponent_id, Match.away_team_id == opponent_id),
-        )
-        .scalar()
-    )
-
-    if match_count == 0:
-        return 3  # Unknown opponent — medium difficulty
-
-    goals_per_match = total_goals / match_count
-
-    # Map goals-per-match to FDR 1–5
-    if goals_per_match >= 2.5:
-        return 5  # Very strong attack
-    elif goals_per_match >= 1.8:
-        return 4
-    elif goals_per_match >= 1.0:
-        return 3
-    elif goals_per_match >= 0.5:
-        return 2
-    else:
-        return 1  # Very weak attack
+    return get_fdr_matrix(db).fdr_against(opponent_id)
 
 
 def get_upcoming_fdr(player_id: str, db: Session) -> Optional[int]:
@@ -74,26 +233,17 @@ def get_upcoming_fdr(player_id: str, db: Session) -> Optional[int]:
     player = db.get(Player, player_id)
     if player is None:
         return None
+    return get_fdr_matrix(db).next_fdr(player.team_id)
 
-    team_id = player.team_id
-    now = datetime.utcnow()
 
-    # Find the next scheduled match for this player's team
-    upcoming = (
-        db.query(Match)
-        .filter(
-            Match.status == MatchStatus.SCHEDULED,
-            Match.kickoff_utc > now,
-            or_(Match.home_team_id == team_id, Match.away_team_id == team_id),
-        )
-        .order_by(Match.kickoff_utc.asc())
-        .first()
-    )
-
-    if upcoming is None:
-        return None
+def get_upcoming_fdr_batch(player_ids: list[str], db: Session) -> dict[str, Optional[int]]:
+    """Batched get_upcoming_fdr for many players in a constant number of queries.
 
-    # Determine opponent
-    opponent_id = upcoming.away_team_id if upcoming.home_team_id == team_id else upcoming.home_team_id
-
-    return compute_fdr(team_id, opponent_id, db)
+    Returns {player_id: fdr or None}; unknown players are omitted.
+    """
+    if not player_ids:
+        return {}
+    player_teams = db.query(Player.id, Player.team_id).filter(Player.id.in_(player_ids)).all()
+    matrix = get_fdr_matrix(db)
+    now = datetime.utcnow()
+    return {player_id: matrix.next_fdr(team_id, now) for player_id, team_id in player_teams}
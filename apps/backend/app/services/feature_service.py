@@ -5,16 +5,35 @@ Used by the RL executor (Step 11+) and the GET /players/{id}/form endpoint.
 """
 from typing import Optional
 
+import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.models.match import Match
 from app.models.player import Player
 from app.models.player_match_stats import PlayerMatchStats
-from app.services.fdr_service import get_upcoming_fdr
+from app.services.fdr_service import get_upcoming_fdr, get_upcoming_fdr_batch
 
 # Position encoding for RL feature vectors
 POSITION_ENCODING = {"GK": 1, "DEF": 2, "MID": 3, "FWD": 4}
 
+# Column layout of build_features_batch() — same names as build_player_features()
+BATCH_FEATURE_COLUMNS = (
+    "position_encoded",
+    "price",
+    "matches_played",
+    "total_goals",
+    "total_assists",
+    "total_points",
+    "total_minutes",
+    "avg_points",
+    "total_saves",
+    "total_yellows",
+    "total_reds",
+    "total_conceded",
+)
+BATCH_FEATURE_INDEX = {name: i for i, name in enumerate(BATCH_FEATURE_COLUMNS)}
+
 
 def build_player_features(player_id: str, db: Session) -> Optional[dict]:
     """Build a feature dict for a single player from their match stats.
@@ -73,6 +92,55 @@ def build_player_features(player_id: str, db: Session) -> Optional[dict]:
     }
 
 
+def build_features_batch(db: Session, player_ids: list[str]) -> np.ndarray:
+    """Feature matrix for many players from a single GROUP BY query.
+
+    Returns a contiguous float32 array of shape (len(player_ids),
+    len(BATCH_FEATURE_COLUMNS)); row i belongs to player_ids[i]. Rows for
+    unknown players are all zeros.
+    """
+    features = np.zeros((len(player_ids), len(BATCH_FEATURE_COLUMNS)), dtype=np.float32)
+    if not player_ids:
+        return features
+
+    rows = (
+        db.query(
+            Player.id,
+            Player.position,
+            Player.price,
+            func.count(PlayerMatchStats.id),
+            func.coalesce(func.sum(PlayerMatchStats.goals), 0),
+            func.coalesce(func.sum(PlayerMatchStats.assists), 0),
+            func.coalesce(func.sum(PlayerMatchStats.fantasy_points), 0),
+            func.coalesce(func.sum(PlayerMatchStats.minutes_played), 0),
+            func.coalesce(func.sum(PlayerMatchStats.saves), 0),
+            func.coalesce(func.sum(PlayerMatchStats.yellow_cards), 0),
+            func.coalesce(func.sum(PlayerMatchStats.red_cards), 0),
+            func.coalesce(func.sum(PlayerMatchStats.goals_conceded), 0),
+        )
+        .outerjoin(PlayerMatchStats, PlayerMatchStats.player_id == Player.id)
+        .filter(Player.id.in_(player_ids))
+        .group_by(Player.id, Player.position, Player.price)
+        .all()
+    )
+    if not rows:
+        return features
+
+    index = {pid: i for i, pid in enumerate(player_ids)}
+    target = np.array([index[r[0]] for r in rows])
+    position = np.array([POSITION_ENCODING.get(r[1], 0) for r in rows], dtype=np.float32)
+    # price, matches_played, goals, assists, points, minutes, saves, yellows, reds, conceded
+    raw = np.array([r[2:] for r in rows], dtype=np.float32)
+    matches_played = raw[:, 1]
+    avg_points = np.round(raw[:, 4] / np.maximum(matches_played, 1), 2)
+
+    features[target] = np.column_stack([
+        position, raw[:, 0], matches_played, raw[:, 2], raw[:, 3], raw[:, 4],
+        raw[:, 5], avg_points, raw[:, 6], raw[:, 7], raw[:, 8], raw[:, 9],
+    ])
+    return features
+
+
 def get_player_form(player_id: str, db: Session) -> Optional[dict]:
     """Build a form snapshot for the player detail screen.
 
@@ -84,8 +152,6 @@ def get_player_form(player_id: str, db: Session) -> Optional[dict]:
         return None
 
     # Last 5 match fantasy points (ordered by match kickoff, most recent first)
-    from app.models.match import Match
-
     last5 = (
         db.query(PlayerMatchStats.fantasy_points)
         .join(Match, PlayerMatchStats.match_id == Match.id)
@@ -111,3 +177,50 @@ def get_player_form(player_id: str, db: Session) -> Optional[dict]:
         "totalPointsThisTournament": int(total),
         "upcomingFdr": fdr,
     }
+
+
+def get_players_form_batch(player_ids: list[str], db: Session) -> dict[str, dict]:
+    """Form snapshots for many players in a constant number of queries.
+
+    A single window-function query ranks each player's matches by kickoff
+    (ROW_NUMBER) and carries the tournament total alongside (SUM OVER), so
+    last-5 and totals come back together; FDR is batched separately.
+
+    Returns {player_id: form dict} in the same shape as get_player_form;
+    unknown players are omitted.
+    """
+    if not player_ids:
+        return {}
+    fdr = get_upcoming_fdr_batch(player_ids, db)  # also tells us which players exist
+
+    ranked = (
+        db.query(
+            PlayerMatchStats.player_id.label("player_id"),
+            PlayerMatchStats.fantasy_points.label("points"),
+            func.row_number()
+            .over(partition_by=PlayerMatchStats.player_id, order_by=Match.kickoff_utc.desc())
+            .label("rn"),
+            func.sum(PlayerMatchStats.fantasy_points)
+            .over(partition_by=PlayerMatchStats.player_id)
+            .label("total"),
+        )
+        .join(Match, PlayerMatchStats.match_id == Match.id)
+        .filter(PlayerMatchStats.player_id.in_(list(fdr)))
+        .subquery()
+    )
+    rows = (
+        db.query(ranked.c.player_id, ranked.c.points, ranked.c.total)
+        .filter(ranked.c.rn <= 5)
+        .order_by(ranked.c.player_id, ranked.c.rn.desc())  # chronological order
+        .all()
+    )
+
+    forms = {
+        pid: {"last5Points": [], "totalPointsThisTournament": 0, "upcomingFdr": upcoming}
+        for pid, upcoming in fdr.items()
+    }
+    for player_id, points, total in rows:
+        form = forms[player_id]
+        form["last5Points"].append(points)
+        form["totalPointsThisTournament"] = int(total or 0)
+    return forms
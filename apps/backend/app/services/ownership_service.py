@@ -0,0 +1,233 @@
+"""
+Ownership service — incrementally maintained "selected by %" counters.
+
+Every squad write path (create_squad, update_lineup, make_transfer) applies
+a small delta to the player_ownership / ownership_scopes tables, both for the
+squad's league and for the tournament-wide "global" scope. Reads are then a
+primary-key lookup instead of a COUNT over squad_players.
+
+Deltas are applied with INSERT ... ON CONFLICT DO UPDATE, so the increment
+happens in the database. Concurrent squad writes neither lose updates nor
+fail when two of them create the same first counter row. Counters can still
+drift (rows written before the counters existed, manual DB edits), so
+reconcile_ownership() recomputes the truth from squad_players and corrects
+any mismatch. It runs periodically from the scheduler.
+"""
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.player_ownership import GLOBAL_SCOPE, OwnershipScope, PlayerOwnership
+from app.models.squad import Squad
+from app.models.squad_player import SquadPlayer
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _apply_deltas(db: Session, player_ids: Iterable[str], league_id: str, **deltas: int) -> None:
+    """Add `deltas` to the counters of every player in both scopes.
+
+    One INSERT ... ON CONFLICT DO UPDATE for all rows: the increment runs in
+    the database, so concurrent writers neither lose updates nor collide
+    when both create a player's first counter row. Counters never go below
+    zero.
+    """
+    ids = [pid for pid in dict.fromkeys(player_ids) if pid]
+    deltas = {col: d for col, d in deltas.items() if d}
+    if not ids or not deltas:
+        return
+    now = datetime.utcnow()
+
+    # Missing rows start from zero; a negative delta means the counter was
+    # never tracked, which reconciliation will fix.
+    initial = {col: max(d, 0) for col, d in deltas.items()}
+    rows = [
+        {"id": str(uuid.uuid4()), "player_id": pid, "scope": scope, "updated_at": now, **initial}
+        for pid in ids
+        for scope in (GLOBAL_SCOPE, league_id)
+    ]
+    table = PlayerOwnership.__table__
+    stmt = _insert(db)(table).values(rows)
+    counts = {col: table.c[col] + d for col, d in deltas.items()}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.player_id, table.c.scope],
+        set_={**{col: case((n < 0, 0), else_=n) for col, n in counts.items()}, "updated_at": now},
+    )
+    _execute_upsert(db, stmt)
+
+
+def _apply_scope_delta(db: Session, league_id: str, delta: int) -> None:
+    """Adjust the squad totals for the league and global scopes (atomic upsert, never below zero)."""
+    now = datetime.utcnow()
+    table = OwnershipScope.__table__
+    stmt = _insert(db)(table).values(
+        [{"scope": scope, "squads": max(delta, 0), "updated_at": now} for scope in (GLOBAL_SCOPE, league_id)]
+    )
+    squads = table.c.squads + delta
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.scope],
+        set_={"squads": case((squads < 0, 0), else_=squads), "updated_at": now},
+    )
+    _execute_upsert(db, stmt)
+
+
+def _insert(db: Session):
+    """The dialect's INSERT construct with ON CONFLICT support (PostgreSQL in production, SQLite in tests)."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        raise NotImplementedError(f"Ownership counters need ON CONFLICT support, not available on {dialect}")
+    return _UPSERT_INSERTS[dialect]
+
+
+def _execute_upsert(db: Session, stmt) -> None:
+    db.flush()
+    db.execute(stmt)
+    # Core statements bypass the identity map: reload counters already held by this session
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, (PlayerOwnership, OwnershipScope)):
+            db.expire(obj)
+
+
+def record_squad_added(
+    db: Session,
+    league_id: str,
+    player_ids: list[str],
+    captain_id: Optional[str] = None,
+    vice_captain_id: Optional[str] = None,
+) -> None:
+    """Count a newly created squad."""
+    _apply_scope_delta(db, league_id, +1)
+    _apply_deltas(db, player_ids, league_id, owners=+1)
+    record_armband_change(db, league_id, None, captain_id, None, vice_captain_id)
+
+
+def record_squad_removed(
+    db: Session,
+    league_id: str,
+    player_ids: list[str],
+    captain_id: Optional[str] = None,
+    vice_captain_id: Optional[str] = None,
+) -> None:
+    """Uncount a squad that is about to be deleted."""
+    _apply_scope_delta(db, league_id, -1)
+    _apply_deltas(db, player_ids, league_id, owners=-1)
+    record_armband_change(db, league_id, captain_id, None, vice_captain_id, None)
+
+
+def record_transfer(
+    db: Session, league_id: str, player_out_id: Optional[str], player_in_id: str
+) -> None:
+    """Move one ownership from player_out to player_in."""
+    _apply_deltas(db, [player_out_id], league_id, owners=-1)
+    _apply_deltas(db, [player_in_id], league_id, owners=+1)
+
+
+def record_armband_change(
+    db: Session,
+    league_id: str,
+    old_captain_id: Optional[str],
+    new_captain_id: Optional[str],
+    old_vice_id: Optional[str],
+    new_vice_id: Optional[str],
+) -> None:
+    """Move captain / vice-captain counts when the armbands change hands."""
+    if old_captain_id != new_captain_id:
+        _apply_deltas(db, [old_captain_id], league_id, captains=-1)
+        _apply_deltas(db, [new_captain_id], league_id, captains=+1)
+    if old_vice_id != new_vice_id:
+        _apply_deltas(db, [old_vice_id], league_id, vice_captains=-1)
+        _apply_deltas(db, [new_vice_id], league_id, vice_captains=+1)
+
+
+def get_ownership(db: Session, player_ids: list[str], league_id: Optional[str] = None) -> list[dict]:
+    """Read ownership stats for `player_ids` in a league (or globally).
+
+    Two indexed lookups regardless of how many squads exist.
+    """
+    scope = league_id or GLOBAL_SCOPE
+    total_row = db.get(OwnershipScope, scope)
+    total = total_row.squads if total_row else 0
+
+    rows = {
+        r.player_id: r
+        for r in db.query(PlayerOwnership)
+        .filter(PlayerOwnership.player_id.in_(player_ids), PlayerOwnership.scope == scope)
+        .all()
+    }
+
+    def pct(n: int) -> float:
+        return round(100.0 * n / total, 1) if total else 0.0
+
+    result = []
+    for pid in player_ids:
+        r = rows.get(pid)
+        owners = r.owners if r else 0
+        captains = r.captains if r else 0
+        result.append({
+            "player_id": pid,
+            "owners": owners,
+            "captains": captains,
+            "selected_by_pct": pct(owners),
+            "captained_by_pct": pct(captains),
+        })
+    return result
+
+
+def reconcile_ownership(db: Session) -> int:
+    """Recompute every counter from squad_players and fix any drift.
+
+    Returns the number of rows corrected. Does not commit.
+    """
+    truth: dict[tuple[str, str], tuple[int, int, int]] = {}
+
+    def add(key: tuple[str, str], counts: tuple[int, int, int]) -> None:
+        prev = truth.get(key, (0, 0, 0))
+        truth[key] = tuple(a + b for a, b in zip(prev, counts))
+
+    rows = (
+        db.query(
+            SquadPlayer.player_id,
+            Squad.league_id,
+            func.count(SquadPlayer.id),
+            func.sum(case((SquadPlayer.is_captain == True, 1), else_=0)),  # noqa: E712
+            func.sum(case((SquadPlayer.is_vice_captain == True, 1), else_=0)),  # noqa: E712
+        )
+        .join(Squad, Squad.id == SquadPlayer.squad_id)
+        .group_by(SquadPlayer.player_id, Squad.league_id)
+        .all()
+    )
+    for player_id, league_id, owners, captains, vices in rows:
+        counts = (int(owners or 0), int(captains or 0), int(vices or 0))
+        add((player_id, league_id), counts)
+        add((player_id, GLOBAL_SCOPE), counts)
+
+    corrected = 0
+    for row in db.query(PlayerOwnership).all():
+        expected = truth.pop((row.player_id, row.scope), (0, 0, 0))
+        if (row.owners, row.captains, row.vice_captains) != expected:
+            row.owners, row.captains, row.vice_captains = expected
+            corrected += 1
+    for (player_id, scope), (owners, captains, vices) in truth.items():
+        db.add(PlayerOwnership(
+            player_id=player_id, scope=scope, owners=owners, captains=captains, vice_captains=vices,
+        ))
+        corrected += 1
+
+    # Squad totals per scope
+    squad_totals = dict(db.query(Squad.league_id, func.count(Squad.id)).group_by(Squad.league_id).all())
+    squad_totals[GLOBAL_SCOPE] = sum(squad_totals.values())
+    for row in db.query(OwnershipScope).all():
+        expected = squad_totals.pop(row.scope, 0)
+        if row.squads != expected:
+            row.squads = expected
+            corrected += 1
+    for scope, squads in squad_totals.items():
+        db.add(OwnershipScope(scope=scope, squads=squads))
+        corrected += 1
+
+    db.flush()
+    return corrected
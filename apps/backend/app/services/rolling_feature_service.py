@@ -0,0 +1,219 @@
+"""
+Rolling feature service — incrementally maintained form features.
+
+player_rolling_features keeps, per player, the last five appearances
+(points and minutes) plus cumulative goals/assists/minutes. When a match is
+settled, update_rolling_features() touches only the players who appeared in
+it: the new appearance is appended to each window and the derived features
+(last-3/last-5 points, per-90 rates, minutes trend, start probability) are
+recomputed from the window. Re-synced or out-of-order matches fall back to
+rebuilding just the affected players from raw stats.
+
+Rows are stamped with the stats data version of the transaction that wrote
+them; get_rolling_snapshot() serves a consistent, process-cached matrix of
+every player's features keyed by that version.
+"""
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.player_match_stats import PlayerMatchStats
+from app.models.player_rolling_features import PlayerRollingFeatures
+from app.services.data_version_service import STATS, current_version
+
+WINDOW = 5
+START_MINUTES = 60  # an appearance of this length counts as a start
+
+# Column layout of RollingFeatureSnapshot.matrix
+ROLLING_FEATURE_COLUMNS = (
+    "last3_points",
+    "last5_points",
+    "goals_per90",
+    "assists_per90",
+    "minutes_trend",
+    "start_probability",
+)
+ROLLING_FEATURE_INDEX = {name: i for i, name in enumerate(ROLLING_FEATURE_COLUMNS)}
+
+
+def _derive(row: PlayerRollingFeatures) -> None:
+    """Recompute the derived columns from the window and totals."""
+    points = row.recent_points or []
+    minutes = np.asarray(row.recent_minutes or [], dtype=np.float64)
+    row.last3_points = round(float(np.mean(points[-3:])), 2) if points else 0.0
+    row.last5_points = round(float(np.mean(points)), 2) if points else 0.0
+
+    per90 = 90.0 / row.total_minutes if row.total_minutes else 0.0
+    row.goals_per90 = round(row.total_goals * per90, 3)
+    row.assists_per90 = round(row.total_assists * per90, 3)
+
+    if len(minutes) >= 2:
+        x = np.arange(len(minutes)) - (len(minutes) - 1) / 2
+        row.minutes_trend = round(float((x * minutes).sum() / (x * x).sum()), 2)
+    else:
+        row.minutes_trend = 0.0
+    # Share of recent appearances started, shrunk toward 50% for short histories
+    starts = int((minutes >= START_MINUTES).sum())
+    row.start_probability = round((starts + 0.5) / (len(minutes) + 1), 3) if len(minutes) else 0.0
+
+
+def _rebuild(db: Session, player_ids: list[str], rows: dict[str, PlayerRollingFeatures], version: str) -> None:
+    """Recompute rows for `player_ids` from raw stats (one query)."""
+    history: dict[str, list] = {pid: [] for pid in player_ids}
+    stats = (
+        db.query(
+            PlayerMatchStats.player_id,
+            PlayerMatchStats.match_id,
+            PlayerMatchStats.fantasy_points,
+            PlayerMatchStats.minutes_played,
+            PlayerMatchStats.goals,
+            PlayerMatchStats.assists,
+            Match.kickoff_utc,
+        )
+        .join(Match, PlayerMatchStats.match_id == Match.id)
+        .filter(PlayerMatchStats.player_id.in_(player_ids))
+        .order_by(Match.kickoff_utc.asc())
+        .all()
+    )
+    for s in stats:
+        history[s.player_id].append(s)
+
+    now = datetime.utcnow()
+    for pid, apps in history.items():
+        row = rows.get(pid)
+        if row is None:
+            row = PlayerRollingFeatures(player_id=pid)
+            db.add(row)
+            rows[pid] = row
+        recent = apps[-WINDOW:]
+        row.matches_played = len(apps)
+        row.total_goals = sum(a.goals or 0 for a in apps)
+        row.total_assists = sum(a.assists or 0 for a in apps)
+        row.total_minutes = sum(a.minutes_played or 0 for a in apps)
+        row.recent_match_ids = [a.match_id for a in recent]
+        row.recent_points = [a.fantasy_points or 0 for a in recent]
+        row.recent_minutes = [a.minutes_played or 0 for a in recent]
+        row.last_kickoff_utc = apps[-1].kickoff_utc if apps else None
+        _derive(row)
+        row.stats_version = version
+        row.updated_at = now
+
+
+def update_rolling_features(db: Session, match_id: str) -> int:
+    """Fold one settled match into the feature store.
+
+    Only players with stats in the match are touched. Call after
+    bump_version(db, STATS) so rows carry the new version. Does not commit.
+    Returns the number of players updated.
+    """
+    db.flush()
+    match = db.get(Match, match_id)
+    if match is None:
+        return 0
+    stats = db.query(PlayerMatchStats).filter(PlayerMatchStats.match_id == match_id).all()
+    if not stats:
+        return 0
+    version = current_version(db, STATS)
+    player_ids = [s.player_id for s in stats]
+    rows = {
+        r.player_id: r
+        for r in db.query(PlayerRollingFeatures)
+        .filter(PlayerRollingFeatures.player_id.in_(player_ids))
+        .all()
+    }
+
+    # Incremental append only applies to a new, most-recent match; anything
+    # else (re-sync, late correction, missing row) is rebuilt from raw stats.
+    needs_rebuild = []
+    now = datetime.utcnow()
+    for s in stats:
+        row = rows.get(s.player_id)
+        if (
+            row is None
+            or match_id in (row.recent_match_ids or [])
+            or (row.last_kickoff_utc is not None and match.kickoff_utc < row.last_kickoff_utc)
+        ):
+            needs_rebuild.append(s.player_id)
+            continue
+        row.matches_played += 1
+        row.total_goals += s.goals or 0
+        row.total_assists += s.assists or 0
+        row.total_minutes += s.minutes_played or 0
+        row.recent_match_ids = (row.recent_match_ids + [match_id])[-WINDOW:]
+        row.recent_points = (row.recent_points + [s.fantasy_points or 0])[-WINDOW:]
+        row.recent_minutes = (row.recent_minutes + [s.minutes_played or 0])[-WINDOW:]
+        row.last_kickoff_utc = match.kickoff_utc
+        _derive(row)
+        row.stats_version = version
+        row.updated_at = now
+
+    if needs_rebuild:
+        _rebuild(db, needs_rebuild, rows, version)
+    db.flush()
+    return len(player_ids)
+
+
+def rebuild_rolling_features(db: Session, player_ids: Optional[Iterable[str]] = None) -> int:
+    """Recompute the store from raw stats (all players with stats by default).
+
+    For backfills and repairs. Does not commit. Returns rows written.
+    """
+    if player_ids is None:
+        player_ids = [pid for (pid,) in db.query(PlayerMatchStats.player_id).distinct()]
+    player_ids = list(player_ids)
+    if not player_ids:
+        return 0
+    rows = {
+        r.player_id: r
+        for r in db.query(PlayerRollingFeatures)
+        .filter(PlayerRollingFeatures.player_id.in_(player_ids))
+        .all()
+    }
+    _rebuild(db, player_ids, rows, current_version(db, STATS))
+    db.flush()
+    return len(player_ids)
+
+
+class RollingFeatureSnapshot:
+    """Every stored player's rolling features as one float32 matrix."""
+
+    def __init__(self, version: str, player_ids: list[str], matrix: np.ndarray):
+        self.version = version
+        self.player_index = {pid: i for i, pid in enumerate(player_ids)}
+        self.matrix = matrix
+
+    def rows(self, player_ids: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(features, found) aligned to `player_ids`; missing players get zeros."""
+        idx = np.array([self.player_index.get(pid, -1) for pid in player_ids], dtype=np.int64)
+        found = idx >= 0
+        features = np.zeros((len(player_ids), len(ROLLING_FEATURE_COLUMNS)), dtype=np.float32)
+        features[found] = self.matrix[idx[found]]
+        return features, found
+
+
+_snapshot_lock = threading.Lock()
+_snapshot_cache: Optional[RollingFeatureSnapshot] = None
+
+
+def get_rolling_snapshot(db: Session) -> RollingFeatureSnapshot:
+    """Snapshot for the current stats version (rebuilt once per version)."""
+    global _snapshot_cache
+    version = current_version(db, STATS)
+    cached = _snapshot_cache
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _snapshot_lock:
+        cached = _snapshot_cache
+        if cached is not None and cached.version == version:
+            return cached
+        columns = [getattr(PlayerRollingFeatures, name) for name in ROLLING_FEATURE_COLUMNS]
+        rows = db.query(PlayerRollingFeatures.player_id, *columns).all()
+        matrix = np.array([r[1:] for r in rows], dtype=np.float32).reshape(len(rows), len(columns))
+        snapshot = RollingFeatureSnapshot(version, [r[0] for r in rows], matrix)
+        _snapshot_cache = snapshot
+        return snapshot
@@ -7,6 +7,15 @@ after we have the rating value. Only base match stats are computed here.
 from app.models.player import Player
 from app.models.player_match_stats import PlayerMatchStats
 
+# Per-event points; the round simulator (app/rl/round_simulator.py) scores with the same tables
+GOAL_POINTS = {"GK": 6, "DEF": 6, "MID": 5, "FWD": 4}
+ASSIST_POINTS = 3
+CLEAN_SHEET_POINTS = {"GK": 4, "DEF": 4, "MID": 1, "FWD": 0}
+CONCEDED_POSITIONS = {"GK", "DEF"}   # -1 per 2 goals conceded
+SAVES_PER_POINT = 3
+YELLOW_CARD_POINTS = -1
+RED_CARD_POINTS = -3
+
 
 def compute_player_points(player: Player, stats: PlayerMatchStats) -> int:
     """Compute fantasy points for a player based on their match stats."""
@@ -19,34 +28,30 @@ def compute_player_points(player: Player, stats: PlayerMatchStats) -> int:
         points += 1
 
     # Goals (FWD=4, MID=5, DEF=6, GK=6)
-    goal_pts = {"GK": 6, "DEF": 6, "MID": 5, "FWD": 4}
-    points += stats.goals * goal_pts.get(player.position, 4)
+    points += stats.goals * GOAL_POINTS.get(player.position, 4)
 
     # Assists
-    points += stats.assists * 3
+    points += stats.assists * ASSIST_POINTS
 
     # Clean sheet (must play ≥60 min)
     if stats.clean_sheet and stats.minutes_played >= 60:
-        if player.position in {"GK", "DEF"}:
-            points += 4
-        elif player.position == "MID":
-            points += 1
+        points += CLEAN_SHEET_POINTS.get(player.position, 0)
 
     # Goals conceded (GK/DEF: -1 per every 2 conceded)
-    if player.position in {"GK", "DEF"} and stats.goals_conceded:
+    if player.position in CONCEDED_POSITIONS and stats.goals_conceded:
         points -= stats.goals_conceded // 2
 
     # Saves (GK: 1 pt per 3 saves)
     if player.position == "GK" and stats.saves:
-        points += stats.saves // 3
+        points += stats.saves // SAVES_PER_POINT
 
     # Penalties
     points += stats.penalties_scored * 3
     points -= stats.penalties_missed * 2
 
     # Discipline
-    points -= stats.yellow_cards
-    points -= stats.red_cards * 3
+    points += stats.yellow_cards * YELLOW_CARD_POINTS
+    points += stats.red_cards * RED_CARD_POINTS
     points -= stats.own_goals * 2
 
     return points
@@ -10,6 +10,7 @@ from app.models.player import Player
 from app.models.squad import Squad
 from app.models.squad_player import SquadPlayer
 from app.schemas.squad_schemas import LineupUpdateRequest
+from app.services import ownership_service
 
 
 MAX_PLAYERS_PER_TEAM = 2
@@ -51,8 +52,18 @@ def _ensure_league(db: Session, league_id: str, user_id: str) -> str:
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
 
 
-def _auto_assign_lineup(db: Session, squad: Squad, players: List[Player]) -> None:
-    """Auto-assign starting XI, captain, and VC using fallback logic (4-4-2, price-based)."""
+def _armbands(squad_players: List[SquadPlayer]) -> tuple[Optional[str], Optional[str]]:
+    """Return (captain_id, vice_captain_id) for a list of SquadPlayer rows."""
+    captain_id = next((sp.player_id for sp in squad_players if sp.is_captain), None)
+    vc_id = next((sp.player_id for sp in squad_players if sp.is_vice_captain), None)
+    return captain_id, vc_id
+
+
+def _auto_assign_lineup(db: Session, squad: Squad, players: List[Player]) -> tuple[Optional[str], Optional[str]]:
+    """Auto-assign starting XI, captain, and VC using fallback logic (4-4-2, price-based).
+
+    Returns (captain_id, vice_captain_id).
+    """
     formation = FORMATIONS.get(squad.formation, FORMATIONS["4-4-2"])
 
     # Group players by position
@@ -97,6 +108,7 @@ def _auto_assign_lineup(db: Session, squad: Squad, players: List[Player]) -> Non
         else:
             sp.bench_order = None
     db.flush()
+    return captain_id, vc_id
 
 
 def create_squad(
@@ -135,6 +147,10 @@ def create_squad(
     # Delete existing squad for this user/league
     existing = db.query(Squad).filter(Squad.user_id == user_id, Squad.league_id == league_id).first()
     if existing:
+        old_rows = db.query(SquadPlayer).filter(SquadPlayer.squad_id == existing.id).all()
+        ownership_service.record_squad_removed(
+            db, league_id, [sp.player_id for sp in old_rows], *_armbands(old_rows)
+        )
         db.query(SquadPlayer).filter(SquadPlayer.squad_id == existing.id).delete()
         db.delete(existing)
         db.flush()
@@ -153,7 +169,8 @@ def create_squad(
     db.flush()
 
     # Auto-assign lineup with fallback logic (default 4-4-2)
-    _auto_assign_lineup(db, squad, players)
+    captain_id, vc_id = _auto_assign_lineup(db, squad, players)
+    ownership_service.record_squad_added(db, league_id, player_ids, captain_id, vc_id)
 
     db.commit()
     db.refresh(squad)
@@ -171,6 +188,9 @@ def update_lineup(db: Session, squad_id: str, payload: LineupUpdateRequest) -> S
     # Update formation if provided
     if payload.formation and payload.formation in FORMATIONS:
         squad.formation = payload.formation
+    old_captain_id, old_vc_id = _armbands(
+        db.query(SquadPlayer).filter(SquadPlayer.squad_id == squad_id).all()
+    )
     # reset
     db.query(SquadPlayer).filter(SquadPlayer.squad_id == squad_id).update(
         {"is_starting": False, "bench_order": None, "is_captain": False, "is_vice_captain": False}
@@ -184,6 +204,12 @@ def update_lineup(db: Session, squad_id: str, payload: LineupUpdateRequest) -> S
                 "is_vice_captain": sp.is_vice_captain,
             }
         )
+    new_captain_id, new_vc_id = _armbands(
+        db.query(SquadPlayer).filter(SquadPlayer.squad_id == squad_id).all()
+    )
+    ownership_service.record_armband_change(
+        db, squad.league_id, old_captain_id, new_captain_id, old_vc_id, new_vc_id
+    )
     db.commit()
     db.refresh(squad)
     return squad
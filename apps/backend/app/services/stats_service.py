@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 
 from app.models.match import Match, MatchStatus
 from app.models.player_match_stats import PlayerMatchStats
+from app.services.data_version_service import STATS, bump_version
+from app.services.rolling_feature_service import update_rolling_features
 from app.services.scoring_service import apply_points
 
 
@@ -13,6 +15,7 @@ def update_match_scores(db: Session, match_id: str, home_score: int, away_score:
     match.away_score = away_score
     if match.status != MatchStatus.FINISHED:
         match.status = MatchStatus.LIVE
+    bump_version(db, STATS)
     db.commit()
 
 
@@ -30,5 +33,7 @@ def apply_player_stats(db: Session, match_id: str, stats_payload: list[dict]):
             if hasattr(stats, field):
                 setattr(stats, field, value)
         apply_points(stats)
+    bump_version(db, STATS)
+    update_rolling_features(db, match_id)
     db.commit()
 
@@ -0,0 +1,312 @@
+"""
+Team model service — Poisson attack/defence ratings and fixture projections.
+
+Goals in a match are modelled as independent Poisson variables:
+
+    log E[home goals] = attack[home] - defence[away] + home_advantage
+    log E[away goals] = attack[away] - defence[home]
+
+Ratings are fitted by penalised maximum likelihood (vectorised diagonal
+Newton steps) on this tournament's finished matches plus down-weighted
+historical World Cup results (historical_match_results.csv from
+scripts/collect_training_data.py) as priors.
+
+refit_team_model() runs once after each finished match. It persists the
+ratings on team_strengths and a projection (expected goals, clean-sheet and
+result probabilities) for every upcoming fixture in fixture_projections.
+The in-process TeamModel evaluates all team × team pairings in one
+broadcast pass, so per-fixture reads are array lookups.
+"""
+import csv
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.fixture_projection import FixtureProjection
+from app.models.match import Match, MatchStatus
+from app.models.team import Team
+from app.models.team_strength import TeamStrength
+from app.services.data_version_service import CATALOG, STATS, current_versions
+
+log = logging.getLogger(__name__)
+
+MAX_GOALS = 10                 # score-grid truncation for result probabilities
+PRIOR_PRECISION = 2.0          # L2 pull of ratings toward average (shrinks small samples)
+HISTORICAL_WEIGHT = 0.25       # weight of a historical match relative to a current one
+HISTORICAL_HALF_LIFE_YEARS = 12.0
+FIT_ITERATIONS = 100
+
+_LOG_FACTORIAL = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, MAX_GOALS + 1)))])
+
+
+def fit_ratings(
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_goals: np.ndarray,
+    away_goals: np.ndarray,
+    weights: np.ndarray,
+    n_teams: int,
+    prior_precision: float = PRIOR_PRECISION,
+    iterations: int = FIT_ITERATIONS,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """Fit (attack, defence, home_advantage) to weighted match results.
+
+    Attack includes the baseline scoring rate, so
+    E[home goals] = exp(attack[h] - defence[a] + home_advantage).
+    """
+    hg = home_goals.astype(np.float64)
+    ag = away_goals.astype(np.float64)
+    w = weights.astype(np.float64)
+    attack = np.zeros(n_teams)
+    defence = np.zeros(n_teams)
+    total_w = max(w.sum(), 1e-9)
+    mu = np.log(max((w * (hg + ag)).sum() / (2 * total_w), 0.1))
+    home_adv = 0.0
+
+    for _ in range(iterations):
+        lam_h = np.exp(mu + home_adv + attack[home_idx] - defence[away_idx])
+        lam_a = np.exp(mu + attack[away_idx] - defence[home_idx])
+        res_h, res_a = w * (hg - lam_h), w * (ag - lam_a)
+        fis_h, fis_a = w * lam_h, w * lam_a
+
+        # Diagonal Newton step on the penalised log-likelihood
+        grad_att = np.bincount(home_idx, res_h, n_teams) + np.bincount(away_idx, res_a, n_teams)
+        hess_att = np.bincount(home_idx, fis_h, n_teams) + np.bincount(away_idx, fis_a, n_teams)
+        grad_def = -(np.bincount(away_idx, res_h, n_teams) + np.bincount(home_idx, res_a, n_teams))
+        hess_def = np.bincount(away_idx, fis_h, n_teams) + np.bincount(home_idx, fis_a, n_teams)
+        attack += 0.5 * (grad_att - prior_precision * attack) / (hess_att + prior_precision)
+        defence += 0.5 * (grad_def - prior_precision * defence) / (hess_def + prior_precision)
+
+        mu += 0.5 * (res_h.sum() + res_a.sum()) / max(fis_h.sum() + fis_a.sum(), 1e-9)
+        home_adv += 0.5 * res_h.sum() / max(fis_h.sum() + prior_precision, 1e-9)
+
+        # Identifiability: keep ratings centred, the baseline absorbs the shift
+        mu += attack.mean() - defence.mean()
+        attack -= attack.mean()
+        defence -= defence.mean()
+
+    return (attack + mu).astype(np.float32), defence.astype(np.float32), float(home_adv)
+
+
+def pairing_probabilities(
+    attack: np.ndarray, defence: np.ndarray, home_adv: float, max_goals: int = MAX_GOALS
+) -> dict[str, np.ndarray]:
+    """Projections for every (home, away) pairing as T × T arrays.
+
+    Keys: home_xg, away_xg, home_clean_sheet, away_clean_sheet,
+    home_win, draw, away_win.
+    """
+    home_xg = np.exp(attack[:, None] - defence[None, :] + home_adv)
+    away_xg = np.exp(attack[None, :] - defence[:, None])
+
+    k = np.arange(max_goals + 1)
+    log_fact = _LOG_FACTORIAL[: max_goals + 1]
+    pmf_h = np.exp(k * np.log(home_xg[..., None]) - home_xg[..., None] - log_fact)
+    pmf_a = np.exp(k * np.log(away_xg[..., None]) - away_xg[..., None] - log_fact)
+
+    # P(other side scored strictly fewer than k)
+    below_h = np.concatenate([np.zeros_like(pmf_h[..., :1]), np.cumsum(pmf_h, -1)[..., :-1]], -1)
+    below_a = np.concatenate([np.zeros_like(pmf_a[..., :1]), np.cumsum(pmf_a, -1)[..., :-1]], -1)
+    home_win = (pmf_h * below_a).sum(-1)
+    away_win = (pmf_a * below_h).sum(-1)
+    draw = (pmf_h * pmf_a).sum(-1)
+    total = home_win + draw + away_win  # < 1 only through grid truncation
+
+    return {
+        "home_xg": home_xg.astype(np.float32),
+        "away_xg": away_xg.astype(np.float32),
+        "home_clean_sheet": np.exp(-away_xg).astype(np.float32),
+        "away_clean_sheet": np.exp(-home_xg).astype(np.float32),
+        "home_win": (home_win / total).astype(np.float32),
+        "draw": (draw / total).astype(np.float32),
+        "away_win": (away_win / total).astype(np.float32),
+    }
+
+
+class TeamModel:
+    """Fitted ratings for the tournament's teams with all pairings precomputed."""
+
+    def __init__(self, team_ids: list[str], attack: np.ndarray, defence: np.ndarray, home_adv: float):
+        self.team_ids = team_ids
+        self.team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+        self.attack = attack
+        self.defence = defence
+        self.home_advantage = home_adv
+        self.pairings = pairing_probabilities(attack, defence, home_adv)
+
+    def projection(self, home_id: str, away_id: str) -> Optional[dict]:
+        """Projection for one fixture, or None if either team is unknown."""
+        h, a = self.team_index.get(home_id), self.team_index.get(away_id)
+        if h is None or a is None:
+            return None
+        return {key: float(arr[h, a]) for key, arr in self.pairings.items()}
+
+
+@lru_cache(maxsize=4)
+def _historical_results(path: str, mtime: float) -> tuple[tuple[str, str, int, int, float], ...]:
+    """(home_name, away_name, home_goals, away_goals, weight) rows, recency-weighted."""
+    this_year = datetime.utcnow().year
+    rows = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            try:
+                home_goals = int(r["home_team_score"])
+                away_goals = int(r["away_team_score"])
+                year = int(str(r.get("match_date", ""))[:4])
+            except (KeyError, ValueError):
+                continue
+            weight = HISTORICAL_WEIGHT * 0.5 ** ((this_year - year) / HISTORICAL_HALF_LIFE_YEARS)
+            rows.append((r["home_team_name"].strip().lower(), r["away_team_name"].strip().lower(),
+                         home_goals, away_goals, weight))
+    return tuple(rows)
+
+
+def _load_historical() -> tuple[tuple[str, str, int, int, float], ...]:
+    path = settings.historical_results_path
+    try:
+        return _historical_results(path, os.path.getmtime(path))
+    except OSError:
+        return ()
+
+
+def fit_team_model(db: Session) -> TeamModel:
+    """Fit a TeamModel from finished matches plus historical priors (no writes)."""
+    teams = db.query(Team.id, Team.name).all()
+    team_ids = [t.id for t in teams]
+    index = {t.id: i for i, t in enumerate(teams)}
+    by_name = {t.name.strip().lower(): t.id for t in teams}
+
+    home, away, hg, ag, w = [], [], [], [], []
+    finished = (
+        db.query(Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+        .filter(Match.status == MatchStatus.FINISHED)
+        .all()
+    )
+    for home_id, away_id, home_score, away_score in finished:
+        if home_score is None or away_score is None:
+            continue
+        home.append(index[home_id])
+        away.append(index[away_id])
+        hg.append(home_score)
+        ag.append(away_score)
+        w.append(1.0)
+
+    # Historical teams not in this tournament still inform their opponents' ratings
+    extra: dict[str, int] = {}
+    for home_name, away_name, home_goals, away_goals, weight in _load_historical():
+        idx = []
+        for name in (home_name, away_name):
+            if name in by_name:
+                idx.append(index[by_name[name]])
+            else:
+                idx.append(extra.setdefault(name, len(team_ids) + len(extra)))
+        home.append(idx[0])
+        away.append(idx[1])
+        hg.append(home_goals)
+        ag.append(away_goals)
+        w.append(weight)
+
+    n = len(team_ids) + len(extra)
+    if home:
+        attack, defence, home_adv = fit_ratings(
+            np.array(home), np.array(away), np.array(hg), np.array(ag), np.array(w), n
+        )
+    else:
+        attack, defence, home_adv = np.zeros(n, np.float32), np.zeros(n, np.float32), 0.0
+    return TeamModel(team_ids, attack[: len(team_ids)], defence[: len(team_ids)], home_adv)
+
+
+def refit_team_model(db: Session) -> int:
+    """Refit ratings and persist them plus upcoming-fixture projections.
+
+    Call once per finished match, after refresh_team_strengths(). Does not
+    commit. Returns the number of fixtures projected.
+    """
+    model = fit_team_model(db)
+    strengths = {row.team_id: row for row in db.query(TeamStrength).all()}
+    for i, team_id in enumerate(model.team_ids):
+        row = strengths.get(team_id)
+        if row is None:
+            row = TeamStrength(team_id=team_id)
+            db.add(row)
+        row.attack_rating = float(model.attack[i])
+        row.defence_rating = float(model.defence[i])
+        row.home_advantage = model.home_advantage
+
+    db.query(FixtureProjection).delete(synchronize_session=False)
+    upcoming = (
+        db.query(Match.id, Match.home_team_id, Match.away_team_id)
+        .filter(Match.status == MatchStatus.SCHEDULED)
+        .all()
+    )
+    now = datetime.utcnow()
+    for match_id, home_id, away_id in upcoming:
+        projection = model.projection(home_id, away_id)
+        if projection is not None:
+            db.add(FixtureProjection(match_id=match_id, updated_at=now, **projection))
+    db.flush()
+
+    global _model_cache
+    _model_cache = None
+    return len(upcoming)
+
+
+_model_lock = threading.Lock()
+_model_cache: Optional[tuple[str, TeamModel]] = None
+
+
+def get_team_model(db: Session) -> TeamModel:
+    """TeamModel for the current data version, built from persisted ratings.
+
+    Falls back to fitting in-process when nothing has been persisted yet.
+    """
+    global _model_cache
+    version = current_versions(db, STATS, CATALOG)
+    cached = _model_cache
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _model_lock:
+        cached = _model_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = (
+            db.query(TeamStrength)
+            .filter(TeamStrength.attack_rating.isnot(None))
+            .all()
+        )
+        if rows:
+            model = TeamModel(
+                [r.team_id for r in rows],
+                np.array([r.attack_rating for r in rows], dtype=np.float32),
+                np.array([r.defence_rating for r in rows], dtype=np.float32),
+                rows[0].home_advantage or 0.0,
+            )
+        else:
+            model = fit_team_model(db)
+        _model_cache = (version, model)
+        return model
+
+
+def get_fixture_projections(db: Session, match_ids: list[str]) -> dict[str, dict]:
+    """Projections for `match_ids`, read from fixture_projections in one query."""
+    rows = db.query(FixtureProjection).filter(FixtureProjection.match_id.in_(match_ids)).all()
+    return {
+        r.match_id: {
+            "home_xg": r.home_xg,
+            "away_xg": r.away_xg,
+            "home_clean_sheet": r.home_clean_sheet,
+            "away_clean_sheet": r.away_clean_sheet,
+            "home_win": r.home_win,
+            "draw": r.draw,
+            "away_win": r.away_win,
+        }
+        for r in rows
+    }
@@ -19,6 +19,7 @@ from app.models.round import Round
 from app.models.squad import Squad
 from app.models.squad_player import SquadPlayer
 from app.models.squad_round_points import SquadRoundPoints
+from app.services import ownership_service
 
 
 def _current_round(db: Session) -> Round | None:
@@ -96,6 +97,27 @@ def make_transfer(
                     srp.points = (srp.points or 0) - 4
 
     # ── Execute transfer ──────────────────────────────────────────────────────
+    outgoing = (
+        db.query(SquadPlayer)
+        .filter(SquadPlayer.squad_id == squad_id, SquadPlayer.player_id == player_out_id)
+        .first()
+    )
+    ownership_service.record_transfer(
+        db,
+        squad.league_id,
+        player_out_id if outgoing is not None else None,
+        player_in_id,
+    )
+    if outgoing is not None:
+        # The armband leaves with the player
+        ownership_service.record_armband_change(
+            db,
+            squad.league_id,
+            player_out_id if outgoing.is_captain else None,
+            None,
+            player_out_id if outgoing.is_vice_captain else None,
+            None,
+        )
     db.query(SquadPlayer).filter(
         SquadPlayer.squad_id == squad_id, SquadPlayer.player_id == player_out_id
     ).delete()
@@ -18,6 +18,7 @@ from app.models.match import Match, MatchStatus
 from app.models.player import Player
 from app.models.round import Round
 from app.models.team import Team
+from app.services.data_version_service import CATALOG, STATS, bump_version
 
 POSITION_MAP = {
     "Goalkeeper": "GK",
@@ -198,6 +199,8 @@ def seed_worldcup(db: Session):
     seed_squads(db, client, api_to_db)
     seed_fixtures(db, client, api_to_db)
 
+    bump_version(db, CATALOG)
+    bump_version(db, STATS)
     db.commit()
     print("Seed complete!")
 
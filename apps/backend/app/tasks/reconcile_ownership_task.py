@@ -0,0 +1,32 @@
+"""
+reconcile_ownership_task.py
+
+Periodic safety net for the incrementally maintained ownership counters.
+Recomputes player ownership / captaincy from squad_players and corrects any
+drift left behind by concurrent writes or out-of-band edits.
+"""
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.services.ownership_service import reconcile_ownership
+
+log = logging.getLogger(__name__)
+
+
+def reconcile_ownership_counters() -> int:
+    """Reconcile ownership counters. Returns the number of corrected rows."""
+    db: Session = SessionLocal()
+    try:
+        corrected = reconcile_ownership(db)
+        db.commit()
+        if corrected:
+            log.info("Ownership reconciliation corrected %d rows", corrected)
+        return corrected
+    except Exception as exc:
+        db.rollback()
+        log.error("reconcile_ownership_counters failed: %s", exc)
+        return 0
+    finally:
+        db.close()
@@ -4,6 +4,7 @@ APScheduler-based background scheduler.
 Smart polling strategy:
   - Every 30 seconds: sync_live_scores() (when tournament is active)
   - On match finish: sync_match_stats() triggered immediately
+  - Every hour: reconcile_ownership_counters() corrects ownership drift
   - Runs in the same process as FastAPI; started/stopped via lifespan events.
 """
 import logging
@@ -11,6 +12,7 @@ import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
+from app.tasks.reconcile_ownership_task import reconcile_ownership_counters
 from app.tasks.sync_fixtures_task import sync_live_scores
 from app.tasks.sync_stats_task import sync_match_stats
 
@@ -38,6 +40,14 @@ def start_scheduler() -> None:
         max_instances=1,
         misfire_grace_time=10,
     )
+    _scheduler.add_job(
+        reconcile_ownership_counters,
+        trigger=IntervalTrigger(hours=1),
+        id="reconcile_ownership",
+        replace_existing=True,
+        max_instances=1,
+        misfire_grace_time=300,
+    )
     _scheduler.start()
     log.info("APScheduler started — polling every 30s")
 
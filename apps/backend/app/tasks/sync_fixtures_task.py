@@ -17,6 +17,7 @@ from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.integrations.football_data_client import FootballDataClient
 from app.models.match import Match, MatchStatus
+from app.services.data_version_service import STATS, bump_version
 
 log = logging.getLogger(__name__)
 
@@ -44,6 +45,7 @@ def sync_live_scores() -> list[int]:
         return []
 
     newly_finished: list[int] = []
+    status_changed = False
 
     db: Session = SessionLocal()
     try:
@@ -61,6 +63,7 @@ def sync_live_scores() -> list[int]:
                 continue
 
             was_live = match.status == MatchStatus.LIVE
+            status_changed = status_changed or match.status != new_status
             match.status = new_status
             if home_score is not None:
                 match.home_score = home_score
@@ -71,6 +74,8 @@ def sync_live_scores() -> list[int]:
                 newly_finished.append(match.id)
                 log.info("Match %s finished: %s-%s", match.id, home_score, away_score)
 
+        if status_changed:
+            bump_version(db, STATS)
         db.commit()
     except Exception as exc:
         db.rollback()
@@ -2,7 +2,11 @@
 sync_stats_task.py
 
 Triggered post-match (by sync_fixtures_task when a match finishes).
-Uses 1 API-Football call to fetch per-player stats, runs scoring, updates DB.
+Uses 1 API-Football call to fetch per-player stats, runs scoring, updates DB,
+then refreshes team strengths, refits the Poisson team model and bumps the
+stats data version so derived caches (FDR matrix etc.) rebuild once. Rolling
+form features are folded in for the players who appeared, stamped with the
+new version.
 """
 import logging
 
@@ -15,7 +19,11 @@ from app.models.player import Player
 from app.models.player_match_stats import PlayerMatchStats
 from app.models.squad_player import SquadPlayer
 from app.models.squad_round_points import SquadRoundPoints
+from app.services.data_version_service import STATS, bump_version
+from app.services.fdr_service import refresh_team_strengths
+from app.services.rolling_feature_service import update_rolling_features
 from app.services.scoring_service import compute_player_points
+from app.services.team_model_service import refit_team_model
 
 log = logging.getLogger(__name__)
 
@@ -91,6 +99,10 @@ def sync_match_stats(match_id: str) -> None:
 
         db.flush()
         _update_squad_round_points(match, db)
+        refresh_team_strengths(db)
+        refit_team_model(db)
+        bump_version(db, STATS)
+        update_rolling_features(db, match_id)
         db.commit()
         log.info("Stats synced for match %s", match_id)
 
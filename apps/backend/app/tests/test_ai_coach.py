@@ -1,3 +1,155 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+
+class _Session:
+    def close(self):
+        pass
+
+
 def test_ai_coach_placeholder():
     assert True
 
+
+def test_suggest_squad_runs_rl_planner_and_memory_concurrently(monkeypatch):
+    from app.rl import inference, player_pool
+    from app.rl.compute_pool import ComputePool
+    from app.schemas.ai_schemas import SquadBuilderRequest
+    from app.services import ai_coach_service
+
+    delay = 0.2
+    squad = {"player_ids": ["p1"], "explanation": "RL squad"}
+
+    async def rl_batched(db, budget):
+        await asyncio.sleep(delay / 2)
+        return dict(squad)
+
+    def optimal(db, **kwargs):
+        time.sleep(delay / 2)                               # blocking, on the compute pool
+        return dict(squad)
+
+    async def branches(player_context, squad_context, data_version):
+        await asyncio.sleep(delay)
+        return [{"name": "safe"}]
+
+    def lessons(query, n_results, decision_type):
+        time.sleep(delay)                                   # blocking ChromaDB call
+        return [{"lesson": "captain the penalty taker"}]
+
+    lookup_threads = []
+
+    def pool_lookup(db):
+        lookup_threads.append(threading.current_thread())
+        return SimpleNamespace(version="v1")
+
+    monkeypatch.setattr(inference, "_compute_pool", ComputePool(workers=0, session_factory=_Session))
+    monkeypatch.setattr(inference, "suggest_squad_rl_batched", rl_batched)
+    monkeypatch.setattr(inference, "suggest_squad_optimal", optimal)
+    monkeypatch.setattr(inference, "suggest_squads_beam", lambda db, budget: [])
+    monkeypatch.setattr(inference, "round_outlooks", lambda db, squads, risk: [{"mean": 50}] * len(squads))
+    monkeypatch.setattr(player_pool, "get_player_pool", pool_lookup)
+    monkeypatch.setattr(ai_coach_service, "_build_player_context", lambda pool: "")
+    monkeypatch.setattr(ai_coach_service, "generate_tot_branches", branches)
+    monkeypatch.setattr(ai_coach_service, "query_lessons", lessons)
+
+    payload = SquadBuilderRequest(league_id="l1", budget=100.0, preferred_formation="4-4-2", risk_profile="balanced")
+    start = time.perf_counter()
+    result = asyncio.run(ai_coach_service.suggest_squad(None, payload))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2 * delay                              # the stages in sequence take 3x delay
+    assert result["data"] == [{"name": "safe"}]
+    assert result["past_lessons"] == ["captain the penalty taker"]
+    assert result["optimal_squad"]["round_outlook"] == {"mean": 50}
+    # Pool lookups (a catalog rebuild after a version bump) never run on the event loop
+    assert lookup_threads and threading.main_thread() not in lookup_threads
+    inference._compute_pool.shutdown()
+
+
+def test_squad_candidates_runs_optimizer_and_beam_together(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    from app.rl import inference, player_pool
+    from app.rl.compute_pool import ComputePool
+    from app.schemas.ai_schemas import SquadBuilderRequest
+    from app.services import ai_coach_service
+
+    delay = 0.2
+    squad = {"player_ids": ["p1"]}
+
+    async def rl_batched(db, budget):
+        return dict(squad)
+
+    def optimal(db, budget, **kwargs):
+        time.sleep(delay)                                   # blocking, on the compute pool
+        if budget < 50:
+            raise ValueError("No legal squad fits the budget")
+        return dict(squad)
+
+    def beam(db, budget):
+        time.sleep(delay)
+        return [dict(squad), dict(squad)]
+
+    monkeypatch.setattr(inference, "_compute_pool", ComputePool(workers=0, session_factory=_Session))
+    monkeypatch.setattr(inference, "suggest_squad_rl_batched", rl_batched)
+    monkeypatch.setattr(inference, "suggest_squad_optimal", optimal)
+    monkeypatch.setattr(inference, "suggest_squads_beam", beam)
+    monkeypatch.setattr(inference, "round_outlooks", lambda db, squads, risk: [{"mean": 50}] * len(squads))
+    monkeypatch.setattr(player_pool, "get_player_pool", lambda db: None)
+
+    payload = SquadBuilderRequest(league_id="l1", budget=100.0, preferred_formation="4-4-2", risk_profile="balanced")
+    start = time.perf_counter()
+    _, optimal_squad, alternatives = asyncio.run(ai_coach_service._squad_candidates(None, payload))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.5 * delay                            # one after the other takes 2x delay
+    assert optimal_squad["round_outlook"] == {"mean": 50}
+    assert [a["round_outlook"] for a in alternatives] == [{"mean": 50}] * 2
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(ai_coach_service._squad_candidates(None, payload.model_copy(update={"budget": 20.0})))
+    assert exc.value.status_code == 400
+    inference._compute_pool.shutdown()
+
+
+def test_stream_squad_sends_branches_before_slow_stages_and_reports_errors(monkeypatch):
+    from fastapi import HTTPException
+
+    from app.rl import inference, player_pool
+    from app.rl.compute_pool import ComputePool
+    from app.schemas.ai_schemas import SquadBuilderRequest
+    from app.services import ai_coach_service
+
+    async def branches(player_context, squad_context, data_version):
+        for name in ("safe", "differential", "fixture"):
+            await asyncio.sleep(0.01)
+            yield {"branch": name}
+
+    async def candidates(db, payload):
+        await asyncio.sleep(0.1)
+        raise HTTPException(status_code=400, detail="no squad fits the budget")
+
+    async def past_lessons(query, decision_type):
+        await asyncio.sleep(0.05)
+        return ["captain the penalty taker"]
+
+    monkeypatch.setattr(inference, "_compute_pool", ComputePool(workers=0, session_factory=_Session))
+    monkeypatch.setattr(player_pool, "get_player_pool", lambda db: SimpleNamespace(version="v1"))
+    monkeypatch.setattr(ai_coach_service, "_build_player_context", lambda pool: "")
+    monkeypatch.setattr(ai_coach_service, "stream_tot_branches", branches)
+    monkeypatch.setattr(ai_coach_service, "_squad_candidates", candidates)
+    monkeypatch.setattr(ai_coach_service, "_past_lessons", past_lessons)
+
+    payload = SquadBuilderRequest(league_id="l1", budget=80.0, preferred_formation="4-4-2", risk_profile="balanced")
+
+    async def main():
+        return [event async for event in ai_coach_service.stream_squad(None, payload)]
+
+    events = asyncio.run(main())
+    inference._compute_pool.shutdown()
+    assert [name for name, _ in events] == ["branch", "branch", "branch", "lessons", "error", "done"]
+    assert [data["index"] for name, data in events if name == "branch"] == [0, 1, 2]
+    assert events[3][1] == {"past_lessons": ["captain the penalty taker"]}
+    assert events[4][1] == {"status_code": 400, "detail": "no squad fits the budget"}
@@ -0,0 +1,155 @@
+"""
+Tests for micro-batched policy inference (app/rl/batch_scheduler.py).
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.player import Player
+from app.models.team import Team
+
+
+def _obs(n_players, seed=0):
+    from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+    env = FantasyEnv(_generate_random_pool(n_players), _generate_team_ids(n_players))
+    obs, _ = env.reset(seed=seed)
+    return obs
+
+
+def _only(n_players, action):
+    """A mask allowing only `action` (pools are padded to at least MAX_PLAYERS)."""
+    from app.rl.environment import MAX_PLAYERS
+    mask = np.zeros(max(n_players, MAX_PLAYERS), dtype=bool)
+    mask[action] = True
+    return mask
+
+
+def test_shared_pool_forward_matches_full_forward():
+    from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+    from app.rl.executor_policy import FantasyPolicy
+
+    env = FantasyEnv(_generate_random_pool(300), _generate_team_ids(300))
+    obs, _ = env.reset(seed=0)
+    rows = [obs.copy()]
+    for action in np.flatnonzero(env.action_masks())[:4]:
+        obs, _, _, _, _ = env.step(int(action))
+        rows.append(obs.copy())
+    batch = np.stack(rows)
+
+    policy = FantasyPolicy(seed=3)
+    np.testing.assert_allclose(policy.forward_shared_pool(batch), policy.forward(batch), rtol=1e-5, atol=1e-5)
+
+
+def test_concurrent_steps_share_one_forward_pass():
+    from app.rl.batch_scheduler import PolicyBatchScheduler
+    from app.rl.executor_policy import FantasyPolicy
+
+    policy = FantasyPolicy(seed=0)
+    scheduler = PolicyBatchScheduler(lambda: policy, window_ms=50.0, seed=0)
+    obs = _obs(200)
+
+    async def burst():
+        return await asyncio.gather(*[scheduler.select_action(obs, _only(200, a)) for a in range(0, 160, 20)])
+
+    assert asyncio.run(burst()) == list(range(0, 160, 20))
+    assert scheduler.batches == 1 and scheduler.steps == 8
+    assert scheduler.stats()["mean_batch_size"] == 8.0
+
+
+def test_full_batch_flushes_before_the_window():
+    from app.rl.batch_scheduler import PolicyBatchScheduler
+    from app.rl.executor_policy import FantasyPolicy
+
+    policy = FantasyPolicy(seed=0)
+    scheduler = PolicyBatchScheduler(lambda: policy, window_ms=10_000.0, max_batch=4)
+    obs = _obs(100)
+
+    async def burst():
+        return await asyncio.wait_for(
+            asyncio.gather(*[scheduler.select_action(obs, _only(100, a)) for a in range(8)]), timeout=5
+        )
+
+    assert asyncio.run(burst()) == list(range(8))
+    assert scheduler.batches == 2 and scheduler.max_batch_seen == 4
+
+
+def test_pool_sizes_are_batched_separately():
+    from app.rl.batch_scheduler import PolicyBatchScheduler
+    from app.rl.executor_policy import FantasyPolicy
+
+    policy = FantasyPolicy(seed=0)
+    scheduler = PolicyBatchScheduler(lambda: policy, window_ms=20.0)
+    small, large = _obs(300), _obs(700)
+
+    async def burst():
+        return await asyncio.gather(
+            scheduler.select_action(small, _only(300, 7)),
+            scheduler.select_action(large, _only(700, 650)),
+            scheduler.select_action(small, _only(300, 9)),
+        )
+
+    assert asyncio.run(burst()) == [7, 650, 9]
+    assert scheduler.batches == 2
+
+
+def test_policy_errors_reach_every_caller():
+    from app.rl.batch_scheduler import PolicyBatchScheduler
+
+    class Broken:
+        def select_actions(self, obs, masks, rng, shared_pool=False):
+            raise RuntimeError("bad checkpoint")
+
+    scheduler = PolicyBatchScheduler(lambda: Broken(), window_ms=5.0)
+    obs = _obs(100)
+
+    async def burst():
+        return await asyncio.gather(
+            *[scheduler.select_action(obs, _only(100, a)) for a in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def test_batched_squad_builder_requests(db, monkeypatch):
+    from app.rl import inference
+    from app.rl.batch_scheduler import PolicyBatchScheduler
+
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(40)])
+    db.flush()
+    positions = ["GK"] * 12 + ["DEF"] * 30 + ["MID"] * 30 + ["FWD"] * 18
+    db.add_all([
+        Player(id=f"p{i:03d}", external_id=f"p{i}", team_id=f"t{i % 40}", name=f"P{i}",
+               position=pos, price=4.0 + (i % 3) * 0.5, is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    db.commit()
+    scheduler = PolicyBatchScheduler(inference._get_policy, window_ms=5.0, seed=1)
+    monkeypatch.setattr(inference, "_scheduler", scheduler)
+
+    async def burst():
+        return await asyncio.gather(*[inference.suggest_squad_rl_batched(db, budget=100.0) for _ in range(6)])
+
+    squads = asyncio.run(burst())
+    for squad in squads:
+        assert len(squad["player_ids"]) == 15
+        assert squad["positions"] == {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+        assert squad["budget_remaining"] >= 0
+    # 6 requests × 15 picks, evaluated in lock-step
+    assert scheduler.steps == 90
+    assert scheduler.batches < 90
@@ -0,0 +1,20 @@
+"""
+Tests for the benchmark suite's regression check (benchmarks/bench_suite.py).
+"""
+
+
+def test_regressions_respect_metric_direction_and_tolerance():
+    from benchmarks.bench_suite import compare_results
+
+    baseline = {"env_steps_per_sec": 1000.0, "mask_us": 10.0, "forward_single_ms": 1.0, "retired_metric": 5.0}
+    metrics = {"env_steps_per_sec": 800.0, "mask_us": 11.0, "forward_single_ms": 0.5, "new_metric": 1.0}
+    rows = {row["metric"]: row for row in compare_results(metrics, baseline)}
+
+    assert set(rows) == {"env_steps_per_sec", "mask_us", "forward_single_ms"}
+    assert rows["env_steps_per_sec"]["regressed"]           # 20% slower, 15% allowed
+    assert not rows["mask_us"]["regressed"]                  # 10% slower, 20% allowed
+    assert not rows["forward_single_ms"]["regressed"]        # faster
+    assert rows["forward_single_ms"]["change"] == -0.5
+
+    strict = {row["metric"]: row["regressed"] for row in compare_results(metrics, baseline, tolerance=0.05)}
+    assert strict == {"env_steps_per_sec": True, "mask_us": True, "forward_single_ms": False}
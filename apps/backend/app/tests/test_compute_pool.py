@@ -0,0 +1,117 @@
+"""
+Tests for the bounded AI compute pool (app/rl/compute_pool.py).
+"""
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+
+def _add(db, a, b=0):
+    return (type(db).__name__, a + b, os.getpid())
+
+
+def _fail(db):
+    raise ValueError("no squad fits the budget")
+
+
+class _Session:
+    opened = []
+
+    def __init__(self):
+        self.closed = False
+        _Session.opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+
+def test_thread_mode_opens_a_session_per_task_and_propagates_errors():
+    from app.rl.compute_pool import ComputePool
+
+    _Session.opened.clear()
+    pool = ComputePool(workers=0, session_factory=_Session)
+
+    async def main():
+        result = await pool.run(_add, 2, b=3)
+        with pytest.raises(ValueError, match="budget"):
+            await pool.run(_fail)
+        return result
+
+    try:
+        assert asyncio.run(main()) == ("_Session", 5, os.getpid())
+    finally:
+        pool.shutdown()
+    assert len(_Session.opened) == 2 and all(s.closed for s in _Session.opened)
+    stats = pool.stats()
+    assert stats["mode"] == "threads" and stats["in_flight"] == 0
+    assert (stats["submitted"], stats["completed"], stats["failed"]) == (2, 1, 1)
+
+
+def test_queue_is_bounded():
+    from app.rl.compute_pool import INLINE_THREADS, ComputePool, ComputePoolFull
+
+    release = threading.Event()
+    pool = ComputePool(workers=0, max_queue=1, timeout_s=5.0, session_factory=_Session)
+
+    def blocked(db):
+        release.wait(5)
+        return "done"
+
+    async def main():
+        tasks = [asyncio.create_task(pool.run(blocked)) for _ in range(INLINE_THREADS + 1)]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queue_depth"] == 1
+        with pytest.raises(ComputePoolFull):
+            await pool.run(blocked)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    try:
+        assert asyncio.run(main()) == ["done"] * (INLINE_THREADS + 1)
+    finally:
+        pool.shutdown()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_timeout_keeps_the_slot_and_the_tasks_own_session_until_it_ends():
+    from app.rl.compute_pool import ComputePool, ComputeTimeout
+
+    _Session.opened.clear()
+    pool = ComputePool(workers=0, max_queue=0, session_factory=_Session)
+
+    async def main():
+        with pytest.raises(ComputeTimeout):
+            await pool.run(lambda db: time.sleep(0.2), timeout=0.02)
+        assert pool.stats()["in_flight"] == 1         # still running in its thread
+        assert not _Session.opened[0].closed          # ...on its own session, not the caller's
+        await asyncio.sleep(0.3)
+        assert _Session.opened[0].closed
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["in_flight"] == 0 and stats["completed"] == 1
+
+
+def test_process_workers_run_off_the_main_process():
+    from app.rl.compute_pool import ComputePool
+
+    pool = ComputePool(workers=1, timeout_s=60.0)
+    pool.start()
+
+    async def main():
+        return await asyncio.gather(pool.run(_add, 1), pool.run(_add, 2))
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert [r[1] for r in results] == [1, 2]
+    assert all(r[2] != os.getpid() for r in results)
+    assert all(r[0] == "Session" for r in results)    # each task got the worker's own session
+    assert pool.stats()["mode"] == "processes"
@@ -0,0 +1,106 @@
+"""
+Tests for the columnar episode store and replay mode (app/rl/episode_store.py).
+"""
+import pickle
+
+import numpy as np
+import pytest
+
+
+def _appearances(n_rounds=3, n_players=40, seed=0):
+    """Per-appearance rows: every player appears in every round, two teams per 'match'."""
+    rng = np.random.default_rng(seed)
+    rounds = np.repeat(np.arange(n_rounds), n_players)
+    players = np.tile(np.arange(n_players), n_rounds)
+    return {
+        "round_keys": np.array([f"2022-11-{20 + r:02d} WC {r}" for r in rounds]),
+        "player_keys": np.array([f"p{p}" for p in players]),
+        "team_keys": np.array([f"t{p % 10}" for p in players]),
+        "positions": np.resize([0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 2], len(players)),
+        "goals": rng.poisson(0.3, len(players)).astype(float),
+        "assists": rng.poisson(0.2, len(players)).astype(float),
+        "minutes": rng.integers(0, 91, len(players)).astype(float),
+        "saves": rng.integers(0, 4, len(players)).astype(float),
+        "points": rng.integers(-2, 13, len(players)).astype(float),
+    }
+
+
+def test_store_roundtrip_is_memory_mapped(tmp_path):
+    from app.rl.episode_store import EpisodeStore, write_episode_store
+
+    rows = _appearances()
+    EpisodeStore(write_episode_store(tmp_path / "episodes", **rows))        # replaced on rewrite
+    store = EpisodeStore(write_episode_store(tmp_path / "episodes", **rows))
+    assert len(store) == 3 and store.max_round_size == 40
+    assert store.labels == sorted(set(rows["round_keys"]))
+    assert [p.name for p in tmp_path.iterdir()] == ["episodes"]
+
+    features, team, points = store.round(1)
+    assert isinstance(store.features, np.memmap)
+    assert np.shares_memory(features, store.features)                      # views, no copies
+    assert features.shape == (40, 8) and team.shape == points.shape == (40,)
+    keys = np.unique(rows["player_keys"])[store.player[store.offsets[1]:store.offsets[2]]]
+    expected = rows["points"][40:80][[int(k[1:]) for k in keys]]
+    np.testing.assert_array_equal(points, expected)
+
+    clone = pickle.loads(pickle.dumps(store))
+    assert clone.root == store.root and len(clone) == 3
+
+
+def test_features_use_earlier_rounds_only(tmp_path):
+    from app.rl.episode_store import EpisodeStore, write_episode_store
+
+    # Player "a" (FWD) scores 10 then 4 then 7; a duplicate row in round 2 is summed
+    rows = dict(
+        round_keys=np.array(["r1", "r2", "r2", "r3"]),
+        player_keys=np.array(["a", "a", "a", "a"]),
+        team_keys=np.array(["t", "t", "t", "t"]),
+        positions=np.array([3, 3, 3, 3]),
+        goals=np.array([2.0, 0.0, 1.0, 1.0]),
+        assists=np.zeros(4),
+        minutes=np.array([90.0, 45.0, 0.0, 60.0]),
+        saves=np.zeros(4),
+        points=np.array([10.0, 1.0, 3.0, 7.0]),
+    )
+    store = EpisodeStore(write_episode_store(tmp_path / "s", **rows))
+    first, second, third = (store.round(r) for r in range(3))
+    np.testing.assert_array_equal(first[0][0], [3, 6.5, 0, 0, 0, 0, 0, 0])  # no history yet
+    assert second[2][0] == 4.0
+    assert second[0][0][2] == pytest.approx(10.0) and second[0][0][3] == 2
+    assert third[0][0][2] == pytest.approx(7.0)                            # (10 + 4) / 2
+    assert third[0][0][5] == pytest.approx(67.5)
+    assert third[0][0][1] == pytest.approx(6.5 + 0.5 * 7.0)
+
+    thin = EpisodeStore(write_episode_store(tmp_path / "thin", **rows, min_round_size=2))
+    assert len(thin) == 0
+
+
+def test_replay_env_rewards_realised_points(tmp_path):
+    from app.rl.environment import FantasyEnv, SQUAD_SIZE
+    from app.rl.episode_store import EpisodeStore, write_episode_store
+    from app.rl.vec_env import VecFantasyEnv
+
+    store = EpisodeStore(write_episode_store(tmp_path / "episodes", **_appearances(n_players=60)))
+    env = FantasyEnv(episodes=store)
+    obs, info = env.reset(seed=0, options={"round": 2})
+    assert info["round"] == store.labels[2] and obs.shape == env.observation_space.shape
+    _, _, realised = store.round(2)
+
+    info = {}
+    while "squad_points" not in info:
+        action = int(np.argmin(np.where(env.action_masks(), env.player_pool[:, 1], np.inf)))   # cheapest
+        _, _, terminated, _, info = env.step(action)
+        assert not info.get("incomplete_squad")
+    assert len(env.squad) == SQUAD_SIZE
+    assert info["squad_points"] == pytest.approx(float(realised[env.squad].sum()))
+
+    vec = VecFantasyEnv(4, episodes=store, seed=1)
+    assert vec.obs_dim == env.observation_space.shape[0]
+    _, info = vec.reset(round_index=2)
+    for _ in range(SQUAD_SIZE):
+        actions = np.argmin(np.where(vec.action_masks(), vec.player_pool[:, 1], np.inf), axis=1)
+        squads = vec.squads.copy()
+        _, _, terminated, _, infos = vec.step(actions)
+    assert terminated.all()
+    squad = np.r_[squads[0, :SQUAD_SIZE - 1], actions[0]]
+    np.testing.assert_allclose(infos["squad_points"], realised[squad].sum())
@@ -3,6 +3,7 @@ import uuid
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
@@ -111,6 +112,27 @@ def test_build_player_features_nonexistent(db):
     assert features is None
 
 
+def test_build_features_batch_matches_single(db, seed_data):
+    from app.services.feature_service import BATCH_FEATURE_COLUMNS, build_features_batch, build_player_features
+    ids = ["p3", "p1", "p2", "p4"]
+    matrix = build_features_batch(db, ids)
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (4, len(BATCH_FEATURE_COLUMNS))
+    assert matrix.flags["C_CONTIGUOUS"]
+    for row, pid in zip(matrix, ids):
+        single = build_player_features(pid, db)
+        for col, value in zip(BATCH_FEATURE_COLUMNS, row):
+            assert value == pytest.approx(single[col]), (pid, col)
+
+
+def test_build_features_batch_unknown_rows_are_zero(db, seed_data):
+    from app.services.feature_service import build_features_batch
+    matrix = build_features_batch(db, ["p1", "nonexistent"])
+    assert matrix[0].any()
+    assert not matrix[1].any()
+    assert build_features_batch(db, []).shape[0] == 0
+
+
 # ───── fdr_service tests ─────
 
 def test_compute_fdr_returns_rating(db, seed_data):
@@ -168,3 +190,87 @@ def test_get_player_form_nonexistent(db):
     from app.services.feature_service import get_player_form
     form = get_player_form("nonexistent", db)
     assert form is None
+
+
+# ───── batched form tests ─────
+
+def test_get_players_form_batch_matches_single(db, seed_data):
+    from app.services.feature_service import get_player_form, get_players_form_batch
+    forms = get_players_form_batch(["p1", "p2", "p3", "p4"], db)
+    for pid in ("p1", "p2", "p3", "p4"):
+        assert forms[pid] == get_player_form(pid, db)
+
+
+def test_get_players_form_batch_skips_unknown(db, seed_data):
+    from app.services.feature_service import get_players_form_batch
+    forms = get_players_form_batch(["p1", "nonexistent"], db)
+    assert set(forms) == {"p1"}
+    assert forms["p1"]["last5Points"] == [10, 5]  # chronological
+    assert forms["p1"]["totalPointsThisTournament"] == 15
+
+
+def test_get_players_form_batch_constant_queries(db, seed_data):
+    """Query count must not grow with the number of players."""
+    from sqlalchemy import event
+    from app.services.feature_service import get_players_form_batch
+
+    statements = []
+
+    def _count(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    get_players_form_batch(["p1"], db)  # warm the FDR matrix cache
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        get_players_form_batch(["p1"], db)
+        single = len(statements)
+        statements.clear()
+        get_players_form_batch(["p1", "p2", "p3", "p4"], db)
+        assert len(statements) == single
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
+# ───── team strengths / FDR matrix tests ─────
+
+def test_refresh_team_strengths_persists(db, seed_data):
+    from app.models.team_strength import TeamStrength
+    from app.services.fdr_service import refresh_team_strengths
+    assert refresh_team_strengths(db) == 2
+    t1 = db.get(TeamStrength, "t1")
+    # t1: 2-1 home win, 0-0 away draw
+    assert (t1.matches_played, t1.goals_for, t1.goals_against) == (2, 2, 1)
+    assert t1.attack == 1.0
+    assert t1.defence == 0.5
+
+
+def test_fdr_matrix_layout(db, seed_data):
+    from app.services.fdr_service import get_fdr_matrix
+    matrix = get_fdr_matrix(db)
+    t1, t2 = matrix.team_index["t1"], matrix.team_index["t2"]
+    # Only m3 is upcoming: t1 (home) vs t2
+    assert matrix.opponents[t1, 0] == t2
+    assert matrix.opponents[t2, 0] == t1
+    assert matrix.is_home[t1, 0] and not matrix.is_home[t2, 0]
+    assert (matrix.opponents[:, 1:] == -1).all()
+    assert matrix.fdr[t1, 0] == matrix.opponent_fdr[t2]
+    assert matrix.upcoming("t1") == [{"opponent_id": "t2", "is_home": True, "fdr": int(matrix.fdr[t1, 0])}]
+
+
+def test_fdr_matrix_cached_until_version_bump(db, seed_data):
+    from app.services.data_version_service import STATS, bump_version
+    from app.services.fdr_service import compute_fdr, get_fdr_matrix
+
+    first = get_fdr_matrix(db)
+    assert get_fdr_matrix(db) is first
+    assert compute_fdr("t1", "t2", db) == 2  # t2 scored 1 in 2 matches
+
+    # t2 wins big — not visible until the stats version is bumped
+    m = db.get(Match, "m2")
+    m.home_score = 6
+    db.flush()
+    assert compute_fdr("t1", "t2", db) == 2
+    bump_version(db, STATS)
+    assert get_fdr_matrix(db) is not first
+    assert compute_fdr("t1", "t2", db) == 5  # 7 goals in 2 matches
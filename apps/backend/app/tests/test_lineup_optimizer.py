@@ -0,0 +1,113 @@
+"""
+Tests for the formation-aware lineup solver (app/rl/lineup_optimizer.py).
+"""
+import itertools
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.player import Player
+from app.models.team import Team
+
+SQUAD_POSITIONS = np.array([0] * 2 + [1] * 5 + [2] * 5 + [3] * 3)
+
+
+def _brute_force(points, positions):
+    from app.rl.lineup_optimizer import CAPTAIN_BONUS, FORMATION_COUNTS, VICE_BONUS
+    best = -np.inf
+    groups = [np.flatnonzero(positions == p) for p in range(4)]
+    for counts in FORMATION_COUNTS:
+        for combo in itertools.product(*[itertools.combinations(g, k) for g, k in zip(groups, counts)]):
+            xi = np.sort(points[np.concatenate(combo)])[::-1]
+            best = max(best, xi.sum() + CAPTAIN_BONUS * xi[0] + VICE_BONUS * xi[1])
+    return best
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lineup_matches_brute_force(seed):
+    from app.rl.lineup_optimizer import FORMATION_COUNTS, solve_lineups
+
+    points = np.random.default_rng(seed).uniform(0, 10, 15).round(1)
+    result = solve_lineups(points, SQUAD_POSITIONS)
+    assert result.expected_points[0] == pytest.approx(_brute_force(points, SQUAD_POSITIONS))
+
+    xi = result.starting[0]
+    assert xi.sum() == 11
+    assert np.bincount(SQUAD_POSITIONS[xi], minlength=4).tolist() == FORMATION_COUNTS[result.formation[0]].tolist()
+    starters = np.flatnonzero(xi)
+    assert points[result.captain[0]] == points[starters].max()
+    assert result.captain[0] != result.vice_captain[0] and xi[result.vice_captain[0]]
+    bench = result.bench[0]
+    assert sorted(bench.tolist()) == np.flatnonzero(~xi).tolist()
+    assert SQUAD_POSITIONS[bench[0]] == 0  # bench goalkeeper first
+
+
+def test_batched_matches_single_squads():
+    from app.rl.lineup_optimizer import solve_lineups
+
+    rng = np.random.default_rng(7)
+    points = rng.uniform(0, 10, (64, 15))
+    positions = np.array([rng.permutation(SQUAD_POSITIONS) for _ in range(64)])
+    batch = solve_lineups(points, positions)
+    for i in range(0, 64, 9):
+        single = solve_lineups(points[i], positions[i])
+        assert single.formation[0] == batch.formation[i]
+        np.testing.assert_array_equal(single.starting[0], batch.starting[i])
+        assert single.expected_points[0] == pytest.approx(batch.expected_points[i])
+
+
+def test_incomplete_squad_has_no_formation():
+    from app.rl.lineup_optimizer import best_lineup
+
+    ids = [f"p{i}" for i in range(12)]
+    positions = ["DEF"] * 6 + ["MID"] * 4 + ["FWD"] * 2    # no goalkeeper
+    result = best_lineup(ids, positions, np.ones(12))
+    assert result["formation"] is None
+    assert result["starting"] == []
+
+
+def test_best_lineup_prefers_attacking_formation():
+    from app.rl.lineup_optimizer import best_lineup
+
+    positions = ["GK"] * 2 + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+    points = np.array([5, 1] + [2] * 5 + [4] * 5 + [8, 7, 6], dtype=float)
+    ids = [f"p{i:02d}" for i in range(15)]
+    result = best_lineup(ids, positions, points)
+    assert result["formation"] == "3-4-3"
+    assert result["captain_id"] == "p12" and result["vice_captain_id"] == "p13"
+    assert result["bench"][0] == "p01"
+    assert len(result["starting"]) == 11 and len(result["bench"]) == 4
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def test_suggest_lineup_rl_uses_formations(db):
+    from app.rl.inference import suggest_lineup_rl
+
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(8)])
+    db.flush()
+    positions = ["GK"] * 2 + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+    db.add_all([
+        Player(id=f"p{i:02d}", external_id=f"p{i}", team_id=f"t{i % 8}", name=f"P{i}",
+               position=pos, price=5.0, is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    db.commit()
+
+    result = suggest_lineup_rl(db, [f"p{i:02d}" for i in range(15)])
+    assert result["formation"] in ("4-4-2", "4-3-3", "3-4-3", "3-5-2", "4-5-1", "5-4-1", "5-3-2")
+    assert len(result["starting"]) == 11 and len(result["bench"]) == 4
+    assert result["captain_id"] in result["starting"]
+    assert result["vice_captain_id"] in result["starting"]
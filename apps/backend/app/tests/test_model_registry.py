@@ -0,0 +1,114 @@
+"""
+Tests for the versioned policy model registry (app/rl/model_registry.py).
+"""
+import numpy as np
+import pytest
+
+
+def _obs(seed=0):
+    from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+    env = FantasyEnv(_generate_random_pool(250), _generate_team_ids(250))
+    obs, _ = env.reset(seed=seed)
+    return obs
+
+
+def test_publish_and_mmap_load_roundtrip(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import PARAM_NAMES, FantasyPolicy
+
+    policy = FantasyPolicy(seed=1)
+    policy.w_v = np.full_like(policy.w_v, 0.5)
+    version = model_registry.publish(policy, tmp_path, metadata={"mean_return": 101.5})
+
+    assert model_registry.live_version(tmp_path) == version
+    [meta] = model_registry.list_versions(tmp_path)
+    assert meta["version"] == version and meta["mean_return"] == 101.5
+    assert meta["params"]["w_e"] == list(policy.w_e.shape)
+
+    loaded = model_registry.load_version(tmp_path, version)
+    for name in PARAM_NAMES:
+        assert isinstance(getattr(loaded, name), np.memmap)
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(policy, name))
+    obs = _obs()
+    np.testing.assert_allclose(loaded.forward(obs), policy.forward(obs))
+    with pytest.raises(ValueError):
+        loaded.w_e[0, 0] = 1.0   # read-only mapping: shared pages are never written
+
+
+def test_registry_hot_swaps_and_rolls_back(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import FantasyPolicy
+
+    registry = model_registry.ModelRegistry(tmp_path, check_interval=0.0)
+    first = model_registry.publish(FantasyPolicy(seed=1), tmp_path)
+    served = registry.policy()
+    assert registry.version == first
+    assert registry.policy() is served          # unchanged LIVE: no reload
+
+    second = model_registry.publish(FantasyPolicy(seed=2), tmp_path)
+    assert registry.policy() is not served
+    assert registry.status()["version"] == second
+
+    model_registry.set_live(tmp_path, first)
+    registry.policy()
+    assert registry.version == first
+    with pytest.raises(ValueError):
+        model_registry.set_live(tmp_path, "no-such-version")
+
+
+def test_check_interval_defers_pickup(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import FantasyPolicy
+
+    first = model_registry.publish(FantasyPolicy(seed=1), tmp_path)
+    registry = model_registry.ModelRegistry(tmp_path, check_interval=3600.0)
+    registry.policy()
+    model_registry.publish(FantasyPolicy(seed=2), tmp_path)
+    registry.policy()
+    assert registry.version == first
+
+
+def test_broken_live_version_keeps_serving_previous(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import FantasyPolicy
+
+    good = model_registry.publish(FantasyPolicy(seed=1), tmp_path)
+    registry = model_registry.ModelRegistry(tmp_path, check_interval=0.0)
+    registry.policy()
+
+    bad = model_registry.publish(FantasyPolicy(seed=2), tmp_path, make_live=False)
+    (tmp_path / model_registry.VERSIONS_DIR / bad / "w_e.npy").unlink()
+    model_registry.set_live(tmp_path, bad)
+    registry.policy()
+    assert registry.version == good
+
+
+def test_fallbacks_when_registry_is_empty(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import FantasyPolicy
+
+    registry = model_registry.ModelRegistry(tmp_path / "empty", fallback_path=str(tmp_path / "missing.npz"))
+    registry.policy()
+    assert registry.version == model_registry.UNTRAINED
+
+    checkpoint = tmp_path / "rl_executor.npz"
+    FantasyPolicy(seed=4).save(str(checkpoint))
+    registry = model_registry.ModelRegistry(tmp_path / "empty", fallback_path=str(checkpoint), check_interval=0.0)
+    registry.policy()
+    assert registry.version == "file:rl_executor.npz"
+
+    # Publishing a version later is picked up over the fallback
+    version = model_registry.publish(FantasyPolicy(seed=5), tmp_path / "empty")
+    registry.policy()
+    assert registry.version == version
+
+
+def test_incomplete_staging_dirs_are_ignored(tmp_path):
+    from app.rl import model_registry
+    from app.rl.executor_policy import FantasyPolicy
+
+    version = model_registry.publish(FantasyPolicy(seed=1), tmp_path, version="v1")
+    (tmp_path / model_registry.VERSIONS_DIR / ".v2.deadbeef.tmp").mkdir()
+    assert [m["version"] for m in model_registry.list_versions(tmp_path)] == [version]
+    with pytest.raises(ValueError):
+        model_registry.publish(FantasyPolicy(seed=2), tmp_path, version="v1")
@@ -0,0 +1,96 @@
+"""
+Tests for the shared, rate-limited Ollama client (app/integrations/ollama_client.py).
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+def _completion(text):
+    return {"choices": [{"message": {"content": text}}]}
+
+
+def _client(handler, **kwargs):
+    from app.integrations.ollama_client import OllamaClient
+
+    return OllamaClient("http://ollama:11434/v1", "wc26-planner", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_chat_posts_to_the_openai_endpoint_and_reuses_one_client():
+    seen = []
+
+    def handler(request):
+        seen.append((str(request.url), json.loads(request.content)))
+        return httpx.Response(200, json=_completion("hello"))
+
+    client = _client(handler)
+
+    async def main():
+        first = await client.chat("system", "user")
+        pool = client._client
+        second = await client.chat("system", "again")
+        assert client._client is pool
+        await client.aclose()
+        return first, second
+
+    assert asyncio.run(main()) == ("hello", "hello")
+    assert seen[0][0] == "http://ollama:11434/v1/chat/completions"
+    assert seen[0][1]["model"] == "wc26-planner"
+    assert [m["role"] for m in seen[0][1]["messages"]] == ["system", "user"]
+    assert client.stats()["completed"] == 2
+
+
+def test_concurrency_is_capped_and_full_queue_rejects_fast():
+    from app.integrations.ollama_client import OllamaBusy
+
+    active, peak = [0], [0]
+
+    async def handler(request):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return httpx.Response(200, json=_completion("ok"))
+
+    client = _client(handler, max_concurrency=2, max_queue=2)
+
+    async def main():
+        results = await asyncio.gather(*(client.chat("s", str(i)) for i in range(6)), return_exceptions=True)
+        await client.aclose()
+        return results
+
+    results = asyncio.run(main())
+    assert peak[0] == 2
+    assert results.count("ok") == 4
+    assert sum(isinstance(r, OllamaBusy) for r in results) == 2
+    stats = client.stats()
+    assert (stats["rejected"], stats["completed"], stats["active"], stats["waiting"]) == (2, 4, 0, 0)
+    assert stats["wait_ms_p95"] > 0 and stats["generation_ms_p50"] > 0
+
+
+def test_queue_wait_times_out_and_errors_free_the_slot():
+    from app.integrations.ollama_client import OllamaBusy
+
+    async def handler(request):
+        if request.content and b"slow" in request.content:
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json=_completion("slow"))
+        return httpx.Response(500)
+
+    client = _client(handler, max_concurrency=1, queue_timeout_s=0.02)
+
+    async def main():
+        slow = asyncio.create_task(client.chat("s", "slow"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(OllamaBusy):
+            await client.chat("s", "fast")
+        assert await slow == "slow"
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.chat("s", "fast")
+        await client.aclose()
+
+    asyncio.run(main())
+    stats = client.stats()
+    assert (stats["queue_timeouts"], stats["failed"], stats["active"]) == (1, 1, 0)
@@ -0,0 +1,227 @@
+"""
+Tests for ownership_service — incremental counters maintained by squad
+creation, lineup changes and transfers, plus drift reconciliation.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.league import League
+from app.models.player import Player
+from app.models.player_ownership import GLOBAL_SCOPE, PlayerOwnership
+from app.models.round import Round
+from app.models.squad_player import SquadPlayer
+from app.models.team import Team
+from app.models.user import User
+from app.schemas.squad_schemas import LineupUpdateRequest, SquadPlayerLine
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def _uid():
+    return str(uuid.uuid4())
+
+
+@pytest.fixture()
+def world(db):
+    """Two users in one league and a 20-player catalog spread over 10 teams."""
+    users = [User(id=_uid(), email=f"{_uid()}@test.com", username=f"u{i}", password_hash="x") for i in range(2)]
+    db.add_all(users)
+    db.flush()
+    league = League(id=_uid(), name="L", code=_uid()[:6], owner_id=users[0].id)
+    teams = [Team(id=_uid(), external_id=_uid(), name=f"T{i}", country_code=f"T{i}") for i in range(10)]
+    db.add_all([league, *teams])
+    db.flush()
+
+    positions = ["GK"] * 3 + ["DEF"] * 6 + ["MID"] * 6 + ["FWD"] * 5
+    players = [
+        Player(id=f"p{i:02d}", external_id=_uid(), team_id=teams[i % 10].id, name=f"P{i}",
+               position=pos, price=Decimal("5.0"), is_active=True)
+        for i, pos in enumerate(positions)
+    ]
+    db.add_all(players)
+    db.commit()
+    return {"users": users, "league": league, "players": players}
+
+
+def _squad_ids(players):
+    by_pos = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+    picked = []
+    for p in players:
+        if by_pos.get(p.position, 0) > 0:
+            picked.append(p.id)
+            by_pos[p.position] -= 1
+    return picked
+
+
+def _counter(db, player_id, scope):
+    row = (
+        db.query(PlayerOwnership)
+        .filter(PlayerOwnership.player_id == player_id, PlayerOwnership.scope == scope)
+        .first()
+    )
+    return (row.owners, row.captains, row.vice_captains) if row else (0, 0, 0)
+
+
+def test_create_squad_counts_owners_and_armbands(db, world):
+    from app.services.ownership_service import get_ownership
+    from app.services.squad_service import create_squad
+
+    ids = _squad_ids(world["players"])
+    squad = create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+
+    stats = {s["player_id"]: s for s in get_ownership(db, ids, league_id=world["league"].id)}
+    assert all(stats[pid]["owners"] == 1 for pid in ids)
+    assert all(stats[pid]["selected_by_pct"] == 100.0 for pid in ids)
+    captain = next(sp.player_id for sp in squad.players if sp.is_captain)
+    assert stats[captain]["captains"] == 1
+    assert _counter(db, captain, GLOBAL_SCOPE)[1] == 1
+
+
+def test_recreating_squad_does_not_double_count(db, world):
+    from app.services.ownership_service import get_ownership
+    from app.services.squad_service import create_squad
+
+    ids = _squad_ids(world["players"])
+    create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+    create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+
+    stats = get_ownership(db, ids)
+    assert all(s["owners"] == 1 for s in stats)
+    assert sum(s["captains"] for s in stats) == 1
+
+
+def test_update_lineup_moves_captaincy(db, world):
+    from app.services.squad_service import create_squad, update_lineup
+
+    ids = _squad_ids(world["players"])
+    squad = create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+    old_captain = next(sp.player_id for sp in squad.players if sp.is_captain)
+    new_captain = next(pid for pid in ids if pid != old_captain)
+
+    lines = [
+        SquadPlayerLine(player_id=pid, is_starting=True, is_captain=pid == new_captain)
+        for pid in ids
+    ]
+    update_lineup(db, squad.id, LineupUpdateRequest(players=lines))
+
+    assert _counter(db, old_captain, world["league"].id)[1] == 0
+    assert _counter(db, new_captain, world["league"].id)[1] == 1
+    # No vice-captain in the new lineup
+    assert sum(_counter(db, pid, GLOBAL_SCOPE)[2] for pid in ids) == 0
+
+
+def test_transfer_moves_ownership(db, world):
+    from app.services.squad_service import create_squad
+    from app.services.transfers_service import make_transfer
+
+    now = datetime.utcnow()
+    db.add(Round(id=_uid(), name="R1", start_utc=now - timedelta(hours=1),
+                 deadline_utc=now + timedelta(hours=24), end_utc=now + timedelta(days=3)))
+    ids = _squad_ids(world["players"])
+    squad = create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+    out_id = ids[0]  # a GK
+    in_id = next(p.id for p in world["players"] if p.position == "GK" and p.id not in ids)
+
+    make_transfer(db, squad.id, out_id, in_id)
+
+    assert _counter(db, out_id, GLOBAL_SCOPE)[0] == 0
+    assert _counter(db, in_id, GLOBAL_SCOPE)[0] == 1
+
+
+def test_reconcile_fixes_drift(db, world):
+    from app.services.ownership_service import get_ownership, reconcile_ownership
+    from app.services.squad_service import create_squad
+
+    ids = _squad_ids(world["players"])
+    create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+
+    # Simulate drift: corrupt one counter and drop a squad player behind the service's back
+    db.query(PlayerOwnership).filter(PlayerOwnership.player_id == ids[1]).update({"owners": 7})
+    db.query(SquadPlayer).filter(SquadPlayer.player_id == ids[2]).delete()
+    db.commit()
+
+    corrected = reconcile_ownership(db)
+    db.commit()
+
+    assert corrected >= 4  # two scopes for each of the two players
+    stats = {s["player_id"]: s for s in get_ownership(db, ids)}
+    assert stats[ids[1]]["owners"] == 1
+    assert stats[ids[2]]["owners"] == 0
+    assert reconcile_ownership(db) == 0
+
+
+def test_removal_on_a_drifted_counter_stops_at_zero(db, world):
+    from app.services.ownership_service import _apply_deltas
+    from app.services.squad_service import create_squad
+
+    ids = _squad_ids(world["players"])
+    create_squad(db, world["users"][0].id, world["league"].id, ids, budget_remaining=25.0)
+    db.query(PlayerOwnership).filter(PlayerOwnership.player_id == ids[0]).update(
+        {"owners": 0, "captains": 0, "vice_captains": 0})
+    db.commit()
+
+    _apply_deltas(db, [ids[0]], world["league"].id, owners=-1, captains=-1, vice_captains=-1)
+    db.commit()
+    for scope in (GLOBAL_SCOPE, world["league"].id):
+        assert _counter(db, ids[0], scope) == (0, 0, 0)
+
+
+
+def test_concurrent_first_squads_neither_collide_nor_lose_counts(tmp_path):
+    """Two sessions count the first squad of a league. B looks for the counter rows while
+    A's are still uncommitted, and A commits just before B writes."""
+    from sqlalchemy import event
+
+    from app.models.player_ownership import OwnershipScope
+    from app.services import ownership_service
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    setup = Session()
+    team = Team(id=_uid(), external_id=_uid(), name="T", country_code="T")
+    setup.add(team)
+    setup.flush()
+    ids = [f"p{i}" for i in range(3)]
+    setup.add_all([Player(id=pid, external_id=_uid(), team_id=team.id, name=pid, position="MID",
+                          price=Decimal("5.0"), is_active=True) for pid in ids])
+    setup.commit()
+    setup.close()
+
+    a, b = Session(), Session()
+    ownership_service.record_squad_added(a, "league-1", ids)          # flushed, not committed
+
+    b_conn = b.connection()
+
+    def commit_a(conn, clause, *args, before=False):
+        # A commits after B's first read, or just before B's first write if B never reads
+        if a.in_transaction() and (not before or clause.is_dml):
+            a.commit()
+
+    event.listen(b_conn, "before_execute", lambda *args: commit_a(*args, before=True))
+    event.listen(b_conn, "after_execute", commit_a)
+    ownership_service.record_squad_added(b, "league-1", ids)
+    b.commit()
+
+    check = Session()
+    for scope in (GLOBAL_SCOPE, "league-1"):
+        assert check.get(OwnershipScope, scope).squads == 2
+        assert [_counter(check, pid, scope)[0] for pid in ids] == [2, 2, 2]
+    for session in (a, b, check):
+        session.close()
+    engine.dispose()
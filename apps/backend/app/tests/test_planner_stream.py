@@ -0,0 +1,100 @@
+"""
+Tests for streamed ToT branch generation (app/integrations/planner.py).
+"""
+import asyncio
+import json
+
+import httpx
+
+BRANCHES = [
+    {"branch": "safe", "title": 'Premiums {and} "bankers" \\ co', "recommendedPlayerIds": ["p1"], "confidencePct": 70},
+    {"branch": "differential", "title": "Dark horses", "meta": {"risk": "high"}, "confidencePct": 45},
+    {"branch": "fixture", "title": "Easy run", "recommendedPlayerIds": [], "confidencePct": 60},
+]
+
+
+def _chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _sse_client(pieces, sent, fail_after=None):
+    """OllamaClient whose transport streams pieces as OpenAI-style SSE chunks, logging each send."""
+    from app.integrations.ollama_client import OllamaClient
+
+    async def body():
+        for i, piece in enumerate(pieces):
+            if fail_after is not None and i == fail_after:
+                raise httpx.ReadError("connection reset")
+            sent.append(i)
+            chunk = {"choices": [{"delta": {"content": piece}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(0)
+        yield b"data: [DONE]\n\n"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body(), headers={"content-type": "text/event-stream"})
+
+    return OllamaClient("http://ollama/v1", "wc26-planner", transport=httpx.MockTransport(handler))
+
+
+def test_parser_handles_split_chunks_strings_and_fences():
+    from app.integrations.planner import BranchStreamParser
+
+    text = "```json\n" + json.dumps(BRANCHES, indent=2) + "\n```"
+    parser = BranchStreamParser()
+    parsed = [b for piece in _chunks(text, 3) for b in parser.feed(piece)]
+    assert parsed == BRANCHES
+    assert BranchStreamParser().feed('{"note": "no branch key"} {"branch": "safe"}') == [{"branch": "safe"}]
+
+
+def test_branches_stream_before_the_completion_ends_and_are_cached(monkeypatch):
+    from app.integrations import planner
+    from app.integrations.response_cache import ResponseCache
+
+    pieces = _chunks(json.dumps(BRANCHES))
+    sent = []
+    client = _sse_client(pieces, sent)
+    monkeypatch.setattr(planner, "_tot_cache", ResponseCache())
+    monkeypatch.setattr(planner, "get_ollama_client", lambda: client)
+
+    async def main():
+        received, sent_at_first = [], None
+        async for branch in planner.stream_tot_branches("players", "budget", data_version="v1"):
+            if sent_at_first is None:
+                sent_at_first = len(sent)
+            received.append(branch)
+        cached = [b async for b in planner.stream_tot_branches("players", "budget", data_version="v1")]
+        await client.aclose()
+        return received, sent_at_first, cached
+
+    received, sent_at_first, cached = asyncio.run(main())
+    assert received == BRANCHES and cached == BRANCHES
+    assert sent_at_first < len(pieces) / 2           # the first branch arrived well before the end
+    assert len(sent) == len(pieces)                  # the second call never reached Ollama
+    assert client.stats()["completed"] == 1 and client.stats()["active"] == 0
+
+
+def test_failed_stream_is_completed_with_fallbacks_and_not_cached(monkeypatch):
+    from app.integrations import planner
+    from app.integrations.response_cache import ResponseCache
+
+    text = json.dumps(BRANCHES)
+    pieces = _chunks(text)
+    cut = len(json.dumps(BRANCHES[0])) // 7 + 2      # just after the first branch
+    client = _sse_client(pieces, [], fail_after=cut)
+    cache = ResponseCache()
+    monkeypatch.setattr(planner, "_tot_cache", cache)
+    monkeypatch.setattr(planner, "get_ollama_client", lambda: client)
+
+    async def main():
+        branches = [b async for b in planner.stream_tot_branches("players", None, data_version="v1")]
+        await client.aclose()
+        return branches
+
+    branches = asyncio.run(main())
+    assert branches[0] == BRANCHES[0]
+    assert [b["branch"] for b in branches] == ["safe", "differential", "fixture"]
+    assert branches[1] == planner._mock_branches()[1]
+    assert cache.stats()["entries"] == 0
+    assert client.stats()["failed"] == 1 and client.stats()["active"] == 0
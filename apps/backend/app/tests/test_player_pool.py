@@ -0,0 +1,78 @@
+"""
+Tests for the RL player pool cache (app/rl/player_pool.py).
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.player import Player
+from app.models.team import Team
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def catalog(db):
+    """30 active players over 10 teams."""
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(10)])
+    db.flush()
+    positions = ["GK"] * 4 + ["DEF"] * 10 + ["MID"] * 10 + ["FWD"] * 6
+    db.add_all([
+        Player(id=f"p{i:02d}", external_id=f"p{i}", team_id=f"t{i % 10}", name=f"P{i}",
+               position=pos, price=4.5 + (i % 5), is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    db.commit()
+
+
+def test_pool_layout_and_read_only(db, catalog):
+    from app.rl.environment import MAX_PLAYERS
+    from app.rl.player_pool import get_player_pool
+
+    pool = get_player_pool(db)
+    assert pool.n_players == 30
+    assert pool.features.shape[0] == MAX_PLAYERS
+    assert pool.team_index[30:].max() == -1
+    assert pool.indices(["p03", "nope"]).tolist() == [3, -1]
+    assert pool.positions[pool.index["p03"]] == "GK"
+    with pytest.raises(ValueError):
+        pool.features[0, 0] = 1.0
+
+
+def test_pool_cached_until_version_bump(db, catalog):
+    from app.rl.player_pool import get_player_pool
+    from app.services.data_version_service import CATALOG, bump_version
+
+    pool = get_player_pool(db)
+    assert get_player_pool(db) is pool
+
+    db.query(Player).filter(Player.id == "p00").update({"price": 9.5})
+    bump_version(db, CATALOG)
+    db.commit()
+
+    fresh = get_player_pool(db)
+    assert fresh is not pool
+    assert fresh.features[fresh.index["p00"], 1] == pytest.approx(9.5)
+
+
+def test_squad_and_lineup_share_pool(db, catalog, monkeypatch):
+    import app.rl.player_pool as player_pool
+    from app.rl.inference import suggest_lineup_rl, suggest_squad_rl
+
+    squad = suggest_squad_rl(db)
+    assert squad["player_ids"]
+
+    # Lineup for a warm cache must not rebuild the pool
+    monkeypatch.setattr(player_pool, "build_player_pool", lambda *a, **k: pytest.fail("pool rebuilt"))
+    lineup = suggest_lineup_rl(db, squad["player_ids"])
+    assert set(lineup["starting"]) | set(lineup["bench"]) == set(squad["player_ids"])
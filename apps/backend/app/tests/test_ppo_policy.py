@@ -68,3 +68,148 @@ def test_train_ppo_one_episode():
     policy = FantasyPolicy()
     total_reward = train_one_episode(env, policy, lr=0.001)
     assert isinstance(total_reward, float)
+
+
+def _obs(n_players, seed=0):
+    from app.rl.environment import FEATURE_DIM, _generate_random_pool
+    np.random.seed(seed)
+    pool = _generate_random_pool(n_players)
+    state = np.array([80.0, 1, 2, 1, 0, 4], dtype=np.float32)
+    return np.concatenate([pool.ravel(), state]).astype(np.float32)
+
+
+def test_policy_parameters_independent_of_pool_size(tmp_path):
+    from app.rl.executor_policy import FantasyPolicy
+    policy = FantasyPolicy(seed=0)
+    n_params = sum(p.size for p in policy.params().values())
+    assert n_params < 50_000
+
+    path = tmp_path / "policy.npz"
+    policy.save(str(path))
+    loaded = FantasyPolicy.load(str(path))
+    big = _obs(1500)
+    assert loaded.forward(big).shape == (1500,)
+    np.testing.assert_allclose(loaded.forward(big), policy.forward(big), rtol=1e-6)
+
+
+def test_policy_padding_does_not_change_scores():
+    from app.rl.environment import FEATURE_DIM
+    from app.rl.executor_policy import FantasyPolicy
+    policy = FantasyPolicy(seed=0)
+    obs = _obs(150)
+    padded = np.concatenate([obs[:-6], np.zeros(50 * FEATURE_DIM, dtype=np.float32), obs[-6:]])
+    np.testing.assert_allclose(policy.forward(padded)[:150], policy.forward(obs), rtol=1e-5)
+
+
+def test_policy_batched_forward_matches_single():
+    from app.rl.executor_policy import FantasyPolicy
+    policy = FantasyPolicy(seed=0)
+    batch = np.stack([_obs(200, seed=s) for s in range(3)])
+    logits = policy.forward(batch)
+    for i in range(3):
+        np.testing.assert_allclose(logits[i], policy.forward(batch[i]), rtol=1e-5)
+
+
+def test_policy_backward_matches_finite_differences():
+    from app.rl.executor_policy import FantasyPolicy
+    policy = FantasyPolicy(hidden_dim=8, seed=0)
+    for name, p in policy.params().items():
+        setattr(policy, name, p.astype(np.float64))
+    batch = np.stack([_obs(20, seed=s) for s in range(2)]).astype(np.float64)
+    weights = np.random.default_rng(0).standard_normal((2, 20))
+
+    def objective():
+        return float((policy.forward(batch) * weights).sum())
+
+    _, cache = policy.forward_cached(batch)
+    grads = policy.backward(cache, weights)
+    rng = np.random.default_rng(1)
+    for name, param in policy.params().items():
+        for idx in [tuple(rng.integers(s) for s in param.shape) for _ in range(3)]:
+            old = param[idx]
+            param[idx] = old + 1e-6
+            up = objective()
+            param[idx] = old - 1e-6
+            down = objective()
+            param[idx] = old
+            assert grads[name][idx] == pytest.approx((up - down) / 2e-6, rel=1e-3, abs=1e-6), name
+
+
+def test_value_head_backward_matches_finite_differences():
+    from app.rl.executor_policy import FantasyPolicy
+    policy = FantasyPolicy(hidden_dim=8, seed=0)
+    for name, p in policy.params().items():
+        setattr(policy, name, p.astype(np.float64))
+    policy.w_v[:] = np.random.default_rng(2).standard_normal(8)
+    batch = np.stack([_obs(20, seed=s) for s in range(2)]).astype(np.float64)
+    weights = np.array([0.7, -1.3])
+
+    def objective():
+        return float((policy.forward_cached(batch)[1]["values"] * weights).sum())
+
+    _, cache = policy.forward_cached(batch)
+    grads = policy.backward(cache, np.zeros((2, 20)), weights)
+    for name in ("w_v", "b_v", "w_c", "w_e"):
+        param = policy.params()[name]
+        idx = (0,) * param.ndim
+        old = param[idx]
+        param[idx] = old + 1e-6
+        up = objective()
+        param[idx] = old - 1e-6
+        down = objective()
+        param[idx] = old
+        assert grads[name][idx] == pytest.approx((up - down) / 2e-6, rel=1e-3, abs=1e-6), name
+
+
+def test_load_checkpoint_without_value_head(tmp_path):
+    from app.rl.executor_policy import POLICY_PARAM_NAMES, FantasyPolicy
+    policy = FantasyPolicy(seed=0)
+    path = tmp_path / "reinforce.npz"
+    np.savez(path, **{name: getattr(policy, name) for name in POLICY_PARAM_NAMES})
+    loaded = FantasyPolicy.load(str(path))
+    assert np.all(loaded.w_v == 0)
+    obs = _obs(200)
+    np.testing.assert_allclose(loaded.forward(obs), policy.forward(obs), rtol=1e-6)
+
+
+def test_gae_bootstraps_and_stops_at_episode_end():
+    from app.rl.train_ppo import RolloutBuffer
+    buf = RolloutBuffer(n_steps=3, num_envs=1, obs_dim=1, pool_size=1)
+    buf.rewards[:, 0] = [1.0, 2.0, 3.0]
+    buf.values[:, 0] = [0.5, 0.5, 0.5]
+    buf.dones[:, 0] = [False, True, False]
+    buf.last_values[0] = 10.0
+    advantages, returns = buf.compute_gae(gamma=0.9, lam=0.8)
+
+    d2 = 3.0 + 0.9 * 10.0 - 0.5
+    d1 = 2.0 - 0.5                      # episode ended: no bootstrap
+    d0 = 1.0 + 0.9 * 0.5 - 0.5
+    np.testing.assert_allclose(advantages[:, 0], [d0 + 0.72 * d1, d1, d2], rtol=1e-6)
+    np.testing.assert_allclose(returns, advantages + buf.values)
+
+
+def test_ppo_update_trains_from_rollout_buffer():
+    from app.rl.environment import _generate_random_pool
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.train_ppo import Adam, RolloutWorker, ppo_loss_grads, ppo_update
+
+    np.random.seed(0)
+    pool = _generate_random_pool()
+    teams = np.random.default_rng(0).integers(0, 20, size=len(pool))
+    policy = FantasyPolicy(seed=0)
+    worker = RolloutWorker(pool, teams, num_envs=4, seed=0)
+    buf = worker.collect(policy, n_steps=16)
+    assert buf.obs.shape[:2] == (16, 4) and buf.episode_returns
+    assert np.all(buf.masks[np.arange(16)[:, None], np.arange(4), buf.actions])
+
+    advantages, returns = buf.compute_gae(0.99, 0.95)
+    flat = (buf.obs.reshape(64, -1), buf.masks.reshape(64, -1), buf.actions.ravel(), buf.log_probs.ravel())
+    adv = advantages.ravel()
+    _, before = ppo_loss_grads(policy, *flat, adv, returns.ravel())
+    assert before["approx_kl"] == pytest.approx(0.0, abs=1e-5)
+
+    ppo_update(policy, Adam(policy.params(), lr=1e-3), [buf], epochs=4, minibatch_size=32,
+               rng=np.random.default_rng(0))
+    _, after = ppo_loss_grads(policy, *flat, adv, returns.ravel())
+    assert after["value_loss"] < before["value_loss"]
+    assert np.any(policy.w_v != 0)
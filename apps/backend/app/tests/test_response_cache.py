@@ -0,0 +1,130 @@
+"""
+Tests for the LLM response cache (app/integrations/response_cache.py) and its use in the ToT planner.
+"""
+import asyncio
+
+import pytest
+
+
+def _counting(value="answer", delay=0.0):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return compute, calls
+
+
+def test_hits_expire_after_ttl(monkeypatch):
+    from app.integrations import response_cache
+    from app.integrations.response_cache import ResponseCache
+
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl_s=10.0)
+    compute, calls = _counting()
+
+    async def main():
+        assert await cache.get_or_compute("k", compute) == "answer"
+        assert await cache.get_or_compute("k", compute) == "answer"
+        now[0] += 11.0
+        await cache.get_or_compute("k", compute)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    from app.integrations.response_cache import ResponseCache
+
+    cache = ResponseCache(max_entries=2)
+    compute, calls = _counting()
+
+    async def main():
+        for key in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_compute(key, compute)
+
+    asyncio.run(main())
+    assert len(calls) == 4            # a, b, c, then b again after c pushed it out
+    assert cache.evictions == 2 and cache.stats()["entries"] == 2
+
+
+def test_new_scope_drops_old_entries():
+    from app.integrations.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    compute, calls = _counting()
+
+    async def main():
+        await cache.get_or_compute("k", compute, scope="v1")
+        await cache.get_or_compute("k", compute, scope="v1")
+        await cache.get_or_compute("k", compute, scope="v2")
+
+    asyncio.run(main())
+    assert len(calls) == 2 and cache.stats()["entries"] == 1
+
+
+def test_identical_concurrent_requests_share_one_call():
+    from app.integrations.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    compute, calls = _counting(delay=0.05)
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert len(calls) == 1
+    assert (cache.misses, cache.coalesced) == (1, 4)
+
+
+def test_failures_and_rejected_values_are_not_cached():
+    from app.integrations.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    fallback, calls = _counting(value=None)
+
+    async def boom():
+        raise ConnectionError("ollama down")
+
+    async def main():
+        with pytest.raises(ConnectionError):
+            await cache.get_or_compute("k", boom)
+        assert await cache.get_or_compute("k", fallback) is None
+        assert await cache.get_or_compute("k", fallback) is None
+
+    asyncio.run(main())
+    assert len(calls) == 2 and cache.stats()["entries"] == 0
+
+
+def test_planner_caches_llm_branches_but_not_the_fallback(monkeypatch):
+    from app.integrations import planner
+    from app.integrations.response_cache import ResponseCache
+
+    monkeypatch.setattr(planner, "_tot_cache", ResponseCache())
+    calls = []
+    branches = '[{"name": "a"}, {"name": "b"}, {"name": "c"}]'
+
+    async def chat(system, user):
+        calls.append(user)
+        if len(calls) == 1:
+            raise ConnectionError("ollama down")
+        return branches
+
+    monkeypatch.setattr(planner, "_chat_completion", chat)
+
+    async def main():
+        fallback = await planner.generate_tot_branches("players", "budget", data_version="v1")
+        first = await planner.generate_tot_branches("players", "budget", data_version="v1")
+        first[0]["name"] = "edited by caller"
+        second = await planner.generate_tot_branches("players", "budget", data_version="v1")
+        await planner.generate_tot_branches("players", "budget", data_version="v2")
+        return fallback, second
+
+    fallback, second = asyncio.run(main())
+    assert fallback == planner._mock_branches()
+    assert [b["name"] for b in second] == ["a", "b", "c"]
+    assert len(calls) == 3            # fallback, first fill, refill for the new data version
@@ -90,3 +90,61 @@ def test_env_team_limit():
     env = FantasyEnv()
     env.reset()
     assert env.max_per_team == 2
+
+
+def _brute_force_mask(env):
+    """Reference mask recomputed from env.squad with plain Python."""
+    from app.rl.environment import IDX_TO_POS, MAX_PLAYERS
+    pos_counts, team_counts = {}, {}
+    for i in env.squad:
+        pos = IDX_TO_POS.get(int(env.player_pool[i, 0]), "MID")
+        pos_counts[pos] = pos_counts.get(pos, 0) + 1
+        team_counts[int(env.team_ids[i])] = team_counts.get(int(env.team_ids[i]), 0) + 1
+    mask = np.zeros(MAX_PLAYERS, dtype=bool)
+    for i in range(env.n_players):
+        pos = IDX_TO_POS.get(int(env.player_pool[i, 0]), "MID")
+        team = int(env.team_ids[i])
+        mask[i] = (
+            i not in env.squad
+            and float(env.player_pool[i, 1]) <= env.budget_remaining
+            and pos_counts.get(pos, 0) < env.position_limits[pos]
+            and (team < 0 or team_counts.get(team, 0) < env.max_per_team)
+        )
+    return mask
+
+
+def test_env_incremental_mask_matches_brute_force():
+    from app.rl.environment import FantasyEnv
+    rng = np.random.default_rng(3)
+    env = FantasyEnv(team_ids=rng.integers(0, 6, size=200))  # few teams → team limit binds
+    for _ in range(5):
+        env.reset()
+        terminated = False
+        while not terminated:
+            mask = env.action_masks()
+            assert np.array_equal(mask, _brute_force_mask(env))
+            valid = np.flatnonzero(mask)
+            _, _, terminated, _, _ = env.step(int(rng.choice(valid)) if len(valid) else 0)
+        assert all(c <= env.max_per_team for c in env.team_counts.values())
+
+
+def test_env_obs_buffer_tracks_state():
+    from app.rl.environment import FantasyEnv, FEATURE_DIM, MAX_PLAYERS
+    env = FantasyEnv()
+    obs, _ = env.reset()
+    np.testing.assert_array_equal(obs[:MAX_PLAYERS * FEATURE_DIM], env.player_pool.ravel())
+    action = int(np.flatnonzero(env.action_masks())[0])
+    obs, _, _, _, _ = env.step(action)
+    assert obs[-1] == 1
+    assert obs[-6] == pytest.approx(env.budget_remaining)
+    assert obs[-5:-1].sum() == 1
+    assert env.position_counts == {pos: int(c) for pos, c in zip(("GK", "DEF", "MID", "FWD"), obs[-5:-1])}
+
+
+def test_env_padding_never_selectable():
+    from app.rl.environment import FantasyEnv, _generate_random_pool
+    env = FantasyEnv(player_pool=_generate_random_pool(50))
+    env.reset()
+    assert not env.action_masks()[50:].any()
+    _, reward, _, _, info = env.step(120)
+    assert info.get("invalid_pick") and reward == -1.0
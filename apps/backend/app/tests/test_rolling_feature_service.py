@@ -0,0 +1,119 @@
+"""
+Tests for rolling_feature_service — incremental window updates, rebuild
+fallbacks and the version-keyed snapshot.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.match import Match, MatchStatus
+from app.models.player import Player
+from app.models.player_match_stats import PlayerMatchStats
+from app.models.player_rolling_features import PlayerRollingFeatures
+from app.models.team import Team
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture()
+def world(db):
+    """Two teams, two players and six finished matches one day apart."""
+    db.add_all([
+        Team(id="t1", external_id="t1", name="A", country_code="AA"),
+        Team(id="t2", external_id="t2", name="B", country_code="BB"),
+    ])
+    db.flush()
+    db.add_all([
+        Player(id="p1", external_id="p1", team_id="t1", name="Striker", position="FWD", price=8.0),
+        Player(id="p2", external_id="p2", team_id="t2", name="Keeper", position="GK", price=5.0),
+    ])
+    start = datetime.utcnow() - timedelta(days=10)
+    db.add_all([
+        Match(id=f"m{i}", external_id=f"m{i}", home_team_id="t1", away_team_id="t2",
+              kickoff_utc=start + timedelta(days=i), status=MatchStatus.FINISHED, home_score=1, away_score=0)
+        for i in range(6)
+    ])
+    db.commit()
+
+
+def _play(db, match_id, player_id, minutes, points, goals=0, assists=0):
+    from app.services.data_version_service import STATS, bump_version
+    from app.services.rolling_feature_service import update_rolling_features
+
+    db.add(PlayerMatchStats(match_id=match_id, player_id=player_id, minutes_played=minutes,
+                            fantasy_points=points, goals=goals, assists=assists))
+    bump_version(db, STATS)
+    update_rolling_features(db, match_id)
+    db.commit()
+
+
+def test_incremental_updates_match_full_rebuild(db, world):
+    from app.services.rolling_feature_service import ROLLING_FEATURE_COLUMNS, rebuild_rolling_features
+
+    history = [(90, 8, 1, 0), (90, 2, 0, 0), (30, 1, 0, 1), (75, 12, 2, 0), (10, 1, 0, 0), (90, 6, 0, 1)]
+    for i, (minutes, points, goals, assists) in enumerate(history):
+        _play(db, f"m{i}", "p1", minutes, points, goals, assists)
+
+    row = db.get(PlayerRollingFeatures, "p1")
+    assert row.recent_points == [2, 1, 12, 1, 6]
+    assert row.last3_points == pytest.approx((12 + 1 + 6) / 3, abs=0.01)
+    assert row.goals_per90 == pytest.approx(3 * 90 / 385, abs=1e-3)
+    assert 0 < row.start_probability < 1
+    incremental = [getattr(row, col) for col in ROLLING_FEATURE_COLUMNS]
+
+    rebuild_rolling_features(db, ["p1"])
+    db.commit()
+    assert [getattr(row, col) for col in ROLLING_FEATURE_COLUMNS] == pytest.approx(incremental)
+
+
+def test_only_players_in_match_are_touched(db, world):
+    _play(db, "m0", "p1", 90, 5)
+    _play(db, "m1", "p2", 90, 3)
+
+    assert db.get(PlayerRollingFeatures, "p1").recent_match_ids == ["m0"]
+    assert db.get(PlayerRollingFeatures, "p2").recent_match_ids == ["m1"]
+
+
+def test_resync_and_out_of_order_rebuild(db, world):
+    from app.services.rolling_feature_service import update_rolling_features
+
+    _play(db, "m3", "p1", 90, 10)
+    _play(db, "m1", "p1", 90, 2)  # older match arrives late
+    row = db.get(PlayerRollingFeatures, "p1")
+    assert row.recent_match_ids == ["m1", "m3"]
+
+    # Re-sync of m3 with corrected points must not double count
+    db.query(PlayerMatchStats).filter(PlayerMatchStats.match_id == "m3").update({"fantasy_points": 4})
+    update_rolling_features(db, "m3")
+    db.commit()
+    assert row.matches_played == 2
+    assert row.recent_points == [2, 4]
+
+
+def test_snapshot_is_versioned(db, world):
+    from app.services.rolling_feature_service import ROLLING_FEATURE_INDEX, get_rolling_snapshot
+
+    _play(db, "m0", "p1", 90, 5)
+    snap = get_rolling_snapshot(db)
+    assert get_rolling_snapshot(db) is snap
+    features, found = snap.rows(["p2", "p1"])
+    assert found.tolist() == [False, True]
+    assert features[1, ROLLING_FEATURE_INDEX["last5_points"]] == 5
+
+    _play(db, "m1", "p1", 90, 9)
+    fresh = get_rolling_snapshot(db)
+    assert fresh is not snap
+    assert fresh.version == db.get(PlayerRollingFeatures, "p1").stats_version
+    assert fresh.rows(["p1"])[0][0, ROLLING_FEATURE_INDEX["last5_points"]] == 7
@@ -0,0 +1,157 @@
+"""
+Tests for the Monte Carlo round simulator (app/rl/round_simulator.py).
+"""
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.fixture_projection import FixtureProjection
+from app.models.match import Match
+from app.models.player import Player
+from app.models.round import Round
+from app.models.team import Team
+
+
+def _rates(positions, goals_90=0.0, assists_90=0.0, p_full=1.0, p_cameo=0.0, saves=0.0, p_yellow=0.0, p_red=0.0):
+    from app.rl.round_simulator import PlayerRates
+    n = len(positions)
+    full = lambda x: np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+    return PlayerRates(positions, full(p_full), full(p_cameo), full(goals_90), full(assists_90),
+                       full(saves), full(p_yellow), full(p_red))
+
+
+def test_forward_points_match_the_analytic_mean():
+    from app.rl.round_simulator import BASE_XG, Fixtures, simulate_points
+
+    # FWD always plays 90, scores at 0.4 per 90 from a 1.35 xG side: goals ~ Poisson(0.4)
+    rates = _rates([3], goals_90=0.4)
+    points = simulate_points(rates, Fixtures([0], [BASE_XG, BASE_XG], [1, 0]), 100_000, seed=0)
+    lam = 0.4
+    p0, p1 = math.exp(-lam), lam * math.exp(-lam)
+    expected = 2 + 4 * lam + (1 * p0 + 2 * p1 + 3 * (1 - p0 - p1))   # appearance + goals + bonus
+    assert points.dtype == np.int16
+    assert points.mean() == pytest.approx(expected, abs=0.03)
+
+
+def test_opponents_are_correlated_through_side_goals():
+    from app.rl.round_simulator import Fixtures, simulate_points
+
+    # Side 0: a FWD; side 1: a GK and a DEF, who share clean sheets and conceded goals
+    rates = _rates([3, 0, 1], goals_90=[0.8, 0.0, 0.0])
+    points = simulate_points(rates, Fixtures([0, 1, 1], [2.0, 1.0], [1, 0]), 50_000, seed=1)
+    corr = np.corrcoef(points.astype(np.float64))
+    assert corr[0, 1] < -0.2 and corr[0, 2] < -0.2
+    assert corr[1, 2] > 0.3
+
+
+def test_players_without_a_match_score_zero_and_seeds_repeat():
+    from app.rl.round_simulator import Fixtures, simulate_points
+
+    rates = _rates([2, 2], goals_90=0.3, p_full=0.7, p_cameo=0.2, p_yellow=0.1)
+    fixtures = Fixtures([0, -1], [1.35, 1.35], [1, 0])
+    points = simulate_points(rates, fixtures, 10_000, seed=5)
+    assert not points[1].any()
+    np.testing.assert_array_equal(points, simulate_points(rates, fixtures, 10_000, seed=5))
+
+
+def test_squad_distribution_applies_armbands_like_live_scoring():
+    from app.rl.round_simulator import squad_distribution
+
+    points = np.array([[3, 10], [-3, 5], [7, 1], [4, 4]], dtype=np.int16)
+    # Player 0 captain, 1 vice (int(-4.5) == -4, int(7.5) == 7), 2 starter, 3 bench
+    dist = squad_distribution(points, [[0, 1, 2, 3]], [[2.0, 1.5, 1.0, 0.0]], levels=(0.5,))
+    np.testing.assert_array_equal(dist.totals, [[6 - 4 + 7, 20 + 7 + 1]])
+    assert dist.mean[0] == pytest.approx(18.5)
+    assert dist.std[0] == pytest.approx(9.5)
+    assert dist.summary() == {"mean": 18.5, "std": 9.5, "p50": 9}
+
+
+def test_quantiles_match_inverted_cdf():
+    from app.rl.round_simulator import RoundDistribution
+
+    totals = np.random.default_rng(0).integers(-5, 80, size=(3, 9_999)).astype(np.int32)
+    levels = (0.01, 0.1, 0.5, 0.9, 1.0)
+    dist = RoundDistribution(totals, levels)
+    np.testing.assert_array_equal(dist.quantiles, np.quantile(totals, levels, axis=1, method="inverted_cdf").T)
+
+
+def test_captain_choice_follows_the_risk_profile():
+    from app.rl.round_simulator import choose_captains
+
+    n = 40_000
+    rng = np.random.default_rng(2)
+    steady = np.full(n, 6)
+    boom = np.where(rng.random(n) < 0.5, 0, 14)          # mean 7, all-or-nothing
+    filler = rng.integers(1, 4, size=(9, n))
+    points = np.vstack([steady, boom, filler]).astype(np.int16)
+    starters = np.arange(11)
+
+    assert choose_captains(points, starters, "balanced")[0] == 1
+    assert choose_captains(points, starters, "aggressive")[0] == 1
+    captain, vice, dist = choose_captains(points, starters, "conservative")
+    assert captain == 0 and vice != captain
+    assert choose_captains(points, starters, "unknown")[0] == 1        # treated as balanced
+    assert dist.totals.shape == (1, n)
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def _seed_squad(db):
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(4)])
+    db.flush()
+    positions = ["GK"] * 2 + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+    db.add_all([
+        Player(id=f"p{i:02d}", external_id=f"p{i}", team_id=f"t{i % 4}", name=f"P{i}",
+               position=pos, price=Decimal("5.0"), is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    now = datetime.utcnow()
+    match = Match(id="m1", external_id="m1", home_team_id="t0", away_team_id="t1", kickoff_utc=now + timedelta(days=1))
+    round_ = Round(id="r1", name="R1", start_utc=now, deadline_utc=now, end_utc=now + timedelta(days=3))
+    round_.matches.append(match)
+    db.add_all([match, round_, FixtureProjection(
+        match_id="m1", home_xg=2.2, away_xg=0.8, home_clean_sheet=0.45, away_clean_sheet=0.11,
+        home_win=0.6, draw=0.25, away_win=0.15)])
+    db.commit()
+    return [f"p{i:02d}" for i in range(15)]
+
+
+def test_simulate_next_round_uses_fixtures(db):
+    from app.rl.inference import simulate_next_round
+
+    squad = _seed_squad(db)
+    name, points = simulate_next_round(db, squad, n_scenarios=5_000, seed=0)
+    assert name == "R1" and points.shape == (15, 5_000)
+    idle = [i for i in range(15) if i % 4 in (2, 3)]          # teams t2, t3 have no match
+    assert not points[idle].any()
+    assert points[[i for i in range(15) if i % 4 in (0, 1)]].any()
+
+
+def test_lineup_and_outlooks_use_the_risk_profile(db):
+    from app.rl.inference import round_outlooks, suggest_lineup_rl
+
+    squad = _seed_squad(db)
+    lineup = suggest_lineup_rl(db, squad, risk_profile="conservative")
+    outlook = lineup["round_outlook"]
+    assert outlook["risk_profile"] == "conservative" and outlook["round_name"] == "R1"
+    assert outlook["captain_id"] == lineup["captain_id"] in lineup["starting"]
+    assert outlook["p10"] <= outlook["p50"] <= outlook["p90"]
+
+    first, second = round_outlooks(db, [squad, squad], "aggressive", seed=3)
+    assert first == second                                     # one shared simulation
+    assert len(first["starting"]) == 11 and first["vice_captain_id"] in first["starting"]
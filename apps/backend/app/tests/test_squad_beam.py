@@ -0,0 +1,114 @@
+"""
+Tests for policy beam search over squads (app/rl/squad_beam.py).
+"""
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.rl.environment import INITIAL_BUDGET, MAX_PER_TEAM, POSITION_LIMITS, POS_TO_IDX, SQUAD_SIZE
+
+
+def _pool(n=120, seed=0):
+    """Seeded catalog in the shape of environment._generate_random_pool (which is unseeded)."""
+    rng = np.random.default_rng(seed)
+    pool = np.zeros((n, 8), dtype=np.float32)
+    positions = rng.choice(4, size=n, p=[0.13, 0.33, 0.33, 0.21])
+    pool[:, 0] = positions
+    pool[:, 1] = np.array([4.5, 5.0, 5.5, 6.5])[positions] + rng.uniform(-0.5, 1.5, n)
+    pool[:, 2] = rng.uniform(1, 8, n)
+    pool[:, 3] = rng.integers(0, 5, n)
+    pool[:, 4] = rng.integers(0, 5, n)
+    pool[:, 5] = rng.uniform(0, 90, n)
+    pool[:, 6] = np.where(positions == 0, rng.integers(0, 5, n), 0)
+    pool[:, 7] = rng.uniform(0, 10, n)
+    return pool, np.arange(n) % 24
+
+
+def _assert_valid(squad, pool, team_ids, budget=INITIAL_BUDGET):
+    assert len(set(squad)) == SQUAD_SIZE
+    positions = Counter(int(pool[i, 0]) for i in squad)
+    assert positions == {POS_TO_IDX[p]: n for p, n in POSITION_LIMITS.items()}
+    assert max(Counter(team_ids[squad]).values()) <= MAX_PER_TEAM
+    assert pool[squad, 1].sum() <= budget + 1e-6
+
+
+def test_beam_returns_k_distinct_valid_squads():
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.squad_beam import beam_search_squads
+
+    pool, team_ids = _pool()
+    beams = beam_search_squads(FantasyPolicy(seed=0), pool, team_ids, k=4, beam_width=8)
+    assert len(beams) == 4
+    assert len({frozenset(b["indices"]) for b in beams}) == 4
+    for beam in beams:
+        _assert_valid(beam["indices"], pool, team_ids)
+        assert beam["budget_remaining"] == pytest.approx(INITIAL_BUDGET - pool[beam["indices"], 1].sum(), abs=1e-3)
+    assert beams[0]["log_prob"] == max(b["log_prob"] for b in beams)
+
+
+def test_log_prob_matches_the_policy_and_beats_greedy():
+    from app.rl.executor_policy import FantasyPolicy, masked_log_softmax
+    from app.rl.squad_beam import _leaves_fill_budget, beam_search_squads
+    from app.rl.vec_env import VecFantasyEnv
+
+    pool, team_ids = _pool(seed=1)
+    policy = FantasyPolicy(seed=3)
+
+    def replay(picks):
+        # Same masking as the search: valid picks that leave enough to fill the squad
+        env = VecFantasyEnv(1, pool, team_ids, auto_reset=False)
+        obs, _ = env.reset()
+        total = 0.0
+        for pick in picks:
+            mask = env.action_masks() & _leaves_fill_budget(env)
+            log_p = masked_log_softmax(policy.forward_shared_pool(obs), mask)[0]
+            pick = int(np.argmax(log_p)) if pick is None else pick
+            total += log_p[pick]
+            obs, *_ = env.step(np.array([pick]))
+        return total, env.squads[0]
+
+    [best] = beam_search_squads(policy, pool, team_ids, k=1, beam_width=8, diversity=0.0)
+    assert replay(best["indices"])[0] == pytest.approx(best["log_prob"], abs=1e-3)
+    greedy, _ = replay([None] * SQUAD_SIZE)
+    assert best["log_prob"] >= greedy - 1e-6
+
+
+def test_diversity_spreads_the_squads():
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.squad_beam import beam_search_squads
+
+    pool, team_ids = _pool(seed=2)
+    policy = FantasyPolicy(seed=4)
+
+    def mean_overlap(beams):
+        sets = [set(b["indices"]) for b in beams]
+        return np.mean([len(a & b) for i, a in enumerate(sets) for b in sets[i + 1:]])
+
+    plain = beam_search_squads(policy, pool, team_ids, k=3, beam_width=12, diversity=0.0)
+    diverse = beam_search_squads(policy, pool, team_ids, k=3, beam_width=12, diversity=20.0)
+    assert mean_overlap(diverse) < mean_overlap(plain)
+
+
+def test_no_squad_fits_a_tiny_budget():
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.squad_beam import beam_search_squads
+
+    pool, team_ids = _pool()
+    assert beam_search_squads(FantasyPolicy(seed=0), pool, team_ids, budget=20.0) == []
+
+
+def test_tight_budget_still_returns_k_squads():
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.squad_beam import beam_search_squads
+    from app.rl.squad_optimizer import optimize_squad
+
+    pool, team_ids = _pool(500, seed=0)      # the unmasked search returned no squad here
+    budget = 85.0
+    optimize_squad(pool[:, 2], pool[:, 1], pool[:, 0].astype(int), team_ids, budget=budget)   # feasible
+
+    beams = beam_search_squads(FantasyPolicy(seed=42), pool, team_ids, budget=budget, k=3)
+    assert len(beams) == 3
+    assert len({frozenset(b["indices"]) for b in beams}) == 3
+    for beam in beams:
+        _assert_valid(beam["indices"], pool, team_ids, budget=budget)
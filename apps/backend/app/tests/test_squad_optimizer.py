@@ -0,0 +1,140 @@
+"""
+Tests for the exact squad optimizer (app/rl/squad_optimizer.py).
+"""
+import itertools
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.player import Player
+from app.models.team import Team
+
+
+def _small_pool(seed, extra=2, n_teams=12):
+    """need + `extra` players per position, prices correlated with points."""
+    from app.rl.squad_optimizer import NEEDS
+    rng = np.random.default_rng(seed)
+    positions = np.repeat(np.arange(4), NEEDS + extra)
+    n = len(positions)
+    prices = rng.choice(np.arange(4.0, 12.0, 0.5), n)
+    points = (prices * 0.6 + rng.uniform(-2, 2, n)).round(1)
+    return points, prices, positions, rng.integers(0, n_teams, n)
+
+
+def _brute_force(points, prices, positions, teams, budget):
+    from app.rl.squad_optimizer import NEEDS
+    groups = [np.flatnonzero(positions == p) for p in range(4)]
+    best = None
+    for combo in itertools.product(*[itertools.combinations(g, k) for g, k in zip(groups, NEEDS)]):
+        idx = np.concatenate(combo)
+        if prices[idx].sum() > budget + 1e-9 or np.bincount(teams[idx]).max() > 2:
+            continue
+        if best is None or points[idx].sum() > best:
+            best = points[idx].sum()
+    return best
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_optimizer_matches_brute_force(seed):
+    from app.rl.squad_optimizer import optimize_squad
+    points, prices, positions, teams = _small_pool(seed)
+    budget = 112.0
+    expected = _brute_force(points, prices, positions, teams, budget)
+    if expected is None:
+        with pytest.raises(ValueError):
+            optimize_squad(points, prices, positions, teams, budget)
+        return
+
+    sol = optimize_squad(points, prices, positions, teams, budget)
+    assert sol.optimal
+    assert sol.total_points == pytest.approx(expected)
+    assert sol.total_cost <= budget
+    assert np.bincount(positions[sol.indices]).tolist() == [2, 5, 5, 3]
+    assert np.bincount(teams[sol.indices]).max() <= 2
+
+
+def test_dominance_pruning_keeps_optimum(monkeypatch):
+    from app.rl import squad_optimizer
+    from app.rl.environment import _generate_random_pool
+
+    pool = _generate_random_pool(600)
+    rng = np.random.default_rng(3)
+    points = pool[:, 1] * 0.7 + rng.normal(0, 1, 600)
+    teams = rng.integers(0, 48, 600)
+    args = (points, pool[:, 1], pool[:, 0].astype(int), teams, 90.0)
+
+    pruned = squad_optimizer.optimize_squad(*args)
+    assert pruned.candidates < 300
+    monkeypatch.setattr(squad_optimizer, "prune_dominated",
+                        lambda points, costs, teams, need: np.full(len(points), need > 0))
+    full = squad_optimizer.optimize_squad(*args)
+    assert full.candidates == 600
+    assert pruned.total_points == pytest.approx(full.total_points)
+
+
+def test_locked_and_excluded_players():
+    from app.rl.squad_optimizer import optimize_squad
+    points, prices, positions, teams = _small_pool(1, extra=6, n_teams=20)
+    free = optimize_squad(points, prices, positions, teams, 120.0)
+
+    best_pick = free.indices[int(np.argmax(points[free.indices]))]
+    outsider = next(i for i in np.argsort(points) if i not in free.indices)
+    sol = optimize_squad(points, prices, positions, teams, 120.0, locked=[outsider], excluded=[best_pick])
+    assert outsider in sol.indices
+    assert best_pick not in sol.indices
+    assert sol.total_points <= free.total_points
+
+    with pytest.raises(ValueError):
+        optimize_squad(points, prices, positions, teams, 120.0, locked=[outsider], excluded=[outsider])
+    gks = np.flatnonzero(positions == 0)[:3]
+    with pytest.raises(ValueError):
+        optimize_squad(points, prices, positions, teams, 120.0, locked=gks.tolist())
+
+
+def test_deadline_stops_the_search():
+    import time
+    from app.rl.squad_optimizer import optimize_squad
+    points, prices, positions, teams = _small_pool(2, extra=6, n_teams=20)
+
+    assert optimize_squad(points, prices, positions, teams, 120.0, deadline=time.perf_counter() + 60).optimal
+    with pytest.raises(ValueError, match="stopped"):
+        optimize_squad(points, prices, positions, teams, 120.0, deadline=time.perf_counter())
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def test_suggest_squad_optimal_from_catalog(db):
+    from app.rl.inference import suggest_squad_optimal
+
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(10)])
+    db.flush()
+    positions = ["GK"] * 4 + ["DEF"] * 10 + ["MID"] * 10 + ["FWD"] * 6
+    db.add_all([
+        Player(id=f"p{i:02d}", external_id=f"p{i}", team_id=f"t{i % 10}", name=f"P{i}",
+               position=pos, price=4.5 + (i % 5), is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    db.commit()
+
+    result = suggest_squad_optimal(db, budget=100.0, locked_player_ids=["p00"], excluded_player_ids=["p01"])
+    assert len(result["player_ids"]) == 15
+    assert "p00" in result["player_ids"] and "p01" not in result["player_ids"]
+    assert result["positions"] == {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+    assert result["budget_remaining"] >= 0
+    assert suggest_squad_optimal(db, budget=100.0, locked_player_ids=["p00"],
+                                 excluded_player_ids=["p01"]) == result
+
+    with pytest.raises(ValueError):
+        suggest_squad_optimal(db, locked_player_ids=["nope"])
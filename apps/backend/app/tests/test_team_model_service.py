@@ -0,0 +1,105 @@
+"""
+Tests for team_model_service — Poisson rating fit, pairing probabilities and
+persisted fixture projections.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.match import Match, MatchStatus
+from app.models.team import Team
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def no_history(monkeypatch, tmp_path):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "historical_results_path", str(tmp_path / "missing.csv"))
+
+
+def _uid():
+    return str(uuid.uuid4())
+
+
+def test_fit_recovers_relative_strength():
+    from app.services.team_model_service import fit_ratings
+
+    rng = np.random.default_rng(0)
+    attack = np.array([0.6, 0.2, -0.2, -0.6])
+    defence = np.array([0.4, 0.0, 0.0, -0.4])
+    home, away = np.meshgrid(np.arange(4), np.arange(4))
+    mask = home != away
+    home, away = np.repeat(home[mask], 200), np.repeat(away[mask], 200)
+    hg = rng.poisson(np.exp(0.2 + attack[home] - defence[away]))
+    ag = rng.poisson(np.exp(attack[away] - defence[home]))
+
+    fit_att, fit_def, home_adv = fit_ratings(home, away, hg, ag, np.ones(len(home)), 4, prior_precision=0.1)
+
+    assert np.all(np.diff(fit_att) < 0)
+    assert fit_def[0] > fit_def[3]
+    assert 0.05 < home_adv < 0.35
+
+
+def test_pairing_probabilities_are_consistent():
+    from app.services.team_model_service import pairing_probabilities
+
+    p = pairing_probabilities(np.array([0.5, 0.0, -0.3]), np.array([0.2, 0.0, -0.2]), 0.1)
+
+    total = p["home_win"] + p["draw"] + p["away_win"]
+    assert np.allclose(total, 1.0, atol=1e-5)
+    assert p["home_xg"].shape == (3, 3)
+    # Stronger attack against weaker defence → more goals and higher win chance
+    assert p["home_xg"][0, 2] > p["home_xg"][2, 0]
+    assert p["home_win"][0, 2] > p["home_win"][2, 0]
+    assert np.allclose(p["away_clean_sheet"], np.exp(-p["home_xg"]), atol=1e-5)
+
+
+def test_refit_persists_ratings_and_projections(db):
+    from app.models.fixture_projection import FixtureProjection
+    from app.models.team_strength import TeamStrength
+    from app.services.team_model_service import get_fixture_projections, get_team_model, refit_team_model
+
+    teams = [Team(id=_uid(), external_id=_uid(), name=f"T{i}", country_code=f"T{i}") for i in range(3)]
+    db.add_all(teams)
+    now = datetime.utcnow()
+    strong, mid, weak = (t.id for t in teams)
+    db.add_all([
+        Match(id=_uid(), external_id=_uid(), home_team_id=strong, away_team_id=weak, kickoff_utc=now - timedelta(days=3),
+              status=MatchStatus.FINISHED, home_score=4, away_score=0),
+        Match(id=_uid(), external_id=_uid(), home_team_id=mid, away_team_id=weak, kickoff_utc=now - timedelta(days=2),
+              status=MatchStatus.FINISHED, home_score=2, away_score=1),
+    ])
+    upcoming = Match(id=_uid(), external_id=_uid(), home_team_id=strong, away_team_id=mid,
+                     kickoff_utc=now + timedelta(days=1), status=MatchStatus.SCHEDULED)
+    db.add(upcoming)
+    db.commit()
+
+    assert refit_team_model(db) == 1
+    db.commit()
+
+    ratings = {r.team_id: r for r in db.query(TeamStrength).all()}
+    assert ratings[strong].attack_rating > ratings[weak].attack_rating
+    assert db.query(FixtureProjection).count() == 1
+
+    projection = get_fixture_projections(db, [upcoming.id])[upcoming.id]
+    assert projection["home_xg"] > projection["away_xg"]
+    assert projection["home_win"] > projection["away_win"]
+
+    model = get_team_model(db)
+    assert model.projection(strong, mid)["home_xg"] == pytest.approx(projection["home_xg"], rel=1e-4)
+    assert model.projection(strong, "unknown") is None
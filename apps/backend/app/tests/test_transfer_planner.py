@@ -0,0 +1,202 @@
+"""
+Tests for the multi-round transfer planner (app/rl/transfer_planner.py).
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.models.fixture_projection import FixtureProjection
+from app.models.match import Match
+from app.models.player import Player
+from app.models.round import Round
+from app.models.squad import Squad
+from app.models.squad_player import SquadPlayer
+from app.models.team import Team
+
+POSITIONS = [0] * 2 + [1] * 5 + [2] * 5 + [3] * 3
+
+
+def _market(n_rounds=3):
+    """A 15-man squad (indices 0-14) plus 3 outsiders per position."""
+    positions = np.array(POSITIONS + [0, 1, 2, 3] * 3)
+    n = len(positions)
+    prices = np.full(n, 5.0)
+    points = np.full((n, n_rounds), 3.0)
+    teams = np.arange(n) % 20
+    return points, prices, positions, teams
+
+
+def _check_plan(plan, prices, positions, teams, bank):
+    squad = np.array(plan["final_squad"])
+    assert len(set(squad.tolist())) == 15
+    assert np.bincount(positions[squad], minlength=4).tolist() == [2, 5, 5, 3]
+    assert np.bincount(teams[squad]).max() <= 2
+    assert plan["bank"] == pytest.approx(bank + 75.0 - prices[squad].sum())
+    assert plan["bank"] >= 0
+
+
+def test_single_upgrade_beats_hold():
+    from app.rl.transfer_planner import plan_transfers
+    points, prices, positions, teams = _market()
+    points[16] = 9.0                         # outsider DEF, every round
+    points[17] = 3.5                         # marginal MID: +1.5 over the horizon
+    plans = plan_transfers(points, prices, positions, teams, list(range(15)), bank=0.0)
+
+    by_first = {p["first_round"]: p for p in plans}
+    assert set(by_first) == {0, 1, 2}
+    assert plans[0]["first_round"] == 1
+    swap = by_first[1]["steps"][0]["transfers"]
+    assert len(swap) == 1 and swap[0][1] == 16 and positions[swap[0][0]] == 1
+    assert by_first[1]["expected_points"] > by_first[0]["expected_points"]
+    assert by_first[1]["expected_points"] > by_first[2]["expected_points"]   # the MID waits for a free transfer
+    assert by_first[1]["steps"][1]["transfers"] == [(7, 17)]
+    for plan in plans:
+        assert plan["exhaustive"]
+        _check_plan(plan, prices, positions, teams, 0.0)
+
+
+def test_second_transfer_costs_a_hit():
+    from app.rl.transfer_planner import HIT_COST, plan_transfers
+    points, prices, positions, teams = _market(n_rounds=1)
+    points[16] = 9.0
+    points[17] = 4.0                         # +1 for MID, +0.5 more as vice-captain
+    plans = {p["first_round"]: p for p in plan_transfers(points, prices, positions, teams, list(range(15)), 0.0)}
+
+    assert plans[2]["hits"] == 1
+    assert plans[2]["steps"][0]["hits"] == 1
+    assert plans[2]["expected_points"] == pytest.approx(plans[1]["expected_points"] + 1.5 - HIT_COST)
+
+
+def test_budget_and_nation_limits_respected():
+    from app.rl.transfer_planner import plan_transfers
+    points, prices, positions, teams = _market()
+    points[16], prices[16] = 9.0, 12.0      # unaffordable with no bank
+    points[20], teams[20] = 8.0, teams[1]   # DEF whose nation is already full
+    teams[0] = teams[1]
+    plans = plan_transfers(points, prices, positions, teams, list(range(15)), bank=0.0)
+    for plan in plans:
+        _check_plan(plan, prices, positions, teams, 0.0)
+        assert 16 not in plan["final_squad"]
+
+
+def test_wildcard_plan_only_when_available():
+    from app.rl.transfer_planner import WILDCARD, plan_transfers
+    points, prices, positions, teams = _market()
+    points[15:] = 6.0                        # every outsider is an upgrade
+    without = plan_transfers(points, prices, positions, teams, list(range(15)), bank=0.0)
+    assert WILDCARD not in {p["first_round"] for p in without}
+
+    with_wc = plan_transfers(points, prices, positions, teams, list(range(15)), bank=0.0, wildcard_available=True)
+    assert with_wc[0]["first_round"] == WILDCARD
+    assert with_wc[0]["hits"] == 0
+    assert len(with_wc[0]["steps"][0]["transfers"]) == 11   # only two of the three outside GKs fit
+    _check_plan(with_wc[0], prices, positions, teams, 0.0)
+
+
+def test_time_budget_holds_on_a_full_catalog():
+    import time
+    from app.rl.squad_optimizer import optimize_squad
+    from app.rl.transfer_planner import plan_transfers
+
+    rng = np.random.default_rng(0)
+    n = 1500
+    positions = rng.choice(4, size=n, p=[0.13, 0.33, 0.33, 0.21])
+    prices = np.round(np.array([4.5, 5.0, 5.5, 6.5])[positions] + rng.uniform(-0.5, 1.5, n), 1)
+    teams = rng.integers(0, 48, n)
+    points = np.clip(prices[:, None] * 0.6 + rng.normal(0, 1.5, (n, 5)), 0, None)
+    squad = optimize_squad(rng.uniform(0, 1, n), prices, positions, teams, 95.0).indices
+
+    for budget_ms in (10.0, 30.0):
+        start = time.perf_counter()
+        plans = plan_transfers(points, prices, positions, teams, squad, bank=5.0,
+                               wildcard_available=True, time_budget_ms=budget_ms)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        assert elapsed_ms < budget_ms + 15      # a wildcard solve alone takes about 30 ms here
+        assert plans and not any(p["exhaustive"] for p in plans)
+        for plan in plans:
+            assert len(plan["steps"]) == 5
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(engine)
+
+
+def test_suggest_transfer_plans_scales_by_fixture(db):
+    from app.rl.inference import suggest_transfer_plans
+
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(10)])
+    db.flush()
+    positions = ["GK"] * 4 + ["DEF"] * 10 + ["MID"] * 10 + ["FWD"] * 6
+    db.add_all([
+        Player(id=f"p{i:02d}", external_id=f"p{i}", team_id=f"t{i % 10}", name=f"P{i}",
+               position=pos, price=Decimal("5.0"), is_active=True)
+        for i, pos in enumerate(positions)
+    ])
+    now = datetime.utcnow()
+    match = Match(id="m1", external_id="m1", home_team_id="t0", away_team_id="t1", kickoff_utc=now + timedelta(days=1))
+    round_ = Round(id="r1", name="Group Stage - 1", start_utc=now, deadline_utc=now + timedelta(hours=12),
+                   end_utc=now + timedelta(days=3))
+    round_.matches.append(match)
+    db.add_all([match, round_, FixtureProjection(
+        match_id="m1", home_xg=2.7, away_xg=0.5, home_clean_sheet=0.6, away_clean_sheet=0.07,
+        home_win=0.7, draw=0.2, away_win=0.1)])
+    squad = Squad(id="s1", user_id="u1", league_id="l1", budget_remaining=Decimal("25.0"),
+                  free_transfers_remaining=1, wildcard_used=True)
+    db.add(squad)
+    picks = ["p00", "p01", "p04", "p05", "p06", "p07", "p08", "p14", "p15", "p16", "p17", "p18", "p24", "p25", "p26"]
+    db.add_all([SquadPlayer(squad_id="s1", player_id=pid) for pid in picks])
+    db.commit()
+
+    result = suggest_transfer_plans(db, "s1", horizon=2)
+    assert result["rounds"] == ["Group Stage - 1", None]
+    assert {p["first_round"] for p in result["plans"]} <= {0, 1, 2}
+    for plan in result["plans"]:
+        assert len(plan["final_squad"]) == 15
+        for step in plan["steps"]:
+            assert all(set(t) == {"out", "in"} for t in step["transfers"])
+
+    with pytest.raises(ValueError):
+        suggest_transfer_plans(db, "missing")
+
+
+def test_expected_points_by_round_uses_projections(db):
+    from app.rl import player_pool
+    from app.rl.inference import expected_points_by_round
+
+    db.add_all([Team(id=f"t{i}", external_id=f"t{i}", name=f"T{i}", country_code=f"T{i}") for i in range(3)])
+    db.add_all([
+        Player(id="fwd0", external_id="a", team_id="t0", name="A", position="FWD", price=Decimal("8"), is_active=True),
+        Player(id="def1", external_id="b", team_id="t1", name="B", position="DEF", price=Decimal("5"), is_active=True),
+        Player(id="mid2", external_id="c", team_id="t2", name="C", position="MID", price=Decimal("6"), is_active=True),
+    ])
+    now = datetime.utcnow()
+    match = Match(id="m1", external_id="m1", home_team_id="t0", away_team_id="t1", kickoff_utc=now + timedelta(days=1))
+    round_ = Round(id="r1", name="R1", start_utc=now, deadline_utc=now, end_utc=now + timedelta(days=3))
+    round_.matches.append(match)
+    db.add_all([match, round_, FixtureProjection(
+        match_id="m1", home_xg=2.7, away_xg=0.5, home_clean_sheet=0.6, away_clean_sheet=0.07,
+        home_win=0.7, draw=0.2, away_win=0.1)])
+    db.commit()
+
+    pool = player_pool.get_player_pool(db)
+    pool.features.setflags(write=True)
+    pool.features[:3, 2] = 4.0               # avg points
+    names, points = expected_points_by_round(db, pool, horizon=2)
+    assert names == ["R1", None]
+    row = {pid: points[pool.index[pid]] for pid in ("fwd0", "def1", "mid2")}
+    assert row["fwd0"][0] == pytest.approx(4.0 * 1.5)       # xG 2.7 / 1.35, clipped to 1.5
+    assert row["def1"][0] == pytest.approx(4.0 * 0.5)       # clean sheet 0.07 / 0.3, clipped to 0.5
+    assert row["mid2"][0] == 0.0                            # no match this round
+    assert points[:3, 1].tolist() == [4.0, 4.0, 4.0]        # beyond the schedule: plain average
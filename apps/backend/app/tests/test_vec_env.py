@@ -0,0 +1,77 @@
+"""Tests for the batched VecFantasyEnv and batched policy sampling."""
+import numpy as np
+import pytest
+
+
+@pytest.fixture()
+def pool():
+    from app.rl.environment import _generate_random_pool
+    rng = np.random.default_rng(7)
+    return _generate_random_pool(), rng.integers(0, 8, size=200)
+
+
+def test_vec_env_matches_single_env(pool):
+    from app.rl.environment import FantasyEnv
+    from app.rl.vec_env import VecFantasyEnv
+
+    player_pool, team_ids = pool
+    n = 4
+    vec = VecFantasyEnv(n, player_pool, team_ids)
+    singles = [FantasyEnv(player_pool, team_ids) for _ in range(n)]
+    vec_obs, _ = vec.reset()
+    for i, env in enumerate(singles):
+        obs, _ = env.reset()
+        np.testing.assert_allclose(vec_obs[i], obs)
+
+    rng = np.random.default_rng(0)
+    for _ in range(60):
+        masks = vec.action_masks()
+        for i, env in enumerate(singles):
+            np.testing.assert_array_equal(masks[i], env.action_masks())
+        # Mostly valid picks with the occasional invalid one
+        actions = np.array([
+            rng.choice(np.flatnonzero(m)) if m.any() and rng.random() > 0.1 else rng.integers(200)
+            for m in masks
+        ])
+        vec_obs, rewards, terminated, _, infos = vec.step(actions)
+        for i, env in enumerate(singles):
+            obs, reward, done, _, info = env.step(int(actions[i]))
+            assert rewards[i] == pytest.approx(reward, rel=1e-5)
+            assert terminated[i] == done
+            assert infos["invalid_pick"][i] == info.get("invalid_pick", False)
+            if done:
+                obs, _ = env.reset()
+            np.testing.assert_allclose(vec_obs[i], obs, rtol=1e-6)
+
+
+def test_vec_env_auto_resets_finished_episodes(pool):
+    from app.rl.environment import INITIAL_BUDGET, SQUAD_SIZE
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.vec_env import VecFantasyEnv
+
+    vec = VecFantasyEnv(8, *pool)
+    policy = FantasyPolicy(seed=0)
+    obs, _ = vec.reset()
+    finished = 0
+    for _ in range(SQUAD_SIZE * 3):
+        obs, _, terminated, _, infos = vec.step(policy.select_actions(obs, vec.action_masks()))
+        finished += int(terminated.sum())
+        assert np.all(vec.budget_remaining[terminated] == INITIAL_BUDGET)
+        assert np.all(vec.squad_size[terminated] == 0)
+        assert np.all(np.isnan(infos["squad_points"][~terminated]))
+    assert finished >= 8
+
+
+def test_select_actions_respects_masks():
+    from app.rl.environment import MAX_PLAYERS
+    from app.rl.executor_policy import FantasyPolicy
+    from app.rl.vec_env import OBS_DIM
+
+    policy = FantasyPolicy(seed=1)
+    obs = np.random.default_rng(2).standard_normal((5, OBS_DIM)).astype(np.float32)
+    masks = np.zeros((5, MAX_PLAYERS), dtype=bool)
+    for i in range(5):
+        masks[i, [i, 100 + i]] = True
+    actions = policy.select_actions(obs, masks, np.random.default_rng(3))
+    assert all(a in (i, 100 + i) for i, a in enumerate(actions))
+    assert policy.action_probs(obs, masks).shape == (5, MAX_PLAYERS)
@@ -0,0 +1,109 @@
+"""
+Benchmark: squad-builder throughput vs micro-batching window.
+
+Simulates a burst of squad-builder requests, each walking FantasyEnv for
+15 picks. Arrivals are a Poisson process, so the window trades batch
+size against the time the first step of a batch waits. The baseline
+runs every pick as its own forward pass, as the sync suggest_squad_rl
+does. The other rows send the picks through PolicyBatchScheduler with
+different window sizes. For each row the table shows:
+
+- squads/s and picks/s
+- mean batch size
+- p50/p95 request latency, i.e. what one user waits under the burst
+
+A window of 0 flushes every pick immediately: that row is the
+scheduler's overhead without any batching.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_batch_window [--players 1500] [--requests 64] [--windows 0 1 2 3 5 10] [--seed 0]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.rl.batch_scheduler import PolicyBatchScheduler
+from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+from app.rl.executor_policy import FantasyPolicy
+
+
+async def _request(env: FantasyEnv, scheduler: PolicyBatchScheduler, delay: float) -> float:
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    obs, _ = env.reset()
+    terminated = False
+    while not terminated:
+        mask = env.action_masks()
+        if not mask.any():
+            break
+        obs, _, terminated, _, _ = env.step(await scheduler.select_action(obs, mask))
+    return time.perf_counter() - start
+
+
+async def _burst(envs: list[FantasyEnv], scheduler: PolicyBatchScheduler, arrivals: np.ndarray) -> list[float]:
+    return await asyncio.gather(*[_request(env, scheduler, t) for env, t in zip(envs, arrivals)])
+
+
+def sequential(envs: list[FantasyEnv], policy: FantasyPolicy, arrivals: np.ndarray) -> tuple[float, list[float], int]:
+    """Baseline: one forward pass per pick, requests served one after another.
+
+    The sync handler blocks the event loop, so a request that arrives while
+    another is being served waits for it: latency = queueing + service.
+    """
+    latencies, steps, free_at = [], 0, 0.0
+    for env, arrival in zip(envs, arrivals):
+        start = time.perf_counter()
+        obs, _ = env.reset()
+        terminated = False
+        while not terminated:
+            mask = env.action_masks()
+            if not mask.any():
+                break
+            obs, _, terminated, _, _ = env.step(policy.select_action(obs, mask))
+            steps += 1
+        service = time.perf_counter() - start
+        free_at = max(free_at, arrival) + service
+        latencies.append(free_at - arrival)
+    return free_at, latencies, steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1500)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--arrival-ms", type=float, default=2.0, help="mean gap between request arrivals")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, 1.0, 2.0, 3.0, 5.0, 10.0])
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    pool, team_ids = _generate_random_pool(args.players), _generate_team_ids(args.players)
+    policy = FantasyPolicy(seed=args.seed)
+    envs = [FantasyEnv(pool, team_ids) for _ in range(args.requests)]
+    gaps = np.random.default_rng(args.seed).exponential(args.arrival_ms / 1000, args.requests)
+    arrivals = np.cumsum(gaps) - gaps[0]
+
+    def row(name, elapsed, latencies, steps, batch):
+        p50, p95 = np.percentile(np.array(latencies) * 1000, [50, 95])
+        print(f"{name:>12}  {args.requests / elapsed:>8.1f}  {steps / elapsed:>8.0f}  {batch:>6.1f}  "
+              f"{p50:>8.1f}  {p95:>8.1f}")
+
+    print(f"{args.players} players, {args.requests} requests arriving every ~{args.arrival_ms:g} ms")
+    print(f"{'window':>12}  {'squads/s':>8}  {'picks/s':>8}  {'batch':>6}  {'p50 ms':>8}  {'p95 ms':>8}")
+    elapsed, latencies, steps = sequential(envs, policy, arrivals)
+    row("sequential", elapsed, latencies, steps, 1.0)
+    for window in args.windows:
+        scheduler = PolicyBatchScheduler(lambda: policy, window_ms=window, max_batch=args.max_batch, seed=args.seed)
+        start = time.perf_counter()
+        latencies = asyncio.run(_burst(envs, scheduler, arrivals))
+        elapsed = time.perf_counter() - start
+        stats = scheduler.stats()
+        row(f"{window:g} ms", elapsed, latencies, stats["steps"], stats["mean_batch_size"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: FantasyEnv steps/sec vs the original per-player Python loops,
+plus VecFantasyEnv driven by the policy's batched forward pass.
+
+LoopFantasyEnv reproduces the pre-vectorisation masking/observation code
+(list membership, a Python scan per mask, flatten + concatenate per step).
+Both single envs run the same random masked rollouts on the same pool.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_env_step [--steps 20000] [--num-envs 64] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.rl.environment import (
+    IDX_TO_POS,
+    MAX_PLAYERS,
+    SQUAD_SIZE,
+    FantasyEnv,
+    _generate_random_pool,
+    _generate_team_ids,
+)
+from app.rl.executor_policy import FantasyPolicy
+from app.rl.vec_env import VecFantasyEnv
+
+
+class LoopFantasyEnv(FantasyEnv):
+    """FantasyEnv with the original scalar masking and observation code."""
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        self.loop_positions = {"GK": 0, "DEF": 0, "MID": 0, "FWD": 0}
+        self.loop_teams: dict[int, int] = {}
+        return self._get_obs(), {}
+
+    def step(self, action: int):
+        reward, terminated, info = 0.0, False, {}
+        if not self._is_valid_pick(action):
+            reward = -1.0
+            info["invalid_pick"] = True
+        else:
+            self.squad.append(action)
+            player = self.player_pool[action]
+            pos = IDX_TO_POS.get(int(player[0]), "MID")
+            self.budget_remaining -= float(player[1])
+            self.loop_positions[pos] += 1
+            team_id = int(self.team_ids[action])
+            self.loop_teams[team_id] = self.loop_teams.get(team_id, 0) + 1
+            reward = float(player[2]) * 0.1
+        if len(self.squad) >= SQUAD_SIZE:
+            terminated = True
+            reward += sum(float(self.player_pool[pid][2]) for pid in self.squad)
+        elif not any(self._is_valid_pick(i) for i in range(self.n_players)):
+            terminated = True
+            reward -= 10.0 * (SQUAD_SIZE - len(self.squad))
+        return self._get_obs(), reward, terminated, False, info
+
+    def action_masks(self) -> np.ndarray:
+        mask = np.zeros(MAX_PLAYERS, dtype=bool)
+        for i in range(self.n_players):
+            mask[i] = self._is_valid_pick(i)
+        return mask
+
+    def _is_valid_pick(self, action: int) -> bool:
+        if action >= self.n_players or action in self.squad:
+            return False
+        player = self.player_pool[action]
+        pos = IDX_TO_POS.get(int(player[0]), "MID")
+        if float(player[1]) > self.budget_remaining:
+            return False
+        if self.loop_positions.get(pos, 0) >= self.position_limits.get(pos, 0):
+            return False
+        team_id = int(self.team_ids[action])
+        if team_id >= 0 and self.loop_teams.get(team_id, 0) >= self.max_per_team:
+            return False
+        return True
+
+    def _get_obs(self) -> np.ndarray:
+        counts = getattr(self, "loop_positions", {})
+        extras = np.array([
+            self.budget_remaining,
+            counts.get("GK", 0), counts.get("DEF", 0), counts.get("MID", 0), counts.get("FWD", 0),
+            len(self.squad),
+        ], dtype=np.float32)
+        return np.concatenate([self.player_pool.flatten(), extras])
+
+
+def steps_per_second(env: FantasyEnv, n_steps: int, seed: int) -> float:
+    """Random masked rollouts: mask → pick → step, auto-resetting episodes."""
+    rng = np.random.default_rng(seed)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        valid = np.flatnonzero(env.action_masks())
+        action = int(valid[rng.integers(len(valid))]) if len(valid) else 0
+        _, _, terminated, _, _ = env.step(action)
+        if terminated:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+
+def vec_steps_per_second(env: VecFantasyEnv, policy: FantasyPolicy, n_steps: int, seed: int) -> float:
+    """Policy-driven batched rollouts; counts individual env steps."""
+    rng = np.random.default_rng(seed)
+    obs, _ = env.reset()
+    batches = max(n_steps // env.num_envs, 1)
+    start = time.perf_counter()
+    for _ in range(batches):
+        actions = policy.select_actions(obs, env.action_masks(), rng)
+        obs, _, _, _, _ = env.step(actions)
+    return batches * env.num_envs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--num-envs", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    pool, team_ids = _generate_random_pool(), _generate_team_ids()
+    loop = steps_per_second(LoopFantasyEnv(pool, team_ids), args.steps, args.seed)
+    vectorised = steps_per_second(FantasyEnv(pool, team_ids), args.steps, args.seed)
+    batched = vec_steps_per_second(
+        VecFantasyEnv(args.num_envs, pool, team_ids), FantasyPolicy(seed=args.seed), args.steps, args.seed
+    )
+
+    print(f"{'env':>12}  {'steps/s':>10}")
+    print(f"{'loop':>12}  {loop:>10.0f}")
+    print(f"{'vectorised':>12}  {vectorised:>10.0f}")
+    print(f"{f'vec x{args.num_envs}':>12}  {batched:>10.0f}  (incl. policy forward)")
+    print(f"speedup: {vectorised / loop:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
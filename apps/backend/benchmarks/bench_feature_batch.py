@@ -0,0 +1,99 @@
+"""
+Benchmark: per-player build_player_features vs batched build_features_batch.
+
+Seeds a throwaway in-memory SQLite DB with N players (5 matches of stats
+each) and times building features for the whole pool both ways.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_feature_batch [--sizes 200 1500 5000] [--repeat 3]
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.db import Base
+from app.models.match import Match, MatchStatus
+from app.models.player import Player
+from app.models.player_match_stats import PlayerMatchStats
+from app.models.team import Team
+from app.services.feature_service import build_features_batch, build_player_features
+
+N_TEAMS = 48
+MATCHES_PER_PLAYER = 5
+POSITIONS = ("GK", "DEF", "MID", "FWD")
+
+
+def seed(db: Session, n_players: int, seed: int = 0) -> list[str]:
+    """Insert n_players with stats and return their IDs."""
+    rng = np.random.default_rng(seed)
+    teams = [Team(id=f"t{i}", external_id=f"t{i}", name=f"Team {i}", country_code=f"T{i}") for i in range(N_TEAMS)]
+    now = datetime.utcnow()
+    matches = [
+        Match(id=f"m{i}", external_id=f"m{i}", home_team_id=f"t{(2 * i) % N_TEAMS}",
+              away_team_id=f"t{(2 * i + 1) % N_TEAMS}", kickoff_utc=now - timedelta(days=i + 1),
+              status=MatchStatus.FINISHED, home_score=1, away_score=0)
+        for i in range(MATCHES_PER_PLAYER)
+    ]
+    players = [
+        Player(id=f"p{i}", external_id=f"p{i}", team_id=f"t{i % N_TEAMS}", name=f"Player {i}",
+               position=POSITIONS[i % 4], price=float(rng.uniform(4.0, 12.0)), is_active=True)
+        for i in range(n_players)
+    ]
+    db.add_all(teams + matches + players)
+    db.flush()
+    db.bulk_save_objects([
+        PlayerMatchStats(id=str(uuid.uuid4()), match_id=m.id, player_id=p.id,
+                         minutes_played=int(rng.integers(0, 91)), goals=int(rng.poisson(0.2)),
+                         assists=int(rng.poisson(0.15)), saves=int(rng.poisson(1.0)),
+                         fantasy_points=int(rng.integers(0, 12)))
+        for p in players
+        for m in matches
+    ])
+    db.commit()
+    return [p.id for p in players]
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n_players: int, repeat: int) -> tuple[float, float]:
+    """Return (per_player_seconds, batch_seconds) for a pool of n_players."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        ids = seed(db, n_players)
+        per_player = _best_of(lambda: [build_player_features(pid, db) for pid in ids], repeat)
+        batch = _best_of(lambda: build_features_batch(db, ids), repeat)
+        return per_player, batch
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1500, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'players':>8}  {'per-player (ms)':>16}  {'batch (ms)':>11}  {'speedup':>8}")
+    for n in args.sizes:
+        per_player, batch = run(n, args.repeat)
+        print(f"{n:>8}  {per_player * 1e3:>16.1f}  {batch * 1e3:>11.1f}  {per_player / batch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: Monte Carlo round simulation of a squad.
+
+Fits rates for a random 15-man squad spread over several fixtures, then
+times each stage for every scenario count:
+
+- simulate:  simulate_points, the (players, scenarios) points matrix
+- squad:     squad_distribution for --squads squads at once (mean/std/quantiles)
+- captains:  choose_captains for one XI and the risk profile
+- total:     simulate + captains, what one lineup or squad-builder request pays
+
+Each stage reports the best of --repeats runs. The target is under
+100 ms total at 100k scenarios.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_round_simulator [--players 15] [--scenarios 10000 50000 100000] [--risk conservative]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.rl.round_simulator import Fixtures, choose_captains, fit_player_rates, simulate_points, squad_distribution
+from app.services.feature_service import BATCH_FEATURE_COLUMNS, BATCH_FEATURE_INDEX as F
+
+
+def _random_squad(n_players: int, n_matches: int, rng: np.random.Generator) -> tuple:
+    positions = np.resize([0, 0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3], n_players)
+    features = np.zeros((n_players, len(BATCH_FEATURE_COLUMNS)))
+    matches = rng.integers(0, 12, n_players)
+    features[:, F["matches_played"]] = matches
+    features[:, F["total_minutes"]] = matches * rng.uniform(30, 90, n_players)
+    features[:, F["total_goals"]] = rng.poisson(matches * np.array([0.0, 0.06, 0.2, 0.4])[positions])
+    features[:, F["total_assists"]] = rng.poisson(matches * 0.12)
+    features[:, F["total_saves"]] = np.where(positions == 0, rng.poisson(matches * 3), 0)
+    features[:, F["total_yellows"]] = rng.poisson(matches * 0.12)
+    sides = rng.permutation(2 * n_matches)[np.arange(n_players) % (2 * n_matches)]
+    fixtures = Fixtures(sides, rng.uniform(0.6, 2.4, 2 * n_matches), np.arange(2 * n_matches) ^ 1)
+    return fit_player_rates(features, positions), fixtures
+
+
+def _best_ms(fn, repeats: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=15)
+    parser.add_argument("--matches", type=int, default=8, help="fixtures the squad is spread over")
+    parser.add_argument("--scenarios", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--squads", type=int, default=8, help="squads scored together by squad_distribution")
+    parser.add_argument("--risk", default="conservative", choices=["conservative", "balanced", "aggressive"])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    rates, fixtures = _random_squad(args.players, args.matches, rng)
+    starters = np.arange(min(11, args.players))
+    squads = np.stack([rng.permutation(args.players) for _ in range(args.squads)])
+    multipliers = np.tile(np.r_[2.0, 1.5, np.ones(len(starters) - 2), np.zeros(args.players - len(starters))],
+                          (args.squads, 1))
+
+    print(f"{args.players} players over {args.matches} fixtures, risk profile {args.risk}")
+    print(f"{'scenarios':>10}  {'simulate':>9}  {'squad':>9}  {'captains':>9}  {'total':>9}  {'mean':>6}  {'p10-p90':>9}")
+    for n in args.scenarios:
+        sim_ms, points = _best_ms(lambda: simulate_points(rates, fixtures, n, seed=args.seed), args.repeats)
+        squad_ms, _ = _best_ms(lambda: squad_distribution(points, squads, multipliers), args.repeats)
+        cap_ms, (_, _, dist) = _best_ms(lambda: choose_captains(points, starters, args.risk), args.repeats)
+        summary = dist.summary()
+        print(f"{n:>10}  {sim_ms:>7.1f}ms  {squad_ms:>7.1f}ms  {cap_ms:>7.1f}ms  {sim_ms + cap_ms:>7.1f}ms  "
+              f"{summary['mean']:>6.1f}  {summary['p10']:>4}-{summary['p90']:<4}")
+
+
+if __name__ == "__main__":
+    main()
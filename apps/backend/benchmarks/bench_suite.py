@@ -0,0 +1,233 @@
+"""
+Benchmark suite: RL env, policy, trainer and squad-builder regressions.
+
+Runs every benchmark with fixed seeds and writes one JSON document of
+metrics, so two runs (e.g. main vs a branch, on the same machine) can be
+compared:
+
+- env_steps_per_sec        FantasyEnv random masked rollouts
+- vec_env_steps_per_sec    VecFantasyEnv x --num-envs driven by the policy
+- mask_us                  one FantasyEnv.action_masks() call, mid-episode
+- forward_single_ms        FantasyPolicy.forward on one observation
+- forward_batch_ms         FantasyPolicy.forward on a --num-envs batch
+- train_episodes_per_sec   PPO collect + update, completed episodes per second
+- suggest_squad_cold_ms    first suggest_squad_rl call (builds the player pool)
+- suggest_squad_p50_ms     suggest_squad_rl with a warm pool cache, median
+- suggest_squad_p95_ms     ... and 95th percentile
+
+suggest_squad_rl runs against an in-memory SQLite DB seeded with --players
+players, serving a seeded random-init policy from a temporary registry.
+
+With --baseline, each metric is checked against the same metric in an
+earlier results file: a metric more than its tolerance (THRESHOLDS, or
+--tolerance for all of them) worse than the baseline is flagged, and
+--fail-on-regression makes the run exit with status 1.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_suite --output bench_main.json
+    python -m benchmarks.bench_suite --baseline bench_main.json --fail-on-regression [--quick]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import Base
+from app.rl import inference, model_registry, player_pool as pool_cache
+from app.rl.environment import FantasyEnv, _generate_random_pool, _generate_team_ids
+from app.rl.executor_policy import FantasyPolicy
+from app.rl.train_ppo import Adam, RolloutWorker, ppo_update
+from app.rl.vec_env import VecFantasyEnv
+from benchmarks.bench_env_step import steps_per_second, vec_steps_per_second
+from benchmarks.bench_feature_batch import seed as seed_db
+
+# metric -> (unit, higher is better, allowed relative regression)
+THRESHOLDS = {
+    "env_steps_per_sec": ("steps/s", True, 0.15),
+    "vec_env_steps_per_sec": ("steps/s", True, 0.15),
+    "mask_us": ("us", False, 0.20),
+    "forward_single_ms": ("ms", False, 0.20),
+    "forward_batch_ms": ("ms", False, 0.20),
+    "train_episodes_per_sec": ("episodes/s", True, 0.15),
+    "suggest_squad_cold_ms": ("ms", False, 0.30),
+    "suggest_squad_p50_ms": ("ms", False, 0.20),
+    "suggest_squad_p95_ms": ("ms", False, 0.30),
+}
+
+
+def bench_env(steps: int, num_envs: int, seed: int) -> dict[str, float]:
+    rng = np.random.default_rng(seed)
+    np.random.seed(seed)
+    pool, team_ids = _generate_random_pool(), _generate_team_ids()
+    env = FantasyEnv(pool, team_ids)
+
+    # Time only the mask calls of random rollouts, so every squad state is covered
+    env.reset()
+    mask_time = 0.0
+    for _ in range(steps):
+        start = time.perf_counter()
+        mask = env.action_masks()
+        mask_time += time.perf_counter() - start
+        valid = np.flatnonzero(mask)
+        _, _, terminated, _, _ = env.step(int(valid[rng.integers(len(valid))]) if len(valid) else 0)
+        if terminated:
+            env.reset()
+
+    return {
+        "env_steps_per_sec": steps_per_second(env, steps, seed),
+        "vec_env_steps_per_sec": vec_steps_per_second(
+            VecFantasyEnv(num_envs, pool, team_ids), FantasyPolicy(seed=seed), steps, seed
+        ),
+        "mask_us": mask_time / steps * 1e6,
+    }
+
+
+def bench_forward(repeats: int, num_envs: int, seed: int) -> dict[str, float]:
+    np.random.seed(seed)
+    policy = FantasyPolicy(seed=seed)
+    env = VecFantasyEnv(num_envs, _generate_random_pool(), _generate_team_ids())
+    obs, _ = env.reset()
+    return {
+        "forward_single_ms": _median_ms(lambda: policy.forward(obs[0]), repeats),
+        "forward_batch_ms": _median_ms(lambda: policy.forward(obs), repeats),
+    }
+
+
+def bench_train(iterations: int, num_envs: int, n_steps: int, seed: int) -> dict[str, float]:
+    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+    policy = FantasyPolicy(seed=seed)
+    optimizer = Adam(policy.params())
+    worker = RolloutWorker(_generate_random_pool(), _generate_team_ids(), num_envs, seed)
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        buf = worker.collect(policy, n_steps)
+        ppo_update(policy, optimizer, [buf], rng=rng)
+        episodes += len(buf.episode_returns)
+    return {"train_episodes_per_sec": episodes / (time.perf_counter() - start)}
+
+
+def bench_suggest_squad(n_players: int, repeats: int, seed: int) -> dict[str, float]:
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed_db(db, n_players, seed)
+
+    saved_registry = inference._registry
+    with tempfile.TemporaryDirectory() as registry_dir:
+        model_registry.publish(FantasyPolicy(seed=seed), registry_dir)
+        inference._registry = model_registry.ModelRegistry(registry_dir, check_interval=3600)
+        try:
+            np.random.seed(seed)
+            pool_cache._pool_cache = None  # cold: the first request builds the pool
+            start = time.perf_counter()
+            inference.suggest_squad_rl(db)
+            cold = (time.perf_counter() - start) * 1000
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                inference.suggest_squad_rl(db)
+                samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            inference._registry = saved_registry
+            pool_cache._pool_cache = None
+            db.close()
+    return {
+        "suggest_squad_cold_ms": cold,
+        "suggest_squad_p50_ms": float(np.percentile(samples, 50)),
+        "suggest_squad_p95_ms": float(np.percentile(samples, 95)),
+    }
+
+
+def _median_ms(fn, repeats: int) -> float:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def compare_results(metrics: dict[str, float], baseline: dict[str, float],
+                    tolerance: float | None = None) -> list[dict]:
+    """One row per metric present in both runs; "regressed" when worse than the tolerance allows."""
+    rows = []
+    for name, value in metrics.items():
+        if name not in baseline or name not in THRESHOLDS or not baseline[name]:
+            continue
+        _, higher_is_better, allowed = THRESHOLDS[name]
+        allowed = allowed if tolerance is None else tolerance
+        change = value / baseline[name] - 1.0
+        worse = -change if higher_is_better else change
+        rows.append({"metric": name, "baseline": baseline[name], "value": value,
+                     "change": change, "regressed": worse > allowed})
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=str, default=None, help="write results JSON here")
+    parser.add_argument("--baseline", type=str, default=None, help="results JSON of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="allowed relative regression for every metric (default: per metric)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, for a fast smoke run")
+    parser.add_argument("--players", type=int, default=1500)
+    parser.add_argument("--num-envs", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1.0
+    steps, repeats = int(20_000 * scale), max(int(200 * scale), 10)
+    started = time.perf_counter()
+    metrics: dict[str, float] = {}
+    metrics.update(bench_env(steps, args.num_envs, args.seed))
+    metrics.update(bench_forward(repeats, args.num_envs, args.seed))
+    metrics.update(bench_train(max(int(20 * scale), 2), args.num_envs // 4 or 1, 32, args.seed))
+    metrics.update(bench_suggest_squad(args.players, max(int(50 * scale), 5), args.seed))
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"seed": args.seed, "players": args.players, "num_envs": args.num_envs, "quick": args.quick},
+        "machine": {"python": platform.python_version(), "numpy": np.__version__,
+                    "platform": platform.platform(), "processor": platform.processor()},
+        "duration_s": round(time.perf_counter() - started, 1),
+        "metrics": {name: round(value, 3) for name, value in metrics.items()},
+        "units": {name: THRESHOLDS[name][0] for name in metrics},
+    }
+
+    rows = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare_results(metrics, json.load(f)["metrics"], args.tolerance)
+        results["baseline"] = args.baseline
+        results["regressions"] = [row["metric"] for row in rows if row["regressed"]]
+    changes = {row["metric"]: row for row in rows}
+
+    print(f"{'metric':<24}  {'value':>12}  {'unit':<10}  {'vs baseline':>11}")
+    for name, value in metrics.items():
+        row = changes.get(name)
+        delta = f"{row['change']:+.1%}{'  REGRESSED' if row['regressed'] else ''}" if row else ""
+        print(f"{name:<24}  {value:>12.3f}  {THRESHOLDS[name][0]:<10}  {delta:>11}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+    if args.fail_on_regression and results.get("regressions"):
+        print(f"Regressions: {', '.join(results['regressions'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
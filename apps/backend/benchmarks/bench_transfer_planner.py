@@ -0,0 +1,71 @@
+"""
+Benchmark: multi-round transfer planner latency and plan value vs time budget.
+
+A synthetic catalog (prices correlated with per-round expected points,
+48 nations) and a deliberately mediocre starting squad. For each time
+budget the planner is run and the best plan of every first-round choice
+is reported, so the cost of a tighter budget shows up as lost points.
+"over ms" is how far the slowest repeat ran past its budget. With
+--max-overrun-ms, the run exits with status 1 if any budget overran by
+more than that.
+
+Run from apps/backend:
+    source .env
+    python -m benchmarks.bench_transfer_planner [--players 1500] [--rounds 5] [--budgets 50 250 1000] [--seed 0]
+    python -m benchmarks.bench_transfer_planner --budgets 10 50 100 --max-overrun-ms 10
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from app.rl.environment import _generate_random_pool
+from app.rl.squad_optimizer import optimize_squad
+from app.rl.transfer_planner import plan_transfers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=1500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budgets", type=float, nargs="+", default=[50.0, 250.0, 1000.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-overrun-ms", type=float, default=None,
+                        help="fail if any run exceeds its budget by more than this")
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    pool = _generate_random_pool(args.players)
+    prices, positions = np.round(pool[:, 1], 1), pool[:, 0].astype(np.int64)
+    teams = rng.integers(0, 48, args.players)
+    base = prices * 0.6 + rng.normal(0, 1, args.players)
+    points = np.clip(base[:, None] + rng.normal(0, 1.5, (args.players, args.rounds)), 0, None)
+    squad = optimize_squad(rng.uniform(0, 1, args.players), prices, positions, teams, 95.0).indices
+
+    print(f"{args.players} players, {args.rounds} rounds")
+    print(f"{'budget ms':>10}  {'latency ms':>10}  {'over ms':>8}  {'choice':>9}  {'points':>8}  {'hits':>4}  exhaustive")
+    overruns = {}
+    for budget in args.budgets:
+        latencies = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            plans = plan_transfers(points, prices, positions, teams, squad, bank=5.0,
+                                   wildcard_available=True, time_budget_ms=budget)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latency = float(np.median(latencies))
+        overruns[budget] = max(0.0, max(latencies) - budget)
+        for plan in plans:
+            print(f"{budget:>10.0f}  {latency:>10.1f}  {overruns[budget]:>8.1f}  {str(plan['first_round']):>9}  "
+                  f"{plan['expected_points']:>8.1f}  {plan['hits']:>4}  {plan['exhaustive']}")
+
+    worst = max(overruns, key=overruns.get)
+    print(f"Worst overrun: {overruns[worst]:.1f} ms over the {worst:.0f} ms budget")
+    if args.max_overrun_ms is not None and overruns[worst] > args.max_overrun_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
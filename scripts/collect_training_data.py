@@ -11,7 +11,9 @@ Output (all under data/):
   - fpl_gameweeks.csv          — FPL per-player per-GW stats
   - historical_player_stats.csv — merged WC player stats with fantasy scoring
   - historical_match_results.csv — WC match outcomes for FDR computation
-  - training_episodes.pkl       — pre-built RL episodes (state → reward)
+  - episodes/                   — RL episode store, one historical round per episode
+                                  (memory-mapped .npy columns; train with
+                                  app.rl.train_ppo --episodes ../../data/episodes)
 
 Run:
     cd apps/backend
@@ -23,10 +25,17 @@ import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend"))
+
+from app.rl.environment import POS_TO_IDX, SQUAD_SIZE
+from app.rl.episode_store import EpisodeStore, write_episode_store
+
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
+EPISODES_DIR = DATA_DIR / "episodes"
 
 # ── Scoring rules (mirror scoring_service.py) ──────────────────────
 
@@ -190,55 +199,58 @@ def build_player_stats(wc_players: pd.DataFrame) -> pd.DataFrame:
 
 
 def build_training_episodes(player_stats: pd.DataFrame):
-    """Build RL training episodes: each episode is one tournament round.
+    """Write RL training episodes as a columnar episode store (data/episodes/).
 
-    Episode format: {
-        'round_id': str,
-        'player_features': list of dicts (player_id, position, goals, assists, ...),
-        'rewards': list of floats (fantasy points per player),
-    }
+    One episode is one tournament round (tournament + stage): the players who
+    appeared in it, with features from their earlier rounds, and the fantasy
+    points they scored. Columns are taken whole from the frame; see
+    app/rl/episode_store.py for the layout.
     """
-    import pickle
-
     if player_stats.empty:
         print("[Episodes] No player stats to build episodes from.")
         return
 
-    # Group by tournament + stage/round
-    group_cols = []
-    for col in ["tournament_id", "tournament_name", "stage_name", "match_id"]:
-        if col in player_stats.columns:
-            group_cols.append(col)
-
-    if not group_cols:
-        group_cols = ["match_id"] if "match_id" in player_stats.columns else []
+    round_cols = [col for col in ["tournament_id", "stage_name"] if col in player_stats.columns]
+    if not round_cols:
+        round_cols = ["match_id"] if "match_id" in player_stats.columns else []
 
-    if not group_cols:
+    if not round_cols:
         print("[Episodes] Cannot group episodes — no round/match columns found.")
         return
 
-    episodes = []
-    for group_key, group in player_stats.groupby(group_cols):
-        episode = {
-            "round_id": str(group_key),
-            "player_features": [],
-            "rewards": [],
-        }
-        for _, row in group.iterrows():
-            episode["player_features"].append({
-                "name": row.get("player_name", row.get("name", "Unknown")),
-                "position": row.get("position_mapped", "MID"),
-                "goals": row.get("goals_scored", row.get("goals", 0)),
-                "assists": row.get("assists", 0),
-                "minutes": row.get("minutes", row.get("minutes_played", 0)),
-            })
-            episode["rewards"].append(row.get("fantasy_points", 0))
-        episodes.append(episode)
-
-    out_path = DATA_DIR / "training_episodes.pkl"
-    with open(out_path, "wb") as f:
-        pickle.dump(episodes, f)
-    print(f"[Episodes] Saved {len(episodes)} training episodes to {out_path}")
+    # Round keys sort chronologically: first match date of the round, then its name
+    labels = player_stats[round_cols].astype(str).agg(" ".join, axis=1)
+    if "match_date" in player_stats.columns:
+        labels = player_stats["match_date"].astype(str).groupby(labels).transform("min") + " " + labels
+
+    def column(*names):
+        for name in names:
+            if name in player_stats.columns:
+                return pd.to_numeric(player_stats[name], errors="coerce").fillna(0).to_numpy()
+        return np.zeros(len(player_stats))
+
+    def keys(*names):
+        for name in names:
+            if name in player_stats.columns:
+                return player_stats[name].astype(str).to_numpy()
+        return np.full(len(player_stats), "")
+
+    store = write_episode_store(
+        EPISODES_DIR,
+        round_keys=labels.to_numpy(),
+        player_keys=keys("player_id", "player_name", "name"),
+        team_keys=keys("team_id", "team_name"),
+        positions=player_stats["position_mapped"].map(POS_TO_IDX).fillna(POS_TO_IDX["MID"]).to_numpy(),
+        goals=column("goals_scored", "goals"),
+        assists=column("assists"),
+        minutes=column("minutes", "minutes_played"),
+        saves=column("saves"),
+        points=column("fantasy_points"),
+        min_round_size=SQUAD_SIZE,
+    )
+    episodes = EpisodeStore(store)
+    print(f"[Episodes] Saved {len(episodes)} training episodes "
+          f"({int(episodes.offsets[-1])} player rows) to {store}")
 
 
 # ── Main ──────────────────────────────────────────────────────────
@@ -260,7 +272,7 @@ def main():
 
     print("\n" + "=" * 60)
     print("Collection complete! Files in data/:")
-    for f in sorted(DATA_DIR.glob("*.csv")) + sorted(DATA_DIR.glob("*.pkl")):
+    for f in sorted(DATA_DIR.glob("*.csv")) + sorted(EPISODES_DIR.glob("*.npy")):
         size_mb = f.stat().st_size / (1024 * 1024)
         print(f"  {f.name:40s} {size_mb:.1f} MB")
     print("=" * 60)
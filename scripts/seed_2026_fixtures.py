@@ -19,6 +19,7 @@ from app.core.db import SessionLocal
 from app.models.match import Match, MatchStatus
 from app.models.round import Round, round_matches
 from app.models.team import Team
+from app.services.data_version_service import STATS, bump_version
 
 
 # ── 2026 WC Venues ──────────────────────────────────────────────────────────
@@ -250,6 +251,7 @@ def main():
                 db.execute(round_matches.insert().values(round_id=round_id, match_id=match_id))
                 match_count += 1
 
+        bump_version(db, STATS)
         db.commit()
         print(f"\nDone! Seeded {match_count} matches for WC 2026.")
         print("Group stage: 8 groups × 6 matches = 48 matches")
@@ -15,6 +15,7 @@ from app.models.team import Team
 from app.models.player import Player
 from app.models.match import Match, MatchStatus
 from app.models.round import Round
+from app.services.data_version_service import CATALOG, STATS, bump_version
 
 # ──────────────────────────────────────────
 # All 48 teams in 12 groups (A–L)
@@ -447,6 +448,8 @@ def seed():
         db.flush()
         print(f"Created {len(MATCHES)} matches")
 
+        bump_version(db, CATALOG)
+        bump_version(db, STATS)
         db.commit()
         print("Seed complete!")
 